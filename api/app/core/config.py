@@ -207,6 +207,48 @@ class Settings(BaseSettings):
     jellyfin_url: Optional[str] = Field(default=None, description="Jellyfin server URL")
     jellyfin_api_key: Optional[str] = Field(default=None, description="Jellyfin API key")
     jellyfin_user_id: Optional[str] = Field(default=None, description="Jellyfin user ID")
+    jellyfin_pool_limit: int = Field(default=20, description="Maximum pooled connections to Jellyfin per event loop")
+    jellyfin_pool_limit_per_host: int = Field(default=10, description="Maximum pooled connections per Jellyfin host")
+    jellyfin_keepalive_timeout: float = Field(default=30.0, description="Seconds an idle Jellyfin connection is kept alive")
+    jellyfin_item_cache_ttl: int = Field(default=300, description="Seconds Jellyfin item metadata is cached (0 disables)")
+    jellyfin_item_cache_size: int = Field(default=512, description="Maximum Jellyfin items held in the metadata cache")
+    jellyfin_upload_verification: str = Field(default="deferred", description="Poster upload verification: deferred (batched after a job), immediate or off")
+    tag_write_concurrency: int = Field(default=8, description="Maximum concurrent Jellyfin tag updates in bulk tag operations")
+    library_index_refresh_interval: int = Field(default=60, description="Seconds before the poster manager library index is refreshed incrementally")
+    library_index_full_sync_interval: int = Field(default=86400, description="Seconds between full library index resyncs (catches deletions)")
+    
+    # External ratings
+    ratings_cache_omdb_ttl: int = Field(default=604800, description="Seconds OMDb responses (IMDb, RT, Metacritic) are cached")
+    ratings_cache_tmdb_ttl: int = Field(default=259200, description="Seconds TMDb ratings are cached")
+    ratings_cache_negative_ttl: int = Field(default=86400, description="Seconds a 'no rating available' answer is cached")
+    omdb_daily_request_limit: int = Field(default=1000, description="Maximum OMDb requests per UTC day (0 = unlimited)")
+    
+    # Series technical profiles
+    series_profile_cache_ttl: int = Field(default=2592000, description="Seconds a detected series resolution/audio profile is trusted even without new episodes")
+    
+    # Badge settings
+    badge_settings_cache_ttl: int = Field(default=30, description="Seconds badge settings are cached when config change notifications are unavailable")
+    badge_image_cache_size: int = Field(default=256, description="Rendered badge images kept in memory per process (0 disables)")
+    badge_image_cache_dir: str = Field(default="", description="Directory to persist rendered badges across restarts (empty disables)")
+    render_fingerprint_skip: bool = Field(default=True, description="Skip batch reprocessing of badged items whose original poster, badge inputs and settings are unchanged")
+    
+    # Activity tracking
+    activity_flush_batch_size: int = Field(default=200, description="Queued activity rows that trigger a batch write")
+    activity_flush_interval: float = Field(default=2.0, description="Seconds queued activity rows wait before a batch write")
+    
+    # Change feed
+    change_feed_enabled: bool = Field(default=True, description="Badge new and changed Jellyfin items as they appear, using the badge types of enabled schedules")
+    change_feed_poll_interval: int = Field(default=300, description="Seconds between change feed polls when no webhook arrives")
+    change_feed_debounce: float = Field(default=30.0, description="Seconds without further changes before queued items are sent to a batch job")
+    change_feed_max_delay: float = Field(default=300.0, description="Longest a changed item waits for its batch job during a bulk import")
+    jellyfin_webhook_token: str = Field(default="", description="Token the Jellyfin webhook must send as ?token= or X-Aphrodite-Token (empty accepts any)")
+    
+    # Image proxy
+    image_proxy_cache_dir: str = Field(default="/app/data/cache/image_proxy", description="Directory for cached proxied images and thumbnails (empty disables the disk cache)")
+    image_proxy_disk_cache_mb: int = Field(default=1024, description="Disk space for cached proxied images in MB")
+    image_proxy_memory_cache_mb: int = Field(default=64, description="Memory for recently served proxied images in MB")
+    image_proxy_jellyfin_ttl: int = Field(default=300, description="Seconds a cached Jellyfin image is served before it is fetched again")
+    image_proxy_external_ttl: int = Field(default=2592000, description="Seconds cached external (TMDb, Fanart) images are kept and cached by browsers")
     
     # Logging
     log_level: str = Field(default="DEBUG", description="Log level")
@@ -228,6 +270,8 @@ class Settings(BaseSettings):
     
     # Processing
     max_concurrent_jobs: int = Field(default=4, description="Maximum concurrent processing jobs")
+    batch_poster_concurrency: int = Field(default=4, description="Posters processed concurrently within one batch job")
+    image_process_workers: int = Field(default=0, description="Processes for Pillow decode/resize/encode work (0 = one per CPU core)")
     job_timeout: int = Field(default=300, description="Job timeout in seconds")
     image_quality: int = Field(default=95, description="Image quality for processed posters")
     max_image_size: tuple = Field(default=(2000, 3000), description="Maximum image dimensions")
@@ -0,0 +1,165 @@
+"""
+System Config Change Notifications
+
+A trigger on system_config sends a Postgres NOTIFY with the changed key on
+every insert, update or delete, whoever the writer is (API routes, init
+scripts, manual SQL). Processes LISTEN on one dedicated asyncpg connection
+and drop their cached settings when a notification arrives.
+"""
+
+import asyncio
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import get_settings
+from aphrodite_logging import get_logger
+
+
+SYSTEM_CONFIG_CHANNEL = "aphrodite_system_config"
+
+_TRIGGER_STATEMENTS = [
+    f"""
+    CREATE OR REPLACE FUNCTION aphrodite_notify_system_config() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM pg_notify('{SYSTEM_CONFIG_CHANNEL}', OLD.key);
+        ELSE
+            PERFORM pg_notify('{SYSTEM_CONFIG_CHANNEL}', NEW.key);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS system_config_notify ON system_config",
+    """
+    CREATE TRIGGER system_config_notify
+    AFTER INSERT OR UPDATE OR DELETE ON system_config
+    FOR EACH ROW EXECUTE FUNCTION aphrodite_notify_system_config()
+    """,
+]
+
+
+async def install_system_config_trigger(conn: AsyncConnection) -> None:
+    """Create (or replace) the system_config change notification trigger"""
+    for statement in _TRIGGER_STATEMENTS:
+        await conn.execute(text(statement))
+
+
+class SystemConfigListener:
+    """LISTENs for system_config changes and fans them out to subscribers"""
+    
+    def __init__(self, retry_interval: float = 30.0):
+        self.logger = get_logger("aphrodite.config.listener", service="database")
+        self.retry_interval = retry_interval
+        self._subscribers: List[Callable[[str], None]] = []
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._retry_at = 0.0
+        self._connect_lock: Optional[asyncio.Lock] = None
+    
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """Call ``callback(config_key)`` whenever a system_config row changes"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+    
+    @property
+    def is_listening(self) -> bool:
+        """Whether change notifications are currently being received in this loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return (
+            self._connection is not None
+            and self._loop is loop
+            and not self._connection.is_closed()
+        )
+    
+    async def ensure_listening(self) -> bool:
+        """
+        Start listening on the running event loop if not already.
+        
+        Returns:
+            True if notifications are being received, so cached settings can be
+            trusted until a notification says otherwise
+        """
+        if self.is_listening:
+            return True
+        
+        if self._connection is not None:
+            # Connection dropped or belongs to another loop; anything may have
+            # changed while we were not listening
+            stale, self._connection = self._connection, None
+            self._terminate(stale)
+            self._notify_all("*")
+        
+        if time.monotonic() < self._retry_at:
+            return False
+        
+        loop = asyncio.get_running_loop()
+        if self._connect_lock is None or self._loop is not loop:
+            self._connect_lock = asyncio.Lock()
+            self._loop = loop
+        
+        async with self._connect_lock:
+            if self.is_listening:
+                return True
+            try:
+                import asyncpg
+                dsn = get_settings().get_database_url().replace("postgresql+asyncpg://", "postgresql://", 1)
+                connection = await asyncpg.connect(dsn)
+                await connection.add_listener(SYSTEM_CONFIG_CHANNEL, self._on_notification)
+                self._connection = connection
+                self.logger.info("📡 [CONFIG LISTENER] Listening for system_config changes")
+                return True
+            except Exception as e:
+                self._retry_at = time.monotonic() + self.retry_interval
+                self.logger.warning(f"⚠️ [CONFIG LISTENER] Could not listen for config changes: {e}")
+                return False
+    
+    async def close(self) -> None:
+        """Stop listening (call before the listening event loop is closed)"""
+        connection, self._connection = self._connection, None
+        if connection is None or connection.is_closed():
+            return
+        if self._loop is not asyncio.get_running_loop():
+            self._terminate(connection)
+            return
+        try:
+            await connection.close()
+        except Exception:
+            self._terminate(connection)
+    
+    def _terminate(self, connection) -> None:
+        """Drop a connection without awaiting it, e.g. one opened on another event loop"""
+        if connection.is_closed():
+            return
+        try:
+            connection.terminate()
+        except Exception as e:
+            self.logger.warning(f"⚠️ [CONFIG LISTENER] Could not close stale listener connection: {e}")
+    
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        self.logger.debug(f"📡 [CONFIG LISTENER] system_config changed: {payload}")
+        self._notify_all(payload)
+    
+    def _notify_all(self, key: str) -> None:
+        for callback in self._subscribers:
+            try:
+                callback(key)
+            except Exception as e:
+                self.logger.warning(f"⚠️ [CONFIG LISTENER] Subscriber failed for {key}: {e}")
+
+
+# Global listener instance
+_system_config_listener: Optional[SystemConfigListener] = None
+
+def get_system_config_listener() -> SystemConfigListener:
+    """Get global system_config listener instance"""
+    global _system_config_listener
+    if _system_config_listener is None:
+        _system_config_listener = SystemConfigListener()
+    return _system_config_listener
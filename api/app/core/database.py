@@ -173,6 +173,25 @@ async def init_db() -> None:
         from app.models import badge_application
         from app.models import poster_replacement
         from app.models import activity_performance_metric
+        from app.models import activity_rollups
+        
+        # Import poster manager library index models
+        from app.models import library_index
+        
+        # Import external ratings cache models
+        from app.models import external_ratings
+        
+        # Import series technical profile model
+        from app.models import series_profile
+        
+        # Import original poster index model
+        from app.models import original_posters
+        
+        # Import render fingerprint model
+        from app.models import render_fingerprints
+        
+        # Import change feed state model
+        from app.models import change_feed
         
         # Import workflow models
         from app.services.workflow.database.models import BatchJobModel, PosterProcessingStatusModel
@@ -192,6 +211,15 @@ async def init_db() -> None:
         async with async_engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         
+        # Notify settings caches in every process when system_config changes
+        try:
+            from app.core.config_listener import install_system_config_trigger
+            async with async_engine.begin() as conn:
+                await install_system_config_trigger(conn)
+        except Exception as trigger_error:
+            # Another process may be installing it concurrently; caches fall back to a TTL
+            logger.warning(f"Could not install system_config notify trigger: {trigger_error}")
+        
         # Final verification that session factory is still valid
         if not async_session_factory:
             raise RuntimeError("Session factory became None after initialization")
@@ -7,6 +7,13 @@ from .media import MediaItemModel
 from .jobs import ProcessingJobModel
 from .config import BadgeConfigModel, SystemConfigModel
 from .schedules import ScheduleModel, ScheduleExecutionModel
+from .library_index import LibraryIndexItemModel, LibraryIndexStateModel
+from .external_ratings import ExternalRatingCacheModel, ExternalApiUsageModel
+from .series_profile import SeriesProfileModel
+from .original_posters import OriginalPosterModel
+from .render_fingerprints import RenderFingerprintModel
+from .activity_rollups import ActivityDailyRollupModel
+from .change_feed import ChangeFeedStateModel
 from ..services.workflow.database import BatchJobModel, PosterProcessingStatusModel
 
 __all__ = [
@@ -16,6 +23,15 @@ __all__ = [
     "SystemConfigModel",
     "ScheduleModel",
     "ScheduleExecutionModel",
+    "LibraryIndexItemModel",
+    "LibraryIndexStateModel",
+    "ExternalRatingCacheModel",
+    "ExternalApiUsageModel",
+    "SeriesProfileModel",
+    "OriginalPosterModel",
+    "RenderFingerprintModel",
+    "ActivityDailyRollupModel",
+    "ChangeFeedStateModel",
     "BatchJobModel",
     "PosterProcessingStatusModel"
 ]
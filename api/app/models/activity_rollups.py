@@ -0,0 +1,34 @@
+"""
+Activity Rollup Model
+
+Daily totals of completed activities, maintained as activities complete so
+analytics dashboards read a few rows per day instead of the full history.
+"""
+
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ActivityDailyRollupModel(Base):
+    """Completed activities of one day, activity type, badge combination and library"""
+    __tablename__ = "activity_daily_rollups"
+    
+    day = Column(Date, primary_key=True)  # UTC day the activity started
+    activity_type = Column(String(50), primary_key=True)
+    badge_key = Column(String(200), primary_key=True)  # Sorted badge types joined with ',' ('' for none)
+    library_id = Column(String(100), primary_key=True)  # From the library index ('' when unknown)
+    
+    successes = Column(Integer, nullable=False, default=0)
+    failures = Column(Integer, nullable=False, default=0)
+    
+    duration_count = Column(Integer, nullable=False, default=0)
+    duration_sum_ms = Column(BigInteger, nullable=False, default=0)
+    duration_histogram = Column(ARRAY(Integer), nullable=False)  # Counts per DURATION_BUCKETS_MS bucket
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<ActivityDailyRollup(day={self.day}, type='{self.activity_type}', badges='{self.badge_key}')>"
@@ -0,0 +1,26 @@
+"""
+Change Feed Model
+
+Per-library high-water mark of Jellyfin's DateLastSaved, so the change feed
+only asks Jellyfin for items added or changed since its last poll.
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime
+
+from app.core.database import Base
+
+
+class ChangeFeedStateModel(Base):
+    """Change feed bookkeeping for one Jellyfin library"""
+    __tablename__ = "change_feed_state"
+    
+    library_id = Column(String(100), primary_key=True)
+    
+    # Highest DateLastSaved already sent to a batch job, used as MinDateLastSaved
+    last_saved_watermark = Column(DateTime(timezone=True), nullable=True)
+    last_polled_at = Column(DateTime(timezone=True), nullable=True)
+    last_enqueued_at = Column(DateTime(timezone=True), nullable=True)
+    items_enqueued = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ChangeFeedState(library_id={self.library_id}, watermark={self.last_saved_watermark})>"
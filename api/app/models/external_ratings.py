@@ -0,0 +1,43 @@
+"""
+External Ratings Cache Models
+
+Persistent cache of review provider responses (OMDb, TMDb) and per-day
+request counters used to stay inside provider quotas.
+"""
+
+from sqlalchemy import Column, String, Integer, Date, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ExternalRatingCacheModel(Base):
+    """Cached provider response for one external ID"""
+    __tablename__ = "external_rating_cache"
+    
+    provider = Column(String(20), primary_key=True)  # e.g. 'omdb', 'tmdb'
+    external_id = Column(String(100), primary_key=True)  # e.g. 'tt0111161', 'movie/278'
+    
+    payload = Column(JSONB, nullable=True)  # NULL = provider has no data (negative cache)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_external_rating_cache_expires_at", "expires_at"),
+    )
+    
+    def __repr__(self):
+        return f"<ExternalRatingCache(provider='{self.provider}', external_id='{self.external_id}')>"
+
+
+class ExternalApiUsageModel(Base):
+    """Requests made to an external provider on one (UTC) day"""
+    __tablename__ = "external_api_usage"
+    
+    provider = Column(String(20), primary_key=True)
+    usage_date = Column(Date, primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ExternalApiUsage(provider='{self.provider}', date={self.usage_date}, requests={self.request_count})>"
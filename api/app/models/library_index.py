@@ -0,0 +1,63 @@
+"""
+Library Index Models
+
+Local snapshot of Jellyfin movie and series libraries used by the poster
+manager for searching, filtering, stats and pagination.
+"""
+
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class LibraryIndexItemModel(Base):
+    """One Jellyfin movie or series in the poster manager library index"""
+    __tablename__ = "library_index_items"
+    
+    jellyfin_id = Column(String(100), primary_key=True)
+    library_id = Column(String(100), nullable=False)
+    
+    title = Column(String(500), nullable=False)
+    sort_title = Column(String(500), nullable=False)  # Lowercased title for ordering
+    item_type = Column(String(20), nullable=False)  # 'movie' or 'series'
+    year = Column(Integer, nullable=True)
+    overview = Column(Text, nullable=True)
+    community_rating = Column(Float, nullable=True)
+    official_rating = Column(String(50), nullable=True)
+    
+    genres = Column(JSONB, nullable=False, default=list)  # Display genre names
+    genre_keys = Column(JSONB, nullable=False, default=list)  # Lowercased genres for filtering
+    tags = Column(JSONB, nullable=False, default=list)
+    badged = Column(Boolean, nullable=False, default=False)  # Has the aphrodite-overlay tag
+    
+    date_last_saved = Column(DateTime(timezone=True), nullable=True)  # Jellyfin DateLastSaved
+    indexed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_library_index_items_library_sort", "library_id", "sort_title"),
+        Index("ix_library_index_items_library_type", "library_id", "item_type"),
+        Index("ix_library_index_items_library_badged", "library_id", "badged"),
+        Index("ix_library_index_items_library_year", "library_id", "year"),
+        Index("ix_library_index_items_genre_keys", "genre_keys", postgresql_using="gin"),
+    )
+    
+    def __repr__(self):
+        return f"<LibraryIndexItem(jellyfin_id={self.jellyfin_id}, title='{self.title}', type='{self.item_type}')>"
+
+
+class LibraryIndexStateModel(Base):
+    """Sync bookkeeping for one indexed Jellyfin library"""
+    __tablename__ = "library_index_state"
+    
+    library_id = Column(String(100), primary_key=True)
+    
+    # Highest Jellyfin DateLastSaved seen, used as MinDateLastSaved for incremental syncs
+    last_saved_watermark = Column(DateTime(timezone=True), nullable=True)
+    last_synced_at = Column(DateTime(timezone=True), nullable=True)
+    last_full_sync_at = Column(DateTime(timezone=True), nullable=True)
+    item_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<LibraryIndexState(library_id={self.library_id}, items={self.item_count})>"
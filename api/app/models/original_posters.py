@@ -0,0 +1,28 @@
+"""
+Original Poster Index Model
+
+Maps a Jellyfin item to the content hash of its original (pre-badge) poster
+in the content-addressed poster store.
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class OriginalPosterModel(Base):
+    """Original poster of one Jellyfin item"""
+    __tablename__ = "original_posters"
+    
+    jellyfin_id = Column(String(100), primary_key=True)
+    content_hash = Column(String(64), nullable=False, index=True)  # SHA-256 of the image bytes
+    
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    size_bytes = Column(Integer, nullable=False)
+    
+    first_seen_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<OriginalPoster(jellyfin_id='{self.jellyfin_id}', content_hash='{self.content_hash[:12]}')>"
@@ -0,0 +1,28 @@
+"""
+Render Fingerprint Model
+
+Hash of everything that went into the last badged poster uploaded for a
+Jellyfin item, so unchanged items can be skipped on reprocessing.
+"""
+
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class RenderFingerprintModel(Base):
+    """Last render of one Jellyfin item"""
+    __tablename__ = "render_fingerprints"
+    
+    jellyfin_id = Column(String(100), primary_key=True)
+    
+    # SHA-256 of the original poster hash, badge types, badge settings and detected badge inputs
+    fingerprint = Column(String(64), nullable=False)
+    badge_types = Column(JSONB, nullable=False, default=list)
+    
+    rendered_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<RenderFingerprint(jellyfin_id='{self.jellyfin_id}', fingerprint='{self.fingerprint[:12]}')>"
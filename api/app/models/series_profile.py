@@ -0,0 +1,31 @@
+"""
+Series Technical Profile Model
+
+Dominant resolution (with HDR/Dolby Vision flags) and audio format of a TV
+series, detected by sampling its episodes. Shared by the API and all workers.
+"""
+
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class SeriesProfileModel(Base):
+    """Technical profile of one series"""
+    __tablename__ = "series_technical_profiles"
+    
+    series_id = Column(String(100), primary_key=True)  # Jellyfin series (or season) ID
+    
+    # Episode count + DateLastMediaAdded when the profile was detected; a
+    # different fingerprint means episodes were added and the profile is stale
+    fingerprint = Column(String(100), nullable=False)
+    
+    resolution = Column(JSONB, nullable=True)  # ResolutionInfo.to_dict()
+    audio = Column(JSONB, nullable=True)  # AudioInfo.to_dict()
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<SeriesProfile(series_id='{self.series_id}', fingerprint='{self.fingerprint}')>"
@@ -15,7 +15,8 @@ from app.services.analytics import (
     get_search_suggestions_service,
     get_analytics_statistics_service,
     get_batch_analytics_service,
-    get_user_analytics_service
+    get_user_analytics_service,
+    get_activity_rollup_service
 )
 
 router = APIRouter()
@@ -236,6 +237,34 @@ async def get_top_users(
         )
 
 
+@router.get("/analytics/rollups")
+async def get_activity_rollups(
+    days: int = Query(30, ge=1, le=365, description="Number of days to analyze"),
+    activity_type: Optional[str] = Query(None, description="Only this activity type"),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """
+    Get daily, per badge type and per library activity totals from the rollups.
+    
+    Includes success rates and mean/p95 processing times.
+    """
+    try:
+        rollup_service = get_activity_rollup_service()
+        result = await rollup_service.get_rollup_summary(db, days, activity_type)
+        
+        return {
+            "success": True,
+            "message": f"Activity rollups for {days} days",
+            "data": result
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get activity rollups: {str(e)}"
+        )
+
+
 @router.get("/analytics/system/overview")
 async def get_system_analytics_overview(
     days: int = Query(7, ge=1, le=90, description="Number of days to analyze"),
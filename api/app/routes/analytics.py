@@ -5,7 +5,7 @@ Provides system analytics and metrics data
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, and_, extract, select, text
+from sqlalchemy import func, and_, extract, select, text, cast, desc, Date
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel
@@ -192,44 +192,25 @@ async def get_processing_trends(
         # Import workflow models
         from app.services.workflow.database.models import BatchJobModel
         
-        # Get all jobs and filter in Python to avoid date comparison issues
-        all_jobs_result = await db.execute(
-            select(BatchJobModel.created_at, BatchJobModel.status)
-        )
-        all_jobs = all_jobs_result.all()
-        
-        # Filter by date range in Python
+        # Job timestamps are stored as naive UTC
         end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days)
         
-        filtered_jobs = []
-        for job in all_jobs:
-            if job.created_at:
-                # Ensure job.created_at is timezone-aware
-                job_time = job.created_at
-                if job_time.tzinfo is None:
-                    job_time = job_time.replace(tzinfo=timezone.utc)
-                
-                if start_date <= job_time <= end_date:
-                    filtered_jobs.append(job)
-        
-        # Process the data in Python
-        daily_stats = {}
-        for job in filtered_jobs:
-            if job.created_at:
-                job_time = job.created_at
-                if job_time.tzinfo is None:
-                    job_time = job_time.replace(tzinfo=timezone.utc)
-                
-                date_key = job_time.date().isoformat()
-                if date_key not in daily_stats:
-                    daily_stats[date_key] = {"created": 0, "completed": 0, "failed": 0}
-                
-                daily_stats[date_key]["created"] += 1
-                if job.status == "completed":
-                    daily_stats[date_key]["completed"] += 1
-                elif job.status == "failed":
-                    daily_stats[date_key]["failed"] += 1
+        job_day = cast(BatchJobModel.created_at, Date)
+        daily_result = await db.execute(
+            select(
+                job_day.label("day"),
+                func.count().label("created"),
+                func.count().filter(BatchJobModel.status == "completed").label("completed"),
+                func.count().filter(BatchJobModel.status == "failed").label("failed")
+            )
+            .where(BatchJobModel.created_at >= start_date.replace(tzinfo=None))
+            .group_by(job_day)
+        )
+        daily_stats = {
+            row.day.isoformat(): {"created": row.created, "completed": row.completed, "failed": row.failed}
+            for row in daily_result.all()
+        }
         
         # Fill in missing dates with zeros
         trends = []
@@ -265,45 +246,27 @@ async def get_job_type_distribution(db: AsyncSession = Depends(get_db_session)):
     """Get distribution and performance metrics by job type"""
     
     try:
-        # Get all jobs and process in Python to avoid complex SQL
+        completed = ProcessingJobModel.status == "completed"
+        duration = extract("epoch", ProcessingJobModel.completed_at - ProcessingJobModel.started_at)
         jobs_result = await db.execute(
-            select(ProcessingJobModel.job_type, ProcessingJobModel.status, 
-                   ProcessingJobModel.started_at, ProcessingJobModel.completed_at)
+            select(
+                ProcessingJobModel.job_type,
+                func.count().label("total"),
+                func.count().filter(completed).label("completed"),
+                func.avg(duration).filter(completed).label("avg_duration")
+            )
             .where(ProcessingJobModel.job_type.isnot(None))
+            .group_by(ProcessingJobModel.job_type)
         )
-        jobs = jobs_result.all()
-        
-        # Process in Python
-        job_type_stats = {}
-        
-        for job in jobs:
-            job_type = job.job_type
-            if job_type not in job_type_stats:
-                job_type_stats[job_type] = {
-                    "total": 0,
-                    "completed": 0,
-                    "durations": []
-                }
-            
-            job_type_stats[job_type]["total"] += 1
-            
-            if job.status == "completed":
-                job_type_stats[job_type]["completed"] += 1
-                
-                # Calculate duration if we have both start and end times
-                if job.started_at and job.completed_at:
-                    duration = (job.completed_at - job.started_at).total_seconds()
-                    job_type_stats[job_type]["durations"].append(duration)
         
-        # Build response
         result = []
-        for job_type, stats in job_type_stats.items():
-            success_rate = (stats["completed"] / stats["total"] * 100) if stats["total"] > 0 else 0
-            avg_duration = sum(stats["durations"]) / len(stats["durations"]) if stats["durations"] else None
+        for row in jobs_result.all():
+            success_rate = (row.completed / row.total * 100) if row.total > 0 else 0
+            avg_duration = float(row.avg_duration) if row.avg_duration is not None else None
             
             result.append(JobTypeDistribution(
-                job_type=job_type,
-                count=stats["total"],
+                job_type=row.job_type,
+                count=row.total,
                 success_rate=round(success_rate, 2),
                 avg_duration_seconds=round(avg_duration, 2) if avg_duration else None
             ))
@@ -322,31 +285,30 @@ async def get_schedule_analytics(db: AsyncSession = Depends(get_db_session)):
         schedules_result = await db.execute(select(ScheduleModel))
         schedules = schedules_result.scalars().all()
         
+        executions_result = await db.execute(
+            select(
+                ScheduleExecutionModel.schedule_id,
+                func.count().label("execution_count"),
+                func.count().filter(ScheduleExecutionModel.status == "completed").label("success_count"),
+                func.max(ScheduleExecutionModel.started_at).label("last_execution")
+            ).group_by(ScheduleExecutionModel.schedule_id)
+        )
+        execution_stats = {row.schedule_id: row for row in executions_result.all()}
+        
         schedule_analytics = []
         for schedule in schedules:
-            # Get execution statistics
-            executions_result = await db.execute(
-                select(ScheduleExecutionModel).where(ScheduleExecutionModel.schedule_id == schedule.id)
-            )
-            executions = executions_result.scalars().all()
-            
-            execution_count = len(executions)
-            success_count = len([e for e in executions if e.status == "completed"])
+            stats = execution_stats.get(schedule.id)
+            execution_count = stats.execution_count if stats else 0
+            success_count = stats.success_count if stats else 0
             success_rate = (success_count / execution_count * 100) if execution_count > 0 else 0.0
             
-            # Get last execution
-            last_execution = None
-            if executions:
-                sorted_executions = sorted(executions, key=lambda e: e.started_at or e.created_at, reverse=True)
-                last_execution = sorted_executions[0].started_at
-            
             schedule_analytics.append(ScheduleAnalytics(
                 id=str(schedule.id),
                 name=schedule.name,
                 enabled=schedule.enabled,
                 badge_types=schedule.badge_types or [],
                 target_libraries=schedule.target_libraries or [],
-                last_execution=last_execution,
+                last_execution=stats.last_execution if stats else None,
                 execution_count=execution_count,
                 success_rate=round(success_rate, 2)
             ))
@@ -362,70 +324,44 @@ async def get_system_performance(db: AsyncSession = Depends(get_db_session)):
     """Get system performance metrics"""
     
     try:
-        # Get all jobs and filter in Python to avoid datetime issues
-        all_jobs_result = await db.execute(
-            select(ProcessingJobModel.created_at, ProcessingJobModel.status,
-                   ProcessingJobModel.started_at, ProcessingJobModel.completed_at)
+        # Job timestamps are stored as naive UTC
+        twenty_four_hours_ago = (datetime.now(timezone.utc) - timedelta(hours=24)).replace(tzinfo=None)
+        recent = ProcessingJobModel.created_at >= twenty_four_hours_ago
+        
+        avg_duration = await db.scalar(
+            select(func.avg(extract("epoch", ProcessingJobModel.completed_at - ProcessingJobModel.started_at)))
+            .where(
+                ProcessingJobModel.status == "completed",
+                ProcessingJobModel.started_at.isnot(None),
+                ProcessingJobModel.completed_at.isnot(None)
+            )
         )
-        all_jobs = all_jobs_result.all()
-        
-        # Filter for recent jobs (last 24 hours) in Python
-        twenty_four_hours_ago = datetime.now(timezone.utc) - timedelta(hours=24)
-        recent_jobs = []
-        completed_jobs = []
-        
-        for job in all_jobs:
-            # Handle timezone awareness for created_at
-            if job.created_at:
-                job_time = job.created_at
-                if job_time.tzinfo is None:
-                    job_time = job_time.replace(tzinfo=timezone.utc)
-                
-                if job_time >= twenty_four_hours_ago:
-                    recent_jobs.append(job)
-            
-            # Handle completed jobs for duration calculation
-            if (job.status == "completed" and 
-                job.started_at and job.completed_at):
-                completed_jobs.append(job)
-        
-        # Calculate average duration
-        durations = []
-        for job in completed_jobs:
-            if job.started_at and job.completed_at:
-                # Handle timezone awareness for duration calculation
-                start_time = job.started_at
-                end_time = job.completed_at
-                
-                if start_time.tzinfo is None:
-                    start_time = start_time.replace(tzinfo=timezone.utc)
-                if end_time.tzinfo is None:
-                    end_time = end_time.replace(tzinfo=timezone.utc)
-                
-                duration = (end_time - start_time).total_seconds()
-                durations.append(duration)
+        avg_duration = float(avg_duration) if avg_duration is not None else None
         
-        avg_duration = sum(durations) / len(durations) if durations else None
+        recent_result = await db.execute(
+            select(
+                func.count().label("total"),
+                func.count().filter(ProcessingJobModel.status == "failed").label("failed")
+            ).where(recent)
+        )
+        recent_counts = recent_result.one()
         
         # Calculate jobs per hour
-        jobs_per_hour_24h = len(recent_jobs) / 24.0
+        jobs_per_hour_24h = recent_counts.total / 24.0
         
         # Calculate peak hour
-        hourly_counts = {}
-        for job in recent_jobs:
-            if job.created_at:
-                job_time = job.created_at
-                if job_time.tzinfo is None:
-                    job_time = job_time.replace(tzinfo=timezone.utc)
-                
-                hour = job_time.hour
-                hourly_counts[hour] = hourly_counts.get(hour, 0) + 1
-        
-        peak_hour = 0
-        peak_hour_jobs = 0
-        if hourly_counts:
-            peak_hour = max(hourly_counts, key=hourly_counts.get)
-            peak_hour_jobs = hourly_counts[peak_hour]
+        hour = extract("hour", ProcessingJobModel.created_at)
+        job_count = func.count()
+        peak_result = await db.execute(
+            select(hour.label("hour"), job_count.label("count"))
+            .where(recent)
+            .group_by(hour)
+            .order_by(desc(job_count), hour)
+            .limit(1)
+        )
+        peak = peak_result.first()
+        peak_hour = int(peak.hour) if peak else 0
+        peak_hour_jobs = peak.count if peak else 0
         
         # Calculate queue health
         queued_count_result = await db.execute(
@@ -433,8 +369,8 @@ async def get_system_performance(db: AsyncSession = Depends(get_db_session)):
         )
         queued_count = queued_count_result.scalar() or 0
         
-        total_recent = len(recent_jobs)
-        failed_recent = len([j for j in recent_jobs if j.status == "failed"])
+        total_recent = recent_counts.total
+        failed_recent = recent_counts.failed
         
         # Health score: lower queue size and failure rate = higher score
         queue_factor = max(0, 100 - (queued_count * 2))  # Penalty for large queue
@@ -520,128 +456,109 @@ async def get_performance_metrics(db: AsyncSession = Depends(get_db_session)):
         # Import workflow models
         from app.services.workflow.database.models import BatchJobModel
         
-        # Get all completed jobs with timing data
-        completed_jobs_result = await db.execute(
-            select(BatchJobModel)
-            .where(
-                and_(
-                    BatchJobModel.status == "completed",
-                    BatchJobModel.started_at.isnot(None),
-                    BatchJobModel.completed_at.isnot(None)
-                )
-            )
+        # Job timestamps are stored as naive UTC
+        now = datetime.utcnow()
+        duration = extract("epoch", BatchJobModel.completed_at - BatchJobModel.started_at)
+        timed = and_(
+            BatchJobModel.status == "completed",
+            BatchJobModel.started_at.isnot(None),
+            BatchJobModel.completed_at.isnot(None)
         )
-        completed_jobs = completed_jobs_result.scalars().all()
-        
-        # Get all jobs for broader statistics
-        all_jobs_result = await db.execute(select(BatchJobModel))
-        all_jobs = all_jobs_result.scalars().all()
         
         # Calculate basic metrics
-        total_jobs = len(all_jobs)
-        completed_count = len([j for j in all_jobs if j.status == "completed"])
-        success_rate = (completed_count / total_jobs * 100) if total_jobs > 0 else 0
+        totals_result = await db.execute(
+            select(
+                func.count().label("total"),
+                func.count().filter(BatchJobModel.status == "completed").label("completed"),
+                func.count().filter(BatchJobModel.created_at >= now - timedelta(hours=24)).label("recent")
+            )
+        )
+        totals = totals_result.one()
+        total_jobs = totals.total
+        success_rate = (totals.completed / total_jobs * 100) if total_jobs > 0 else 0
+        jobs_per_hour = totals.recent / 24.0
         
         # Calculate duration metrics
-        durations = []
-        throughput_data = []
-        
-        for job in completed_jobs:
-            if job.started_at and job.completed_at:
-                duration_seconds = (job.completed_at - job.started_at).total_seconds()
-                durations.append(duration_seconds)
-                
-                # Calculate throughput (posters per second)
-                if duration_seconds > 0 and job.total_posters:
-                    throughput = job.total_posters / duration_seconds
-                    throughput_data.append({
-                        "job_id": job.id,
-                        "duration": duration_seconds,
-                        "posters": job.total_posters,
-                        "throughput": throughput,
-                        "created_at": job.created_at.isoformat() if job.created_at else None
-                    })
-        
-        avg_duration = sum(durations) / len(durations) if durations else None
-        avg_throughput = sum(job["posters"] for job in throughput_data) / len(throughput_data) if throughput_data else 0
-        
-        # Calculate jobs per hour (last 24 hours)
-        twenty_four_hours_ago = datetime.now() - timedelta(hours=24)
-        recent_jobs = [
-            job for job in all_jobs 
-            if job.created_at and job.created_at >= twenty_four_hours_ago
-        ]
-        jobs_per_hour = len(recent_jobs) / 24.0
+        durations_result = await db.execute(
+            select(
+                func.avg(duration).label("avg"),
+                func.min(duration).label("min"),
+                func.max(duration).label("max"),
+                func.percentile_disc(0.5).within_group(duration).label("median"),
+                func.avg(BatchJobModel.total_posters).filter(
+                    duration > 0, BatchJobModel.total_posters > 0
+                ).label("avg_posters"),
+                func.count().filter(
+                    duration > 0, BatchJobModel.total_posters > duration
+                ).label("high_throughput")
+            ).where(timed)
+        )
+        durations = durations_result.one()
+        avg_duration = float(durations.avg) if durations.avg is not None else None
+        avg_throughput = float(durations.avg_posters) if durations.avg_posters is not None else 0
+        fastest = float(durations.min) if durations.min is not None else 0
+        slowest = float(durations.max) if durations.max is not None else 0
         
         # Find peak processing times (group by hour)
-        hourly_stats = {}
-        for job in completed_jobs:
-            if job.created_at:
-                hour_key = job.created_at.replace(minute=0, second=0, microsecond=0)
-                if hour_key not in hourly_stats:
-                    hourly_stats[hour_key] = {"count": 0, "total_posters": 0, "total_duration": 0}
-                
-                hourly_stats[hour_key]["count"] += 1
-                hourly_stats[hour_key]["total_posters"] += job.total_posters or 0
-                
-                if job.started_at and job.completed_at:
-                    duration = (job.completed_at - job.started_at).total_seconds()
-                    hourly_stats[hour_key]["total_duration"] += duration
-        
-        # Convert to list and sort by activity
-        peak_times = []
-        for hour, stats in hourly_stats.items():
-            avg_duration_hour = stats["total_duration"] / stats["count"] if stats["count"] > 0 else 0
-            peak_times.append({
-                "hour": hour.isoformat(),
-                "jobs_count": stats["count"],
-                "total_posters": stats["total_posters"],
+        hour_key = func.date_trunc("hour", BatchJobModel.created_at)
+        jobs_count = func.count()
+        hourly_result = await db.execute(
+            select(
+                hour_key.label("hour"),
+                jobs_count.label("count"),
+                func.coalesce(func.sum(BatchJobModel.total_posters), 0).label("total_posters"),
+                func.avg(duration).label("avg_duration")
+            )
+            .where(timed, BatchJobModel.created_at.isnot(None))
+            .group_by(hour_key)
+            .order_by(desc(jobs_count))
+            .limit(5)
+        )
+        top_peak_times = []
+        for row in hourly_result.all():
+            avg_duration_hour = float(row.avg_duration or 0)
+            top_peak_times.append({
+                "hour": row.hour.isoformat(),
+                "jobs_count": row.count,
+                "total_posters": row.total_posters,
                 "avg_duration_seconds": round(avg_duration_hour, 2),
-                "efficiency_score": round(stats["total_posters"] / max(avg_duration_hour, 1), 2)
+                "efficiency_score": round(row.total_posters / max(avg_duration_hour, 1), 2)
             })
         
-        # Sort by jobs count and take top 5
-        peak_times.sort(key=lambda x: x["jobs_count"], reverse=True)
-        top_peak_times = peak_times[:5]
-        
         # Processing efficiency analysis
         efficiency_analysis = {
-            "fastest_job_duration": min(durations) if durations else 0,
-            "slowest_job_duration": max(durations) if durations else 0,
-            "median_duration": sorted(durations)[len(durations)//2] if durations else 0,
-            "efficiency_variance": round(max(durations) - min(durations), 2) if durations else 0,
-            "high_throughput_jobs": len([d for d in throughput_data if d["throughput"] > 1]) if throughput_data else 0
+            "fastest_job_duration": fastest,
+            "slowest_job_duration": slowest,
+            "median_duration": float(durations.median) if durations.median is not None else 0,
+            "efficiency_variance": round(slowest - fastest, 2),
+            "high_throughput_jobs": durations.high_throughput
         }
         
         # System load trends (last 7 days)
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        daily_loads = {}
-        
-        for job in all_jobs:
-            if job.created_at and job.created_at >= seven_days_ago:
-                day_key = job.created_at.date()
-                if day_key not in daily_loads:
-                    daily_loads[day_key] = {"jobs": 0, "posters": 0, "completed": 0}
-                
-                daily_loads[day_key]["jobs"] += 1
-                daily_loads[day_key]["posters"] += job.total_posters or 0
-                if job.status == "completed":
-                    daily_loads[day_key]["completed"] += 1
+        job_day = cast(BatchJobModel.created_at, Date)
+        daily_result = await db.execute(
+            select(
+                job_day.label("day"),
+                func.count().label("jobs"),
+                func.coalesce(func.sum(BatchJobModel.total_posters), 0).label("posters"),
+                func.count().filter(BatchJobModel.status == "completed").label("completed")
+            )
+            .where(BatchJobModel.created_at >= now - timedelta(days=7))
+            .group_by(job_day)
+            .order_by(job_day)
+        )
         
         load_trends = []
-        for day, stats in daily_loads.items():
-            success_rate_day = (stats["completed"] / stats["jobs"] * 100) if stats["jobs"] > 0 else 0
+        for row in daily_result.all():
+            success_rate_day = (row.completed / row.jobs * 100) if row.jobs > 0 else 0
             load_trends.append({
-                "date": day.isoformat(),
-                "total_jobs": stats["jobs"],
-                "total_posters": stats["posters"],
+                "date": row.day.isoformat(),
+                "total_jobs": row.jobs,
+                "total_posters": row.posters,
                 "success_rate": round(success_rate_day, 2),
-                "load_score": round(stats["jobs"] * stats["posters"] / 100, 2)  # Normalized load score
+                "load_score": round(row.jobs * row.posters / 100, 2)  # Normalized load score
             })
         
-        # Sort by date
-        load_trends.sort(key=lambda x: x["date"])
-        
         return PerformanceMetrics(
             avg_job_duration_seconds=round(avg_duration, 2) if avg_duration else None,
             total_jobs_processed=total_jobs,
@@ -686,17 +603,14 @@ async def get_live_media_count() -> int:
             if not library_id:
                 continue
                 
-            # Get library items count efficiently
-            items = await jellyfin_service.get_library_items(library_id)
-            
-            # Filter for movies and TV shows only
-            media_items = [
-                item for item in items 
-                if item.get("Type") in ["Movie", "Series"]
-            ]
+            # Count movies and TV shows without downloading the items
+            library_count = await jellyfin_service.count_library_items(
+                library_id,
+                item_types=["Movie", "Series"]
+            )
             
-            total_count += len(media_items)
-            logger.debug(f"Library {library.get('Name', 'Unknown')}: {len(media_items)} items")
+            total_count += library_count
+            logger.debug(f"Library {library.get('Name', 'Unknown')}: {library_count} items")
         
         logger.info(f"Live media count from Jellyfin: {total_count}")
         return total_count
@@ -274,11 +274,12 @@ async def get_audio_cache_stats():
         
         # Import cache component
         try:
-            from app.services.badge_processing.audio_cache import AudioCache
-            cache = AudioCache()
+            from app.services.badge_processing.series_profile_cache import get_series_profile_cache
+            cache = get_series_profile_cache()
             
-            # Get cache statistics
-            stats = cache.get_cache_stats()
+            # Get cache statistics; episode samples are no longer cached separately
+            stats = await cache.get_cache_stats("audio")
+            stats["episode_samples_cached"] = 0
             
             # Safely check if stats is valid before logging
             if isinstance(stats, dict) and 'hit_rate_percent' in stats:
@@ -327,11 +328,11 @@ async def clear_audio_cache():
         
         # Import cache component
         try:
-            from app.services.badge_processing.audio_cache import AudioCache
-            cache = AudioCache()
+            from app.services.badge_processing.series_profile_cache import get_series_profile_cache
+            cache = get_series_profile_cache()
             
             # Clear the cache
-            cache.clear_cache()
+            await cache.clear("audio")
             
             logger.info("Audio cache cleared successfully")
             return BaseResponse(message="Audio cache cleared successfully")
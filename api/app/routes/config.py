@@ -195,6 +195,10 @@ async def update_config(
         if 'badge_settings' in filename:
             settings_service.invalidate_badge_cache()
             
+            # Other processes are notified by the system_config trigger; clear ours right away
+            from app.services.badge_processing.database_service import badge_settings_service
+            badge_settings_service.clear_cache()
+            
             # Clear the compatibility layer cache as well
             try:
                 from aphrodite_helpers.settings_compat import _settings_compat
@@ -2,21 +2,36 @@
 Image Proxy Routes
 
 Proxy Jellyfin images through our backend to avoid Next.js hostname restrictions.
+
+Images and thumbnails are served from the image proxy cache with strong ETags,
+so repeat requests are answered with 304 Not Modified or straight from memory
+or disk instead of refetching full-size posters from Jellyfin or TMDb.
 """
 
-from fastapi import APIRouter, HTTPException, Response
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 import aiohttp
-from typing import Optional
-import io
+from typing import Dict, Optional, Tuple
 import urllib.parse
 
+from app.core.config import get_settings
+from app.services.image_proxy_cache import CachedImage, THUMBNAIL_FORMATS, get_image_proxy_cache
 from app.services.jellyfin_service import get_jellyfin_service
 from aphrodite_logging import get_logger
 
 router = APIRouter(tags=["image-proxy"])
 logger = get_logger("aphrodite.api.image_proxy", service="api")
 
+# Versioned URLs (?v=) never change content, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+NO_CACHE_HEADERS = {
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0"
+}
+
+# Upper bounds for requested thumbnail sizes
+MAX_THUMBNAIL_DIMENSION = 2000
+
 @router.get("/", response_model=dict)
 async def image_proxy_root():
     """Image Proxy API root endpoint"""
@@ -26,69 +41,135 @@ async def image_proxy_root():
         "endpoints": [
             "/proxy/image/{item_id}",
             "/proxy/image/{item_id}/thumbnail",
-            "/proxy/external/"
+            "/proxy/external/",
+            "/proxy/cache/stats"
         ]
     }
 
+def _pick_format(request: Request, image_format: Optional[str]) -> str:
+    """Requested thumbnail format, or WebP when the browser accepts it"""
+    if image_format in THUMBNAIL_FORMATS:
+        return image_format
+    return "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match handling (weak comparison, as RFC 9110 requires for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return etag in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates)
+
+def _image_response(request: Request, image: CachedImage, headers: Dict[str, str]) -> Response:
+    """Serve a cached image, or 304 if the client already has these bytes"""
+    headers = {"ETag": image.etag, **headers}
+    if _etag_matches(request, image.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=image.data, media_type=image.content_type, headers=headers)
+
+def _jellyfin_cache_headers(version: Optional[str], cache_busted: bool) -> Dict[str, str]:
+    if cache_busted:
+        return dict(NO_CACHE_HEADERS)
+    if version:
+        return {"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    # Unversioned posters can change (badging); revalidate with the ETag after a while
+    ttl = get_settings().image_proxy_jellyfin_ttl
+    return {"Cache-Control": f"public, max-age={ttl}, stale-while-revalidate=86400"}
+
+async def _fetch_jellyfin_image(item_id: str, image_type: str, params: Optional[Dict[str, str]] = None) -> Tuple[bytes, str]:
+    """Download an image from Jellyfin over the pooled session"""
+    jellyfin_service = get_jellyfin_service()
+    await jellyfin_service._load_jellyfin_settings()
+    if not jellyfin_service.base_url:
+        raise LookupError("Jellyfin not configured")
+    
+    image_url = f"{jellyfin_service.base_url}/Items/{item_id}/Images/{image_type}"
+    logger.debug(f"Fetching image from Jellyfin: {image_url} with params {params}")
+    
+    session = await jellyfin_service._get_session()
+    async with session.get(image_url, params=params) as response:
+        if response.status != 200:
+            logger.warning(f"Jellyfin returned status {response.status} for item {item_id}")
+            raise LookupError(f"HTTP {response.status}")
+        return await response.read(), response.headers.get("content-type", "image/jpeg")
+
+async def _jellyfin_rendition(
+    item_id: str,
+    image_type: str,
+    version: Optional[str],
+    width: Optional[int],
+    height: Optional[int],
+    image_format: Optional[str],
+    quality: Optional[int],
+    refresh: bool
+) -> CachedImage:
+    """Cached Jellyfin image, resized and re-encoded when a size is requested"""
+    cache = get_image_proxy_cache()
+    key = cache.make_key(f"jellyfin:{item_id}/{image_type}?v={version}", width, height, image_format, quality)
+    
+    async def fetch() -> Tuple[bytes, str]:
+        if not width and not height:
+            return await _fetch_jellyfin_image(item_id, image_type)
+        # Let Jellyfin do the first downscale so the transfer is already small
+        params = {"quality": "90"}
+        if width:
+            params["maxWidth"] = str(width)
+        if height:
+            params["maxHeight"] = str(height)
+        data, _ = await _fetch_jellyfin_image(item_id, image_type, params)
+        return await cache.thumbnail(data, width, height, image_format, quality)
+    
+    return await cache.get_or_fetch(key, get_settings().image_proxy_jellyfin_ttl, fetch, refresh=refresh)
+
 @router.get("/proxy/image/{item_id}")
-async def proxy_jellyfin_image(item_id: str, image_type: str = "Primary"):
+async def proxy_jellyfin_image(
+    request: Request,
+    item_id: str,
+    image_type: str = "Primary",
+    width: Optional[int] = Query(None, ge=1, le=MAX_THUMBNAIL_DIMENSION),
+    format: Optional[str] = Query(None, pattern="^(webp|jpeg)$"),
+    v: Optional[str] = None
+):
     """
     Proxy Jellyfin images through our backend to avoid CORS and hostname issues
     
     Args:
         item_id: Jellyfin item ID
         image_type: Type of image (Primary, Backdrop, etc.)
+        width: Resize to this width (original bytes when omitted)
+        format: Thumbnail format (webp/jpeg, default by Accept header)
+        v: Version token (image tag); versioned URLs are cached as immutable
     """
+    image_format = _pick_format(request, format) if width else None
     try:
-        jellyfin_service = get_jellyfin_service()
-        
-        # Build the image URL
-        image_url = f"{jellyfin_service.base_url}/Items/{item_id}/Images/{image_type}"
-        
-        logger.debug(f"Proxying image request: {image_url}")
-        
-        # Get the image from Jellyfin
-        session = await jellyfin_service._get_session()
-        
-        try:
-            async with session.get(image_url) as response:
-                if response.status == 200:
-                    # Get the content type
-                    content_type = response.headers.get('content-type', 'image/jpeg')
-                    
-                    # Read the image data
-                    image_data = await response.read()
-                    
-                    logger.debug(f"Successfully proxied image for item {item_id}: {len(image_data)} bytes")
-                    
-                    # Return the image with proper headers
-                    return Response(
-                        content=image_data,
-                        media_type=content_type,
-                        headers={
-                            "Cache-Control": "public, max-age=3600",  # Cache for 1 hour
-                            "Content-Length": str(len(image_data))
-                        }
-                    )
-                else:
-                    logger.warning(f"Jellyfin returned status {response.status} for item {item_id}")
-                    raise HTTPException(status_code=404, detail="Image not found")
-        finally:
-            await session.close()
-                
+        image = await _jellyfin_rendition(item_id, image_type, v, width, None, image_format, 85 if width else None, refresh=False)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Image not found")
     except Exception as e:
         logger.error(f"Error proxying image for item {item_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to proxy image")
+    
+    headers = _jellyfin_cache_headers(v, cache_busted=False)
+    if width and not format:
+        headers["Vary"] = "Accept"
+    return _image_response(request, image, headers)
 
 @router.get("/proxy/image/{item_id}/thumbnail")
 async def proxy_jellyfin_thumbnail(
-    item_id: str, 
-    width: Optional[int] = 300,
-    height: Optional[int] = 450,
-    quality: Optional[int] = 80,
+    request: Request,
+    item_id: str,
+    width: Optional[int] = Query(300, ge=1, le=MAX_THUMBNAIL_DIMENSION),
+    height: Optional[int] = Query(450, ge=1, le=MAX_THUMBNAIL_DIMENSION),
+    quality: Optional[int] = Query(80, ge=1, le=100),
+    format: Optional[str] = Query(None, pattern="^(webp|jpeg)$"),
+    v: Optional[str] = None,         # Version token; versioned thumbnails are immutable
     restored: Optional[str] = None,  # Cache-busting parameter
     refresh: Optional[str] = None,   # Alternative cache-busting parameter
-    load: Optional[str] = None       # Page load cache-busting parameter
+    load: Optional[str] = None,      # Page load cache-busting parameter
+    badged: Optional[str] = None,    # Set after badging a poster
+    replaced: Optional[str] = None   # Set after replacing a poster
 ):
     """
     Proxy Jellyfin images with thumbnail sizing
@@ -96,135 +177,94 @@ async def proxy_jellyfin_thumbnail(
     Args:
         item_id: Jellyfin item ID
         width: Thumbnail width
-        height: Thumbnail height  
+        height: Thumbnail height
         quality: Image quality (1-100)
-        restored: Cache-busting parameter (timestamp when poster was restored)
-        refresh: Alternative cache-busting parameter
-        load: Page load cache-busting parameter
+        format: Thumbnail format (webp/jpeg, default by Accept header)
+        v: Version token (DateLastSaved or image tag) that changes when the poster does
+        restored / refresh / load / badged / replaced: Cache-busting parameters;
+            they bypass the server cache and are never cached by the browser
     """
+    cache_params = {"restored": restored, "refresh": refresh, "load": load, "badged": badged, "replaced": replaced}
+    cache_busted = any(value is not None for value in cache_params.values())
+    if cache_busted:
+        busting = ", ".join(f"{name}={value}" for name, value in cache_params.items() if value is not None)
+        logger.debug(f"Cache-busting detected for item {item_id} ({busting})")
+    
+    image_format = _pick_format(request, format)
     try:
-        jellyfin_service = get_jellyfin_service()
-        
-        # Build the thumbnail URL with parameters
-        image_url = f"{jellyfin_service.base_url}/Items/{item_id}/Images/Primary"
-        params = {
-            "width": width,
-            "height": height,
-            "quality": quality
-        }
-        
-        logger.debug(f"Proxying thumbnail request: {image_url} with params {params}")
-        
-        # Determine cache behavior based on cache-busting parameters
-        is_cache_busted = restored is not None or refresh is not None or load is not None
-        if is_cache_busted:
-            cache_params = []
-            if restored: cache_params.append(f"restored={restored}")
-            if refresh: cache_params.append(f"refresh={refresh}")
-            if load: cache_params.append(f"load={load}")
-            logger.debug(f"Cache-busting detected for item {item_id} ({', '.join(cache_params)})")
-        
-        # Get the image from Jellyfin
-        session = await jellyfin_service._get_session()
-        
-        try:
-            async with session.get(image_url, params=params) as response:
-                if response.status == 200:
-                    # Get the content type
-                    content_type = response.headers.get('content-type', 'image/jpeg')
-                    
-                    # Read the image data
-                    image_data = await response.read()
-                    
-                    logger.debug(f"Successfully proxied thumbnail for item {item_id}: {len(image_data)} bytes")
-                    
-                    # Set cache headers based on whether this is cache-busted
-                    if is_cache_busted:
-                        # No cache for cache-busted requests (force fresh fetch)
-                        cache_control = "no-cache, no-store, must-revalidate"
-                        # Add additional headers to really prevent caching
-                        headers = {
-                            "Cache-Control": cache_control,
-                            "Pragma": "no-cache",
-                            "Expires": "0",
-                            "Content-Length": str(len(image_data))
-                        }
-                        logger.debug(f"Using no-cache headers for cache-busted request: {item_id}")
-                    else:
-                        # Much shorter cache for regular requests (5 minutes instead of 2 hours)
-                        cache_control = "public, max-age=300"  # Cache thumbnails for 5 minutes only
-                        headers = {
-                            "Cache-Control": cache_control,
-                            "Content-Length": str(len(image_data))
-                        }
-                    
-                    # Return the image with appropriate headers
-                    return Response(
-                        content=image_data,
-                        media_type=content_type,
-                        headers=headers
-                    )
-                else:
-                    logger.warning(f"Jellyfin returned status {response.status} for thumbnail {item_id}")
-                    raise HTTPException(status_code=404, detail="Thumbnail not found")
-        finally:
-            await session.close()
-                
+        image = await _jellyfin_rendition(
+            item_id, "Primary", v, width, height, image_format, quality, refresh=cache_busted
+        )
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
     except Exception as e:
         logger.error(f"Error proxying thumbnail for item {item_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to proxy thumbnail")
+    
+    headers = _jellyfin_cache_headers(v, cache_busted)
+    if not format:
+        headers["Vary"] = "Accept"
+    return _image_response(request, image, headers)
 
 @router.get("/proxy/external/")
-async def proxy_external_image(url: str, w: Optional[int] = 384, q: Optional[int] = 75):
+async def proxy_external_image(
+    request: Request,
+    url: str,
+    w: Optional[int] = Query(384, ge=1, le=MAX_THUMBNAIL_DIMENSION),
+    q: Optional[int] = Query(75, ge=1, le=100),
+    format: Optional[str] = Query(None, pattern="^(webp|jpeg)$")
+):
     """
     Proxy external images (like TMDB) through our backend to avoid CORS issues
     
     Args:
         url: External image URL to proxy
-        w: Width parameter (for compatibility with Next.js)
-        q: Quality parameter (for compatibility with Next.js)
+        w: Thumbnail width (Next.js compatible)
+        q: Thumbnail quality (Next.js compatible)
+        format: Thumbnail format (webp/jpeg, default by Accept header)
     """
+    # Decode the URL parameter
+    decoded_url = urllib.parse.unquote(url)
+    
+    logger.debug(f"Proxying external image request: {decoded_url}")
+    
+    # Validate URL to prevent SSRF attacks
+    if not decoded_url.startswith(('http://', 'https://')):
+        raise HTTPException(status_code=400, detail="Invalid URL scheme")
+    
+    settings = get_settings()
+    cache = get_image_proxy_cache()
+    image_format = _pick_format(request, format)
+    key = cache.make_key(decoded_url, w, None, image_format, q)
+    
+    async def fetch() -> Tuple[bytes, str]:
+        data, _ = await cache.fetch_url(decoded_url)
+        return await cache.thumbnail(data, w, None, image_format, q)
+    
     try:
-        # Decode the URL parameter
-        decoded_url = urllib.parse.unquote(url)
-        
-        logger.debug(f"Proxying external image request: {decoded_url}")
-        
-        # Validate URL to prevent SSRF attacks
-        if not decoded_url.startswith(('http://', 'https://')):
-            raise HTTPException(status_code=400, detail="Invalid URL scheme")
-        
-        # Get the image from external source
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-            async with session.get(decoded_url) as response:
-                if response.status == 200:
-                    # Get the content type
-                    content_type = response.headers.get('content-type', 'image/jpeg')
-                    
-                    # Read the image data
-                    image_data = await response.read()
-                    
-                    logger.debug(f"Successfully proxied external image: {len(image_data)} bytes")
-                    
-                    # Return the image with proper CORS headers
-                    return Response(
-                        content=image_data,
-                        media_type=content_type,
-                        headers={
-                            "Cache-Control": "public, max-age=3600",  # Cache for 1 hour
-                            "Access-Control-Allow-Origin": "*",
-                            "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS",
-                            "Access-Control-Allow-Headers": "*",
-                            "Content-Length": str(len(image_data))
-                        }
-                    )
-                else:
-                    logger.warning(f"External service returned status {response.status} for URL: {decoded_url}")
-                    raise HTTPException(status_code=404, detail="External image not found")
-                    
+        image = await cache.get_or_fetch(key, settings.image_proxy_external_ttl, fetch)
+    except LookupError as e:
+        logger.warning(f"External service returned {e} for URL: {decoded_url}")
+        raise HTTPException(status_code=404, detail="External image not found")
     except aiohttp.ClientError as e:
         logger.error(f"Network error proxying external image {decoded_url}: {e}")
         raise HTTPException(status_code=502, detail="Failed to fetch external image")
     except Exception as e:
         logger.error(f"Error proxying external image {decoded_url}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to proxy external image")
+    
+    # External artwork URLs are content-addressed, so browsers can keep them
+    headers = {
+        "Cache-Control": f"public, max-age={settings.image_proxy_external_ttl}, immutable",
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS",
+        "Access-Control-Allow-Headers": "*"
+    }
+    if not format:
+        headers["Vary"] = "Accept"
+    return _image_response(request, image, headers)
+
+@router.get("/proxy/cache/stats", response_model=dict)
+async def image_proxy_cache_stats():
+    """Image proxy cache size and hit statistics"""
+    return {"success": True, "stats": get_image_proxy_cache().get_stats()}
@@ -126,7 +126,7 @@ async def test_media_items():
             
             try:
                 # Get items from this library
-                library_items = await jellyfin_service.get_library_items(library_id)
+                library_items, _ = await jellyfin_service.query_library_items(library_id, limit=4)
                 
                 # Take first 3-4 items from each library
                 for item in library_items[:4]:
@@ -13,13 +13,14 @@ from app.core.database import get_db_session
 from app.services.jellyfin_service import get_jellyfin_service
 from app.services.badge_processing.database_service import badge_settings_service
 from app.services.tag_management_service import get_tag_management_service, BulkTagRequest, BulkTagResponse
+from app.services.badge_processing.render_fingerprint import get_render_fingerprint_service
 from app.services.badge_processing import (
     UniversalBadgeProcessor,
     UniversalBadgeRequest,
     SingleBadgeRequest,
     ProcessingMode
 )
-from app.services.poster_management import PosterSelector, StorageManager
+from app.services.poster_management import PosterSelector, StorageManager, get_library_index_service
 from app.services.poster_sources import get_poster_source_manager
 from app.models.poster_sources import (
     PosterSearchRequest, PosterSearchResponse,
@@ -27,10 +28,9 @@ from app.models.poster_sources import (
 )
 from aphrodite_logging import get_logger
 from pathlib import Path
+import asyncio
 import os
-import time
 import tempfile
-import json
 
 router = APIRouter(tags=["poster-manager"])
 logger = get_logger("aphrodite.api.poster_manager", service="api")
@@ -57,6 +57,12 @@ class RestoreOriginalResponse(BaseModel):
     original_poster_found: bool = False
     restored_to_jellyfin: bool = False
 
+class OriginalCacheCleanupResponse(BaseModel):
+    success: bool
+    message: str
+    legacy_imported: int = 0
+    removed: int = 0
+
 @router.get("/", response_model=dict)
 async def poster_manager_root():
     """Poster Manager API root endpoint"""
@@ -121,6 +127,61 @@ async def get_libraries(db: AsyncSession = Depends(get_db_session)):
         logger.error(f"Error getting libraries: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Jellyfin item types shown in the poster manager, keyed by the UI media type
+MEDIA_ITEM_TYPES = {"movie": "Movie", "series": "Series"}
+
+def _build_indexed_item(row) -> Dict[str, Any]:
+    """Convert a library index row into the poster manager item format"""
+    # DateLastSaved changes whenever the poster or its tags change, so it
+    # versions the thumbnail URL and unchanged posters stay in the browser cache
+    poster_url = f"/api/v1/images/proxy/image/{row.jellyfin_id}/thumbnail"
+    if row.date_last_saved is not None:
+        poster_url += f"?v={int(row.date_last_saved.timestamp())}-{int(row.badged)}"
+    return {
+        "id": row.jellyfin_id,
+        "title": row.title,
+        "type": row.item_type,
+        "year": row.year,
+        "overview": row.overview or "",
+        "genres": row.genres or [],
+        "community_rating": row.community_rating,
+        "official_rating": row.official_rating,
+        "poster_url": poster_url,
+        "jellyfin_id": row.jellyfin_id,
+        "badge_status": "BADGED" if row.badged else "ORIGINAL"
+    }
+
+def _build_library_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a Jellyfin library item into the poster manager item format"""
+    item_type = item.get("Type", "").lower()
+    
+    # Check for aphrodite-overlay tag to determine badge status
+    tags = item.get("Tags", []) or []
+    has_aphrodite_overlay = "aphrodite-overlay" in tags
+    badge_status = "BADGED" if has_aphrodite_overlay else "ORIGINAL"
+    
+    # Build poster URL using our image proxy, versioned by the Jellyfin image tag
+    poster_url = None
+    if item.get("Id"):
+        poster_url = f"/api/v1/images/proxy/image/{item['Id']}/thumbnail"
+        image_tag = (item.get("ImageTags") or {}).get("Primary")
+        if image_tag:
+            poster_url += f"?v={image_tag}"
+    
+    return {
+        "id": item.get("Id"),
+        "title": item.get("Name", "Unknown"),
+        "type": item_type,
+        "year": item.get("ProductionYear"),
+        "overview": item.get("Overview", ""),
+        "genres": item.get("Genres", []),
+        "community_rating": item.get("CommunityRating"),
+        "official_rating": item.get("OfficialRating"),
+        "poster_url": poster_url,
+        "jellyfin_id": item.get("Id"),
+        "badge_status": badge_status
+    }
+
 @router.get("/libraries/{library_id}/items")
 async def get_library_items(
     library_id: str,
@@ -130,48 +191,24 @@ async def get_library_items(
 ):
     """Get items from a specific library with pagination"""
     try:
-        jellyfin_service = get_jellyfin_service()
-        
-        # Get library items
-        all_items = await jellyfin_service.get_library_items(library_id)
-        
-        # Filter to only movies and TV shows (no episodes, seasons, etc.)
-        filtered_items = []
-        for item in all_items:
-            item_type = item.get("Type", "").lower()
-            if item_type in ["movie", "series"]:
-                # Check for aphrodite-overlay tag to determine badge status
-                tags = item.get("Tags", [])
-                has_aphrodite_overlay = "aphrodite-overlay" in tags
-                badge_status = "BADGED" if has_aphrodite_overlay else "ORIGINAL"
-                
-                # Build poster URL using our image proxy with cache-busting
-                poster_url = None
-                if item.get("Id"):
-                    # Always add a cache-busting parameter to ensure fresh images
-                    timestamp = int(time.time())  # Use current timestamp
-                    poster_url = f"/api/v1/images/proxy/image/{item['Id']}/thumbnail?load={timestamp}"
-                
-                filtered_items.append({
-                    "id": item.get("Id"),
-                    "title": item.get("Name", "Unknown"),
-                    "type": item_type,
-                    "year": item.get("ProductionYear"),
-                    "overview": item.get("Overview", ""),
-                    "genres": item.get("Genres", []),
-                    "community_rating": item.get("CommunityRating"),
-                    "official_rating": item.get("OfficialRating"),
-                    "poster_url": poster_url,
-                    "jellyfin_id": item.get("Id"),
-                    "badge_status": badge_status
-                })
+        library_index = get_library_index_service()
         
-        # Sort alphabetically by title
-        filtered_items.sort(key=lambda x: x["title"].lower())
-        
-        # Apply pagination
-        total_count = len(filtered_items)
-        paginated_items = filtered_items[offset:offset + limit] if limit else filtered_items[offset:]
+        if await library_index.ensure_fresh(db, library_id):
+            # Served from the local library index
+            rows, total_count = await library_index.query_items(
+                db, library_id, offset=offset or 0, limit=limit or None
+            )
+            paginated_items = [_build_indexed_item(row) for row in rows]
+        else:
+            # Index unavailable: let Jellyfin filter to movies and TV shows and slice the page
+            jellyfin_service = get_jellyfin_service()
+            items, total_count = await jellyfin_service.query_library_items(
+                library_id,
+                item_types=MEDIA_ITEM_TYPES.values(),
+                start_index=offset or 0,
+                limit=limit or None
+            )
+            paginated_items = [_build_library_item(item) for item in items]
         
         logger.info(f"Returning {len(paginated_items)} items from library {library_id} (total: {total_count})")
         
@@ -191,43 +228,33 @@ async def get_library_items(
 async def get_library_stats(library_id: str, db: AsyncSession = Depends(get_db_session)):
     """Get statistics for a specific library"""
     try:
+        library_index = get_library_index_service()
+        
+        if await library_index.ensure_fresh(db, library_id):
+            stats = await library_index.get_stats(db, library_id)
+            logger.info(f"Library {library_id} stats: {stats['total_items']} total items")
+            return stats
+        
         jellyfin_service = get_jellyfin_service()
         
-        # Get all library items
-        all_items = await jellyfin_service.get_library_items(library_id)
+        # Index unavailable: counts come from TotalRecordCount and years/genres
+        # from Jellyfin's filter index, so no items are downloaded
+        total_items, movies, tv_shows, filters = await asyncio.gather(
+            jellyfin_service.count_library_items(library_id),
+            jellyfin_service.count_library_items(library_id, item_types=["Movie"]),
+            jellyfin_service.count_library_items(library_id, item_types=["Series"]),
+            jellyfin_service.get_library_filters(library_id)
+        )
         
-        # Calculate statistics
         stats = {
-            "total_items": 0,
-            "movies": 0,
-            "tv_shows": 0,
-            "other": 0,
-            "years": set(),
-            "genres": set()
+            "total_items": total_items,
+            "movies": movies,
+            "tv_shows": tv_shows,
+            "other": max(total_items - movies - tv_shows, 0),
+            "years": sorted(filters["years"], reverse=True),
+            "genres": sorted(filters["genres"])
         }
         
-        for item in all_items:
-            item_type = item.get("Type", "").lower()
-            stats["total_items"] += 1
-            
-            if item_type == "movie":
-                stats["movies"] += 1
-            elif item_type == "series":
-                stats["tv_shows"] += 1
-            else:
-                stats["other"] += 1
-            
-            # Collect years and genres
-            if item.get("ProductionYear"):
-                stats["years"].add(item["ProductionYear"])
-            
-            for genre in item.get("Genres", []):
-                stats["genres"].add(genre)
-        
-        # Convert sets to sorted lists
-        stats["years"] = sorted(list(stats["years"]), reverse=True)
-        stats["genres"] = sorted(list(stats["genres"]))
-        
         logger.info(f"Library {library_id} stats: {stats['total_items']} total items")
         return stats
         
@@ -249,78 +276,61 @@ async def search_items(
 ):
     """Search and filter library items with badge filtering support"""
     try:
-        jellyfin_service = get_jellyfin_service()
-        
-        # Get all library items
-        all_items = await jellyfin_service.get_library_items(library_id)
-        
-        # Filter items based on criteria
-        filtered_items = []
-        for item in all_items:
-            item_type = item.get("Type", "").lower()
-            
-            # Only include movies and TV shows
-            if item_type not in ["movie", "series"]:
-                continue
-            
-            # Apply filters
-            if media_type and item_type != media_type.lower():
-                continue
-            
-            if genre and genre.lower() not in [g.lower() for g in item.get("Genres", [])]:
-                continue
-            
-            if year and item.get("ProductionYear") != year:
-                continue
-            
-            if query:
-                title = item.get("Name", "").lower()
-                if query.lower() not in title:
-                    continue
-            
-            # Check for aphrodite-overlay tag to determine badge status
-            tags = item.get("Tags", [])
-            has_aphrodite_overlay = "aphrodite-overlay" in tags
-            badge_status = "BADGED" if has_aphrodite_overlay else "ORIGINAL"
-            
-            # Apply badge filter
-            if badge_filter:
-                if badge_filter == "badged" and badge_status != "BADGED":
-                    continue
-                elif badge_filter == "original" and badge_status != "ORIGINAL":
-                    continue
-            
-            # Debug logging for tag detection
-            if tags:  # Only log if there are any tags
-                logger.debug(f"Search item {item.get('Name')}: Tags = {tags}, Badge Status = {badge_status}")
+        library_index = get_library_index_service()
+        
+        if await library_index.ensure_fresh(db, library_id):
+            # Served from the local library index with indexed queries
+            rows, total_count = await library_index.query_items(
+                db,
+                library_id,
+                query=query or None,
+                media_type=media_type,
+                genre=genre,
+                year=year,
+                badge_filter=badge_filter,
+                offset=offset or 0,
+                limit=limit or None
+            )
+            paginated_items = [_build_indexed_item(row) for row in rows]
             
-            # Build poster URL using our image proxy with cache-busting
-            poster_url = None
-            if item.get("Id"):
-                # Always add a cache-busting parameter to ensure fresh images
-                timestamp = int(time.time())  # Use current timestamp
-                poster_url = f"/api/v1/images/proxy/image/{item['Id']}/thumbnail?load={timestamp}"
+            logger.info(f"Search returned {len(paginated_items)} items (total: {total_count})")
             
-            filtered_items.append({
-                "id": item.get("Id"),
-                "title": item.get("Name", "Unknown"),
-                "type": item_type,
-                "year": item.get("ProductionYear"),
-                "overview": item.get("Overview", ""),
-                "genres": item.get("Genres", []),
-                "community_rating": item.get("CommunityRating"),
-                "official_rating": item.get("OfficialRating"),
-                "poster_url": poster_url,
-                "jellyfin_id": item.get("Id"),
-                "badge_status": badge_status
-            })
-        
-        # Sort alphabetically by title
-        filtered_items.sort(key=lambda x: x["title"].lower())
-        
-        # Apply pagination
-        total_count = len(filtered_items)
-        paginated_items = filtered_items[offset:offset + limit] if limit else filtered_items[offset:]
+            return {
+                "items": paginated_items,
+                "total_count": total_count,
+                "offset": offset,
+                "limit": limit,
+                "has_more": offset + len(paginated_items) < total_count
+            }
+        
+        jellyfin_service = get_jellyfin_service()
+        
+        # Index unavailable: only include movies and TV shows
+        if media_type:
+            item_type = MEDIA_ITEM_TYPES.get(media_type.lower())
+            if not item_type:
+                return {"items": [], "total_count": 0, "offset": offset, "limit": limit, "has_more": False}
+            item_types = [item_type]
+        else:
+            item_types = list(MEDIA_ITEM_TYPES.values())
+        
+        # Badge status is the aphrodite-overlay tag
+        tags = ["aphrodite-overlay"] if badge_filter == "badged" else None
+        exclude_tags = ["aphrodite-overlay"] if badge_filter == "original" else None
+        
+        # Push every filter, the sort and the page window down to Jellyfin
+        items, total_count = await jellyfin_service.query_library_items(
+            library_id,
+            item_types=item_types,
+            search_term=query or None,
+            genres=[genre] if genre else None,
+            years=[year] if year else None,
+            tags=tags,
+            exclude_tags=exclude_tags,
+            start_index=offset or 0,
+            limit=limit or None
+        )
+        paginated_items = [_build_library_item(item) for item in items]
         
         logger.info(f"Search returned {len(paginated_items)} items (total: {total_count})")
         
@@ -461,7 +471,7 @@ async def apply_badges_to_poster(
         
         # Cache the original poster for restore functionality
         try:
-            cached_original_path = storage_manager.cache_original_poster(poster_data, request.jellyfin_id)
+            cached_original_path = await storage_manager.cache_original_poster(poster_data, request.jellyfin_id, db)
             logger.info(f"Successfully cached original poster for {request.item_id}")
         except Exception as cache_error:
             logger.warning(f"Failed to cache original poster for {request.item_id}: {cache_error}")
@@ -500,6 +510,9 @@ async def apply_badges_to_poster(
                 # Generate URL for the processed poster
                 poster_url = storage_manager.get_file_url(poster_result.output_path)
                 
+                # Keep the item details the badge processors fetched for the tag write
+                item_data = await jellyfin_service.get_item_details(request.jellyfin_id)
+                
                 # Upload processed poster back to Jellyfin
                 upload_success = await jellyfin_service.upload_poster_image(
                     request.jellyfin_id, 
@@ -512,7 +525,11 @@ async def apply_badges_to_poster(
                     # Add aphrodite-overlay tag to track badged items
                     try:
                         tag_service = get_tag_management_service()
-                        await tag_service.add_tag_to_items([request.jellyfin_id], "aphrodite-overlay")
+                        await tag_service.add_tag_to_items(
+                            [request.jellyfin_id],
+                            "aphrodite-overlay",
+                            item_data={request.jellyfin_id: item_data} if item_data else None
+                        )
                         logger.info(f"Added aphrodite-overlay tag to {request.item_id}")
                     except Exception as tag_error:
                         logger.warning(f"Failed to add tag to {request.item_id}: {tag_error}")
@@ -567,8 +584,9 @@ async def restore_original_poster(
         # Use the storage manager for consistent cache handling
         storage_manager = StorageManager()
         
-        # Get cached original poster using the jellyfin_id (not item_id)
-        cached_poster_path = storage_manager.get_cached_original(request.jellyfin_id)
+        # Get cached original poster using the jellyfin_id (not item_id); the
+        # store's index maps the item to its poster, so no metadata check is needed
+        cached_poster_path = await storage_manager.get_cached_original(request.jellyfin_id, db)
         
         if not cached_poster_path:
             logger.warning(f"No original poster found in cache for Jellyfin ID: {request.jellyfin_id}")
@@ -579,40 +597,7 @@ async def restore_original_poster(
                 restored_to_jellyfin=False
             )
         
-        # Verify the cached poster file exists and is readable
         cached_path = Path(cached_poster_path)
-        if not cached_path.exists() or not cached_path.is_file():
-            logger.error(f"Original poster file not accessible: {cached_path}")
-            return RestoreOriginalResponse(
-                success=False,
-                message="Original poster file not accessible",
-                original_poster_found=True,
-                restored_to_jellyfin=False
-            )
-        
-        # Verify the cache metadata to ensure we have the right poster
-        cache_dir = cached_path.parent
-        meta_files = list(cache_dir.glob(f"{cached_path.stem}.meta"))
-        if meta_files:
-            meta_file = meta_files[0]
-            try:
-                with open(meta_file, 'r') as f:
-                    metadata = json.load(f)
-                
-                # Validate that the cached poster is for the correct jellyfin_id
-                if metadata.get('jellyfin_id') != request.jellyfin_id:
-                    logger.error(f"Cache metadata mismatch! Expected {request.jellyfin_id}, got {metadata.get('jellyfin_id')}")
-                    return RestoreOriginalResponse(
-                        success=False,
-                        message="Cache metadata validation failed - poster ID mismatch",
-                        original_poster_found=True,
-                        restored_to_jellyfin=False
-                    )
-                logger.info(f"Cache metadata validated for {request.jellyfin_id}")
-            except Exception as meta_error:
-                logger.warning(f"Could not validate cache metadata: {meta_error}")
-                # Continue anyway, but log the issue
-        
         logger.info(f"Found valid original poster: {cached_path.name}")
         
         # Upload original poster back to Jellyfin
@@ -633,6 +618,12 @@ async def restore_original_poster(
         
         logger.info(f"Successfully uploaded original poster to Jellyfin for {request.item_id}")
         
+        # The next batch run must render this item again instead of skipping it as unchanged
+        try:
+            await get_render_fingerprint_service().forget(request.jellyfin_id, db)
+        except Exception as fingerprint_error:
+            logger.warning(f"Failed to clear render fingerprint for {request.item_id}: {fingerprint_error}")
+        
         # Remove aphrodite-overlay tag from the item
         tag_removal_success = False
         try:
@@ -683,3 +674,20 @@ async def restore_original_poster(
             original_poster_found=False,
             restored_to_jellyfin=False
         )
+
+@router.post("/originals/cleanup", response_model=OriginalCacheCleanupResponse)
+async def cleanup_original_posters(
+    db: AsyncSession = Depends(get_db_session)
+) -> OriginalCacheCleanupResponse:
+    """Import legacy cached originals into the poster store and delete unreferenced files"""
+    try:
+        storage_manager = StorageManager()
+        result = await storage_manager.cleanup_original_cache(db)
+        return OriginalCacheCleanupResponse(
+            success=True,
+            message=f"Imported {result['legacy_imported']} legacy originals, removed {result['removed']} unreferenced files",
+            **result
+        )
+    except Exception as e:
+        logger.error(f"Error cleaning up original posters: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to clean up original posters: {str(e)}")
@@ -14,6 +14,7 @@ import os
 from app.core.database import get_db_session
 from app.services.jellyfin_service import get_jellyfin_service
 from app.services.tag_management_service import get_tag_management_service
+from app.services.badge_processing.render_fingerprint import get_render_fingerprint_service
 from app.services.poster_management import StorageManager
 from app.services.poster_sources import get_poster_source_manager
 from app.models.poster_sources import (
@@ -101,23 +102,8 @@ async def replace_poster(
             
         logger.info(f"Downloaded poster from {request.selected_poster.source} ({len(poster_data)} bytes)")
         
-        # Cache the current poster as original before replacement
         jellyfin_service = get_jellyfin_service()
         
-        # Get current poster from Jellyfin to cache as original
-        current_poster_data = await jellyfin_service.download_poster(request.jellyfin_id)
-        if current_poster_data:
-            try:
-                storage_manager = StorageManager()
-                cached_original_path = storage_manager.cache_original_poster(
-                    current_poster_data, 
-                    request.jellyfin_id
-                )
-                logger.info(f"Cached current poster as original for {item_id}")
-            except Exception as cache_error:
-                logger.warning(f"Failed to cache current poster for {item_id}: {cache_error}")
-                # Don't fail the operation if caching fails
-        
         # Create temporary file for the new poster
         with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_file:
             temp_file.write(poster_data)
@@ -138,6 +124,21 @@ async def replace_poster(
                 
             logger.info(f"Successfully uploaded new poster to Jellyfin for {item_id}")
             
+            # The replacement is the item's new original, so restore returns to it
+            try:
+                storage_manager = StorageManager()
+                await storage_manager.cache_original_poster(poster_data, request.jellyfin_id, db, replace=True)
+                logger.info(f"Cached replacement poster as original for {item_id}")
+            except Exception as cache_error:
+                logger.warning(f"Failed to cache replacement poster for {item_id}: {cache_error}")
+                # Don't fail the operation if caching fails
+            
+            # The next batch run must render this item again instead of skipping it as unchanged
+            try:
+                await get_render_fingerprint_service().forget(request.jellyfin_id, db)
+            except Exception as fingerprint_error:
+                logger.warning(f"Failed to clear render fingerprint for {item_id}: {fingerprint_error}")
+            
             # Remove aphrodite-overlay tag since this is now original content
             tag_removal_success = False
             try:
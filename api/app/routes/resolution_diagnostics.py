@@ -253,11 +253,11 @@ async def get_cache_stats():
         
         # Import cache component
         try:
-            from app.services.badge_processing.resolution_cache import ResolutionCache
-            cache = ResolutionCache()
+            from app.services.badge_processing.series_profile_cache import get_series_profile_cache
+            cache = get_series_profile_cache()
             
             # Get cache statistics
-            stats = cache.get_cache_stats()
+            stats = await cache.get_cache_stats("resolution")
             
             logger.info(f"Cache stats retrieved: {stats['hit_rate_percent']}% hit rate")
             return CacheStats(**stats)
@@ -291,11 +291,11 @@ async def clear_resolution_cache():
         
         # Import cache component
         try:
-            from app.services.badge_processing.resolution_cache import ResolutionCache
-            cache = ResolutionCache()
+            from app.services.badge_processing.series_profile_cache import get_series_profile_cache
+            cache = get_series_profile_cache()
             
             # Clear the cache
-            cache.clear_cache()
+            await cache.clear("resolution")
             
             logger.info("Resolution cache cleared successfully")
             return BaseResponse(message="Resolution cache cleared successfully")
@@ -0,0 +1,73 @@
+"""
+Webhook Routes
+
+Receives Jellyfin webhook plugin notifications so new media is badged within
+seconds instead of waiting for the next change feed poll or schedule run.
+"""
+
+import hmac
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+
+from app.core.config import get_settings
+from app.services.change_feed_service import get_change_feed_service
+from aphrodite_logging import get_logger
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+logger = get_logger("aphrodite.api.webhooks", service="api")
+
+# Notification types that can mean a movie or series needs badging
+CHANGE_NOTIFICATIONS = {"ItemAdded", "ItemUpdated"}
+CHANGE_ITEM_TYPES = {"Movie", "Series"}
+
+
+def _check_token(token: Optional[str]) -> None:
+    expected = get_settings().jellyfin_webhook_token
+    if expected and not hmac.compare_digest(token or "", expected):
+        raise HTTPException(status_code=401, detail="Invalid webhook token")
+
+
+@router.post("/jellyfin", response_model=dict)
+async def jellyfin_webhook(
+    request: Request,
+    token: Optional[str] = Query(None, description="Webhook token, if jellyfin_webhook_token is set"),
+    x_aphrodite_token: Optional[str] = Header(None)
+):
+    """
+    Jellyfin webhook plugin endpoint (Generic destination, JSON body).
+    
+    The event only wakes the change feed; the feed fetches the changed items
+    from Jellyfin itself, so a burst of events during a bulk import costs one
+    incremental poll.
+    """
+    _check_token(x_aphrodite_token or token)
+    
+    try:
+        payload: Dict[str, Any] = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Expected a JSON body")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Expected a JSON object")
+    
+    notification_type = payload.get("NotificationType")
+    item_type = payload.get("ItemType")
+    
+    relevant = notification_type in CHANGE_NOTIFICATIONS and (not item_type or item_type in CHANGE_ITEM_TYPES)
+    if not relevant:
+        return {"success": True, "accepted": False, "message": f"Ignored {notification_type or 'unknown'} event"}
+    
+    accepted = get_change_feed_service().notify()
+    logger.debug(f"Jellyfin {notification_type} for {item_type} {payload.get('ItemId')} (change feed woken: {accepted})")
+    
+    return {
+        "success": True,
+        "accepted": accepted,
+        "message": "Change feed notified" if accepted else "Change feed is not running"
+    }
+
+
+@router.get("/jellyfin/status", response_model=dict)
+async def change_feed_status():
+    """Change feed state: whether it runs and how many items wait for a batch job"""
+    return {"success": True, **get_change_feed_service().get_status()}
@@ -5,5 +5,6 @@ Provides centralized tracking for all media and poster operations.
 """
 
 from .activity_tracker import ActivityTracker, get_activity_tracker
+from .activity_writer import ActivityWriter, get_activity_writer
 
-__all__ = ['ActivityTracker', 'get_activity_tracker']
+__all__ = ['ActivityTracker', 'get_activity_tracker', 'ActivityWriter', 'get_activity_writer']
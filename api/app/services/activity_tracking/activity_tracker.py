@@ -3,6 +3,7 @@ Activity Tracker Service
 
 Core service for managing activity lifecycle (start, complete, fail).
 Provides centralized tracking for all poster and media-related operations.
+Writes are queued on the activity writer and committed in batches.
 """
 
 import time
@@ -13,9 +14,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.models.media_activity import MediaActivityModel
-from app.models.badge_application import BadgeApplicationModel
-from app.models.poster_replacement import PosterReplacementModel
 from app.core.database import get_db_session
+from .activity_writer import as_uuid, get_activity_writer
 from app.utils.version_manager import get_version
 from aphrodite_logging import get_logger
 
@@ -25,6 +25,7 @@ class ActivityTracker:
     
     def __init__(self):
         self.logger = get_logger("aphrodite.activity_tracker", service="activity")
+        self.writer = get_activity_writer()
     
     async def start_activity(
         self,
@@ -41,7 +42,7 @@ class ActivityTracker:
         db_session: Optional[AsyncSession] = None
     ) -> str:
         """
-        Create a new activity record with status='processing' and return the activity_id.
+        Queue a new activity record with status='processing' and return the activity_id.
         
         Args:
             media_id: ID of the media item being processed
@@ -54,7 +55,7 @@ class ActivityTracker:
             parent_activity_id: FK to parent activity (for related operations)
             input_parameters: Original request parameters
             additional_metadata: Extensible metadata field
-            db_session: Optional database session (will create one if not provided)
+            db_session: Optional database session whose engine receives the write
             
         Returns:
             str: The activity ID
@@ -62,35 +63,30 @@ class ActivityTracker:
         activity_id = str(uuid.uuid4())
         
         try:
-            # Create activity record
-            activity = MediaActivityModel(
-                id=activity_id,
-                media_id=media_id,
-                jellyfin_id=jellyfin_id,
-                activity_type=activity_type,
-                activity_subtype=activity_subtype,
-                status='processing',
-                initiated_by=initiated_by,
-                user_id=user_id,
-                batch_job_id=batch_job_id,
-                parent_activity_id=parent_activity_id,
-                started_at=datetime.now(timezone.utc),
-                input_parameters=input_parameters,
-                system_version=get_version(),
-                additional_metadata=additional_metadata
-            )
-            
-            # Use provided session or create a new one
-            if db_session:
-                db_session.add(activity)
-                await db_session.commit()
-                self.logger.info(f"Started activity {activity_id}: {activity_type} for media {media_id}")
-            else:
-                async for db in get_db_session():
-                    db.add(activity)
-                    await db.commit()
-                    self.logger.info(f"Started activity {activity_id}: {activity_type} for media {media_id}")
-                    break
+            # Every column is set so queued rows share one multi-row INSERT
+            await self.writer.add_activity({
+                'id': uuid.UUID(activity_id),
+                'media_id': media_id,
+                'jellyfin_id': jellyfin_id,
+                'activity_type': activity_type,
+                'activity_subtype': activity_subtype,
+                'status': 'processing',
+                'initiated_by': initiated_by,
+                'user_id': user_id,
+                'batch_job_id': batch_job_id,
+                'parent_activity_id': as_uuid(parent_activity_id) if parent_activity_id else None,
+                'started_at': datetime.now(timezone.utc),
+                'completed_at': None,
+                'processing_duration_ms': None,
+                'input_parameters': input_parameters,
+                'success': None,
+                'result_data': None,
+                'error_message': None,
+                'retry_count': 0,
+                'system_version': get_version(),
+                'additional_metadata': additional_metadata
+            }, db_session)
+            self.logger.info(f"Started activity {activity_id}: {activity_type} for media {media_id}")
             
             return activity_id
             
@@ -107,7 +103,7 @@ class ActivityTracker:
         db_session: Optional[AsyncSession] = None
     ) -> None:
         """
-        Update the activity record to status='completed', log the result, and calculate processing_duration_ms.
+        Queue the update of the activity record to status='completed' with its result and processing_duration_ms.
         
         Args:
             activity_id: The activity ID to complete
@@ -117,19 +113,14 @@ class ActivityTracker:
             db_session: Optional database session
         """
         try:
-            completion_time = datetime.now(timezone.utc)
-            
-            # Update activity record
-            if db_session:
-                await self._update_activity_completion(
-                    db_session, activity_id, success, result_data, error_message, completion_time
-                )
-            else:
-                async for db in get_db_session():
-                    await self._update_activity_completion(
-                        db, activity_id, success, result_data, error_message, completion_time
-                    )
-                    break
+            await self.writer.complete_activity(
+                as_uuid(activity_id),
+                success,
+                datetime.now(timezone.utc),
+                result_data,
+                error_message,
+                db_session
+            )
             
             status = "succeeded" if success else "failed"
             self.logger.info(f"Completed activity {activity_id}: {status}")
@@ -159,42 +150,6 @@ class ActivityTracker:
             db_session=db_session
         )
     
-    async def _update_activity_completion(
-        self,
-        db: AsyncSession,
-        activity_id: str,
-        success: bool,
-        result_data: Optional[Dict[str, Any]],
-        error_message: Optional[str],
-        completion_time: datetime
-    ) -> None:
-        """Internal method to update activity completion"""
-        
-        # Get the activity record
-        result = await db.execute(
-            select(MediaActivityModel).where(MediaActivityModel.id == activity_id)
-        )
-        activity = result.scalar_one_or_none()
-        
-        if not activity:
-            raise ValueError(f"Activity {activity_id} not found")
-        
-        # Calculate processing duration
-        processing_duration = None
-        if activity.started_at:
-            duration_seconds = (completion_time - activity.started_at).total_seconds()
-            processing_duration = int(duration_seconds * 1000)  # Convert to milliseconds
-        
-        # Update the record
-        activity.status = 'completed'
-        activity.success = success
-        activity.completed_at = completion_time
-        activity.processing_duration_ms = processing_duration
-        activity.result_data = result_data
-        activity.error_message = error_message
-        
-        await db.commit()
-    
     async def get_activity_history(
         self,
         media_id: str,
@@ -217,6 +172,9 @@ class ActivityTracker:
             List of activity records as dictionaries
         """
         try:
+            # Include activities still queued for the next batch write
+            await self.writer.flush()
+            
             if db_session:
                 return await self._query_activity_history(
                     db_session, media_id, limit, offset, activity_type
@@ -297,84 +255,27 @@ class ActivityTracker:
             db_session: Optional database session
         """
         try:
-            # Ensure activity_id is a proper UUID object
-            if isinstance(activity_id, str):
-                activity_uuid = uuid.UUID(activity_id)
-            else:
-                activity_uuid = activity_id
+            await self.writer.add_detail('badge_application', {
+                'activity_id': as_uuid(activity_id),
+                'badge_types': badge_types,
+                'badge_settings_snapshot': badge_settings_snapshot,
+                'badge_configuration_id': badge_configuration_id,
+                'poster_source': poster_source,
+                'original_poster_path': original_poster_path,
+                'output_poster_path': output_poster_path,
+                'intermediate_files': intermediate_files or [],
+                'badges_applied': badges_applied or [],
+                'badges_failed': badges_failed or [],
+                'final_poster_dimensions': final_poster_dimensions,
+                'final_file_size': final_file_size,
+                'badge_generation_time_ms': badge_generation_time_ms,
+                'poster_processing_time_ms': poster_processing_time_ms,
+                'total_processing_time_ms': total_processing_time_ms,
+                'poster_quality_score': poster_quality_score,
+                'compression_ratio': compression_ratio
+            }, db_session)
+            self.logger.info(f"Logged badge details for activity {activity_id}")
             
-            # Verify the activity exists before creating badge application
-            if db_session:
-                # Check if activity exists
-                activity_check = await db_session.execute(
-                    select(MediaActivityModel).where(MediaActivityModel.id == activity_uuid)
-                )
-                existing_activity = activity_check.scalar_one_or_none()
-                if not existing_activity:
-                    raise ValueError(f"Activity {activity_uuid} not found")
-                    
-                # Create the badge application with proper session management
-                badge_application = BadgeApplicationModel(
-                    activity_id=activity_uuid,
-                    badge_types=badge_types,
-                    badge_settings_snapshot=badge_settings_snapshot,
-                    badge_configuration_id=badge_configuration_id,
-                    poster_source=poster_source,
-                    original_poster_path=original_poster_path,
-                    output_poster_path=output_poster_path,
-                    intermediate_files=intermediate_files or [],
-                    badges_applied=badges_applied or [],
-                    badges_failed=badges_failed or [],
-                    final_poster_dimensions=final_poster_dimensions,
-                    final_file_size=final_file_size,
-                    badge_generation_time_ms=badge_generation_time_ms,
-                    poster_processing_time_ms=poster_processing_time_ms,
-                    total_processing_time_ms=total_processing_time_ms,
-                    poster_quality_score=poster_quality_score,
-                    compression_ratio=compression_ratio
-                )
-                
-                # Add to session and commit in one transaction
-                db_session.add(badge_application)
-                await db_session.commit()
-                self.logger.info(f"Logged badge details for activity {activity_id}")
-                
-            else:
-                # Handle case where no session is provided
-                async for db in get_db_session():
-                    # Check if activity exists
-                    activity_check = await db.execute(
-                        select(MediaActivityModel).where(MediaActivityModel.id == activity_uuid)
-                    )
-                    existing_activity = activity_check.scalar_one_or_none()
-                    if not existing_activity:
-                        raise ValueError(f"Activity {activity_uuid} not found")
-                        
-                    badge_application = BadgeApplicationModel(
-                        activity_id=activity_uuid,
-                        badge_types=badge_types,
-                        badge_settings_snapshot=badge_settings_snapshot,
-                        badge_configuration_id=badge_configuration_id,
-                        poster_source=poster_source,
-                        original_poster_path=original_poster_path,
-                        output_poster_path=output_poster_path,
-                        intermediate_files=intermediate_files or [],
-                        badges_applied=badges_applied or [],
-                        badges_failed=badges_failed or [],
-                        final_poster_dimensions=final_poster_dimensions,
-                        final_file_size=final_file_size,
-                        badge_generation_time_ms=badge_generation_time_ms,
-                        poster_processing_time_ms=poster_processing_time_ms,
-                        total_processing_time_ms=total_processing_time_ms,
-                        poster_quality_score=poster_quality_score,
-                        compression_ratio=compression_ratio
-                    )
-                    
-                    db.add(badge_application)
-                    await db.commit()
-                    self.logger.info(f"Logged badge details for activity {activity_id}")
-                    break
-                    
         except Exception as e:
             self.logger.error(f"Failed to log badge details for activity {activity_id}: {e}", exc_info=True)
             raise
@@ -434,94 +335,32 @@ class ActivityTracker:
             db_session: Optional database session
         """
         try:
-            # Ensure activity_id is a proper UUID object
-            if isinstance(activity_id, str):
-                activity_uuid = uuid.UUID(activity_id)
-            else:
-                activity_uuid = activity_id
+            await self.writer.add_detail('poster_replacement', {
+                'activity_id': as_uuid(activity_id),
+                'replacement_source': replacement_source,
+                'source_poster_id': source_poster_id,
+                'source_poster_url': source_poster_url,
+                'search_query': search_query,
+                'search_results_count': search_results_count,
+                'original_poster_url': original_poster_url,
+                'original_poster_cached_path': original_poster_cached_path,
+                'original_poster_dimensions': original_poster_dimensions,
+                'original_file_size': original_file_size,
+                'original_poster_hash': original_poster_hash,
+                'new_poster_dimensions': new_poster_dimensions,
+                'new_file_size': new_file_size,
+                'new_poster_hash': new_poster_hash,
+                'download_time_ms': download_time_ms,
+                'upload_time_ms': upload_time_ms,
+                'jellyfin_upload_success': jellyfin_upload_success,
+                'tag_operations': tag_operations or {},
+                'jellyfin_response': jellyfin_response or {},
+                'quality_improvement_score': quality_improvement_score,
+                'visual_similarity_score': visual_similarity_score,
+                'user_rating': user_rating
+            }, db_session)
+            self.logger.info(f"Logged replacement details for activity {activity_id}")
             
-            # Verify the activity exists before creating poster replacement
-            if db_session:
-                # Check if activity exists
-                activity_check = await db_session.execute(
-                    select(MediaActivityModel).where(MediaActivityModel.id == activity_uuid)
-                )
-                existing_activity = activity_check.scalar_one_or_none()
-                if not existing_activity:
-                    raise ValueError(f"Activity {activity_uuid} not found")
-                    
-                # Create the poster replacement with proper session management
-                poster_replacement = PosterReplacementModel(
-                    activity_id=activity_uuid,
-                    replacement_source=replacement_source,
-                    source_poster_id=source_poster_id,
-                    source_poster_url=source_poster_url,
-                    search_query=search_query,
-                    search_results_count=search_results_count,
-                    original_poster_url=original_poster_url,
-                    original_poster_cached_path=original_poster_cached_path,
-                    original_poster_dimensions=original_poster_dimensions,
-                    original_file_size=original_file_size,
-                    original_poster_hash=original_poster_hash,
-                    new_poster_dimensions=new_poster_dimensions,
-                    new_file_size=new_file_size,
-                    new_poster_hash=new_poster_hash,
-                    download_time_ms=download_time_ms,
-                    upload_time_ms=upload_time_ms,
-                    jellyfin_upload_success=jellyfin_upload_success,
-                    tag_operations=tag_operations or {},
-                    jellyfin_response=jellyfin_response or {},
-                    quality_improvement_score=quality_improvement_score,
-                    visual_similarity_score=visual_similarity_score,
-                    user_rating=user_rating
-                )
-                
-                # Add to session and commit in one transaction
-                db_session.add(poster_replacement)
-                await db_session.commit()
-                self.logger.info(f"Logged replacement details for activity {activity_id}")
-                
-            else:
-                # Handle case where no session is provided
-                async for db in get_db_session():
-                    # Check if activity exists
-                    activity_check = await db.execute(
-                        select(MediaActivityModel).where(MediaActivityModel.id == activity_uuid)
-                    )
-                    existing_activity = activity_check.scalar_one_or_none()
-                    if not existing_activity:
-                        raise ValueError(f"Activity {activity_uuid} not found")
-                        
-                    poster_replacement = PosterReplacementModel(
-                        activity_id=activity_uuid,
-                        replacement_source=replacement_source,
-                        source_poster_id=source_poster_id,
-                        source_poster_url=source_poster_url,
-                        search_query=search_query,
-                        search_results_count=search_results_count,
-                        original_poster_url=original_poster_url,
-                        original_poster_cached_path=original_poster_cached_path,
-                        original_poster_dimensions=original_poster_dimensions,
-                        original_file_size=original_file_size,
-                        original_poster_hash=original_poster_hash,
-                        new_poster_dimensions=new_poster_dimensions,
-                        new_file_size=new_file_size,
-                        new_poster_hash=new_poster_hash,
-                        download_time_ms=download_time_ms,
-                        upload_time_ms=upload_time_ms,
-                        jellyfin_upload_success=jellyfin_upload_success,
-                        tag_operations=tag_operations or {},
-                        jellyfin_response=jellyfin_response or {},
-                        quality_improvement_score=quality_improvement_score,
-                        visual_similarity_score=visual_similarity_score,
-                        user_rating=user_rating
-                    )
-                    
-                    db.add(poster_replacement)
-                    await db.commit()
-                    self.logger.info(f"Logged replacement details for activity {activity_id}")
-                    break
-                    
         except Exception as e:
             self.logger.error(f"Failed to log replacement details for activity {activity_id}: {e}", exc_info=True)
             raise
@@ -565,80 +404,24 @@ class ActivityTracker:
             db_session: Optional database session
         """
         try:
-            from app.models.activity_performance_metric import ActivityPerformanceMetricModel
+            await self.writer.add_detail('performance_metrics', {
+                'activity_id': as_uuid(activity_id),
+                'cpu_usage_percent': cpu_usage_percent,
+                'memory_usage_mb': memory_usage_mb,
+                'disk_io_read_mb': disk_io_read_mb,
+                'disk_io_write_mb': disk_io_write_mb,
+                'network_download_mb': network_download_mb,
+                'network_upload_mb': network_upload_mb,
+                'network_latency_ms': network_latency_ms,
+                'stage_timings': stage_timings or {},
+                'bottleneck_stage': bottleneck_stage,
+                'error_rate': error_rate,
+                'throughput_items_per_second': throughput_items_per_second,
+                'server_load_average': server_load_average,
+                'concurrent_operations': concurrent_operations
+            }, db_session)
+            self.logger.info(f"Logged performance metrics for activity {activity_id}")
             
-            # Ensure activity_id is a proper UUID object
-            if isinstance(activity_id, str):
-                activity_uuid = uuid.UUID(activity_id)
-            else:
-                activity_uuid = activity_id
-            
-            # Verify the activity exists before creating performance metrics
-            if db_session:
-                # Check if activity exists
-                activity_check = await db_session.execute(
-                    select(MediaActivityModel).where(MediaActivityModel.id == activity_uuid)
-                )
-                existing_activity = activity_check.scalar_one_or_none()
-                if not existing_activity:
-                    raise ValueError(f"Activity {activity_uuid} not found")
-                    
-                # Create the performance metrics with proper session management
-                performance_metrics = ActivityPerformanceMetricModel(
-                    activity_id=activity_uuid,
-                    cpu_usage_percent=cpu_usage_percent,
-                    memory_usage_mb=memory_usage_mb,
-                    disk_io_read_mb=disk_io_read_mb,
-                    disk_io_write_mb=disk_io_write_mb,
-                    network_download_mb=network_download_mb,
-                    network_upload_mb=network_upload_mb,
-                    network_latency_ms=network_latency_ms,
-                    stage_timings=stage_timings or {},
-                    bottleneck_stage=bottleneck_stage,
-                    error_rate=error_rate,
-                    throughput_items_per_second=throughput_items_per_second,
-                    server_load_average=server_load_average,
-                    concurrent_operations=concurrent_operations
-                )
-                
-                # Add to session and commit in one transaction
-                db_session.add(performance_metrics)
-                await db_session.commit()
-                self.logger.info(f"Logged performance metrics for activity {activity_id}")
-                
-            else:
-                # Handle case where no session is provided
-                async for db in get_db_session():
-                    # Check if activity exists
-                    activity_check = await db.execute(
-                        select(MediaActivityModel).where(MediaActivityModel.id == activity_uuid)
-                    )
-                    existing_activity = activity_check.scalar_one_or_none()
-                    if not existing_activity:
-                        raise ValueError(f"Activity {activity_uuid} not found")
-                        
-                    performance_metrics = ActivityPerformanceMetricModel(
-                        activity_id=activity_uuid,
-                        cpu_usage_percent=cpu_usage_percent,
-                        memory_usage_mb=memory_usage_mb,
-                        disk_io_read_mb=disk_io_read_mb,
-                        disk_io_write_mb=disk_io_write_mb,
-                        network_download_mb=network_download_mb,
-                        network_upload_mb=network_upload_mb,
-                        network_latency_ms=network_latency_ms,
-                        stage_timings=stage_timings or {},
-                        bottleneck_stage=bottleneck_stage,
-                        error_rate=error_rate,
-                        throughput_items_per_second=throughput_items_per_second,
-                        server_load_average=server_load_average,
-                        concurrent_operations=concurrent_operations
-                    )
-                    
-                    db.add(performance_metrics)
-                    await db.commit()
-                    self.logger.info(f"Logged performance metrics for activity {activity_id}")
-                    break
-                    
         except Exception as e:
             self.logger.error(f"Failed to log performance metrics for activity {activity_id}: {e}", exc_info=True)
             raise
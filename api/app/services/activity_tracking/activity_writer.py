@@ -0,0 +1,266 @@
+"""
+Activity Writer
+
+Buffers activity records in memory and writes them in batches. Starting an
+activity, completing it and attaching badge/replacement/performance details
+only queue rows; a flush writes everything queued with one multi-row INSERT
+per table and one executemany UPDATE in a single transaction, together with
+the daily rollups of the activities it completes.
+
+A background flush runs once activity_flush_batch_size rows are queued or
+activity_flush_interval seconds after the first queued row, so callers never
+wait on a commit. Owners of a
+database engine call close() before disposing of it (API shutdown, end of a
+batch job) so nothing queued is lost.
+"""
+
+import asyncio
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import Integer, bindparam, cast, extract, insert, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core import database
+from app.core.config import get_settings
+from app.models.media_activity import MediaActivityModel
+from app.models.badge_application import BadgeApplicationModel
+from app.models.poster_replacement import PosterReplacementModel
+from app.models.activity_performance_metric import ActivityPerformanceMetricModel
+from app.services.analytics.activity_rollups import get_activity_rollup_service
+from aphrodite_logging import get_logger
+
+
+DETAIL_MODELS = {
+    "badge_application": BadgeApplicationModel,
+    "poster_replacement": PosterReplacementModel,
+    "performance_metrics": ActivityPerformanceMetricModel
+}
+
+_activities_table = MediaActivityModel.__table__
+_completed_at = bindparam("b_completed_at", type_=_activities_table.c.completed_at.type)
+
+# Completion of an activity written by an earlier flush; the duration is worked
+# out against the stored started_at
+_complete_activity = (
+    update(_activities_table)
+    .where(_activities_table.c.id == bindparam("b_id"))
+    .values(
+        status="completed",
+        success=bindparam("b_success"),
+        completed_at=_completed_at,
+        processing_duration_ms=cast(
+            extract("epoch", _completed_at - _activities_table.c.started_at) * 1000,
+            Integer
+        ),
+        result_data=bindparam("b_result_data", type_=_activities_table.c.result_data.type),
+        error_message=bindparam("b_error_message")
+    )
+)
+
+
+def as_uuid(activity_id: Any) -> uuid.UUID:
+    return activity_id if isinstance(activity_id, uuid.UUID) else uuid.UUID(str(activity_id))
+
+
+@dataclass
+class _PendingBatch:
+    """Rows queued since the last flush"""
+    activities: Dict[uuid.UUID, Dict[str, Any]] = field(default_factory=dict)
+    completions: Dict[uuid.UUID, Dict[str, Any]] = field(default_factory=dict)
+    details: Dict[str, List[Dict[str, Any]]] = field(
+        default_factory=lambda: {kind: [] for kind in DETAIL_MODELS}
+    )
+    
+    def __len__(self) -> int:
+        return (
+            len(self.activities)
+            + len(self.completions)
+            + sum(len(rows) for rows in self.details.values())
+        )
+    
+    def completed_activity_ids(self) -> List[uuid.UUID]:
+        queued = [activity_id for activity_id, row in self.activities.items() if row["status"] == "completed"]
+        return queued + list(self.completions)
+
+    def split_by_activity(self) -> List["_PendingBatch"]:
+        """One batch per activity, so a bad row only loses its own activity"""
+        groups: Dict[uuid.UUID, _PendingBatch] = {}
+        for activity_id, row in self.activities.items():
+            groups.setdefault(activity_id, _PendingBatch()).activities[activity_id] = row
+        for activity_id, row in self.completions.items():
+            groups.setdefault(activity_id, _PendingBatch()).completions[activity_id] = row
+        for kind, rows in self.details.items():
+            for row in rows:
+                groups.setdefault(row["activity_id"], _PendingBatch()).details[kind].append(row)
+        return list(groups.values())
+
+
+class ActivityWriter:
+    """Queues activity rows and writes them in multi-row batches"""
+    
+    def __init__(self):
+        self.logger = get_logger("aphrodite.activity_writer", service="activity")
+        self.settings = get_settings()
+        
+        self._pending = _PendingBatch()
+        self._bind: Optional[AsyncEngine] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._waiting: Set[asyncio.Task] = set()  # Flush tasks still sleeping, safe to cancel
+        
+        # asyncio locks belong to one event loop and Celery tasks each run their own
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def add_activity(self, row: Dict[str, Any], db_session: Optional[AsyncSession] = None) -> None:
+        """Queue a new media_activities row"""
+        await self._use_bind(db_session)
+        self._pending.activities[row["id"]] = row
+        self._after_enqueue()
+    
+    async def complete_activity(
+        self,
+        activity_id: uuid.UUID,
+        success: bool,
+        completed_at: datetime,
+        result_data: Optional[Dict[str, Any]],
+        error_message: Optional[str],
+        db_session: Optional[AsyncSession] = None
+    ) -> None:
+        """Queue the completion of an activity"""
+        await self._use_bind(db_session)
+        
+        queued = self._pending.activities.get(activity_id)
+        if queued is not None:
+            # Not written yet - the row goes in once, already completed
+            queued.update(
+                status="completed",
+                success=success,
+                completed_at=completed_at,
+                processing_duration_ms=int((completed_at - queued["started_at"]).total_seconds() * 1000),
+                result_data=result_data,
+                error_message=error_message
+            )
+        else:
+            self._pending.completions[activity_id] = {
+                "b_id": activity_id,
+                "b_success": success,
+                "b_completed_at": completed_at,
+                "b_result_data": result_data,
+                "b_error_message": error_message
+            }
+        self._after_enqueue()
+    
+    async def add_detail(self, kind: str, row: Dict[str, Any], db_session: Optional[AsyncSession] = None) -> None:
+        """Queue a badge_applications, poster_replacements or activity_performance_metrics row"""
+        await self._use_bind(db_session)
+        self._pending.details[kind].append(row)
+        self._after_enqueue()
+    
+    async def flush(self) -> None:
+        """Write everything queued so far"""
+        async with self._get_lock():
+            batch, self._pending = self._pending, _PendingBatch()
+            if not len(batch):
+                return
+            
+            bind = self._bind or database.async_engine
+            if bind is None:
+                self.logger.warning(f"⚠️ [ACTIVITY WRITER] No database engine, dropping {len(batch)} activity rows")
+                return
+            
+            try:
+                await self._write(bind, batch)
+                self.logger.debug(f"💾 [ACTIVITY WRITER] Flushed {len(batch)} activity rows")
+            except Exception as e:
+                self.logger.warning(f"⚠️ [ACTIVITY WRITER] Batch write failed, retrying per activity: {e}")
+                for group in batch.split_by_activity():
+                    try:
+                        await self._write(bind, group)
+                    except Exception as group_error:
+                        self.logger.error(f"❌ [ACTIVITY WRITER] Dropped activity rows: {group_error}")
+    
+    async def close(self) -> None:
+        """Write everything queued and wait for flushes in progress; call before the engine in use is disposed"""
+        for task in list(self._waiting):
+            task.cancel()
+        running = [task for task in self._flush_tasks if task is not asyncio.current_task()]
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        await self.flush()
+        self._bind = None
+    
+    async def _write(self, bind: AsyncEngine, batch: _PendingBatch) -> None:
+        async with AsyncSession(bind, expire_on_commit=False) as db:
+            # Parents before children so the activity_id foreign keys resolve
+            if batch.activities:
+                await db.execute(insert(MediaActivityModel), list(batch.activities.values()))
+            if batch.completions:
+                await db.execute(_complete_activity, list(batch.completions.values()))
+            for kind, model in DETAIL_MODELS.items():
+                if batch.details[kind]:
+                    await db.execute(insert(model), batch.details[kind])
+            
+            # Count completions into the daily rollups in the same transaction;
+            # a rollup failure must not cost the activity rows
+            completed_ids = batch.completed_activity_ids()
+            if completed_ids:
+                try:
+                    async with db.begin_nested():
+                        await get_activity_rollup_service().record_completed(db, completed_ids)
+                except Exception as e:
+                    self.logger.warning(f"⚠️ [ACTIVITY WRITER] Rollup update failed: {e}")
+            await db.commit()
+    
+    async def _use_bind(self, db_session: Optional[AsyncSession]) -> None:
+        """Write to the caller's engine; rows queued for another engine are flushed first"""
+        bind = db_session.bind if db_session is not None else database.async_engine
+        if bind is self._bind:
+            return
+        if len(self._pending):
+            await self.flush()
+        self._bind = bind
+    
+    def _after_enqueue(self) -> None:
+        """Schedule a flush; the caller never waits on the database"""
+        if len(self._pending) >= max(1, self.settings.activity_flush_batch_size):
+            self._schedule_flush(0)
+        elif not self._waiting:
+            self._schedule_flush(self.settings.activity_flush_interval)
+    
+    def _schedule_flush(self, delay: float) -> None:
+        task = asyncio.create_task(self._flush_later(delay))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _flush_later(self, delay: float) -> None:
+        task = asyncio.current_task()
+        self._waiting.add(task)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._waiting.discard(task)
+        try:
+            await self.flush()
+        except Exception as e:
+            self.logger.error(f"❌ [ACTIVITY WRITER] Background flush failed: {e}", exc_info=True)
+    
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+
+# Global writer instance
+_activity_writer: Optional[ActivityWriter] = None
+
+def get_activity_writer() -> ActivityWriter:
+    """Get global activity writer instance"""
+    global _activity_writer
+    if _activity_writer is None:
+        _activity_writer = ActivityWriter()
+    return _activity_writer
@@ -9,11 +9,13 @@ from .search_suggestions import get_search_suggestions_service
 from .analytics_statistics import get_analytics_statistics_service
 from .batch_analytics import get_batch_analytics_service
 from .user_analytics import get_user_analytics_service
+from .activity_rollups import get_activity_rollup_service
 
 __all__ = [
     'get_advanced_search_service',
     'get_search_suggestions_service', 
     'get_analytics_statistics_service',
     'get_batch_analytics_service',
-    'get_user_analytics_service'
+    'get_user_analytics_service',
+    'get_activity_rollup_service'
 ]
@@ -0,0 +1,232 @@
+"""
+Activity Rollups Service
+
+Maintains activity_daily_rollups as activities complete and answers the
+dashboard questions (successes, failures, mean and p95 duration per day,
+badge type and library) from it. Reads touch a bounded number of rollup
+rows however long the activity history grows.
+
+Durations are kept as a fixed-bucket histogram so rollups can be merged; the
+p95 reported is the upper bound of the bucket that holds the 95th percentile
+(the lower bound for the open-ended last bucket).
+"""
+
+import math
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database
+from app.models.activity_rollups import ActivityDailyRollupModel
+from app.models.media_activity import MediaActivityModel
+from aphrodite_logging import get_logger
+
+
+# Upper bounds of the duration histogram buckets; the last bucket is open-ended
+DURATION_BUCKETS_MS = (100, 250, 500, 1000, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000, 60000, 120000, 300000)
+
+
+def _histogram_sql() -> str:
+    """ARRAY of per-bucket counts over the grouped activities"""
+    duration = "a.processing_duration_ms"
+    buckets = []
+    lower = None
+    for upper in DURATION_BUCKETS_MS:
+        condition = f"{duration} < {upper}" if lower is None else f"{duration} >= {lower} AND {duration} < {upper}"
+        buckets.append(f"count(*) FILTER (WHERE {condition})")
+        lower = upper
+    buckets.append(f"count(*) FILTER (WHERE {duration} >= {lower})")
+    return "ARRAY[" + ", ".join(buckets) + "]::integer[]"
+
+
+def _merged_histogram_sql() -> str:
+    """Element-wise sum of the stored and the incoming histogram"""
+    return "ARRAY[" + ", ".join(
+        f"r.duration_histogram[{i}] + EXCLUDED.duration_histogram[{i}]"
+        for i in range(1, len(DURATION_BUCKETS_MS) + 2)
+    ) + "]::integer[]"
+
+
+# Completed activities grouped into rollup rows; {where} picks the activities
+_ROLLUP_SELECT = f"""
+    SELECT
+        (coalesce(a.started_at, a.created_at) AT TIME ZONE 'UTC')::date AS day,
+        a.activity_type,
+        CASE WHEN jsonb_typeof(a.input_parameters -> 'badge_types') = 'array' THEN
+            array_to_string(ARRAY(
+                SELECT jsonb_array_elements_text(a.input_parameters -> 'badge_types') AS badge_type ORDER BY 1
+            ), ',')
+        ELSE '' END AS badge_key,
+        coalesce(li.library_id, '') AS library_id,
+        count(*) FILTER (WHERE a.success IS TRUE) AS successes,
+        count(*) FILTER (WHERE a.success IS FALSE) AS failures,
+        count(a.processing_duration_ms) AS duration_count,
+        coalesce(sum(a.processing_duration_ms), 0) AS duration_sum_ms,
+        {_histogram_sql()} AS duration_histogram
+    FROM media_activities a
+    LEFT JOIN library_index_items li ON li.jellyfin_id = a.jellyfin_id
+    WHERE a.completed_at IS NOT NULL AND {{where}}
+    GROUP BY 1, 2, 3, 4
+"""
+
+_ROLLUP_COLUMNS = "day, activity_type, badge_key, library_id, successes, failures, duration_count, duration_sum_ms, duration_histogram"
+
+_RECORD_COMPLETED = text(f"""
+    INSERT INTO activity_daily_rollups AS r ({_ROLLUP_COLUMNS})
+    {_ROLLUP_SELECT.format(where="a.id = ANY(:activity_ids)")}
+    ON CONFLICT (day, activity_type, badge_key, library_id) DO UPDATE SET
+        successes = r.successes + EXCLUDED.successes,
+        failures = r.failures + EXCLUDED.failures,
+        duration_count = r.duration_count + EXCLUDED.duration_count,
+        duration_sum_ms = r.duration_sum_ms + EXCLUDED.duration_sum_ms,
+        duration_histogram = {_merged_histogram_sql()},
+        updated_at = now()
+""")
+
+_REBUILD = text(f"""
+    INSERT INTO activity_daily_rollups ({_ROLLUP_COLUMNS})
+    {_ROLLUP_SELECT.format(where="TRUE")}
+""")
+
+
+class _Totals:
+    """Merged rollup rows for one group"""
+    
+    def __init__(self):
+        self.successes = 0
+        self.failures = 0
+        self.duration_count = 0
+        self.duration_sum_ms = 0
+        self.histogram = [0] * (len(DURATION_BUCKETS_MS) + 1)
+    
+    def add(self, row: ActivityDailyRollupModel) -> None:
+        self.successes += row.successes
+        self.failures += row.failures
+        self.duration_count += row.duration_count
+        self.duration_sum_ms += row.duration_sum_ms
+        for i, count in enumerate(row.duration_histogram or []):
+            self.histogram[i] += count
+    
+    def p95_ms(self) -> Optional[int]:
+        total = sum(self.histogram)
+        if total == 0:
+            return None
+        rank = math.ceil(total * 0.95)
+        seen = 0
+        for i, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank:
+                return DURATION_BUCKETS_MS[min(i, len(DURATION_BUCKETS_MS) - 1)]
+        return DURATION_BUCKETS_MS[-1]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        completed = self.successes + self.failures
+        return {
+            "total": completed,
+            "successful": self.successes,
+            "failed": self.failures,
+            "success_rate": round(self.successes / completed * 100, 2) if completed > 0 else 0,
+            "average_processing_time_ms": round(self.duration_sum_ms / self.duration_count) if self.duration_count else None,
+            "p95_processing_time_ms": self.p95_ms()
+        }
+
+
+class ActivityRollupService:
+    """Maintains and reads the daily activity rollups"""
+    
+    def __init__(self):
+        self.logger = get_logger("aphrodite.analytics.rollups", service="analytics")
+    
+    async def record_completed(self, db_session: AsyncSession, activity_ids: Sequence[uuid.UUID]) -> None:
+        """
+        Add newly completed activities to their rollup rows.
+        
+        Runs in the caller's transaction, the one that completes the activities,
+        so every completion is counted exactly once.
+        """
+        if activity_ids:
+            await db_session.execute(_RECORD_COMPLETED, {"activity_ids": list(activity_ids)})
+    
+    async def rebuild(self, db_session: AsyncSession) -> int:
+        """Recompute every rollup row from media_activities; returns the number of rows"""
+        await db_session.execute(ActivityDailyRollupModel.__table__.delete())
+        await db_session.execute(_REBUILD)
+        await db_session.commit()
+        return await db_session.scalar(select(func.count()).select_from(ActivityDailyRollupModel)) or 0
+    
+    async def backfill_if_empty(self) -> None:
+        """Build the rollups from existing history the first time the table is used"""
+        session_factory = database.async_session_factory
+        if session_factory is None:
+            return
+        
+        async with session_factory() as db:
+            has_rollups = await db.scalar(select(ActivityDailyRollupModel.day).limit(1))
+            has_activities = await db.scalar(
+                select(MediaActivityModel.id).where(MediaActivityModel.completed_at.is_not(None)).limit(1)
+            )
+            if has_rollups is not None or has_activities is None:
+                return
+            
+            rows = await self.rebuild(db)
+            self.logger.info(f"✅ [ROLLUPS] Backfilled {rows} daily activity rollups")
+    
+    async def get_rollup_summary(
+        self,
+        db_session: AsyncSession,
+        days: int = 30,
+        activity_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Totals, mean and p95 duration per day, badge type and library over the last days"""
+        start_day = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+        
+        query = select(ActivityDailyRollupModel).where(ActivityDailyRollupModel.day >= start_day)
+        if activity_type:
+            query = query.where(ActivityDailyRollupModel.activity_type == activity_type)
+        rows = (await db_session.execute(query)).scalars().all()
+        
+        overall = _Totals()
+        by_day: Dict[date, _Totals] = {}
+        by_badge_type: Dict[str, _Totals] = {}
+        by_library: Dict[str, _Totals] = {}
+        
+        for row in rows:
+            overall.add(row)
+            by_day.setdefault(row.day, _Totals()).add(row)
+            by_library.setdefault(row.library_id or "unknown", _Totals()).add(row)
+            # A multi-badge activity counts towards each of its badge types
+            for badge_type in filter(None, row.badge_key.split(",")):
+                by_badge_type.setdefault(badge_type, _Totals()).add(row)
+        
+        daily = []
+        for offset in range(days):
+            day = start_day + timedelta(days=offset)
+            daily.append({"date": day.isoformat(), **by_day.get(day, _Totals()).to_dict()})
+        
+        return {
+            "period": {
+                "days": days,
+                "start_date": start_day.isoformat(),
+                "activity_type": activity_type
+            },
+            "totals": overall.to_dict(),
+            "daily": daily,
+            "badge_types": [
+                {"badge_type": badge_type, **totals.to_dict()}
+                for badge_type, totals in sorted(by_badge_type.items())
+            ],
+            "libraries": [
+                {"library_id": library_id, **totals.to_dict()}
+                for library_id, totals in sorted(by_library.items())
+            ]
+        }
+
+
+def get_activity_rollup_service() -> ActivityRollupService:
+    """Get singleton instance of ActivityRollupService"""
+    if not hasattr(get_activity_rollup_service, '_instance'):
+        get_activity_rollup_service._instance = ActivityRollupService()
+    return get_activity_rollup_service._instance
@@ -1,7 +1,7 @@
 """
-Analytics Statistics Service - Fixed Version
+Analytics Statistics Service
 
-Provides aggregated statistics using safe SQLAlchemy patterns.
+Provides aggregated statistics computed with SQL aggregates.
 """
 
 from typing import Dict, List, Optional, Any
@@ -29,60 +29,51 @@ class AnalyticsStatisticsService:
             # Build the same filters as in search
             filters = self._build_filters(search_params)
             
-            # Get all matching activities and calculate stats manually to avoid SQLAlchemy issues
-            query = select(MediaActivityModel)
+            # Aggregate in the database so cost does not grow with returned rows
+            processing_time = func.nullif(MediaActivityModel.processing_duration_ms, 0)
+            totals_query = select(
+                func.count().label("total"),
+                func.count().filter(MediaActivityModel.success.is_(True)).label("successful"),
+                func.count().filter(MediaActivityModel.success.is_(False)).label("failed"),
+                func.count().filter(MediaActivityModel.success.is_(None)).label("pending"),
+                func.avg(processing_time).label("avg_processing_time"),
+                func.count(func.distinct(func.nullif(MediaActivityModel.user_id, ""))).label("unique_users"),
+                func.count(func.distinct(func.nullif(MediaActivityModel.media_id, ""))).label("unique_media_items"),
+                func.min(MediaActivityModel.created_at).label("earliest_activity"),
+                func.max(MediaActivityModel.created_at).label("latest_activity")
+            )
+            type_query = select(
+                MediaActivityModel.activity_type,
+                func.count().label("total"),
+                func.count().filter(MediaActivityModel.success.is_(True)).label("successful"),
+                func.count().filter(MediaActivityModel.success.is_(False)).label("failed")
+            ).group_by(MediaActivityModel.activity_type)
             if filters:
-                query = query.where(and_(*filters))
+                totals_query = totals_query.where(and_(*filters))
+                type_query = type_query.where(and_(*filters))
             
-            result = await db_session.execute(query)
-            activities = result.scalars().all()
+            totals = (await db_session.execute(totals_query)).one()
+            type_rows = (await db_session.execute(type_query)).all()
             
-            # Calculate basic statistics manually
-            total_count = len(activities)
-            successful_count = sum(1 for a in activities if a.success is True)
-            failed_count = sum(1 for a in activities if a.success is False)
-            pending_count = sum(1 for a in activities if a.success is None)
+            total_count = totals.total
+            successful_count = totals.successful
+            failed_count = totals.failed
+            pending_count = totals.pending
+            avg_processing_time = float(totals.avg_processing_time) if totals.avg_processing_time is not None else None
+            unique_users = totals.unique_users
+            unique_media_items = totals.unique_media_items
+            earliest_activity = totals.earliest_activity
+            latest_activity = totals.latest_activity
             
-            # Performance stats
-            processing_times = [a.processing_duration_ms for a in activities if a.processing_duration_ms]
-            avg_processing_time = sum(processing_times) / len(processing_times) if processing_times else None
-            
-            # Scope stats
-            unique_users = len(set(a.user_id for a in activities if a.user_id))
-            unique_media_items = len(set(a.media_id for a in activities if a.media_id))
-            
-            # Date range
-            created_times = [a.created_at for a in activities if a.created_at]
-            earliest_activity = min(created_times) if created_times else None
-            latest_activity = max(created_times) if created_times else None
-            
-            # Activity type breakdown
-            type_breakdown = {}
-            for activity in activities:
-                activity_type = activity.activity_type
-                if activity_type not in type_breakdown:
-                    type_breakdown[activity_type] = {
-                        "total": 0,
-                        "successful": 0,
-                        "failed": 0
-                    }
-                
-                type_breakdown[activity_type]["total"] += 1
-                if activity.success is True:
-                    type_breakdown[activity_type]["successful"] += 1
-                elif activity.success is False:
-                    type_breakdown[activity_type]["failed"] += 1
-            
-            # Convert to list format
             activity_type_breakdown = [
                 {
-                    "activity_type": activity_type,
-                    "total": stats["total"],
-                    "successful": stats["successful"],
-                    "failed": stats["failed"],
-                    "success_rate": round(stats["successful"] / stats["total"] * 100, 2) if stats["total"] > 0 else 0
+                    "activity_type": row.activity_type,
+                    "total": row.total,
+                    "successful": row.successful,
+                    "failed": row.failed,
+                    "success_rate": round(row.successful / row.total * 100, 2) if row.total > 0 else 0
                 }
-                for activity_type, stats in type_breakdown.items()
+                for row in type_rows
             ]
             
             return {
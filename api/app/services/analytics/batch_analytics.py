@@ -1,7 +1,7 @@
 """
-Batch Analytics Service - Fixed Version
+Batch Analytics Service
 
-Provides analytics for batch operations using modern SQLAlchemy patterns.
+Provides analytics for batch operations computed with SQL aggregates.
 """
 
 from typing import Dict, List, Optional, Any
@@ -10,11 +10,17 @@ from sqlalchemy import select, func, and_, desc
 from datetime import datetime, timedelta
 
 from app.models.media_activity import MediaActivityModel
-from app.models.badge_application import BadgeApplicationModel
-from app.models.poster_replacement import PosterReplacementModel
 from app.models.activity_performance_metric import ActivityPerformanceMetricModel
 
 
+def _number(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def _rounded(value: Any) -> Optional[float]:
+    return round(float(value), 2) if value is not None else None
+
+
 class BatchAnalyticsService:
     """Service for analyzing batch operations and activity relationships"""
     
@@ -29,58 +35,74 @@ class BatchAnalyticsService:
         Returns success/failure counts, timing, performance metrics.
         """
         try:
-            # Get all activities for this batch
-            query = select(MediaActivityModel).where(
-                MediaActivityModel.batch_job_id == batch_job_id
-            ).order_by(MediaActivityModel.created_at)
+            in_batch = MediaActivityModel.batch_job_id == batch_job_id
             
-            result = await db_session.execute(query)
-            activities = result.scalars().all()
+            totals = (await db_session.execute(
+                select(
+                    func.count().label("total"),
+                    func.count().filter(MediaActivityModel.success.is_(True)).label("successful"),
+                    func.count().filter(MediaActivityModel.success.is_(False)).label("failed"),
+                    func.count().filter(MediaActivityModel.success.is_(None)).label("pending"),
+                    func.min(MediaActivityModel.created_at).label("start_time"),
+                    func.max(MediaActivityModel.completed_at).label("end_time"),
+                    func.avg(func.nullif(MediaActivityModel.processing_duration_ms, 0)).label("avg_processing_time")
+                ).where(in_batch)
+            )).one()
             
-            if not activities:
+            if not totals.total:
                 return {
                     "batch_job_id": batch_job_id,
                     "found": False,
                     "error": "No activities found for this batch job ID"
                 }
             
-            # Calculate basic statistics
-            total_activities = len(activities)
-            successful = sum(1 for a in activities if a.success is True)
-            failed = sum(1 for a in activities if a.success is False)
-            pending = sum(1 for a in activities if a.success is None)
-            
-            # Calculate timing
-            start_time = min(a.created_at for a in activities if a.created_at)
-            end_time = max(a.completed_at for a in activities if a.completed_at)
+            total_activities = totals.total
+            successful = totals.successful
+            failed = totals.failed
+            pending = totals.pending
+            start_time = totals.start_time
+            end_time = totals.end_time
+            avg_processing_time = float(totals.avg_processing_time) if totals.avg_processing_time is not None else None
             
             total_duration = None
             if start_time and end_time:
                 total_duration = int((end_time - start_time).total_seconds() * 1000)
             
-            # Calculate average processing time
-            processing_times = [a.processing_duration_ms for a in activities if a.processing_duration_ms]
-            avg_processing_time = sum(processing_times) / len(processing_times) if processing_times else None
-            
             # Activity type breakdown
-            activity_types = {}
-            for activity in activities:
-                activity_type = activity.activity_type
-                if activity_type not in activity_types:
-                    activity_types[activity_type] = {"total": 0, "successful": 0, "failed": 0}
-                
-                activity_types[activity_type]["total"] += 1
-                if activity.success is True:
-                    activity_types[activity_type]["successful"] += 1
-                elif activity.success is False:
-                    activity_types[activity_type]["failed"] += 1
+            type_rows = (await db_session.execute(
+                select(
+                    MediaActivityModel.activity_type,
+                    func.count().label("total"),
+                    func.count().filter(MediaActivityModel.success.is_(True)).label("successful"),
+                    func.count().filter(MediaActivityModel.success.is_(False)).label("failed")
+                ).where(in_batch).group_by(MediaActivityModel.activity_type)
+            )).all()
+            activity_types = {
+                row.activity_type: {"total": row.total, "successful": row.successful, "failed": row.failed}
+                for row in type_rows
+            }
             
-            # Get error summary
-            error_summary = {}
-            for activity in activities:
-                if activity.error_message:
-                    error_msg = activity.error_message[:100]  # Truncate long errors
-                    error_summary[error_msg] = error_summary.get(error_msg, 0) + 1
+            # Error summary, grouped on the first 100 characters of each error
+            error_prefix = func.substr(MediaActivityModel.error_message, 1, 100)
+            error_rows = (await db_session.execute(
+                select(error_prefix.label("error"), func.count().label("count"))
+                .where(in_batch, func.coalesce(MediaActivityModel.error_message, "") != "")
+                .group_by(error_prefix)
+            )).all()
+            error_summary = {row.error: row.count for row in error_rows}
+            
+            activities = (await db_session.execute(
+                select(
+                    MediaActivityModel.id,
+                    MediaActivityModel.media_id,
+                    MediaActivityModel.activity_type,
+                    MediaActivityModel.status,
+                    MediaActivityModel.success,
+                    MediaActivityModel.created_at,
+                    MediaActivityModel.processing_duration_ms,
+                    MediaActivityModel.error_message
+                ).where(in_batch).order_by(MediaActivityModel.created_at)
+            )).all()
             
             return {
                 "batch_job_id": batch_job_id,
@@ -132,82 +154,82 @@ class BatchAnalyticsService:
         Includes resource usage, bottlenecks, and performance trends.
         """
         try:
-            # Get performance metrics for all activities in the batch
-            query = select(
-                MediaActivityModel.activity_type,
-                ActivityPerformanceMetricModel.cpu_usage_percent,
-                ActivityPerformanceMetricModel.memory_usage_mb,
-                ActivityPerformanceMetricModel.disk_io_read_mb,
-                ActivityPerformanceMetricModel.disk_io_write_mb,
-                ActivityPerformanceMetricModel.throughput_items_per_second,
-                ActivityPerformanceMetricModel.bottleneck_stage,
-                ActivityPerformanceMetricModel.server_load_average
-            ).select_from(
-                MediaActivityModel.__table__.join(
-                    ActivityPerformanceMetricModel.__table__,
-                    MediaActivityModel.id == ActivityPerformanceMetricModel.activity_id
-                )
-            ).where(
-                MediaActivityModel.batch_job_id == batch_job_id
+            # Aggregate the performance metrics of all activities in the batch;
+            # zero readings count as missing, as they did when averaged in Python
+            metric = ActivityPerformanceMetricModel
+            cpu = func.nullif(metric.cpu_usage_percent, 0)
+            memory = func.nullif(metric.memory_usage_mb, 0)
+            disk_read = func.nullif(metric.disk_io_read_mb, 0)
+            disk_write = func.nullif(metric.disk_io_write_mb, 0)
+            throughput = func.nullif(metric.throughput_items_per_second, 0)
+            load = func.nullif(metric.server_load_average, 0)
+            
+            batch_metrics = MediaActivityModel.__table__.join(
+                metric.__table__,
+                MediaActivityModel.id == metric.activity_id
             )
+            in_batch = MediaActivityModel.batch_job_id == batch_job_id
             
-            result = await db_session.execute(query)
-            metrics = result.fetchall()
+            stats = (await db_session.execute(
+                select(
+                    func.count().label("metrics_count"),
+                    func.avg(cpu).label("cpu_avg"), func.max(cpu).label("cpu_max"), func.min(cpu).label("cpu_min"),
+                    func.avg(memory).label("memory_avg"), func.max(memory).label("memory_max"), func.min(memory).label("memory_min"),
+                    func.sum(disk_read).label("read_sum"), func.avg(disk_read).label("read_avg"),
+                    func.sum(disk_write).label("write_sum"), func.avg(disk_write).label("write_avg"),
+                    func.avg(throughput).label("throughput_avg"), func.max(throughput).label("throughput_max"),
+                    func.avg(load).label("load_avg"), func.max(load).label("load_max")
+                ).select_from(batch_metrics).where(in_batch)
+            )).one()
             
-            if not metrics:
+            if not stats.metrics_count:
                 return {
                     "batch_job_id": batch_job_id,
                     "found": False,
                     "message": "No performance metrics found for this batch"
                 }
             
-            # Calculate aggregated performance metrics
-            cpu_values = [float(m.cpu_usage_percent) for m in metrics if m.cpu_usage_percent]
-            memory_values = [float(m.memory_usage_mb) for m in metrics if m.memory_usage_mb]
-            disk_read_values = [float(m.disk_io_read_mb) for m in metrics if m.disk_io_read_mb]
-            disk_write_values = [float(m.disk_io_write_mb) for m in metrics if m.disk_io_write_mb]
-            throughput_values = [float(m.throughput_items_per_second) for m in metrics if m.throughput_items_per_second]
-            load_values = [float(m.server_load_average) for m in metrics if m.server_load_average]
-            
-            # Bottleneck analysis
-            bottlenecks = {}
-            for metric in metrics:
-                if metric.bottleneck_stage:
-                    bottlenecks[metric.bottleneck_stage] = bottlenecks.get(metric.bottleneck_stage, 0) + 1
+            bottleneck_rows = (await db_session.execute(
+                select(metric.bottleneck_stage, func.count().label("frequency"))
+                .select_from(batch_metrics)
+                .where(in_batch, func.coalesce(metric.bottleneck_stage, "") != "")
+                .group_by(metric.bottleneck_stage)
+                .order_by(desc("frequency"))
+            )).all()
             
             performance_summary = {
                 "batch_job_id": batch_job_id,
                 "found": True,
-                "metrics_count": len(metrics),
+                "metrics_count": stats.metrics_count,
                 "resource_usage": {
                     "cpu": {
-                        "average": round(sum(cpu_values) / len(cpu_values), 2) if cpu_values else None,
-                        "peak": max(cpu_values) if cpu_values else None,
-                        "minimum": min(cpu_values) if cpu_values else None
+                        "average": _rounded(stats.cpu_avg),
+                        "peak": _number(stats.cpu_max),
+                        "minimum": _number(stats.cpu_min)
                     },
                     "memory": {
-                        "average_mb": round(sum(memory_values) / len(memory_values), 2) if memory_values else None,
-                        "peak_mb": max(memory_values) if memory_values else None,
-                        "minimum_mb": min(memory_values) if memory_values else None
+                        "average_mb": _rounded(stats.memory_avg),
+                        "peak_mb": _number(stats.memory_max),
+                        "minimum_mb": _number(stats.memory_min)
                     },
                     "disk_io": {
-                        "total_read_mb": round(sum(disk_read_values), 2) if disk_read_values else None,
-                        "total_write_mb": round(sum(disk_write_values), 2) if disk_write_values else None,
-                        "average_read_mb": round(sum(disk_read_values) / len(disk_read_values), 2) if disk_read_values else None,
-                        "average_write_mb": round(sum(disk_write_values) / len(disk_write_values), 2) if disk_write_values else None
+                        "total_read_mb": _rounded(stats.read_sum),
+                        "total_write_mb": _rounded(stats.write_sum),
+                        "average_read_mb": _rounded(stats.read_avg),
+                        "average_write_mb": _rounded(stats.write_avg)
                     },
                     "throughput": {
-                        "average_items_per_second": round(sum(throughput_values) / len(throughput_values), 2) if throughput_values else None,
-                        "peak_items_per_second": max(throughput_values) if throughput_values else None
+                        "average_items_per_second": _rounded(stats.throughput_avg),
+                        "peak_items_per_second": _number(stats.throughput_max)
                     },
                     "system_load": {
-                        "average": round(sum(load_values) / len(load_values), 2) if load_values else None,
-                        "peak": max(load_values) if load_values else None
+                        "average": _rounded(stats.load_avg),
+                        "peak": _number(stats.load_max)
                     }
                 },
                 "bottleneck_analysis": [
-                    {"stage": stage, "frequency": count}
-                    for stage, count in sorted(bottlenecks.items(), key=lambda x: x[1], reverse=True)
+                    {"stage": row.bottleneck_stage, "frequency": row.frequency}
+                    for row in bottleneck_rows
                 ]
             }
             
@@ -227,79 +249,55 @@ class BatchAnalyticsService:
         limit: int = 20
     ) -> List[Dict[str, Any]]:
         """
-        Get summary of recent batch operations.
-        
-        Using modern SQLAlchemy filter approach instead of func.case
+        Get summary of recent batch operations, most recently started first.
         """
         try:
             # Calculate date range
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(days=days)
             
-            # Use subqueries for counting with filters - more reliable approach
-            base_query = select(MediaActivityModel).where(
+            # One grouped query over the batches that had activity in the period
+            recent_batch_ids = select(MediaActivityModel.batch_job_id).where(
                 and_(
                     MediaActivityModel.batch_job_id.isnot(None),
                     MediaActivityModel.created_at >= start_date
                 )
-            )
+            ).distinct()
             
-            # Get the distinct batch job IDs first
-            batch_ids_query = select(MediaActivityModel.batch_job_id.distinct()).where(
-                and_(
-                    MediaActivityModel.batch_job_id.isnot(None),
-                    MediaActivityModel.created_at >= start_date
-                )
-            ).order_by(desc(MediaActivityModel.batch_job_id)).limit(limit)
-            
-            batch_ids_result = await db_session.execute(batch_ids_query)
-            batch_ids = [row[0] for row in batch_ids_result.fetchall()]
+            start_time = func.min(MediaActivityModel.created_at)
+            query = select(
+                MediaActivityModel.batch_job_id,
+                func.count().label("total"),
+                func.count().filter(MediaActivityModel.success.is_(True)).label("successful"),
+                func.count().filter(MediaActivityModel.success.is_(False)).label("failed"),
+                start_time.label("start_time"),
+                func.max(MediaActivityModel.completed_at).label("end_time"),
+                func.avg(func.nullif(MediaActivityModel.processing_duration_ms, 0)).label("avg_processing_time")
+            ).where(
+                MediaActivityModel.batch_job_id.in_(recent_batch_ids)
+            ).group_by(
+                MediaActivityModel.batch_job_id
+            ).order_by(desc(start_time)).limit(limit)
             
             batches = []
-            
-            # For each batch, calculate stats separately to avoid SQLAlchemy issues
-            for batch_id in batch_ids:
-                batch_activities_query = select(MediaActivityModel).where(
-                    MediaActivityModel.batch_job_id == batch_id
-                )
-                
-                result = await db_session.execute(batch_activities_query)
-                activities = result.scalars().all()
-                
-                if not activities:
-                    continue
-                
-                # Calculate stats manually - more reliable
-                total = len(activities)
-                successful = sum(1 for a in activities if a.success is True)
-                failed = sum(1 for a in activities if a.success is False)
-                
-                start_time = min(a.created_at for a in activities if a.created_at)
-                end_time = max(a.completed_at for a in activities if a.completed_at)
-                
+            for row in (await db_session.execute(query)).all():
                 batch_duration = None
-                if start_time and end_time:
-                    batch_duration = int((end_time - start_time).total_seconds() * 1000)
-                
-                processing_times = [a.processing_duration_ms for a in activities if a.processing_duration_ms]
-                avg_processing_time = sum(processing_times) / len(processing_times) if processing_times else None
+                if row.start_time and row.end_time:
+                    batch_duration = int((row.end_time - row.start_time).total_seconds() * 1000)
                 
                 batches.append({
-                    "batch_job_id": batch_id,
-                    "total_activities": total,
-                    "successful": successful,
-                    "failed": failed,
-                    "pending": total - successful - failed,
-                    "success_rate": round(successful / total * 100, 2) if total > 0 else 0,
-                    "start_time": start_time.isoformat() if start_time else None,
-                    "end_time": end_time.isoformat() if end_time else None,
+                    "batch_job_id": row.batch_job_id,
+                    "total_activities": row.total,
+                    "successful": row.successful,
+                    "failed": row.failed,
+                    "pending": row.total - row.successful - row.failed,
+                    "success_rate": round(row.successful / row.total * 100, 2) if row.total > 0 else 0,
+                    "start_time": row.start_time.isoformat() if row.start_time else None,
+                    "end_time": row.end_time.isoformat() if row.end_time else None,
                     "batch_duration_ms": batch_duration,
-                    "average_processing_time_ms": round(avg_processing_time) if avg_processing_time else None
+                    "average_processing_time_ms": round(row.avg_processing_time) if row.avg_processing_time else None
                 })
             
-            # Sort by start time descending
-            batches.sort(key=lambda x: x["start_time"] or "", reverse=True)
-            
             return batches
             
         except Exception as e:
@@ -1,17 +1,21 @@
 """
-User Analytics Service - Fixed Version
+User Analytics Service
 
-Provides analytics for user-specific activity tracking using safe manual calculations.
+Provides analytics for user-specific activity tracking computed with SQL aggregates.
 """
 
 from typing import Dict, List, Optional, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc
+from sqlalchemy import select, and_, desc, func, Date, cast
 from datetime import datetime, timedelta
 
 from app.models.media_activity import MediaActivityModel
 
 
+# UTC calendar day an activity was created on
+_utc_day = cast(func.timezone("UTC", MediaActivityModel.created_at), Date)
+
+
 class UserAnalyticsService:
     """Service for analyzing user-specific activity patterns"""
     
@@ -29,62 +33,51 @@ class UserAnalyticsService:
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(days=days)
             
-            # Get all user activities in the time range
-            query = select(MediaActivityModel).where(
-                and_(
-                    MediaActivityModel.user_id == user_id,
-                    MediaActivityModel.created_at >= start_date
-                )
-            ).order_by(desc(MediaActivityModel.created_at))
+            in_period = and_(
+                MediaActivityModel.user_id == user_id,
+                MediaActivityModel.created_at >= start_date
+            )
             
-            result = await db_session.execute(query)
-            activities = result.scalars().all()
+            # Activity type breakdown; overall totals are summed from it
+            type_rows = (await db_session.execute(
+                select(
+                    MediaActivityModel.activity_type,
+                    func.count().label("total"),
+                    func.count().filter(MediaActivityModel.success.is_(True)).label("successful"),
+                    func.count().filter(MediaActivityModel.success.is_(False)).label("failed"),
+                    func.avg(func.nullif(MediaActivityModel.processing_duration_ms, 0)).label("avg_processing_time")
+                ).where(in_period).group_by(MediaActivityModel.activity_type)
+            )).all()
             
-            if not activities:
+            if not type_rows:
                 return {
                     "user_id": user_id,
                     "found": False,
                     "message": f"No activities found for user in the last {days} days"
                 }
             
-            # Calculate basic statistics
-            total_activities = len(activities)
-            successful = sum(1 for a in activities if a.success is True)
-            failed = sum(1 for a in activities if a.success is False)
-            pending = sum(1 for a in activities if a.success is None)
-            
-            # Activity type breakdown
-            activity_types = {}
-            for activity in activities:
-                activity_type = activity.activity_type
-                if activity_type not in activity_types:
-                    activity_types[activity_type] = {
-                        "total": 0, 
-                        "successful": 0, 
-                        "failed": 0,
-                        "avg_processing_time_ms": None
-                    }
-                
-                activity_types[activity_type]["total"] += 1
-                if activity.success is True:
-                    activity_types[activity_type]["successful"] += 1
-                elif activity.success is False:
-                    activity_types[activity_type]["failed"] += 1
+            total_activities = sum(row.total for row in type_rows)
+            successful = sum(row.successful for row in type_rows)
+            failed = sum(row.failed for row in type_rows)
+            pending = total_activities - successful - failed
             
-            # Calculate average processing times per activity type
-            for activity_type in activity_types:
-                type_activities = [a for a in activities if a.activity_type == activity_type]
-                processing_times = [a.processing_duration_ms for a in type_activities if a.processing_duration_ms]
-                if processing_times:
-                    activity_types[activity_type]["avg_processing_time_ms"] = round(
-                        sum(processing_times) / len(processing_times)
-                    )
+            activity_types = {
+                row.activity_type: {
+                    "total": row.total,
+                    "successful": row.successful,
+                    "failed": row.failed,
+                    "avg_processing_time_ms": round(row.avg_processing_time) if row.avg_processing_time else None
+                }
+                for row in type_rows
+            }
             
             # Initiated by breakdown
-            initiated_by_stats = {}
-            for activity in activities:
-                initiated_by = activity.initiated_by or "unknown"
-                initiated_by_stats[initiated_by] = initiated_by_stats.get(initiated_by, 0) + 1
+            initiated_by = func.coalesce(func.nullif(MediaActivityModel.initiated_by, ""), "unknown")
+            initiated_rows = (await db_session.execute(
+                select(initiated_by.label("initiated_by"), func.count().label("count"))
+                .where(in_period).group_by(initiated_by)
+            )).all()
+            initiated_by_stats = {row.initiated_by: row.count for row in initiated_rows}
             
             # Daily activity pattern (last 7 days)
             daily_pattern = {}
@@ -97,25 +90,36 @@ class UserAnalyticsService:
                     "failed": 0
                 }
             
-            for activity in activities:
-                if activity.created_at:
-                    day_str = activity.created_at.strftime('%Y-%m-%d')
-                    if day_str in daily_pattern:
-                        daily_pattern[day_str]["total"] += 1
-                        if activity.success is True:
-                            daily_pattern[day_str]["successful"] += 1
-                        elif activity.success is False:
-                            daily_pattern[day_str]["failed"] += 1
+            day_rows = (await db_session.execute(
+                select(
+                    _utc_day.label("day"),
+                    func.count().label("total"),
+                    func.count().filter(MediaActivityModel.success.is_(True)).label("successful"),
+                    func.count().filter(MediaActivityModel.success.is_(False)).label("failed")
+                ).where(in_period, MediaActivityModel.created_at >= end_date - timedelta(days=7)).group_by(_utc_day)
+            )).all()
+            for row in day_rows:
+                day_str = row.day.isoformat()
+                if day_str in daily_pattern:
+                    daily_pattern[day_str] = {"total": row.total, "successful": row.successful, "failed": row.failed}
             
-            # Most common errors
-            error_summary = {}
-            for activity in activities:
-                if activity.error_message:
-                    error_msg = activity.error_message[:100]  # Truncate long errors
-                    error_summary[error_msg] = error_summary.get(error_msg, 0) + 1
+            # Most common errors (max 5), grouped on the first 100 characters
+            error_prefix = func.substr(MediaActivityModel.error_message, 1, 100)
+            error_count = func.count()
+            top_errors = (await db_session.execute(
+                select(error_prefix, error_count)
+                .where(in_period, func.coalesce(MediaActivityModel.error_message, "") != "")
+                .group_by(error_prefix)
+                .order_by(desc(error_count))
+                .limit(5)
+            )).all()
             
-            # Top errors (max 5)
-            top_errors = sorted(error_summary.items(), key=lambda x: x[1], reverse=True)[:5]
+            activities = (await db_session.execute(
+                select(MediaActivityModel)
+                .where(in_period)
+                .order_by(desc(MediaActivityModel.created_at))
+                .limit(10)
+            )).scalars().all()
             
             return {
                 "user_id": user_id,
@@ -150,7 +154,7 @@ class UserAnalyticsService:
                         "success": activity.success,
                         "created_at": activity.created_at.isoformat() if activity.created_at else None,
                         "processing_duration_ms": activity.processing_duration_ms
-                    } for activity in activities[:10]  # Last 10 activities
+                    } for activity in activities  # Last 10 activities
                 ]
             }
             
@@ -169,70 +173,38 @@ class UserAnalyticsService:
     ) -> List[Dict[str, Any]]:
         """
         Get the most active users in the specified time period.
-        Using manual calculation to avoid SQLAlchemy issues.
         """
         try:
             # Calculate date range
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(days=days)
             
-            # Get all activities in the time range with user_id
-            query = select(MediaActivityModel).where(
+            total = func.count()
+            query = select(
+                MediaActivityModel.user_id,
+                total.label("total"),
+                func.count().filter(MediaActivityModel.success.is_(True)).label("successful"),
+                func.count().filter(MediaActivityModel.success.is_(False)).label("failed"),
+                func.avg(func.nullif(MediaActivityModel.processing_duration_ms, 0)).label("avg_processing_time")
+            ).where(
                 and_(
                     MediaActivityModel.user_id.isnot(None),
                     MediaActivityModel.created_at >= start_date
                 )
-            )
-            
-            result = await db_session.execute(query)
-            activities = result.scalars().all()
-            
-            # Group by user_id and calculate stats manually
-            user_stats = {}
-            for activity in activities:
-                user_id = activity.user_id
-                if user_id not in user_stats:
-                    user_stats[user_id] = {
-                        "total": 0,
-                        "successful": 0,
-                        "failed": 0,
-                        "processing_times": []
-                    }
-                
-                user_stats[user_id]["total"] += 1
-                if activity.success is True:
-                    user_stats[user_id]["successful"] += 1
-                elif activity.success is False:
-                    user_stats[user_id]["failed"] += 1
-                
-                if activity.processing_duration_ms:
-                    user_stats[user_id]["processing_times"].append(activity.processing_duration_ms)
+            ).group_by(MediaActivityModel.user_id).order_by(desc(total)).limit(limit)
             
-            # Convert to final format
-            users = []
-            for user_id, stats in user_stats.items():
-                total = stats["total"]
-                successful = stats["successful"]
-                failed = stats["failed"]
-                processing_times = stats["processing_times"]
-                
-                avg_processing_time = None
-                if processing_times:
-                    avg_processing_time = round(sum(processing_times) / len(processing_times))
-                
-                users.append({
-                    "user_id": user_id,
-                    "total_activities": total,
-                    "successful": successful,
-                    "failed": failed,
-                    "pending": total - successful - failed,
-                    "success_rate": round(successful / total * 100, 2) if total > 0 else 0,
-                    "average_processing_time_ms": avg_processing_time
-                })
-            
-            # Sort by total activities descending and limit
-            users.sort(key=lambda x: x["total_activities"], reverse=True)
-            return users[:limit]
+            return [
+                {
+                    "user_id": row.user_id,
+                    "total_activities": row.total,
+                    "successful": row.successful,
+                    "failed": row.failed,
+                    "pending": row.total - row.successful - row.failed,
+                    "success_rate": round(row.successful / row.total * 100, 2) if row.total > 0 else 0,
+                    "average_processing_time_ms": round(row.avg_processing_time) if row.avg_processing_time else None
+                }
+                for row in (await db_session.execute(query)).all()
+            ]
             
         except Exception as e:
             raise Exception(f"Failed to retrieve top users: {str(e)}")
@@ -251,17 +223,6 @@ class UserAnalyticsService:
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(days=days)
             
-            # Get user activities
-            query = select(MediaActivityModel).where(
-                and_(
-                    MediaActivityModel.user_id == user_id,
-                    MediaActivityModel.created_at >= start_date
-                )
-            ).order_by(MediaActivityModel.created_at)
-            
-            result = await db_session.execute(query)
-            activities = result.scalars().all()
-            
             # Create daily timeline
             timeline = {}
             for i in range(days + 1):
@@ -277,38 +238,42 @@ class UserAnalyticsService:
                     "avg_processing_time_ms": None
                 }
             
-            # Populate timeline with activity data
-            daily_processing_times = {}
-            for activity in activities:
-                if activity.created_at:
-                    day_str = activity.created_at.strftime('%Y-%m-%d')
-                    if day_str in timeline:
-                        timeline[day_str]["total"] += 1
-                        
-                        if activity.success is True:
-                            timeline[day_str]["successful"] += 1
-                        elif activity.success is False:
-                            timeline[day_str]["failed"] += 1
-                        else:
-                            timeline[day_str]["pending"] += 1
-                        
-                        # Track activity types
-                        activity_type = activity.activity_type
-                        if activity_type not in timeline[day_str]["activity_types"]:
-                            timeline[day_str]["activity_types"][activity_type] = 0
-                        timeline[day_str]["activity_types"][activity_type] += 1
-                        
-                        # Track processing times for average calculation
-                        if activity.processing_duration_ms:
-                            if day_str not in daily_processing_times:
-                                daily_processing_times[day_str] = []
-                            daily_processing_times[day_str].append(activity.processing_duration_ms)
+            in_period = and_(
+                MediaActivityModel.user_id == user_id,
+                MediaActivityModel.created_at >= start_date
+            )
+            
+            # Daily totals and average processing time
+            day_rows = (await db_session.execute(
+                select(
+                    _utc_day.label("day"),
+                    func.count().label("total"),
+                    func.count().filter(MediaActivityModel.success.is_(True)).label("successful"),
+                    func.count().filter(MediaActivityModel.success.is_(False)).label("failed"),
+                    func.avg(func.nullif(MediaActivityModel.processing_duration_ms, 0)).label("avg_processing_time")
+                ).where(in_period).group_by(_utc_day)
+            )).all()
+            for row in day_rows:
+                day_str = row.day.isoformat()
+                if day_str in timeline:
+                    timeline[day_str].update(
+                        total=row.total,
+                        successful=row.successful,
+                        failed=row.failed,
+                        pending=row.total - row.successful - row.failed,
+                        avg_processing_time_ms=round(row.avg_processing_time) if row.avg_processing_time else None
+                    )
             
-            # Calculate average processing times
-            for day_str in timeline:
-                if day_str in daily_processing_times:
-                    times = daily_processing_times[day_str]
-                    timeline[day_str]["avg_processing_time_ms"] = round(sum(times) / len(times))
+            # Activity types per day
+            type_rows = (await db_session.execute(
+                select(_utc_day.label("day"), MediaActivityModel.activity_type, func.count().label("count"))
+                .where(in_period)
+                .group_by(_utc_day, MediaActivityModel.activity_type)
+            )).all()
+            for row in type_rows:
+                day_str = row.day.isoformat()
+                if day_str in timeline:
+                    timeline[day_str]["activity_types"][row.activity_type] = row.count
             
             # Convert to list and sort by date
             timeline_list = list(timeline.values())
@@ -5,6 +5,7 @@ Handles creating audio badges using enhanced or legacy methods.
 
 from typing import Dict, Any, Optional
 from pathlib import Path
+from PIL import Image
 from aphrodite_logging import get_logger
 
 from .audio_enhanced_components import EnhancedAudioComponents
@@ -20,41 +21,59 @@ class AudioBadgeCreator:
         self.components = components
         self.legacy_handler = legacy_handler
     
-    async def create_badge(
-        self,
-        poster_path: str,
-        audio_data,
-        settings: Dict[str, Any],
-        output_path: Optional[str] = None
-    ) -> Optional[str]:
-        """Create audio badge using enhanced or legacy methods"""
+    def build_badge(self, audio_data, settings: Dict[str, Any]) -> Optional[Image.Image]:
+        """Create the audio badge image using enhanced or legacy methods"""
         try:
             # Determine if we have AudioInfo (enhanced) or string (legacy)
             from .audio_types import AudioInfo
             
             if self.components.enabled and isinstance(audio_data, AudioInfo):
-                return await self._create_enhanced_badge(poster_path, audio_data, settings, output_path)
+                return self._build_enhanced_badge(audio_data, settings)
             else:
-                return await self._create_legacy_badge(poster_path, str(audio_data), settings, output_path)
-                
+                return self._build_legacy_badge(str(audio_data), settings)
+        
         except Exception as e:
             self.logger.error(f"❌ [AUDIO BADGE] Badge creation error: {e}", exc_info=True)
             return None
     
-    async def _create_enhanced_badge(
+    async def create_badge(
         self,
         poster_path: str,
-        audio_info,
+        audio_data,
         settings: Dict[str, Any],
         output_path: Optional[str] = None
     ) -> Optional[str]:
-        """Create audio badge using enhanced image manager"""
+        """Create audio badge and apply it to a poster file"""
         try:
-            self.logger.debug(f"🎨 [AUDIO BADGE] Creating enhanced badge for: {audio_info}")
+            badge = self.build_badge(audio_data, settings)
+            if not badge:
+                self.logger.error(f"❌ [AUDIO BADGE] Badge creation failed")
+                return None
             
             # Determine output path
             final_output_path = self._get_output_path(poster_path, output_path)
             
+            # Apply badge to poster
+            success = self.renderer.apply_badge_to_poster(
+                poster_path, badge, settings, final_output_path
+            )
+            
+            if success:
+                self.logger.debug(f"✅ [AUDIO BADGE] Badge applied: {final_output_path}")
+                return final_output_path
+            else:
+                self.logger.error(f"❌ [AUDIO BADGE] Badge application failed")
+                return None
+        
+        except Exception as e:
+            self.logger.error(f"❌ [AUDIO BADGE] Badge creation error: {e}", exc_info=True)
+            return None
+    
+    def _build_enhanced_badge(self, audio_info, settings: Dict[str, Any]) -> Optional[Image.Image]:
+        """Create audio badge using enhanced image manager"""
+        try:
+            self.logger.debug(f"🎨 [AUDIO BADGE] Creating enhanced badge for: {audio_info}")
+            
             # Create badge using enhanced image manager
             image_badges_enabled = settings.get('ImageBadges', {}).get('enable_image_badges', False)
             
@@ -87,38 +106,17 @@ class AudioBadgeCreator:
             
             if not badge:
                 self.logger.error(f"❌ [AUDIO BADGE] Enhanced badge creation failed")
-                return None
-            
-            # Apply badge to poster
-            success = self.renderer.apply_badge_to_poster(
-                poster_path, badge, settings, final_output_path
-            )
-            
-            if success:
-                self.logger.debug(f"✅ [AUDIO BADGE] Enhanced badge applied: {final_output_path}")
-                return final_output_path
-            else:
-                self.logger.error(f"❌ [AUDIO BADGE] Enhanced badge application failed")
-                return None
-                
+            return badge
+        
         except Exception as e:
             self.logger.error(f"❌ [AUDIO BADGE] Enhanced badge creation error: {e}", exc_info=True)
             return None
     
-    async def _create_legacy_badge(
-        self,
-        poster_path: str,
-        codec_data: str,
-        settings: Dict[str, Any],
-        output_path: Optional[str] = None
-    ) -> Optional[str]:
+    def _build_legacy_badge(self, codec_data: str, settings: Dict[str, Any]) -> Optional[Image.Image]:
         """Create audio badge using legacy V2 renderer"""
         try:
             self.logger.debug(f"🎨 [AUDIO BADGE] Creating legacy badge for: {codec_data}")
             
-            # Determine output path
-            final_output_path = self._get_output_path(poster_path, output_path)
-            
             # Create badge using V2 renderer
             image_badges_enabled = settings.get('ImageBadges', {}).get('enable_image_badges', False)
             
@@ -142,20 +140,8 @@ class AudioBadgeCreator:
             
             if not badge:
                 self.logger.error(f"❌ [AUDIO BADGE] Legacy badge creation failed")
-                return None
-            
-            # Apply badge to poster
-            success = self.renderer.apply_badge_to_poster(
-                poster_path, badge, settings, final_output_path
-            )
-            
-            if success:
-                self.logger.debug(f"✅ [AUDIO BADGE] Legacy badge applied: {final_output_path}")
-                return final_output_path
-            else:
-                self.logger.error(f"❌ [AUDIO BADGE] Legacy badge application failed")
-                return None
-                
+            return badge
+        
         except Exception as e:
             self.logger.error(f"❌ [AUDIO BADGE] Legacy badge creation error: {e}", exc_info=True)
             return None
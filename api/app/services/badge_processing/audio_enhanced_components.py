@@ -12,7 +12,7 @@ try:
     from .audio_detector import EnhancedAudioDetector
     from .audio_image_manager import AudioImageManager
     from .audio_parallel_processor import ParallelAudioProcessor
-    from .audio_cache import AudioCache
+    from .series_profile_cache import get_series_profile_cache
     
     ENHANCED_COMPONENTS_AVAILABLE = True
 except ImportError as e:
@@ -35,7 +35,7 @@ class EnhancedAudioComponents:
                 self.detector = EnhancedAudioDetector()
                 self.image_manager = AudioImageManager()
                 self.parallel_processor = ParallelAudioProcessor(self.detector)
-                self.cache = AudioCache()
+                self.cache = get_series_profile_cache()
                 
                 self.logger.info("🚀 [ENHANCED AUDIO] Components initialized successfully")
                 self.enabled = True
@@ -47,7 +47,7 @@ class EnhancedAudioComponents:
             self.logger.warning(f"⚠️ [ENHANCED AUDIO] Components not available: {import_error}")
             self.enabled = False
     
-    def get_status(self) -> Dict[str, Any]:
+    async def get_status(self) -> Dict[str, Any]:
         """Get status of enhanced components for diagnostics"""
         if not self.enabled:
             return {
@@ -61,13 +61,13 @@ class EnhancedAudioComponents:
             "image_manager_available": hasattr(self, 'image_manager'),
             "parallel_processor_available": hasattr(self, 'parallel_processor'),
             "cache_available": hasattr(self, 'cache'),
-            "cache_stats": self.cache.get_cache_stats() if hasattr(self, 'cache') else None,
+            "cache_stats": await self.cache.get_cache_stats("audio") if hasattr(self, 'cache') else None,
             "image_coverage": self.image_manager.get_coverage_analysis() if hasattr(self, 'image_manager') else None
         }
     
-    def clear_cache(self) -> bool:
-        """Clear audio cache"""
+    async def clear_cache(self) -> bool:
+        """Clear cached series audio profiles"""
         if self.enabled and hasattr(self, 'cache'):
-            self.cache.clear_cache()
+            await self.cache.clear("audio")
             return True
         return False
@@ -5,9 +5,11 @@ Handles getting enhanced audio info from various sources.
 
 from typing import Dict, Any, Optional
 from pathlib import Path
+from sqlalchemy.ext.asyncio import AsyncSession
 from aphrodite_logging import get_logger
 
 from .audio_enhanced_components import EnhancedAudioComponents
+from .series_profile_cache import series_fingerprint
 
 
 class EnhancedAudioDataHandler:
@@ -22,7 +24,8 @@ class EnhancedAudioDataHandler:
         jellyfin_id: Optional[str],
         use_demo_data: bool,
         poster_path: str,
-        settings: Dict[str, Any]
+        settings: Dict[str, Any],
+        db_session: Optional[AsyncSession] = None
     ):
         """Get audio info using enhanced detection system"""
         try:
@@ -39,7 +42,7 @@ class EnhancedAudioDataHandler:
             # Use real Jellyfin data when available
             if jellyfin_id:
                 self.logger.debug(f"🔍 [ENHANCED AUDIO] Getting enhanced audio for ID: {jellyfin_id}")
-                return await self._get_jellyfin_audio(jellyfin_id)
+                return await self._get_jellyfin_audio(jellyfin_id, db_session)
             
             # Use demo data as fallback
             if use_demo_data:
@@ -53,7 +56,7 @@ class EnhancedAudioDataHandler:
             self.logger.error(f"❌ [ENHANCED AUDIO] Audio detection error: {e}", exc_info=True)
             return None
     
-    async def _get_jellyfin_audio(self, jellyfin_id: str):
+    async def _get_jellyfin_audio(self, jellyfin_id: str, db_session: Optional[AsyncSession] = None):
         """Get enhanced audio info from Jellyfin"""
         try:
             # Import V2 Jellyfin service
@@ -77,7 +80,8 @@ class EnhancedAudioDataHandler:
             
             elif media_type in ['Series', 'Season']:
                 # For TV: check cache first, then use parallel processing
-                cached_audio = self.components.cache.get_series_audio(jellyfin_id)
+                fingerprint = series_fingerprint(media_item)
+                cached_audio = await self.components.cache.get_audio(jellyfin_id, fingerprint, db_session)
                 if cached_audio:
                     self.logger.debug(f"💾 [ENHANCED AUDIO] Cache hit for series: {jellyfin_id}")
                     return cached_audio
@@ -89,7 +93,7 @@ class EnhancedAudioDataHandler:
                 
                 if audio_info:
                     # Cache the result
-                    self.components.cache.cache_series_audio(jellyfin_id, audio_info)
+                    await self.components.cache.put_audio(jellyfin_id, fingerprint, audio_info, db_session)
                     self.logger.debug(f"📺 [ENHANCED AUDIO] TV series audio (parallel): {audio_info}")
                 
                 return audio_info
@@ -9,6 +9,7 @@ from typing import Dict, List, Optional
 from aphrodite_logging import get_logger
 
 from .audio_types import AudioInfo, FallbackRules
+from .renderers.asset_registry import get_asset_registry
 
 
 class AudioImageManager:
@@ -20,6 +21,7 @@ class AudioImageManager:
     def __init__(self, image_directory: str = "images/codec"):
         self.logger = get_logger("aphrodite.audio.images", service="badge")
         self.image_directory = image_directory
+        self.assets = get_asset_registry()
         self.available_images = self.discover_available_images()
         self.fallback_rules = FallbackRules.get_default()
         
@@ -41,7 +43,7 @@ class AudioImageManager:
         
         image_path = None
         for base_path in base_paths:
-            if base_path.exists():
+            if self.assets.directory_exists(str(base_path)):
                 image_path = base_path
                 break
         
@@ -49,8 +51,8 @@ class AudioImageManager:
             self.logger.warning(f"Audio image directory not found: {self.image_directory}")
             return images
         
-        # Discover all image files
-        for image_file in image_path.glob("*.png"):
+        # Discover all image files from the shared directory index
+        for image_file in self.assets.list_files(str(image_path), ".png"):
             # Remove extension and normalize name
             image_key = image_file.stem.lower().replace("-", "_")
             images[image_key] = str(image_file)
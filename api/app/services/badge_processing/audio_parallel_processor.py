@@ -39,42 +39,25 @@ class ParallelAudioProcessor:
             start_time = asyncio.get_event_loop().time()
             self.logger.debug(f"Starting parallel audio processing for series: {series_id}")
             
-            # Get episode list
-            episodes = await jellyfin_service.get_series_episodes(series_id, limit=max_episodes)
-            if not episodes:
+            # Sample evenly across the whole series; the listing already carries
+            # the media streams the detector needs
+            episodes_to_process = await jellyfin_service.get_series_episode_sample(
+                series_id,
+                lambda total: self._sample_indices(total, max_episodes)
+            )
+            if not episodes_to_process:
                 self.logger.warning(f"No episodes found for series: {series_id}")
                 return None
             
-            # Limit episodes to process
-            episodes_to_process = episodes[:max_episodes]
-            self.logger.debug(f"Processing {len(episodes_to_process)} episodes in parallel")
+            self.logger.debug(f"Processing {len(episodes_to_process)} sampled episodes")
             
-            # Create semaphore for concurrent requests
-            semaphore = asyncio.Semaphore(self.max_concurrent_requests)
-            
-            # Process episodes in parallel
-            tasks = [
-                self._process_episode_audio(semaphore, jellyfin_service, episode, i)
+            audio_results = [
+                self._process_episode_audio(episode, i)
                 for i, episode in enumerate(episodes_to_process)
             ]
             
-            # Wait for all tasks with timeout
-            try:
-                audio_results = await asyncio.wait_for(
-                    asyncio.gather(*tasks, return_exceptions=True),
-                    timeout=self.timeout_per_episode * len(episodes_to_process)
-                )
-            except asyncio.TimeoutError:
-                self.logger.warning(f"Parallel audio processing timeout for series: {series_id}")
-                return None
-            
             # Filter successful results
-            valid_audio_infos = []
-            for i, result in enumerate(audio_results):
-                if isinstance(result, Exception):
-                    self.logger.warning(f"Episode {i} audio processing failed: {result}")
-                elif isinstance(result, AudioInfo):
-                    valid_audio_infos.append(result)
+            valid_audio_infos = [result for result in audio_results if isinstance(result, AudioInfo)]
             
             if not valid_audio_infos:
                 self.logger.warning(f"No valid audio info extracted from {len(episodes_to_process)} episodes")
@@ -96,34 +79,30 @@ class ParallelAudioProcessor:
             self.logger.error(f"Parallel audio processing error: {e}", exc_info=True)
             return None
     
-    async def _process_episode_audio(self, 
-                                   semaphore: asyncio.Semaphore,
-                                   jellyfin_service,
-                                   episode: Dict[str, Any],
-                                   episode_index: int) -> Optional[AudioInfo]:
-        """Process single episode audio with semaphore control"""
-        async with semaphore:
-            try:
-                episode_id = episode.get('Id')
-                if not episode_id:
-                    return None
-                
-                # Get episode details
-                episode_details = await jellyfin_service.get_item_details(episode_id)
-                if not episode_details:
-                    return None
-                
-                # Extract audio info
-                audio_info = self.detector.extract_audio_info(episode_details)
-                
-                if audio_info:
-                    self.logger.debug(f"Episode {episode_index + 1} audio: {audio_info}")
-                
-                return audio_info
-                
-            except Exception as e:
-                self.logger.warning(f"Episode {episode_index + 1} audio error: {e}")
-                return None
+    def _sample_indices(self, total_episodes: int, max_episodes: int) -> List[int]:
+        """Episode positions spread evenly from the first to the last episode"""
+        if total_episodes <= max_episodes:
+            return list(range(total_episodes))
+        if max_episodes == 1:
+            return [0]
+        return [
+            int((i / (max_episodes - 1)) * (total_episodes - 1))
+            for i in range(max_episodes)
+        ]
+    
+    def _process_episode_audio(self, episode: Dict[str, Any], episode_index: int) -> Optional[AudioInfo]:
+        """Extract audio info from one episode listing"""
+        try:
+            audio_info = self.detector.extract_audio_info(episode)
+            
+            if audio_info:
+                self.logger.debug(f"Episode {episode_index + 1} audio: {audio_info}")
+            
+            return audio_info
+            
+        except Exception as e:
+            self.logger.warning(f"Episode {episode_index + 1} audio error: {e}")
+            return None
     
     def _determine_dominant_audio(self, audio_infos: List[AudioInfo]) -> AudioInfo:
         """Determine dominant audio format from multiple episodes"""
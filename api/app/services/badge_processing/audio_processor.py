@@ -139,7 +139,7 @@ class AudioBadgeProcessor(BaseBadgeProcessor):
             # Load from v2 database
             if db_session:
                 self.logger.debug("Loading audio settings from v2 database")
-                settings = await badge_settings_service.get_audio_settings(db_session, force_reload=True)
+                settings = await badge_settings_service.get_audio_settings(db_session)
                 if settings and await badge_settings_service.validate_settings(settings, "audio"):
                     self.logger.info("Successfully loaded audio settings from v2 database")
                     return settings
@@ -148,7 +148,7 @@ class AudioBadgeProcessor(BaseBadgeProcessor):
             if not db_session:
                 try:
                     async with async_session_factory() as db:
-                        settings = await badge_settings_service.get_audio_settings(db, force_reload=True)
+                        settings = await badge_settings_service.get_audio_settings(db)
                         if settings and await badge_settings_service.validate_settings(settings, "audio"):
                             self.logger.info("Successfully loaded audio settings from v2 database (new session)")
                             return settings
@@ -243,7 +243,7 @@ class AwardsBadgeProcessor(BaseBadgeProcessor):
             self.logger.debug("📖 Loading awards badge settings...")
             
             if db_session:
-                settings = await badge_settings_service.get_awards_settings(db_session, force_reload=True)
+                settings = await badge_settings_service.get_awards_settings(db_session)
                 if settings and await badge_settings_service.validate_settings(settings, "awards"):
                     self.logger.debug("✅ Loaded awards settings from provided DB session")
                     return settings
@@ -251,7 +251,7 @@ class AwardsBadgeProcessor(BaseBadgeProcessor):
             if not db_session:
                 try:
                     async with async_session_factory() as db:
-                        settings = await badge_settings_service.get_awards_settings(db, force_reload=True)
+                        settings = await badge_settings_service.get_awards_settings(db)
                         if settings and await badge_settings_service.validate_settings(settings, "awards"):
                             self.logger.debug("✅ Loaded awards settings from new DB session")
                             return settings
@@ -5,11 +5,13 @@ Abstract base class for all badge processors with common functionality.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
 
 from aphrodite_logging import get_logger
 from .types import PosterResult
+from .renderers.compositor import BadgeLayerResult
+from .image_executor import PosterRenderJob, get_image_executor
 
 
 class BaseBadgeProcessor(ABC):
@@ -41,6 +43,77 @@ class BaseBadgeProcessor(ABC):
         """Process multiple posters with this badge type"""
         pass
     
+    async def create_badge_layers(
+        self,
+        poster_size: Tuple[int, int],
+        poster_path: str,
+        use_demo_data: bool = False,
+        db_session = None,
+        jellyfin_id: Optional[str] = None
+    ) -> BadgeLayerResult:
+        """Render this badge type as positioned layers for an in-memory poster canvas"""
+        return BadgeLayerResult(
+            success=False,
+            error=f"{self.badge_type} processor does not support layer compositing"
+        )
+    
+    async def get_fingerprint_inputs(
+        self,
+        jellyfin_id: str,
+        db_session = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Settings and detected data this badge type would render for an item,
+        used to tell whether re-rendering would change anything. None means
+        the processor cannot tell, so the item is always rendered.
+        """
+        return None
+    
+    async def apply_layer_result(
+        self,
+        poster_path: str,
+        layer_result: BadgeLayerResult,
+        output_path: Optional[str] = None
+    ) -> PosterResult:
+        """Write a layer result onto a poster file for standalone (non-pipeline) use"""
+        if not layer_result.success:
+            return PosterResult(
+                source_path=poster_path,
+                success=False,
+                error=layer_result.error
+            )
+        
+        if not layer_result.layers:
+            return PosterResult(
+                source_path=poster_path,
+                output_path=poster_path,
+                applied_badges=[],
+                success=True
+            )
+        
+        final_output_path = output_path or f"/app/api/static/preview/{Path(poster_path).name}"
+        try:
+            # Decode, composite and encode off the event loop
+            await get_image_executor().render_poster(PosterRenderJob(
+                poster_path=poster_path,
+                output_path=final_output_path,
+                layers=layer_result.layers
+            ))
+        except Exception as e:
+            self.logger.error(f"❌ [V2 {self.badge_type.upper()}] Badge application failed: {e}", exc_info=True)
+            return PosterResult(
+                source_path=poster_path,
+                success=False,
+                error=f"V2 {self.badge_type} badge application failed"
+            )
+        
+        return PosterResult(
+            source_path=poster_path,
+            output_path=final_output_path,
+            applied_badges=layer_result.applied_badges,
+            success=True
+        )
+    
     def validate_poster_path(self, poster_path: str) -> bool:
         """Validate that poster path exists and is a valid image"""
         try:
@@ -4,10 +4,13 @@ Database Service for Badge Settings
 Service to load and manage badge configurations from the PostgreSQL database.
 """
 
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.config import get_settings
+from app.core.config_listener import get_system_config_listener
 from app.models.config import SystemConfigModel
 from aphrodite_logging import get_logger
 
@@ -16,7 +19,60 @@ class BadgeSettingsService:
     
     def __init__(self):
         self.logger = get_logger("aphrodite.badge.settings", service="badge")
-        self._cache = {}  # Simple in-memory cache
+        self._cache = {}  # cache_key -> (loaded_at, settings)
+        self._resolved_keys = {}  # badge_type -> system_config key that held its settings
+        self._generation = 0  # bumped on every change notification
+        
+        # Drop cached settings whenever any process changes system_config
+        get_system_config_listener().subscribe(self._on_config_changed)
+    
+    def _on_config_changed(self, config_key: str):
+        """Invalidate cached settings after a system_config change notification"""
+        self._generation += 1
+        if self._cache or self._resolved_keys:
+            self._cache.clear()
+            self._resolved_keys.clear()
+            self.logger.debug(f"Badge settings cache invalidated by change to {config_key}")
+    
+    async def _get_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return cached settings if still valid.
+        
+        While change notifications are received, cached settings stay valid
+        until a notification invalidates them; otherwise they expire after
+        badge_settings_cache_ttl seconds.
+        """
+        entry = self._cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        loaded_at, settings = entry
+        if await get_system_config_listener().ensure_listening():
+            # ensure_listening may have invalidated everything after a reconnect
+            return settings if cache_key in self._cache else None
+        
+        if time.monotonic() - loaded_at < get_settings().badge_settings_cache_ttl:
+            return settings
+        
+        self._cache.pop(cache_key, None)
+        return None
+    
+    async def _begin_load(self) -> int:
+        """
+        Start the change listener before reading system_config.
+        
+        Returns the notification generation; pass it to _store so settings
+        read before a concurrent change are not cached.
+        """
+        await get_system_config_listener().ensure_listening()
+        return self._generation
+    
+    def _store(self, cache_key: str, settings: Dict[str, Any], generation: int):
+        """Cache settings unless a change notification arrived since _begin_load"""
+        if generation != self._generation:
+            self.logger.debug(f"Not caching {cache_key}: system_config changed while loading")
+            return
+        self._cache[cache_key] = (time.monotonic(), settings)
     
     async def get_badge_settings(
         self, 
@@ -33,25 +89,22 @@ class BadgeSettingsService:
             db: Database session
             use_cache: Whether to use cached settings
             force_reload: Whether to force reload from database (ignores cache)
-            
+        
         Returns:
             Dictionary of badge settings or None if not found
         """
         try:
             # Check cache first (unless force_reload is True)
             cache_key = f"badge_settings_{badge_type}"
-            if use_cache and not force_reload and cache_key in self._cache:
-                self.logger.debug(f"Using cached settings for {badge_type}")
-                return self._cache[cache_key]
-            
-            # Force reload: clear cache for this badge type
-            if force_reload and cache_key in self._cache:
-                del self._cache[cache_key]
-                self.logger.debug(f"Cleared cache for {badge_type} due to force_reload")
+            if use_cache and not force_reload:
+                cached = await self._get_cached(cache_key)
+                if cached is not None:
+                    self.logger.debug(f"Using cached settings for {badge_type}")
+                    return cached
             
             self.logger.debug(f"Loading {badge_type} badge settings from database (cache: {use_cache}, force_reload: {force_reload})")
             
-            # Try different key patterns for badge settings
+            # Try different key patterns for badge settings, in order of preference
             key_patterns = [
                 f"badge_settings_{badge_type}.yml",  # Pattern like "badge_settings_audio.yml"
                 f"badge_settings_{badge_type}",      # Pattern like "badge_settings_audio"
@@ -59,39 +112,45 @@ class BadgeSettingsService:
                 f"{badge_type}_settings"              # Pattern like "audio_settings"
             ]
             
-            settings = None
-            found_key = None
-            
-            # Try each key pattern
-            for key_pattern in key_patterns:
-                self.logger.debug(f"Searching for {badge_type} settings with key: {key_pattern}")
-                stmt = select(SystemConfigModel).where(SystemConfigModel.key == key_pattern)
-                result = await db.execute(stmt)
-                config_model = result.scalar_one_or_none()
-                
-                if config_model and config_model.value:
-                    settings = config_model.value
-                    found_key = key_pattern
-                    self.logger.info(f"Found {badge_type} settings with key: {found_key}")
-                    break
+            # Query the key that held the settings last time, else all patterns at once
+            generation = await self._begin_load()
+            resolved_key = self._resolved_keys.get(badge_type)
+            settings, found_key = await self._load_first_key(
+                db, [resolved_key] if resolved_key else key_patterns
+            )
+            if not settings and resolved_key:
+                settings, found_key = await self._load_first_key(db, key_patterns)
             
             if not settings:
+                self._resolved_keys.pop(badge_type, None)
                 self.logger.warning(f"No {badge_type} badge configuration found in system_config with any key pattern")
                 return None
             
+            if generation == self._generation:
+                self._resolved_keys[badge_type] = found_key
+            
             # Cache and return settings
             if use_cache:
-                self._cache[cache_key] = settings
+                self._store(cache_key, settings, generation)
             
             self.logger.info(f"Successfully loaded {badge_type} badge settings from system_config (key: {found_key})")
             self.logger.debug(f"{badge_type} settings keys: {list(settings.keys())}")
             
             return settings
-            
+        
         except Exception as e:
             self.logger.error(f"Error loading {badge_type} badge settings: {e}", exc_info=True)
             return None
     
+    async def _load_first_key(self, db: AsyncSession, keys: List[str]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Load the first key (in the given order) that has a value, with one query"""
+        stmt = select(SystemConfigModel.key, SystemConfigModel.value).where(SystemConfigModel.key.in_(keys))
+        values = {key: value for key, value in (await db.execute(stmt)).all() if value}
+        for key in keys:
+            if key in values:
+                return values[key], key
+        return None, None
+    
     async def get_audio_settings(self, db: AsyncSession, force_reload: bool = False) -> Optional[Dict[str, Any]]:
         """Get audio badge settings"""
         return await self.get_badge_settings("audio", db, force_reload=force_reload)
@@ -167,18 +226,16 @@ class BadgeSettingsService:
             cache_key = "review_source_settings"
             
             # Check cache first (unless force_reload is True)
-            if not force_reload and cache_key in self._cache:
-                self.logger.debug("Using cached review source settings")
-                return self._cache[cache_key]
-            
-            # Force reload: clear cache
-            if force_reload and cache_key in self._cache:
-                del self._cache[cache_key]
-                self.logger.debug("Cleared cache for review source settings due to force_reload")
+            if not force_reload:
+                cached = await self._get_cached(cache_key)
+                if cached is not None:
+                    self.logger.debug("Using cached review source settings")
+                    return cached
             
             self.logger.debug(f"Loading review source settings from database (force_reload: {force_reload})")
             
             # Query database for review source settings
+            generation = await self._begin_load()
             stmt = select(SystemConfigModel).where(SystemConfigModel.key == "review_source_settings")
             result = await db.execute(stmt)
             config_model = result.scalar_one_or_none()
@@ -190,7 +247,7 @@ class BadgeSettingsService:
             settings = config_model.value
             
             # Cache the settings
-            self._cache[cache_key] = settings
+            self._store(cache_key, settings, generation)
             
             self.logger.info("Successfully loaded review source settings from system_config")
             self.logger.debug(f"Review source settings: {settings}")
@@ -249,18 +306,16 @@ class BadgeSettingsService:
             cache_key = "poster_manager_settings"
             
             # Check cache first (unless force_reload is True)
-            if not force_reload and cache_key in self._cache:
-                self.logger.debug("Using cached poster manager settings")
-                return self._cache[cache_key]
-            
-            # Force reload: clear cache
-            if force_reload and cache_key in self._cache:
-                del self._cache[cache_key]
-                self.logger.debug("Cleared cache for poster manager settings due to force_reload")
+            if not force_reload:
+                cached = await self._get_cached(cache_key)
+                if cached is not None:
+                    self.logger.debug("Using cached poster manager settings")
+                    return cached
             
             self.logger.debug(f"Loading poster manager settings from database (force_reload: {force_reload})")
             
             # Query database for poster manager settings
+            generation = await self._begin_load()
             stmt = select(SystemConfigModel).where(SystemConfigModel.key == "poster_manager_settings")
             result = await db.execute(stmt)
             config_model = result.scalar_one_or_none()
@@ -272,7 +327,7 @@ class BadgeSettingsService:
             settings = config_model.value
             
             # Cache the settings
-            self._cache[cache_key] = settings
+            self._store(cache_key, settings, generation)
             
             self.logger.info("Successfully loaded poster manager settings from system_config")
             self.logger.debug(f"Poster manager settings: {settings}")
@@ -286,6 +341,7 @@ class BadgeSettingsService:
     def clear_cache(self):
         """Clear the settings cache"""
         self._cache.clear()
+        self._resolved_keys.clear()
         self.logger.info("Badge settings cache cleared")
     
     def clear_badge_cache(self, badge_type: str):
@@ -0,0 +1,120 @@
+"""
+Image Executor
+
+Runs the CPU-heavy Pillow stages of the V2 pipeline (poster decode, LANCZOS
+resize, layer compositing and JPEG encode) in a process pool so the event
+loop only awaits results. Jobs are plain picklable descriptions.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from PIL import Image
+from aphrodite_logging import get_logger
+
+from .renderers.compositor import BadgeLayer
+
+
+@dataclass
+class PosterRenderJob:
+    """Everything a pool process needs to produce a finished poster file"""
+    poster_path: str
+    output_path: str
+    layers: List[BadgeLayer] = field(default_factory=list)
+    target_size: Optional[Tuple[int, int]] = None  # Resize to this size before compositing
+    quality: int = 95
+
+
+def render_poster(job: PosterRenderJob) -> Tuple[int, int]:
+    """
+    Decode, resize, composite and encode a poster (runs inside a pool process).
+
+    Returns:
+        Final poster dimensions
+    """
+    with Image.open(job.poster_path) as source:
+        canvas = source.convert("RGB")
+
+    if job.target_size and canvas.size != tuple(job.target_size):
+        canvas = canvas.resize(tuple(job.target_size), Image.LANCZOS)
+
+    if job.layers:
+        canvas = canvas.convert("RGBA")
+        for layer in job.layers:
+            canvas.paste(layer.image, layer.position, layer.image)
+        canvas = canvas.convert("RGB")
+
+    Path(job.output_path).parent.mkdir(parents=True, exist_ok=True)
+    canvas.save(job.output_path, "JPEG", quality=job.quality)
+    return canvas.size
+
+
+class ImageExecutor:
+    """Lazily started CPU executor for Pillow work"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.logger = get_logger("aphrodite.badge.image_executor", service="badge")
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+
+    def _create_executor(self) -> Executor:
+        """Create a process pool sized to the available cores"""
+        if self.max_workers is None:
+            from app.core.config import get_settings
+            configured = get_settings().image_process_workers
+            self.max_workers = configured if configured > 0 else (os.cpu_count() or 1)
+
+        # Celery prefork children are daemonic and may not start processes;
+        # Pillow releases the GIL for resize/encode so threads still use several cores
+        if multiprocessing.current_process().daemon:
+            self.logger.info(f"🧵 [IMAGE EXECUTOR] Daemonic process, using {self.max_workers} threads")
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="aphrodite-image")
+
+        self.logger.info(f"⚙️ [IMAGE EXECUTOR] Starting process pool with {self.max_workers} workers")
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a picklable top-level function in the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge poster); start a fresh pool and retry once
+            self.logger.warning("⚠️ [IMAGE EXECUTOR] Process pool broken, restarting")
+            self.shutdown(wait=False)
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    async def render_poster(self, job: PosterRenderJob) -> Tuple[int, int]:
+        """Render a poster file from a job description"""
+        return await self.run(render_poster, job)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the pool processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+
+# Global executor instance
+_image_executor: Optional[ImageExecutor] = None
+
+def get_image_executor() -> ImageExecutor:
+    """Get global image executor instance"""
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ImageExecutor()
+    return _image_executor
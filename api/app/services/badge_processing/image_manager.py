@@ -9,6 +9,7 @@ from typing import Dict, Optional, List, Set
 from aphrodite_logging import get_logger
 
 from .resolution_types import ResolutionInfo, FallbackRules
+from .renderers.asset_registry import get_asset_registry
 
 
 class ResolutionImageManager:
@@ -19,6 +20,7 @@ class ResolutionImageManager:
     
     def __init__(self, image_directory: str = None):
         self.logger = get_logger("aphrodite.resolution.images", service="badge")
+        self.assets = get_asset_registry()
         
         # Auto-detect the correct image directory path
         if image_directory is None:
@@ -31,7 +33,7 @@ class ResolutionImageManager:
             
             # Find the first existing path
             for path in possible_paths:
-                if path.exists():
+                if self.assets.directory_exists(str(path)):
                     self.image_directory = path
                     break
             else:
@@ -59,12 +61,12 @@ class ResolutionImageManager:
         
         available_images = set()
         
-        if not self.image_directory.exists():
+        if not self.assets.directory_exists(str(self.image_directory)):
             self.logger.warning(f"Image directory not found: {self.image_directory}")
             return available_images
         
-        # Scan for PNG files
-        for image_file in self.image_directory.glob("*.png"):
+        # PNG files from the shared directory index
+        for image_file in self.assets.list_files(str(self.image_directory), ".png"):
             # Skip aphrodite variant files
             if "-aphrodite" not in image_file.stem:
                 available_images.add(image_file.stem)
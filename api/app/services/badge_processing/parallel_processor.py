@@ -1,9 +1,9 @@
 """
 Parallel processing for TV series resolution detection.
-Improves performance by processing episodes concurrently.
+Samples episodes across the whole series and analyses them straight from
+the episode listing, fetched concurrently by position.
 """
 
-import asyncio
 from typing import List, Optional, Dict, Any
 from collections import Counter
 from aphrodite_logging import get_logger
@@ -47,22 +47,20 @@ class ParallelResolutionProcessor:
         try:
             self.logger.debug(f"Starting parallel resolution analysis for series: {series_id}")
             
-            # Get series episodes
-            episodes = await jellyfin_service.get_series_episodes(series_id, limit=max_episodes * 2)
+            # Sample episodes strategically across the whole series; the listing
+            # already carries the media streams the detector needs
+            episodes = await jellyfin_service.get_series_episode_sample(
+                series_id,
+                lambda total: self._sample_indices_strategically(total, max_episodes)
+            )
             
             if not episodes:
                 self.logger.warning(f"No episodes found for series: {series_id}")
                 return self._get_default_resolution()
             
-            # Sample episodes strategically
-            sampled_episodes = self._sample_episodes_strategically(episodes, max_episodes)
-            
-            self.logger.debug(f"Sampled {len(sampled_episodes)} episodes for analysis")
+            self.logger.debug(f"Sampled {len(episodes)} episodes for analysis")
             
-            # Process episodes in parallel
-            resolution_results = await self._process_episodes_parallel(
-                jellyfin_service, sampled_episodes
-            )
+            resolution_results = self._detect_episode_resolutions(episodes)
             
             # Determine dominant resolution
             dominant_resolution = self._find_dominant_resolution(resolution_results)
@@ -79,135 +77,60 @@ class ParallelResolutionProcessor:
             self.logger.error(f"Parallel resolution processing error: {e}", exc_info=True)
             return self._get_default_resolution()
     
-    def _sample_episodes_strategically(self, episodes: List[Dict], max_episodes: int) -> List[Dict]:
+    def _sample_indices_strategically(self, total_episodes: int, max_episodes: int) -> List[int]:
         """
-        Sample episodes strategically to get representative resolution data.
+        Pick episode positions that give representative resolution data.
         Takes episodes from different parts of the series for better accuracy.
         """
-        if len(episodes) <= max_episodes:
-            return episodes
-        
-        # Strategy: Take episodes from beginning, middle, and end
-        total_episodes = len(episodes)
+        if total_episodes <= max_episodes:
+            return list(range(total_episodes))
         
         if max_episodes == 1:
             # Take the first episode
-            return [episodes[0]]
+            return [0]
         elif max_episodes == 2:
             # Take first and last
-            return [episodes[0], episodes[-1]]
+            return [0, total_episodes - 1]
         elif max_episodes <= 5:
             # Distribute across the series
-            indices = []
-            for i in range(max_episodes):
-                index = int((i / (max_episodes - 1)) * (total_episodes - 1))
-                indices.append(index)
-            
-            return [episodes[i] for i in indices]
+            return [
+                int((i / (max_episodes - 1)) * (total_episodes - 1))
+                for i in range(max_episodes)
+            ]
         else:
             # For larger samples, take more from the beginning (most likely to be consistent)
             beginning_count = max_episodes // 2
             middle_count = max_episodes // 4
             end_count = max_episodes - beginning_count - middle_count
             
-            sampled = []
-            sampled.extend(episodes[:beginning_count])
+            sampled = list(range(beginning_count))
             
             if middle_count > 0:
                 middle_start = total_episodes // 3
-                middle_end = middle_start + middle_count
-                sampled.extend(episodes[middle_start:middle_end])
+                sampled.extend(range(middle_start, middle_start + middle_count))
             
             if end_count > 0:
-                sampled.extend(episodes[-end_count:])
+                sampled.extend(range(total_episodes - end_count, total_episodes))
             
             return sampled
     
-    async def _process_episodes_parallel(
-        self, 
-        jellyfin_service,
-        episodes: List[Dict]
-    ) -> List[Optional[ResolutionInfo]]:
-        """Process multiple episodes concurrently with proper error handling"""
-        
-        # Create semaphore to limit concurrent requests
-        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
-        
-        # Create tasks for parallel processing
-        tasks = [
-            self._process_single_episode_with_semaphore(
-                semaphore, jellyfin_service, episode, i
-            )
-            for i, episode in enumerate(episodes)
-        ]
-        
-        # Execute all tasks concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Filter out exceptions and None results
+    def _detect_episode_resolutions(self, episodes: List[Dict]) -> List[ResolutionInfo]:
+        """Extract resolution info from episode listings, skipping episodes that fail"""
         resolution_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                self.logger.warning(f"Episode {i+1} processing failed: {result}")
-            elif result is not None:
-                resolution_results.append(result)
-        
-        self.logger.debug(f"Successfully processed {len(resolution_results)} out of {len(episodes)} episodes")
-        
-        return resolution_results
-    
-    async def _process_single_episode_with_semaphore(
-        self,
-        semaphore: asyncio.Semaphore,
-        jellyfin_service,
-        episode: Dict,
-        episode_index: int
-    ) -> Optional[ResolutionInfo]:
-        """Process a single episode with semaphore control and timeout"""
-        
-        async with semaphore:
+        for episode_index, episode in enumerate(episodes):
             try:
-                # Add timeout to prevent hanging
-                return await asyncio.wait_for(
-                    self._process_single_episode(jellyfin_service, episode, episode_index),
-                    timeout=self.timeout_per_episode
-                )
-            except asyncio.TimeoutError:
-                self.logger.warning(f"Episode {episode_index+1} processing timed out")
-                return None
+                resolution_info = self.detector.extract_resolution_info(episode)
             except Exception as e:
                 self.logger.warning(f"Episode {episode_index+1} processing error: {e}")
-                return None
-    
-    async def _process_single_episode(
-        self,
-        jellyfin_service,
-        episode: Dict,
-        episode_index: int
-    ) -> Optional[ResolutionInfo]:
-        """Process a single episode to extract resolution info"""
-        
-        try:
-            episode_id = episode.get('Id')
-            if not episode_id:
-                return None
-            
-            # Get detailed episode information
-            episode_details = await jellyfin_service.get_media_item_by_id(episode_id)
-            if not episode_details:
-                return None
-            
-            # Extract resolution using enhanced detector
-            resolution_info = self.detector.extract_resolution_info(episode_details)
+                continue
             
             if resolution_info:
                 self.logger.debug(f"Episode {episode_index+1}: {resolution_info}")
-            
-            return resolution_info
-            
-        except Exception as e:
-            self.logger.warning(f"Episode {episode_index+1} detail processing error: {e}")
-            return None
+                resolution_results.append(resolution_info)
+        
+        self.logger.debug(f"Successfully processed {len(resolution_results)} out of {len(episodes)} episodes")
+        
+        return resolution_results
     
     def _find_dominant_resolution(self, resolution_results: List[ResolutionInfo]) -> Optional[ResolutionInfo]:
         """
@@ -68,7 +68,7 @@ class PosterResizer:
             self.logger.debug(f"Resizing from {original_width}x{original_height} to {new_width}x{new_height}")
             
             # Resize the image using high-quality resampling
-            resized_image = image.resize((new_width, new_height), Image.LANCZOS)
+            resized_image = self.resize_image(image)
             
             # Determine output path
             if not output_path:
@@ -91,6 +91,51 @@ class PosterResizer:
             self.logger.error(f"Error resizing poster {input_path}: {e}", exc_info=True)
             return None
     
+    def resize_image(self, image: Image.Image) -> Image.Image:
+        """
+        Resize an in-memory image to standard width with maintained aspect ratio.
+        
+        Args:
+            image: Decoded poster image
+            
+        Returns:
+            Resized image, or the same image if it is already at standard width
+        """
+        if image.width == self.STANDARD_WIDTH:
+            return image
+        new_size = self.get_standardized_dimensions(image.width, image.height)
+        return image.resize(new_size, Image.LANCZOS)
+    
+    def get_standardized_size(self, input_path: str) -> Optional[Tuple[int, int]]:
+        """
+        Get the canvas size a poster will have after standardization.
+        
+        Only the image header is read, so this is cheap enough for the event loop;
+        the decode and resize happen later in the image executor.
+        
+        Args:
+            input_path: Path to original poster
+            
+        Returns:
+            Tuple of (width, height) or None if the poster cannot be read
+        """
+        try:
+            if not Path(input_path).exists():
+                self.logger.error(f"Input poster not found: {input_path}")
+                return None
+            
+            with Image.open(input_path) as source:
+                width, height = source.size
+            
+            self.logger.debug(f"Original dimensions: {width}x{height}")
+            if width == self.STANDARD_WIDTH:
+                return width, height
+            return self.get_standardized_dimensions(width, height)
+            
+        except Exception as e:
+            self.logger.error(f"Error reading poster size {input_path}: {e}", exc_info=True)
+            return None
+    
     def get_standardized_dimensions(self, original_width: int, original_height: int) -> Tuple[int, int]:
         """
         Calculate standardized dimensions for given original dimensions.
@@ -0,0 +1,260 @@
+"""
+External Ratings Cache
+
+Shared, persistent cache of review provider responses keyed by provider and
+external ID, so reprocessing a library does not spend provider quota again.
+
+- Responses live in Postgres with a per-provider TTL and an in-process LRU in front
+- "No data" answers are cached too (negative caching) with their own TTL
+- Each provider can have a daily request budget tracked per UTC day
+- Callers without the global session factory (batch workers) pass their
+  db_session, and the cache opens its own short sessions on that engine
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import database
+from app.core.config import get_settings
+from app.models.external_ratings import ExternalRatingCacheModel, ExternalApiUsageModel
+from aphrodite_logging import get_logger
+
+
+class RatingsUnavailable(Exception):
+    """Transient provider failure (network, HTTP error, quota); never cached"""
+
+
+class RatingsCache:
+    """Persistent provider response cache with negative caching and request budgets"""
+    
+    def __init__(self, memory_size: int = 2048):
+        self.logger = get_logger("aphrodite.badge.review.cache", service="badge")
+        self.settings = get_settings()
+        self.memory_size = memory_size
+        
+        # (provider, external_id) -> (expires_at monotonic, payload or None)
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        
+        # Fallback budget counters when the database is not available
+        self._local_usage: Dict[Tuple[str, str], int] = {}
+    
+    def get_ttl(self, provider: str) -> int:
+        """Positive cache lifetime for a provider in seconds"""
+        return {
+            "omdb": self.settings.ratings_cache_omdb_ttl,
+            "tmdb": self.settings.ratings_cache_tmdb_ttl,
+        }.get(provider, self.settings.ratings_cache_omdb_ttl)
+    
+    def get_daily_limit(self, provider: str) -> int:
+        """Daily request budget for a provider (0 = unlimited)"""
+        return {
+            "omdb": self.settings.omdb_daily_request_limit,
+        }.get(provider, 0)
+    
+    async def get(self, provider: str, external_id: str,
+                  db_session: Optional[AsyncSession] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a cached provider response.
+        
+        Returns:
+            Tuple of (hit, payload); a hit with payload None is a cached "no data"
+        """
+        key = (provider, external_id)
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                return True, payload
+            del self._memory[key]
+        
+        session_factory = self._session_factory(db_session)
+        if session_factory is None:
+            return False, None
+        
+        try:
+            async with session_factory() as db:
+                row = await db.get(ExternalRatingCacheModel, (provider, external_id))
+        except Exception as e:
+            self.logger.warning(f"⚠️ [RATINGS CACHE] Lookup failed for {provider}:{external_id}: {e}")
+            return False, None
+        
+        if row is None:
+            return False, None
+        
+        remaining = (row.expires_at - datetime.now(timezone.utc)).total_seconds()
+        if remaining <= 0:
+            return False, None
+        
+        self._remember(key, row.payload, remaining)
+        return True, row.payload
+    
+    async def put(self, provider: str, external_id: str, payload: Optional[Dict[str, Any]],
+                  db_session: Optional[AsyncSession] = None) -> None:
+        """Store a provider response, or None to record that the provider has no data"""
+        ttl = self.get_ttl(provider) if payload is not None else self.settings.ratings_cache_negative_ttl
+        if ttl <= 0:
+            return
+        
+        self._remember((provider, external_id), payload, ttl)
+        
+        session_factory = self._session_factory(db_session)
+        if session_factory is None:
+            return
+        
+        now = datetime.now(timezone.utc)
+        values = {
+            "provider": provider,
+            "external_id": external_id,
+            "payload": payload,
+            "fetched_at": now,
+            "expires_at": now + timedelta(seconds=ttl)
+        }
+        stmt = insert(ExternalRatingCacheModel).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["provider", "external_id"],
+            set_={column: stmt.excluded[column] for column in ("payload", "fetched_at", "expires_at")}
+        )
+        try:
+            async with session_factory() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            self.logger.warning(f"⚠️ [RATINGS CACHE] Store failed for {provider}:{external_id}: {e}")
+    
+    async def get_or_fetch(
+        self,
+        provider: str,
+        external_id: str,
+        fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+        db_session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached provider response or fetch it within the daily budget.
+        
+        ``fetch`` returns the payload, None when the provider has no data for
+        the ID (cached negatively), or raises RatingsUnavailable (not cached).
+        
+        Returns:
+            Provider payload, or None when unavailable
+        """
+        hit, payload = await self.get(provider, external_id, db_session)
+        if hit:
+            self.logger.debug(f"🔄 [RATINGS CACHE] Hit for {provider}:{external_id}")
+            return payload
+        
+        if not await self.acquire_budget(provider, db_session):
+            self.logger.warning(f"🚫 [RATINGS CACHE] Daily {provider} budget used up, skipping {external_id}")
+            return None
+        
+        try:
+            payload = await fetch()
+        except RatingsUnavailable as e:
+            self.logger.warning(f"⚠️ [RATINGS CACHE] {provider} unavailable for {external_id}: {e}")
+            return None
+        
+        await self.put(provider, external_id, payload, db_session)
+        return payload
+    
+    async def acquire_budget(self, provider: str, db_session: Optional[AsyncSession] = None) -> bool:
+        """Count one request against the provider's daily budget if any is left"""
+        limit = self.get_daily_limit(provider)
+        if limit <= 0:
+            return True
+        
+        today = datetime.now(timezone.utc).date()
+        session_factory = self._session_factory(db_session)
+        if session_factory is None:
+            key = (provider, today.isoformat())
+            if self._local_usage.get(key, 0) >= limit:
+                return False
+            self._local_usage[key] = self._local_usage.get(key, 0) + 1
+            return True
+        
+        # Atomic across worker processes: the update only applies under the limit
+        stmt = insert(ExternalApiUsageModel).values(provider=provider, usage_date=today, request_count=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["provider", "usage_date"],
+            set_={"request_count": ExternalApiUsageModel.request_count + 1},
+            where=ExternalApiUsageModel.request_count < limit
+        ).returning(ExternalApiUsageModel.request_count)
+        try:
+            async with session_factory() as db:
+                result = await db.execute(stmt)
+                await db.commit()
+                return result.scalar_one_or_none() is not None
+        except Exception as e:
+            # Never block ratings because the bookkeeping failed
+            self.logger.warning(f"⚠️ [RATINGS CACHE] Budget check failed for {provider}: {e}")
+            return True
+    
+    async def exhaust_budget(self, provider: str, db_session: Optional[AsyncSession] = None) -> None:
+        """Mark today's budget as used up (the provider reported its quota is reached)"""
+        limit = self.get_daily_limit(provider)
+        if limit <= 0:
+            return
+        
+        today = datetime.now(timezone.utc).date()
+        self._local_usage[(provider, today.isoformat())] = limit
+        
+        session_factory = self._session_factory(db_session)
+        if session_factory is None:
+            return
+        
+        stmt = insert(ExternalApiUsageModel).values(provider=provider, usage_date=today, request_count=limit)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["provider", "usage_date"],
+            set_={"request_count": limit}
+        )
+        try:
+            async with session_factory() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            self.logger.warning(f"⚠️ [RATINGS CACHE] Could not record exhausted {provider} budget: {e}")
+    
+    async def get_usage(self, provider: str, db_session: Optional[AsyncSession] = None) -> int:
+        """Requests made to a provider today"""
+        today = datetime.now(timezone.utc).date()
+        session_factory = self._session_factory(db_session)
+        if session_factory is None:
+            return self._local_usage.get((provider, today.isoformat()), 0)
+        
+        async with session_factory() as db:
+            count = await db.scalar(
+                select(ExternalApiUsageModel.request_count).where(
+                    ExternalApiUsageModel.provider == provider,
+                    ExternalApiUsageModel.usage_date == today
+                )
+            )
+        return count or 0
+    
+    def _session_factory(self, db_session: Optional[AsyncSession] = None) -> Optional[async_sessionmaker]:
+        """Sessions on the caller's engine (batch workers), else on the global one"""
+        if db_session is not None and db_session.bind is not None:
+            return async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+        return database.async_session_factory
+    
+    def _remember(self, key: Tuple[str, str], payload: Optional[Dict[str, Any]], ttl: float) -> None:
+        """Keep a response in the in-process LRU"""
+        self._memory[key] = (time.monotonic() + ttl, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+
+# Global cache instance
+_ratings_cache: Optional[RatingsCache] = None
+
+def get_ratings_cache() -> RatingsCache:
+    """Get global ratings cache instance"""
+    global _ratings_cache
+    if _ratings_cache is None:
+        _ratings_cache = RatingsCache()
+    return _ratings_cache
@@ -0,0 +1,136 @@
+"""
+Render Fingerprints
+
+A render fingerprint hashes everything a badged poster depends on: the
+original poster's content hash, the badge types in order, each badge type's
+settings and the data it would render (resolution, audio format, review
+scores, awards). Batch workers compare it with the fingerprint stored for the
+last upload and skip the download, render and upload when nothing changed.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from aphrodite_logging import get_logger
+from app.core import database
+from app.models.render_fingerprints import RenderFingerprintModel
+from .base_processor import BaseBadgeProcessor
+from .v2_audio_processor import V2AudioBadgeProcessor
+from .v2_resolution_processor import V2ResolutionBadgeProcessor
+from .v2_review_processor import V2ReviewBadgeProcessor
+from .v2_awards_processor import V2AwardsBadgeProcessor
+
+
+def _jsonable(value: Any) -> Any:
+    """Detected badge data as plain JSON (ResolutionInfo/AudioInfo via to_dict)"""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return value
+
+
+class RenderFingerprintService:
+    """Computes, stores and compares per-item render fingerprints"""
+    
+    def __init__(self):
+        self.logger = get_logger("aphrodite.badge.fingerprint", service="badge")
+        self._processors: Optional[Dict[str, BaseBadgeProcessor]] = None
+    
+    def _get_processors(self) -> Dict[str, BaseBadgeProcessor]:
+        if self._processors is None:
+            self._processors = {
+                "audio": V2AudioBadgeProcessor(),
+                "resolution": V2ResolutionBadgeProcessor(),
+                "review": V2ReviewBadgeProcessor(),
+                "awards": V2AwardsBadgeProcessor()
+            }
+        return self._processors
+    
+    async def get_inputs_digest(
+        self,
+        jellyfin_id: str,
+        badge_types: List[str],
+        db_session: Optional[AsyncSession] = None
+    ) -> Optional[str]:
+        """
+        Hash of the badge types, settings and detected badge data for an item.
+        
+        Returns None when any badge type cannot report its inputs, in which
+        case the item must be rendered.
+        """
+        processors = self._get_processors()
+        inputs: Dict[str, Any] = {"badge_types": list(badge_types)}
+        
+        for badge_type in badge_types:
+            processor = processors.get(badge_type)
+            if processor is None:
+                return None
+            try:
+                badge_inputs = await processor.get_fingerprint_inputs(jellyfin_id, db_session)
+            except Exception as e:
+                self.logger.warning(f"⚠️ [FINGERPRINT] {badge_type} inputs unavailable for {jellyfin_id}: {e}")
+                return None
+            if badge_inputs is None:
+                return None
+            inputs[badge_type] = {key: _jsonable(value) for key, value in badge_inputs.items()}
+        
+        encoded = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def fingerprint(original_hash: str, inputs_digest: str) -> str:
+        """Render fingerprint of an original poster rendered with the given inputs"""
+        return hashlib.sha256(f"{original_hash}:{inputs_digest}".encode("utf-8")).hexdigest()
+    
+    async def matches(self, db_session: AsyncSession, jellyfin_id: str, fingerprint: str) -> bool:
+        """Whether the item's last upload was rendered with this fingerprint"""
+        row = await db_session.get(RenderFingerprintModel, jellyfin_id)
+        return row is not None and row.fingerprint == fingerprint
+    
+    async def record(self, db_session: AsyncSession, jellyfin_id: str, fingerprint: str, badge_types: List[str]) -> None:
+        """Remember the fingerprint of a poster that was just uploaded"""
+        stmt = insert(RenderFingerprintModel).values(
+            jellyfin_id=jellyfin_id,
+            fingerprint=fingerprint,
+            badge_types=list(badge_types)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["jellyfin_id"],
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                "badge_types": stmt.excluded.badge_types,
+                "rendered_at": func.now()
+            }
+        )
+        await db_session.execute(stmt)
+        await db_session.commit()
+    
+    async def forget(self, jellyfin_id: str, db_session: Optional[AsyncSession] = None) -> None:
+        """Drop an item's fingerprint after its poster was restored or replaced"""
+        stmt = delete(RenderFingerprintModel).where(RenderFingerprintModel.jellyfin_id == jellyfin_id)
+        if db_session is not None:
+            await db_session.execute(stmt)
+            await db_session.commit()
+            return
+        
+        session_factory = database.async_session_factory
+        if session_factory is None:
+            return
+        async with session_factory() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+
+# Global fingerprint service instance
+_render_fingerprint_service: Optional[RenderFingerprintService] = None
+
+def get_render_fingerprint_service() -> RenderFingerprintService:
+    """Get global render fingerprint service instance"""
+    global _render_fingerprint_service
+    if _render_fingerprint_service is None:
+        _render_fingerprint_service = RenderFingerprintService()
+    return _render_fingerprint_service
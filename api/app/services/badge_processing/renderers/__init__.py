@@ -8,10 +8,14 @@ from .badge_renderer import UnifiedBadgeRenderer
 from .font_manager import FontManager
 from .color_utils import ColorUtils
 from .positioning import BadgePositioning
+from .compositor import BadgeCompositor, BadgeLayer, BadgeLayerResult
 
 __all__ = [
     'UnifiedBadgeRenderer',
     'FontManager', 
     'ColorUtils',
-    'BadgePositioning'
+    'BadgePositioning',
+    'BadgeCompositor',
+    'BadgeLayer',
+    'BadgeLayerResult'
 ]
@@ -0,0 +1,222 @@
+"""
+Badge Asset Registry
+
+Process-wide index of badge image and font directories plus caches of
+decoded images and loaded fonts. Directories are scanned once and only
+rescanned when their mtime changes (checked at most every few seconds),
+so badge lookups no longer walk the filesystem for every poster.
+
+Images returned by load_image are shared and must be treated as read-only.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageFont
+from aphrodite_logging import get_logger
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.svg')
+
+# Asset roots indexed when the registry is created
+DEFAULT_IMAGE_ROOTS = ["/app/images", "/app/assets/images", "/app/static/images"]
+DEFAULT_FONT_DIRECTORIES = [
+    "/app/assets/fonts",
+    "/app/fonts",
+    "/usr/share/fonts",
+    "/usr/share/fonts/truetype",
+    "/usr/share/fonts/TTF",
+    "/System/Library/Fonts",  # macOS
+    "C:/Windows/Fonts"       # Windows
+]
+
+
+class _DirectoryIndex:
+    """File names of one directory, exact and lower-cased"""
+    
+    def __init__(self, path: Path, mtime: float):
+        self.path = path
+        self.mtime = mtime
+        self.files: Dict[str, Path] = {}
+        self.lower: Dict[str, Path] = {}
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    file_path = path / entry.name
+                    self.files[entry.name] = file_path
+                    self.lower.setdefault(entry.name.lower(), file_path)
+    
+    def find(self, name: str) -> Optional[Path]:
+        return self.files.get(name) or self.lower.get(name.lower())
+
+
+class AssetRegistry:
+    """Indexed lookup and caching of badge images and fonts"""
+    
+    def __init__(self, refresh_interval: float = 10.0, max_images: int = 128):
+        self.logger = get_logger("aphrodite.badge.assets", service="badge")
+        self.refresh_interval = refresh_interval
+        self.max_images = max_images
+        self._lock = threading.RLock()
+        
+        # Absolute directory path -> index (None when the directory does not exist)
+        self._directories: Dict[str, Tuple[float, Optional[_DirectoryIndex]]] = {}
+        self._images: "OrderedDict[Path, Image.Image]" = OrderedDict()
+        self._fonts: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+        
+        # Shared by every FontManager: "<font>_<size>" -> loaded font (incl. fallbacks)
+        self.font_cache: Dict[str, ImageFont.FreeTypeFont] = {}
+    
+    def index_tree(self, root: str) -> int:
+        """Index a directory and its immediate subdirectories; returns files indexed"""
+        count = 0
+        index = self._get_index(root)
+        if index is None:
+            return 0
+        count += len(index.files)
+        with os.scandir(index.path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    sub_index = self._get_index(os.path.join(index.path, entry.name))
+                    count += len(sub_index.files) if sub_index else 0
+        return count
+    
+    def find_file(self, directory: str, name: str, extensions: Tuple[str, ...] = IMAGE_EXTENSIONS) -> Optional[Path]:
+        """
+        Find a file in a directory: exact name, then case-insensitive name,
+        then the same stem with each of the given extensions.
+        """
+        subdirectory, name = os.path.split(name)
+        if subdirectory:
+            directory = os.path.join(directory, subdirectory)
+        index = self._get_index(directory)
+        if index is None:
+            return None
+        
+        found = index.find(name)
+        if found:
+            return found
+        
+        stem = Path(name).stem
+        for ext in extensions:
+            found = index.find(f"{stem}{ext}")
+            if found:
+                return found
+        return None
+    
+    def list_files(self, directory: str, suffix: Optional[str] = None) -> List[Path]:
+        """Files in a directory, optionally filtered by (case-insensitive) suffix"""
+        index = self._get_index(directory)
+        if index is None:
+            return []
+        files = index.files.values()
+        if suffix:
+            files = [path for path in files if path.suffix.lower() == suffix.lower()]
+        return sorted(files)
+    
+    def directory_exists(self, directory: str) -> bool:
+        return self._get_index(directory) is not None
+    
+    def load_image(self, path: Path) -> Image.Image:
+        """Decode an image as RGBA once and share it (read-only)"""
+        path = Path(path)
+        with self._lock:
+            image = self._images.get(path)
+            if image is not None:
+                self._images.move_to_end(path)
+                return image
+        
+        with Image.open(path) as source:
+            image = source.convert('RGBA')
+        
+        with self._lock:
+            self._images[path] = image
+            while len(self._images) > self.max_images:
+                self._images.popitem(last=False)
+        return image
+    
+    def find_font(self, font_name: str, font_directories: List[str]) -> Optional[Path]:
+        """Resolve a font file name (or absolute path) against the font directories"""
+        if os.path.isabs(font_name):
+            return self.find_file(os.path.dirname(font_name), os.path.basename(font_name), extensions=())
+        for directory in font_directories:
+            if os.sep in font_name or (os.altsep and os.altsep in font_name):
+                # Relative names may point into subdirectories (e.g. dejavu/DejaVuSans.ttf)
+                found = self.find_file(directory, font_name, extensions=())
+                if found:
+                    return found
+                continue
+            index = self._get_index(directory)
+            if index is not None and font_name in index.files:
+                return index.files[font_name]
+        return None
+    
+    def get_font(self, path: Path, size: int) -> ImageFont.FreeTypeFont:
+        """Load a TrueType/OpenType font once per size"""
+        key = (str(path), size)
+        with self._lock:
+            font = self._fonts.get(key)
+        if font is None:
+            font = ImageFont.truetype(str(path), size)
+            with self._lock:
+                self._fonts[key] = font
+        return font
+    
+    def clear(self) -> None:
+        """Forget all indexes, images and fonts"""
+        with self._lock:
+            self._directories.clear()
+            self._images.clear()
+            self._fonts.clear()
+            self.font_cache.clear()
+    
+    def _get_index(self, directory: str) -> Optional[_DirectoryIndex]:
+        """Directory index, rescanned when the directory's mtime changes"""
+        key = os.path.abspath(directory)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._directories.get(key)
+            if cached is not None and now - cached[0] < self.refresh_interval:
+                return cached[1]
+            
+            try:
+                mtime = os.stat(key).st_mtime
+            except OSError:
+                self._directories[key] = (now, None)
+                return None
+            
+            index = cached[1] if cached is not None else None
+            if index is None or index.mtime != mtime:
+                try:
+                    index = _DirectoryIndex(Path(key), mtime)
+                except OSError as e:
+                    self.logger.warning(f"⚠️ [ASSETS] Cannot index {key}: {e}")
+                    self._directories[key] = (now, None)
+                    return None
+                # Files in a changed directory may have been replaced
+                for path in [p for p in self._images if p.parent == index.path]:
+                    del self._images[path]
+                self.logger.debug(f"📁 [ASSETS] Indexed {len(index.files)} files in {key}")
+            
+            self._directories[key] = (now, index)
+            return index
+
+
+# Global registry instance
+_asset_registry: Optional[AssetRegistry] = None
+
+def get_asset_registry() -> AssetRegistry:
+    """Get global asset registry, indexing the standard asset directories on first use"""
+    global _asset_registry
+    if _asset_registry is None:
+        registry = AssetRegistry()
+        indexed = sum(registry.index_tree(root) for root in DEFAULT_IMAGE_ROOTS)
+        for directory in DEFAULT_FONT_DIRECTORIES:
+            registry.directory_exists(directory)
+        registry.logger.info(f"📁 [ASSETS] Asset registry ready ({indexed} image files indexed)")
+        _asset_registry = registry
+    return _asset_registry
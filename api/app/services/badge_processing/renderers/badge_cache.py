@@ -0,0 +1,153 @@
+"""
+Badge Image Cache
+
+Process-wide LRU cache of finished RGBA badge images keyed by badge content
+and a hash of the settings sections that affect how a badge looks. A library
+only has a few dozen distinct badges, so after warm-up badge creation is a
+dictionary lookup. Optionally persists badges as PNGs so new worker
+processes start warm.
+
+Cached images are shared between posters and must be treated as read-only.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from PIL import Image
+from aphrodite_logging import get_logger
+
+
+# Bump when badge drawing code changes so persisted badges are not reused
+RENDER_VERSION = 1
+
+# Settings sections that change badge appearance (position lives in General
+# too, which only costs a re-render when it changes)
+APPEARANCE_SECTIONS = ("General", "Text", "ImageBadges", "Background", "Border", "Shadow")
+
+
+class BadgeImageCache:
+    """LRU cache of rendered badge images with optional PNG persistence"""
+    
+    def __init__(self, max_items: int = 256, cache_dir: Optional[str] = None):
+        self.logger = get_logger("aphrodite.badge.cache", service="badge")
+        self.max_items = max_items
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._images: "OrderedDict[str, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def make_key(self, kind: str, content: Any, settings: Dict[str, Any]) -> str:
+        """Hash badge kind, content and appearance settings into a cache key"""
+        relevant = {section: settings.get(section) for section in APPEARANCE_SECTIONS}
+        raw = json.dumps(
+            {"v": RENDER_VERSION, "kind": kind, "content": content, "settings": relevant},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def get_or_render(
+        self,
+        kind: str,
+        content: Any,
+        settings: Dict[str, Any],
+        render: Callable[[], Optional[Image.Image]]
+    ) -> Optional[Image.Image]:
+        """Return a cached badge or render it; failed renders (None) are not cached"""
+        if self.max_items <= 0:
+            return render()
+        
+        key = self.make_key(kind, content, settings)
+        
+        badge = self._get(key)
+        if badge is not None:
+            self.hits += 1
+            return badge
+        
+        self.misses += 1
+        badge = self._load_from_disk(key)
+        if badge is None:
+            badge = render()
+            if badge is None:
+                return None
+            self._save_to_disk(key, badge)
+        
+        self._put(key, badge)
+        return badge
+    
+    def clear(self) -> None:
+        """Drop all in-memory badges"""
+        with self._lock:
+            self._images.clear()
+        self.logger.debug("Badge image cache cleared")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        return {
+            "size": len(self._images),
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "persistent": self.cache_dir is not None
+        }
+    
+    def _get(self, key: str) -> Optional[Image.Image]:
+        with self._lock:
+            badge = self._images.get(key)
+            if badge is not None:
+                self._images.move_to_end(key)
+            return badge
+    
+    def _put(self, key: str, badge: Image.Image) -> None:
+        with self._lock:
+            self._images[key] = badge
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_items:
+                self._images.popitem(last=False)
+    
+    def _load_from_disk(self, key: str) -> Optional[Image.Image]:
+        if not self.cache_dir:
+            return None
+        path = self.cache_dir / f"{key}.png"
+        if not path.exists():
+            return None
+        try:
+            with Image.open(path) as stored:
+                return stored.convert("RGBA")
+        except Exception as e:
+            self.logger.warning(f"⚠️ [BADGE CACHE] Ignoring unreadable cached badge {path.name}: {e}")
+            return None
+    
+    def _save_to_disk(self, key: str, badge: Image.Image) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{key}.png"
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            badge.save(tmp_path, "PNG")
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.warning(f"⚠️ [BADGE CACHE] Could not persist badge: {e}")
+
+
+# Global cache instance
+_badge_image_cache: Optional[BadgeImageCache] = None
+
+def get_badge_image_cache() -> BadgeImageCache:
+    """Get global badge image cache instance"""
+    global _badge_image_cache
+    if _badge_image_cache is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+        _badge_image_cache = BadgeImageCache(
+            max_items=settings.badge_image_cache_size,
+            cache_dir=settings.badge_image_cache_dir or None
+        )
+    return _badge_image_cache
@@ -12,6 +12,9 @@ from aphrodite_logging import get_logger
 from .font_manager import FontManager
 from .color_utils import ColorUtils
 from .positioning import BadgePositioning
+from .compositor import BadgeCompositor, BadgeLayer
+from .badge_cache import get_badge_image_cache
+from .asset_registry import get_asset_registry, DEFAULT_IMAGE_ROOTS
 
 
 class UnifiedBadgeRenderer:
@@ -22,13 +25,16 @@ class UnifiedBadgeRenderer:
         self.font_manager = FontManager()
         self.color_utils = ColorUtils()
         self.positioning = BadgePositioning()
+        self.compositor = BadgeCompositor()
+        
+        # Finished badges are shared by every renderer in the process
+        self.badge_cache = get_badge_image_cache()
+        
+        # Indexed image directories and decoded badge images, shared process-wide
+        self.assets = get_asset_registry()
         
         # Standard image paths in Docker container
-        self.image_paths = [
-            "/app/images",
-            "/app/assets/images",
-            "/app/static/images"
-        ]
+        self.image_paths = list(DEFAULT_IMAGE_ROOTS)
     
     def create_text_badge(
         self, 
@@ -36,7 +42,19 @@ class UnifiedBadgeRenderer:
         settings: Dict[str, Any],
         badge_type: str = "generic"
     ) -> Image.Image:
-        """Create a text-based badge"""
+        """Create a text-based badge (cached; treat the result as read-only)"""
+        return self.badge_cache.get_or_render(
+            "text", [text, badge_type], settings,
+            lambda: self._render_text_badge(text, settings, badge_type)
+        )
+    
+    def _render_text_badge(
+        self, 
+        text: str, 
+        settings: Dict[str, Any],
+        badge_type: str = "generic"
+    ) -> Image.Image:
+        """Draw a text-based badge"""
         try:
             self.logger.debug(f"🔨 [V2 RENDERER] Creating text badge: '{text}' ({badge_type})")
             
@@ -149,7 +167,19 @@ class UnifiedBadgeRenderer:
         settings: Dict[str, Any],
         badge_type: str = "generic"
     ) -> Optional[Image.Image]:
-        """Create an image-based badge with full database styling applied"""
+        """Create an image-based badge (cached; treat the result as read-only)"""
+        return self.badge_cache.get_or_render(
+            "image", [image_name, badge_type], settings,
+            lambda: self._render_image_badge(image_name, settings, badge_type)
+        )
+    
+    def _render_image_badge(
+        self, 
+        image_name: str, 
+        settings: Dict[str, Any],
+        badge_type: str = "generic"
+    ) -> Optional[Image.Image]:
+        """Draw an image-based badge with full database styling applied"""
         try:
             self.logger.debug(f"🔨 [V2 RENDERER] Creating image badge: '{image_name}' ({badge_type})")
             
@@ -159,8 +189,8 @@ class UnifiedBadgeRenderer:
                 self.logger.warning(f"⚠️ [V2 RENDERER] Image not found: {image_name}")
                 return None
             
-            # Load image
-            badge_image = Image.open(image_path).convert('RGBA')
+            # Load image (shared, read-only)
+            badge_image = self.assets.load_image(image_path)
             
             # Get ALL settings sections from database
             general = settings.get('General', {})
@@ -284,7 +314,19 @@ class UnifiedBadgeRenderer:
         percentage_text: str,
         settings: Dict[str, Any]
     ) -> Optional[Image.Image]:
-        """Create a review badge with logo image and percentage text overlay - FULLY USER CONFIGURABLE"""
+        """Create a review badge (cached; treat the result as read-only)"""
+        return self.badge_cache.get_or_render(
+            "review", [image_name, percentage_text], settings,
+            lambda: self._render_review_badge(image_name, percentage_text, settings)
+        )
+    
+    def _render_review_badge(
+        self, 
+        image_name: str, 
+        percentage_text: str,
+        settings: Dict[str, Any]
+    ) -> Optional[Image.Image]:
+        """Draw a review badge with logo image and percentage text overlay - FULLY USER CONFIGURABLE"""
         try:
             self.logger.debug(f"🔨 [V2 RENDERER] Creating review badge: '{image_name}' with text '{percentage_text}'")
             
@@ -318,8 +360,8 @@ class UnifiedBadgeRenderer:
                 else:
                     return None
             
-            # Load logo image
-            logo_image = Image.open(image_path).convert('RGBA')
+            # Load logo image (shared, read-only)
+            logo_image = self.assets.load_image(image_path)
             
             # =====================================================================
             # ALL SIZING AND SPACING FROM USER'S DATABASE SETTINGS
@@ -483,36 +525,56 @@ class UnifiedBadgeRenderer:
     def _find_review_image_file(self, filename: str, image_directory: str) -> Optional[Path]:
         """Find review image file in specified directory"""
         try:
-            directory = Path(image_directory)
-            if directory.exists():
-                # Try direct file match
-                image_file = directory / filename
-                if image_file.exists():
-                    return image_file
-                
-                # Try with different cases
-                for file in directory.iterdir():
-                    if file.name.lower() == filename.lower():
-                        return file
-                
-                # Try without extension and add common extensions
-                name_without_ext = Path(filename).stem
-                for ext in ['.png', '.jpg', '.jpeg', '.svg']:
-                    image_file = directory / f"{name_without_ext}{ext}"
-                    if image_file.exists():
-                        return image_file
-                    
-                    # Try case-insensitive
-                    for file in directory.iterdir():
-                        if file.stem.lower() == name_without_ext.lower() and file.suffix.lower() == ext:
-                            return file
-            
-            return None
+            return self.assets.find_file(image_directory, filename)
             
         except Exception as e:
             self.logger.error(f"Error finding review image file {filename}: {e}")
             return None
     
+    def position_badge(
+        self,
+        poster_size: Tuple[int, int],
+        badge: Image.Image,
+        settings: Dict[str, Any]
+    ) -> BadgeLayer:
+        """Calculate where a single badge goes on a poster of the given size"""
+        poster_width, poster_height = poster_size
+        
+        # Get position settings
+        general = settings.get('General', {})
+        position = general.get('general_badge_position', 'top-right')
+        base_edge_padding = general.get('general_edge_padding', 30)
+        
+        # Calculate dynamic padding
+        edge_padding = self.positioning.calculate_dynamic_padding(
+            poster_width, poster_height, base_edge_padding
+        )
+        
+        # Calculate badge position
+        coords = self.positioning.calculate_badge_position(
+            (poster_width, poster_height),
+            (badge.width, badge.height),
+            position,
+            edge_padding
+        )
+        
+        return BadgeLayer(image=badge, position=coords)
+    
+    def position_badges(
+        self,
+        poster_size: Tuple[int, int],
+        badges: List[Image.Image],
+        settings: Dict[str, Any]
+    ) -> List[BadgeLayer]:
+        """Calculate the multi-badge layout for a poster of the given size"""
+        badge_sizes = [(badge.width, badge.height) for badge in badges]
+        positions = self.positioning.calculate_multi_badge_layout(
+            poster_size,
+            badge_sizes,
+            settings
+        )
+        return [BadgeLayer(image=badge, position=position) for badge, position in zip(badges, positions)]
+    
     def apply_badge_to_poster(
         self,
         poster_path: str, 
@@ -525,34 +587,14 @@ class UnifiedBadgeRenderer:
             self.logger.debug(f"🔨 [V2 RENDERER] Applying badge to poster: {poster_path} -> {output_path}")
             
             # Load poster
-            poster = Image.open(poster_path).convert("RGBA")
-            
-            # Get position settings
-            general = settings.get('General', {})
-            position = general.get('general_badge_position', 'top-right')
-            base_edge_padding = general.get('general_edge_padding', 30)
-            
-            # Calculate dynamic padding
-            edge_padding = self.positioning.calculate_dynamic_padding(
-                poster.width, poster.height, base_edge_padding
-            )
-            
-            # Calculate badge position
-            coords = self.positioning.calculate_badge_position(
-                (poster.width, poster.height),
-                (badge.width, badge.height),
-                position,
-                edge_padding
-            )
-            
-            # Apply badge to poster
-            poster.paste(badge, coords, badge)
+            poster = self.compositor.load_canvas(poster_path)
             
-            # Ensure output directory exists
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            # Position and apply badge
+            layer = self.position_badge(poster.size, badge, settings)
+            self.compositor.composite(poster, [layer])
             
             # Save final poster
-            poster.convert("RGB").save(output_path, "JPEG", quality=95)
+            self.compositor.save(poster, output_path)
             
             self.logger.debug(f"✅ [V2 RENDERER] Badge applied successfully to: {output_path}")
             return True
@@ -577,25 +619,14 @@ class UnifiedBadgeRenderer:
             self.logger.debug(f"🔨 [V2 RENDERER] Applying {len(badges)} badges to poster: {poster_path}")
             
             # Load poster
-            poster = Image.open(poster_path).convert("RGBA")
+            poster = self.compositor.load_canvas(poster_path)
             
-            # Calculate positions for all badges
-            badge_sizes = [(badge.width, badge.height) for badge in badges]
-            positions = self.positioning.calculate_multi_badge_layout(
-                (poster.width, poster.height),
-                badge_sizes,
-                settings
-            )
-            
-            # Apply each badge
-            for badge, position in zip(badges, positions):
-                poster.paste(badge, position, badge)
-            
-            # Ensure output directory exists
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            # Position and apply each badge
+            layers = self.position_badges(poster.size, badges, settings)
+            self.compositor.composite(poster, layers)
             
             # Save final poster
-            poster.convert("RGB").save(output_path, "JPEG", quality=95)
+            self.compositor.save(poster, output_path)
             
             self.logger.debug(f"✅ [V2 RENDERER] {len(badges)} badges applied successfully to: {output_path}")
             return True
@@ -657,33 +688,10 @@ class UnifiedBadgeRenderer:
                     unique_paths.append(path)
             
             for path_str in unique_paths:
-                path = Path(path_str)
-                if path.exists():
-                    # Try direct file match
-                    image_file = path / image_name
-                    if image_file.exists():
-                        self.logger.debug(f"🔍 [V2 RENDERER] Found image: {image_file}")
-                        return image_file
-                    
-                    # Try case-insensitive match
-                    for file in path.iterdir():
-                        if file.name.lower() == image_name.lower():
-                            self.logger.debug(f"🔍 [V2 RENDERER] Found image (case-insensitive): {file}")
-                            return file
-                    
-                    # Try with different extensions
-                    name_without_ext = Path(image_name).stem
-                    for ext in ['.png', '.jpg', '.jpeg', '.svg']:
-                        image_file = path / f"{name_without_ext}{ext}"
-                        if image_file.exists():
-                            self.logger.debug(f"🔍 [V2 RENDERER] Found image with extension: {image_file}")
-                            return image_file
-                        
-                        # Try case-insensitive with extension
-                        for file in path.iterdir():
-                            if file.stem.lower() == name_without_ext.lower() and file.suffix.lower() == ext:
-                                self.logger.debug(f"🔍 [V2 RENDERER] Found image (case-insensitive + ext): {file}")
-                                return file
+                image_file = self.assets.find_file(path_str, image_name)
+                if image_file:
+                    self.logger.debug(f"🔍 [V2 RENDERER] Found image: {image_file}")
+                    return image_file
             
             self.logger.warning(f"⚠️ [V2 RENDERER] Image not found: {image_name} in paths: {unique_paths[:3]}...")
             return None
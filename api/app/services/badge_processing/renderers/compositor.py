@@ -0,0 +1,57 @@
+"""
+Badge Compositor
+
+In-memory poster compositing for the V2 pipeline. Processors hand back
+positioned badge layers and the poster is encoded exactly once at the end.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PIL import Image
+from aphrodite_logging import get_logger
+
+
+@dataclass
+class BadgeLayer:
+    """A finished RGBA badge image and its top-left position on the poster"""
+    image: Image.Image
+    position: Tuple[int, int]
+
+
+@dataclass
+class BadgeLayerResult:
+    """Result of rendering one badge type as layers instead of a poster file"""
+    layers: List[BadgeLayer] = field(default_factory=list)
+    applied_badges: List[str] = field(default_factory=list)
+    success: bool = True
+    error: Optional[str] = None
+
+
+class BadgeCompositor:
+    """Composites badge layers onto an in-memory poster canvas"""
+
+    JPEG_QUALITY = 95
+
+    def __init__(self):
+        self.logger = get_logger("aphrodite.badge.compositor", service="badge")
+
+    def load_canvas(self, poster_path: str) -> Image.Image:
+        """Open a poster file as an RGBA canvas"""
+        with Image.open(poster_path) as image:
+            return image.convert("RGBA")
+
+    def composite(self, canvas: Image.Image, layers: List[BadgeLayer]) -> Image.Image:
+        """Paste layers onto the canvas in place and return it"""
+        for layer in layers:
+            canvas.paste(layer.image, layer.position, layer.image)
+        self.logger.debug(f"🧩 [V2 COMPOSITOR] Composited {len(layers)} layers")
+        return canvas
+
+    def save(self, canvas: Image.Image, output_path: str) -> str:
+        """Encode the canvas as JPEG - the only encode in the compositing path"""
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        canvas.convert("RGB").save(output_path, "JPEG", quality=self.JPEG_QUALITY)
+        self.logger.debug(f"💾 [V2 COMPOSITOR] Saved composited poster: {output_path}")
+        return output_path
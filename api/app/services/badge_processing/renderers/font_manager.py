@@ -5,28 +5,24 @@ Pure V2 font loading and text measurement utilities.
 """
 
 from typing import Optional, Dict, Tuple
-from pathlib import Path
 from PIL import ImageFont, ImageDraw, Image
 from aphrodite_logging import get_logger
 
+from .asset_registry import get_asset_registry, DEFAULT_FONT_DIRECTORIES
+
 
 class FontManager:
     """Pure V2 font management utilities"""
     
     def __init__(self):
         self.logger = get_logger("aphrodite.badge.fonts", service="badge")
-        self._font_cache: Dict[str, ImageFont.FreeTypeFont] = {}
+        self.assets = get_asset_registry()
+        
+        # Loaded fonts are shared by every FontManager in the process
+        self._font_cache: Dict[str, ImageFont.FreeTypeFont] = self.assets.font_cache
         
         # Standard font paths in Docker container
-        self.font_paths = [
-            "/app/assets/fonts",
-            "/app/fonts", 
-            "/usr/share/fonts",
-            "/usr/share/fonts/truetype",
-            "/usr/share/fonts/TTF",
-            "/System/Library/Fonts",  # macOS
-            "C:/Windows/Fonts"       # Windows
-        ]
+        self.font_paths = list(DEFAULT_FONT_DIRECTORIES)
     
     def load_font(self, font_name: str, size: int, fallback_font: str = "DejaVuSans.ttf") -> ImageFont.FreeTypeFont:
         """Load font with fallback support"""
@@ -61,13 +57,11 @@ class FontManager:
     def _load_font_file(self, font_name: str, size: int) -> Optional[ImageFont.FreeTypeFont]:
         """Try to load font file from various paths"""
         try:
-            # Try each font path
-            for font_path in self.font_paths:
-                font_file_path = Path(font_path) / font_name
-                
-                if font_file_path.exists():
-                    self.logger.debug(f"Loading font: {font_file_path}")
-                    return ImageFont.truetype(str(font_file_path), size)
+            # Look the font up in the indexed font paths
+            font_file_path = self.assets.find_font(font_name, self.font_paths)
+            if font_file_path:
+                self.logger.debug(f"Loading font: {font_file_path}")
+                return self.assets.get_font(font_file_path, size)
             
             # Try loading directly by name (system font)
             try:
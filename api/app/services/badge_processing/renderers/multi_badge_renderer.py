@@ -10,6 +10,7 @@ from aphrodite_logging import get_logger
 
 from .badge_renderer import UnifiedBadgeRenderer
 from .positioning import BadgePositioning
+from .compositor import BadgeLayer
 
 
 class V2MultiBadgeRenderer:
@@ -72,6 +73,18 @@ class V2MultiBadgeRenderer:
             self.logger.error(f"❌ [V2 MULTI RENDERER] Error creating review badges: {e}", exc_info=True)
             return []
     
+    def create_review_badge_layers(
+        self,
+        poster_size: Tuple[int, int],
+        reviews: List[Dict[str, Any]],
+        settings: Dict[str, Any]
+    ) -> List[BadgeLayer]:
+        """Create review badges laid out for a poster of the given size"""
+        badges = self.create_review_badges(reviews, settings)
+        if not badges:
+            return []
+        return self.unified_renderer.position_badges(poster_size, badges, settings)
+    
     def apply_review_badges_to_poster(
         self,
         poster_path: str,
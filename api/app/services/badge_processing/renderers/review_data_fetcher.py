@@ -8,12 +8,13 @@ Coordinates individual fetchers for each review source.
 from typing import Dict, Any, Optional, List
 import hashlib
 from pathlib import Path
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from aphrodite_logging import get_logger
 from .review_fetchers import (
     IMDbFetcher, TMDbFetcher, RottenTomatoesFetcher, 
     MetacriticFetcher, MDBListFetcher, MyAnimeListFetcher,
-    SharedOMDbFetcher
+    get_shared_omdb_fetcher
 )
 
 
@@ -24,7 +25,7 @@ class V2ReviewDataFetcher:
         self.logger = get_logger("aphrodite.badge.review.fetcher.v2", service="badge")
         
         # Initialize shared OMDb fetcher and individual fetchers
-        self.shared_omdb = SharedOMDbFetcher()
+        self.shared_omdb = get_shared_omdb_fetcher()
         self.imdb_fetcher = IMDbFetcher()
         self.tmdb_fetcher = TMDbFetcher()
         self.rt_fetcher = RottenTomatoesFetcher()
@@ -32,12 +33,24 @@ class V2ReviewDataFetcher:
         self.mdblist_fetcher = MDBListFetcher()
         self.mal_fetcher = MyAnimeListFetcher()
         
+        # Sources read from the one shared OMDb response, keyed by their enable flag
+        self.omdb_sources = {
+            'enable_imdb': self.imdb_fetcher,
+            'enable_rotten_tomatoes_critics': self.rt_fetcher,
+            'enable_metacritic': self.metacritic_fetcher
+        }
+        
         # API keys loaded from PostgreSQL
         self.omdb_api_key = None
         self.tmdb_api_key = None
         self._api_keys_loaded = False
     
-    async def get_reviews_for_media(self, jellyfin_id: str, settings: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def get_reviews_for_media(
+        self,
+        jellyfin_id: str,
+        settings: Dict[str, Any],
+        db_session: Optional[AsyncSession] = None
+    ) -> List[Dict[str, Any]]:
         """Get review data for media using pure V2 methods"""
         try:
             self.logger.info(f"🔍 [V2 REVIEW FETCHER] Getting reviews for: {jellyfin_id}")
@@ -67,17 +80,14 @@ class V2ReviewDataFetcher:
             # Collect reviews from enabled sources
             reviews = []
             
-            # Fetch shared OMDb data once if we need it for any OMDb-based sources
+            # Fetch shared OMDb data once if we need it for any OMDb-based sources;
+            # every OMDb-derived fetcher reads this payload instead of calling OMDb
             omdb_data = None
-            needs_omdb = (imdb_id and (
-                sources.get('enable_imdb', True) or 
-                sources.get('enable_rotten_tomatoes_critics', True) or 
-                sources.get('enable_metacritic', True)
-            ))
+            needs_omdb = imdb_id and any(sources.get(flag, True) for flag in self.omdb_sources)
             
             if needs_omdb and self.omdb_api_key:
                 self.logger.info(f"✅ [V2 REVIEW FETCHER] Making single OMDb API call for: {imdb_id}")
-                omdb_data = await self.shared_omdb.fetch_omdb_data(imdb_id, self.omdb_api_key)
+                omdb_data = await self.shared_omdb.fetch_omdb_data(imdb_id, self.omdb_api_key, db_session)
                 if omdb_data:
                     self.logger.debug(f"✅ [V2 REVIEW FETCHER] OMDb data retrieved successfully for {imdb_id}")
                 else:
@@ -87,7 +97,7 @@ class V2ReviewDataFetcher:
             
             # Fetch IMDb rating if enabled
             if imdb_id and sources.get('enable_imdb', True):
-                review = await self.imdb_fetcher.fetch(imdb_id, self.omdb_api_key)
+                review = await self.imdb_fetcher.fetch(imdb_id, omdb_data)
                 if review:
                     reviews.append(review)
                     self.logger.debug(f"✅ [V2 REVIEW FETCHER] IMDb: {review['text']}")
@@ -99,7 +109,7 @@ class V2ReviewDataFetcher:
                 else:
                     self.logger.warning(f"❌ [V2 REVIEW FETCHER] No TMDb API key - TMDb fetch will fail: {tmdb_id}")
                 tmdb_media_type = "movie" if media_type == "movie" else "tv"
-                review = await self.tmdb_fetcher.fetch(tmdb_id, tmdb_media_type, self.tmdb_api_key)
+                review = await self.tmdb_fetcher.fetch(tmdb_id, tmdb_media_type, self.tmdb_api_key, db_session)
                 if review:
                     reviews.append(review)
                     self.logger.debug(f"✅ [V2 REVIEW FETCHER] TMDb: {review['text']}")
@@ -149,7 +159,7 @@ class V2ReviewDataFetcher:
             
             self.logger.info(f"✅ [V2 REVIEW FETCHER] Found {len(reviews)} reviews")
             return reviews
-            
+        
         except Exception as e:
             self.logger.error(f"❌ [V2 REVIEW FETCHER] Error getting reviews: {e}", exc_info=True)
             return []
@@ -246,7 +256,7 @@ class V2ReviewDataFetcher:
             
             self.logger.debug(f"🎭 [V2 REVIEW FETCHER] Generated {len(reviews)} demo reviews")
             return reviews
-            
+        
         except Exception as e:
             self.logger.error(f"❌ [V2 REVIEW FETCHER] Error generating demo reviews: {e}", exc_info=True)
             return []
@@ -329,7 +339,7 @@ class V2ReviewDataFetcher:
                 self.logger.warning("⚠️ [V2 REVIEW FETCHER] No API keys found in settings.yaml")
             
             self._api_keys_loaded = True
-            
+        
         except Exception as e:
             self.logger.error(f"❌ [V2 REVIEW FETCHER] Error loading API keys: {e}")
             self._api_keys_loaded = True  # Prevent infinite retries
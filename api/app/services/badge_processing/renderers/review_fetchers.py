@@ -2,162 +2,194 @@
 Review Source Fetchers - Individual API implementations
 """
 
+from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import hashlib
-import time
 import aiohttp
 from aphrodite_logging import get_logger
 
+from ..ratings_cache import RatingsUnavailable, get_ratings_cache
+
 
 class SharedOMDbFetcher:
     """Shared OMDb API fetcher to avoid multiple API calls"""
     
     def __init__(self):
         self.logger = get_logger("aphrodite.badge.review.fetcher.omdb", service="badge")
-        self.cache = {}
-        self.cache_expiration = 60 * 60  # 1 hour cache
     
-    async def fetch_omdb_data(self, imdb_id: str, api_key: str) -> Optional[Dict[str, Any]]:
-        """Fetch OMDb data once and cache it for all fetchers"""
+    async def fetch_omdb_data(
+        self,
+        imdb_id: str,
+        api_key: str,
+        db_session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch OMDb data once through the persistent ratings cache for all fetchers"""
+        try:
+            return await get_ratings_cache().get_or_fetch(
+                "omdb",
+                imdb_id,
+                lambda: self._call_omdb_api(imdb_id, api_key, db_session),
+                db_session
+            )
+        except Exception as e:
+            self.logger.error(f"❌ [SHARED OMDB] Error fetching data for {imdb_id}: {e}")
+            return None
+    
+    async def _call_omdb_api(
+        self,
+        imdb_id: str,
+        api_key: str,
+        db_session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Make the OMDb API call.
+        
+        Returns the payload, or None when OMDb has no entry for the ID.
+        Raises RatingsUnavailable for failures that should not be cached.
+        """
+        self.logger.debug(f"🌐 [SHARED OMDB] Making API call for {imdb_id}")
+        url = f"http://www.omdbapi.com/?i={imdb_id}&apikey={api_key}"
+        
         try:
-            cache_key = f"omdb_{imdb_id}"
-            if cache_key in self.cache:
-                entry = self.cache[cache_key]
-                if time.time() - entry["timestamp"] < self.cache_expiration:
-                    self.logger.debug(f"🔄 [SHARED OMDB] Using cached data for {imdb_id}")
-                    return entry["data"]
-            
-            self.logger.debug(f"🌐 [SHARED OMDB] Making API call for {imdb_id}")
-            url = f"http://www.omdbapi.com/?i={imdb_id}&apikey={api_key}"
-            
             async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
                 async with session.get(url) as response:
                     if response.status == 200:
                         data = await response.json()
                         if data.get("Response") == "True":
-                            # Cache the result
-                            self.cache[cache_key] = {
-                                "timestamp": time.time(),
-                                "data": data
-                            }
-                            self.logger.debug(f"✅ [SHARED OMDB] Successfully fetched and cached data for {imdb_id}")
+                            self.logger.debug(f"✅ [SHARED OMDB] Successfully fetched data for {imdb_id}")
                             return data
-                        else:
-                            error_msg = data.get('Error', 'Unknown error')
-                            if "Request limit reached" in error_msg:
-                                self.logger.error(f"🚫 [SHARED OMDB] OMDb API quota exceeded: {error_msg}")
-                            else:
-                                self.logger.warning(f"⚠️ [SHARED OMDB] OMDb returned error: {error_msg}")
-                    elif response.status == 401:
+                        
+                        error_msg = data.get('Error', 'Unknown error')
+                        if "Request limit reached" in error_msg:
+                            self.logger.error(f"🚫 [SHARED OMDB] OMDb API quota exceeded: {error_msg}")
+                            await get_ratings_cache().exhaust_budget("omdb", db_session)
+                            raise RatingsUnavailable(error_msg)
+                        if "not found" in error_msg.lower() or "incorrect imdb id" in error_msg.lower():
+                            self.logger.info(f"📊 [SHARED OMDB] No OMDb entry for {imdb_id}: {error_msg}")
+                            return None
+                        self.logger.warning(f"⚠️ [SHARED OMDB] OMDb returned error: {error_msg}")
+                        raise RatingsUnavailable(error_msg)
+                    
+                    if response.status == 401:
                         try:
                             data = await response.json()
                             error_msg = data.get('Error', 'Unauthorized')
-                            if "Request limit reached" in error_msg:
-                                self.logger.error(f"🚫 [SHARED OMDB] OMDb API quota exceeded (HTTP 401): {error_msg}")
-                            else:
-                                self.logger.error(f"🔒 [SHARED OMDB] OMDb API authentication failed: {error_msg}")
-                        except:
-                            self.logger.error(f"🔒 [SHARED OMDB] OMDb API returned HTTP 401 (likely quota exceeded)")
-                    else:
-                        self.logger.warning(f"⚠️ [SHARED OMDB] HTTP {response.status} for {imdb_id}")
-            
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"❌ [SHARED OMDB] Error fetching data for {imdb_id}: {e}")
-            return None
+                        except Exception:
+                            error_msg = "HTTP 401 (likely quota exceeded)"
+                        if "Request limit reached" in error_msg:
+                            self.logger.error(f"🚫 [SHARED OMDB] OMDb API quota exceeded (HTTP 401): {error_msg}")
+                            await get_ratings_cache().exhaust_budget("omdb", db_session)
+                        else:
+                            self.logger.error(f"🔒 [SHARED OMDB] OMDb API authentication failed: {error_msg}")
+                        raise RatingsUnavailable(error_msg)
+                    
+                    self.logger.warning(f"⚠️ [SHARED OMDB] HTTP {response.status} for {imdb_id}")
+                    raise RatingsUnavailable(f"HTTP {response.status}")
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise RatingsUnavailable(str(e) or type(e).__name__)
 
 
 class BaseReviewFetcher:
     """Base class for review fetchers"""
     
+    # Provider whose response this source is parsed from. The coordinator fetches
+    # each provider at most once per poster and hands the payload to every source.
+    provider: Optional[str] = None
+    
     def __init__(self):
         self.logger = get_logger("aphrodite.badge.review.fetcher", service="badge")
-        self.cache = {}
-        self.cache_expiration = 60 * 60  # 1 hour cache
 
 
-class IMDbFetcher(BaseReviewFetcher):
-    """IMDb rating fetcher using OMDb API"""
+class OMDbDerivedFetcher(BaseReviewFetcher, ABC):
+    """Base class for review sources read from a pre-fetched OMDb response"""
+    
+    provider = "omdb"
+    source_name = "OMDb"
+    log_prefix = "📊 [OMDB SOURCE]"
     
-    async def fetch(self, imdb_id: str, omdb_api_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
-        """Fetch IMDb rating - PRODUCTION: NO DEMO DATA"""
+    async def fetch(self, imdb_id: str, omdb_data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Read the rating from shared OMDb data (never calls OMDb itself)"""
         try:
-            cache_key = f"imdb_{imdb_id}"
-            if cache_key in self.cache:
-                entry = self.cache[cache_key]
-                if time.time() - entry["timestamp"] < self.cache_expiration:
-                    return entry["data"]
+            if not omdb_data:
+                self.logger.info(f"{self.log_prefix} No OMDb data provided for {imdb_id}")
+                return None
             
-            if not omdb_api_key:
-                self.logger.warning(f"❌ No OMDb API key available - using demo data for {imdb_id} (IMDb)")
-                return None  # NO DEMO DATA IN PRODUCTION
+            result = self.extract(omdb_data)
             
-            # Real API call only
-            omdb_data = await self._call_omdb_api(imdb_id, omdb_api_key)
-            if omdb_data and "imdbRating" in omdb_data and omdb_data["imdbRating"] != "N/A":
-                rating = float(omdb_data["imdbRating"])
-                percentage = int((rating / 10.0) * 100)
-                
-                result = {
-                    "source": "IMDb",
-                    "text": f"{percentage}%", 
-                    "score": percentage,
-                    "score_max": 100,
-                    "image_key": "IMDb"
-                }
-            else:
-                self.logger.info(f"📊 [IMDb] No rating data available for {imdb_id}")
+            # Don't show badge if no real data available (common for TV series)
+            if not result:
+                self.logger.info(f"{self.log_prefix} No {self.source_name} data available for {imdb_id} - badge will be skipped")
                 return None
             
-            # Cache result
-            self.cache[cache_key] = {
-                "timestamp": time.time(),
-                "data": result
-            }
-            
             return result
-            
+        
         except Exception as e:
-            self.logger.error(f"❌ Error fetching IMDb rating: {e}")
+            self.logger.error(f"❌ Error fetching {self.source_name}: {e}")
             return None
     
-    async def _call_omdb_api(self, imdb_id: str, api_key: str) -> Optional[Dict[str, Any]]:
-        """Make OMDb API call"""
-        try:
-            url = f"http://www.omdbapi.com/?i={imdb_id}&apikey={api_key}"
-            
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("Response") == "True":
-                            return data
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"❌ OMDb API error: {e}")
+    @abstractmethod
+    def extract(self, omdb_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build the review entry from an OMDb response"""
+        pass
+    
+    def _find_rating(self, omdb_data: Dict[str, Any], source: str) -> Optional[str]:
+        """Value of an entry in the OMDb Ratings list"""
+        for rating in omdb_data.get("Ratings") or []:
+            if rating.get("Source") == source:
+                return rating.get("Value")
+        return None
+
+
+class IMDbFetcher(OMDbDerivedFetcher):
+    """IMDb rating fetcher using OMDb data"""
+    
+    source_name = "IMDb"
+    log_prefix = "📊 [IMDb]"
+    
+    def extract(self, omdb_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rating = omdb_data.get("imdbRating")
+        if not rating or rating == "N/A":
             return None
+        
+        percentage = int((float(rating) / 10.0) * 100)
+        return {
+            "source": "IMDb",
+            "text": f"{percentage}%", 
+            "score": percentage,
+            "score_max": 100,
+            "image_key": "IMDb"
+        }
 
 
 class TMDbFetcher(BaseReviewFetcher):
     """TMDb rating fetcher"""
     
-    async def fetch(self, tmdb_id: str, media_type: str = "movie", tmdb_api_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    provider = "tmdb"
+    
+    async def fetch(
+        self,
+        tmdb_id: str,
+        media_type: str = "movie",
+        tmdb_api_key: Optional[str] = None,
+        db_session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
         """Fetch TMDb rating - PRODUCTION: NO DEMO DATA"""
         try:
-            cache_key = f"tmdb_{tmdb_id}_{media_type}"
-            if cache_key in self.cache:
-                entry = self.cache[cache_key]
-                if time.time() - entry["timestamp"] < self.cache_expiration:
-                    return entry["data"]
-            
             if not tmdb_api_key:
                 self.logger.warning(f"❌ No TMDb API key available - using demo data for {tmdb_id} (TMDb)")
                 return None  # NO DEMO DATA IN PRODUCTION
             
-            # Real API call only
-            rating = await self._call_tmdb_api(tmdb_id, media_type, tmdb_api_key)
+            # Real API call only, served from the ratings cache when possible
+            tmdb_data = await get_ratings_cache().get_or_fetch(
+                "tmdb",
+                f"{media_type}/{tmdb_id}",
+                lambda: self._call_tmdb_api(tmdb_id, media_type, tmdb_api_key),
+                db_session
+            )
+            rating = tmdb_data.get("vote_average") if tmdb_data else None
             if rating:
                 percentage = int(round(rating * 10))
             else:
@@ -172,174 +204,85 @@ class TMDbFetcher(BaseReviewFetcher):
                 "image_key": "TMDb"
             }
             
-            # Cache result
-            self.cache[cache_key] = {
-                "timestamp": time.time(),
-                "data": result
-            }
-            
             return result
-            
+        
         except Exception as e:
             self.logger.error(f"❌ Error fetching TMDb rating: {e}")
             return None
     
-    async def _call_tmdb_api(self, tmdb_id: str, media_type: str, api_key: str) -> Optional[float]:
-        """Make TMDb API call"""
+    async def _call_tmdb_api(self, tmdb_id: str, media_type: str, api_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Make TMDb API call.
+        
+        Returns the cacheable rating payload, or None when TMDb has no rating.
+        Raises RatingsUnavailable for failures that should not be cached.
+        """
+        url = f"https://api.themoviedb.org/3/{media_type}/{tmdb_id}"
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "accept": "application/json"
+        }
+        
         try:
-            url = f"https://api.themoviedb.org/3/{media_type}/{tmdb_id}"
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "accept": "application/json"
-            }
-            
             async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
                 async with session.get(url, headers=headers) as response:
                     if response.status == 200:
                         data = await response.json()
-                        if "vote_average" in data and data["vote_average"] > 0:
-                            return float(data["vote_average"])
-            return None
-            
-        except Exception as e:
+                        if data.get("vote_average") and data["vote_average"] > 0:
+                            return {
+                                "vote_average": float(data["vote_average"]),
+                                "vote_count": data.get("vote_count")
+                            }
+                        return None
+                    if response.status == 404:
+                        return None
+                    raise RatingsUnavailable(f"HTTP {response.status}")
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             self.logger.error(f"❌ TMDb API error: {e}")
-            return None
+            raise RatingsUnavailable(str(e) or type(e).__name__)
 
 
-class RottenTomatoesFetcher(BaseReviewFetcher):
+class RottenTomatoesFetcher(OMDbDerivedFetcher):
     """Rotten Tomatoes Critics rating fetcher"""
     
-    async def fetch(self, imdb_id: str, omdb_data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
-        """Fetch RT Critics rating from shared OMDb data"""
-        try:
-            cache_key = f"rt_{imdb_id}"
-            if cache_key in self.cache:
-                entry = self.cache[cache_key]
-                if time.time() - entry["timestamp"] < self.cache_expiration:
-                    return entry["data"]
-            
-            result = None
-            
-            if omdb_data:
-                # Use shared OMDb data
-                if "Ratings" in omdb_data:
-                    for rating in omdb_data["Ratings"]:
-                        if rating["Source"] == "Rotten Tomatoes":
-                            score = int(rating["Value"].rstrip("%"))
-                            result = {
-                                "source": "RT Critics",
-                                "text": f"{score}%",
-                                "score": score,
-                                "score_max": 100,
-                                "image_key": "RT-Crit-Fresh" if score >= 60 else "RT-Crit-Rotten"
-                            }
-                            break
-            else:
-                # No shared OMDb data available
-                self.logger.info(f"🍅 [RT FETCHER] No OMDb data provided for {imdb_id}")
-            
-            # Don't show badge if no real data available (common for TV series)
-            if not result:
-                self.logger.info(f"🍅 [RT FETCHER] No RT Critics data available for {imdb_id} - badge will be skipped")
-                return None
-            
-            # Cache result
-            if result:
-                self.cache[cache_key] = {
-                    "timestamp": time.time(),
-                    "data": result
-                }
-            
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"❌ Error fetching RT Critics: {e}")
-            return None
+    source_name = "RT Critics"
+    log_prefix = "🍅 [RT FETCHER]"
     
-    async def _call_omdb_api(self, imdb_id: str, api_key: str) -> Optional[Dict[str, Any]]:
-        """Make OMDb API call"""
-        try:
-            url = f"http://www.omdbapi.com/?i={imdb_id}&apikey={api_key}"
-            
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("Response") == "True":
-                            return data
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"❌ OMDb API error: {e}")
+    def extract(self, omdb_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        value = self._find_rating(omdb_data, "Rotten Tomatoes")
+        if not value:
             return None
+        
+        score = int(value.rstrip("%"))
+        return {
+            "source": "RT Critics",
+            "text": f"{score}%",
+            "score": score,
+            "score_max": 100,
+            "image_key": "RT-Crit-Fresh" if score >= 60 else "RT-Crit-Rotten"
+        }
 
 
-class MetacriticFetcher(BaseReviewFetcher):
+class MetacriticFetcher(OMDbDerivedFetcher):
     """Metacritic rating fetcher"""
     
-    async def fetch(self, imdb_id: str, omdb_data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
-        """Fetch Metacritic rating from shared OMDb data"""
-        try:
-            cache_key = f"meta_{imdb_id}"
-            if cache_key in self.cache:
-                entry = self.cache[cache_key]
-                if time.time() - entry["timestamp"] < self.cache_expiration:
-                    return entry["data"]
-            
-            result = None
-            
-            if omdb_data:
-                # Use shared OMDb data
-                if "Ratings" in omdb_data:
-                    for rating in omdb_data["Ratings"]:
-                        if rating["Source"] == "Metacritic":
-                            score = int(rating["Value"].split("/")[0])
-                            result = {
-                                "source": "Metacritic",
-                                "text": f"{score}%",
-                                "score": score,
-                                "score_max": 100,
-                                "image_key": "Metacritic"
-                            }
-                            break
-            else:
-                # No shared OMDb data available
-                self.logger.info(f"🎭 [METACRITIC FETCHER] No OMDb data provided for {imdb_id}")
-            
-            # Don't show badge if no real data available (common for TV series)
-            if not result:
-                self.logger.info(f"🎭 [METACRITIC FETCHER] No Metacritic data available for {imdb_id} - badge will be skipped")
-                return None
-            
-            # Cache result
-            if result:
-                self.cache[cache_key] = {
-                    "timestamp": time.time(),
-                    "data": result
-                }
-            
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"❌ Error fetching Metacritic: {e}")
-            return None
+    source_name = "Metacritic"
+    log_prefix = "🎭 [METACRITIC FETCHER]"
     
-    async def _call_omdb_api(self, imdb_id: str, api_key: str) -> Optional[Dict[str, Any]]:
-        """Make OMDb API call"""
-        try:
-            url = f"http://www.omdbapi.com/?i={imdb_id}&apikey={api_key}"
-            
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("Response") == "True":
-                            return data
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"❌ OMDb API error: {e}")
+    def extract(self, omdb_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        value = self._find_rating(omdb_data, "Metacritic")
+        if not value:
             return None
+        
+        score = int(value.split("/")[0])
+        return {
+            "source": "Metacritic",
+            "text": f"{score}%",
+            "score": score,
+            "score_max": 100,
+            "image_key": "Metacritic"
+        }
 
 
 class MDBListFetcher(BaseReviewFetcher):
@@ -363,7 +306,7 @@ class MDBListFetcher(BaseReviewFetcher):
                 "score_max": 100,
                 "image_key": "MDBList"
             }
-            
+        
         except Exception as e:
             self.logger.error(f"❌ Error fetching MDBList: {e}")
             return None
@@ -386,7 +329,18 @@ class MyAnimeListFetcher(BaseReviewFetcher):
                 "score_max": 100,
                 "image_key": "MyAnimeList"
             }
-            
+        
         except Exception as e:
             self.logger.error(f"❌ Error fetching MyAnimeList: {e}")
             return None
+
+
+# Global fetcher instance, shared by every review processor
+_shared_omdb_fetcher: Optional[SharedOMDbFetcher] = None
+
+def get_shared_omdb_fetcher() -> SharedOMDbFetcher:
+    """Get global shared OMDb fetcher instance"""
+    global _shared_omdb_fetcher
+    if _shared_omdb_fetcher is None:
+        _shared_omdb_fetcher = SharedOMDbFetcher()
+    return _shared_omdb_fetcher
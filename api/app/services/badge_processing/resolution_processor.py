@@ -134,7 +134,7 @@ class ResolutionBadgeProcessor(BaseBadgeProcessor):
             # Load from v2 database
             if db_session:
                 self.logger.debug("Loading resolution settings from v2 database")
-                settings = await badge_settings_service.get_resolution_settings(db_session, force_reload=True)
+                settings = await badge_settings_service.get_resolution_settings(db_session)
                 if settings and await badge_settings_service.validate_settings(settings, "resolution"):
                     self.logger.info("Successfully loaded resolution settings from v2 database")
                     return settings
@@ -143,7 +143,7 @@ class ResolutionBadgeProcessor(BaseBadgeProcessor):
             if not db_session:
                 try:
                     async with async_session_factory() as db:
-                        settings = await badge_settings_service.get_resolution_settings(db, force_reload=True)
+                        settings = await badge_settings_service.get_resolution_settings(db)
                         if settings and await badge_settings_service.validate_settings(settings, "resolution"):
                             self.logger.info("Successfully loaded resolution settings from v2 database (new session)")
                             return settings
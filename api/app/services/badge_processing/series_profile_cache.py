@@ -0,0 +1,248 @@
+"""
+Series Technical Profile Cache
+
+One store for the per-series results of episode sampling: dominant
+resolution (including HDR/Dolby Vision flags) and audio format. Profiles live
+in Postgres so the API process, every worker and restarts share them, with an
+in-process LRU in front. Workers that never initialise the global session
+factory pass their own db_session; the cache opens short sessions on its
+engine so profile writes never commit the caller's transaction.
+
+Each profile carries a fingerprint of the series (episode count and
+DateLastMediaAdded). When episodes are added the fingerprint changes and the
+series is sampled again.
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import database
+from app.core.config import get_settings
+from app.models.series_profile import SeriesProfileModel
+from aphrodite_logging import get_logger
+
+from .audio_types import AudioInfo
+from .resolution_types import ResolutionInfo
+
+
+PROFILE_KINDS = ("resolution", "audio")
+
+
+def series_fingerprint(series_item: Optional[Dict[str, Any]]) -> str:
+    """Fingerprint that changes when episodes are added to a series"""
+    if not series_item:
+        return ""
+    episode_count = series_item.get("RecursiveItemCount", series_item.get("ChildCount", ""))
+    return f"{episode_count}|{series_item.get('DateLastMediaAdded', '')}"
+
+
+class SeriesProfileCache:
+    """Persistent per-series resolution/audio profiles invalidated by a series fingerprint"""
+    
+    def __init__(self, memory_size: int = 1024):
+        self.logger = get_logger("aphrodite.badge.series_profile", service="badge")
+        self.settings = get_settings()
+        self.memory_size = memory_size
+        
+        # series_id -> (expires_at monotonic, fingerprint, {kind: data})
+        self._memory: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        
+        self.hits = dict.fromkeys(PROFILE_KINDS, 0)
+        self.misses = dict.fromkeys(PROFILE_KINDS, 0)
+        self.last_cleared = datetime.now(timezone.utc)
+    
+    async def get_resolution(self, series_id: str, fingerprint: str,
+                             db_session: Optional[AsyncSession] = None) -> Optional[ResolutionInfo]:
+        """Cached dominant resolution of a series, if its episodes have not changed"""
+        data = await self.get(series_id, fingerprint, "resolution", db_session)
+        return ResolutionInfo.from_dict(data) if data else None
+    
+    async def put_resolution(self, series_id: str, fingerprint: str, resolution: ResolutionInfo,
+                             db_session: Optional[AsyncSession] = None) -> None:
+        await self.put(series_id, fingerprint, "resolution", resolution.to_dict(), db_session)
+    
+    async def get_audio(self, series_id: str, fingerprint: str,
+                        db_session: Optional[AsyncSession] = None) -> Optional[AudioInfo]:
+        """Cached dominant audio format of a series, if its episodes have not changed"""
+        data = await self.get(series_id, fingerprint, "audio", db_session)
+        return AudioInfo.from_dict(data) if data else None
+    
+    async def put_audio(self, series_id: str, fingerprint: str, audio: AudioInfo,
+                        db_session: Optional[AsyncSession] = None) -> None:
+        await self.put(series_id, fingerprint, "audio", audio.to_dict(), db_session)
+    
+    async def get(self, series_id: str, fingerprint: str, kind: str,
+                  db_session: Optional[AsyncSession] = None) -> Optional[Dict[str, Any]]:
+        """Look up one part of a series profile; a fingerprint mismatch is a miss"""
+        data = self._get_from_memory(series_id, fingerprint, kind)
+        if data is None:
+            data = await self._get_from_database(series_id, fingerprint, kind, db_session)
+        
+        if data is None:
+            self.misses[kind] += 1
+            return None
+        
+        self.hits[kind] += 1
+        self.logger.debug(f"📦 [SERIES PROFILE] {kind} hit for series {series_id}")
+        return data
+    
+    async def put(self, series_id: str, fingerprint: str, kind: str, data: Dict[str, Any],
+                  db_session: Optional[AsyncSession] = None) -> None:
+        """Store one part of a series profile; parts detected for an older fingerprint are dropped"""
+        if kind not in PROFILE_KINDS:
+            raise ValueError(f"Unknown series profile kind: {kind}")
+        
+        entry = self._memory.get(series_id)
+        parts = dict(entry[2]) if entry is not None and entry[1] == fingerprint else {}
+        parts[kind] = data
+        self._remember(series_id, fingerprint, parts)
+        
+        session_factory = self._session_factory(db_session)
+        if session_factory is None:
+            return
+        
+        stmt = insert(SeriesProfileModel).values(series_id=series_id, fingerprint=fingerprint, **{kind: data})
+        same_series_state = SeriesProfileModel.fingerprint == stmt.excluded.fingerprint
+        other_kind = "audio" if kind == "resolution" else "resolution"
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["series_id"],
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                kind: stmt.excluded[kind],
+                other_kind: case((same_series_state, getattr(SeriesProfileModel, other_kind)), else_=None),
+                "updated_at": func.now()
+            }
+        )
+        try:
+            async with session_factory() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            self.logger.warning(f"⚠️ [SERIES PROFILE] Store failed for series {series_id}: {e}")
+    
+    async def invalidate(self, series_id: str) -> None:
+        """Forget a series profile"""
+        self._memory.pop(series_id, None)
+        session_factory = database.async_session_factory
+        if session_factory is None:
+            return
+        try:
+            async with session_factory() as db:
+                await db.execute(delete(SeriesProfileModel).where(SeriesProfileModel.series_id == series_id))
+                await db.commit()
+        except Exception as e:
+            self.logger.warning(f"⚠️ [SERIES PROFILE] Invalidate failed for series {series_id}: {e}")
+    
+    async def clear(self, kind: Optional[str] = None) -> None:
+        """Forget all profiles, or only their resolution or audio part"""
+        self._memory.clear()
+        for counted_kind in ([kind] if kind else PROFILE_KINDS):
+            self.hits[counted_kind] = 0
+            self.misses[counted_kind] = 0
+        self.last_cleared = datetime.now(timezone.utc)
+        
+        session_factory = database.async_session_factory
+        if session_factory is None:
+            return
+        
+        async with session_factory() as db:
+            if kind is None:
+                await db.execute(delete(SeriesProfileModel))
+            else:
+                await db.execute(SeriesProfileModel.__table__.update().values(**{kind: None}))
+            await db.commit()
+        self.logger.info(f"🧹 [SERIES PROFILE] Cleared {kind or 'all'} series profiles")
+    
+    async def get_cache_stats(self, kind: Optional[str] = None) -> Dict[str, Any]:
+        """Hit rate of this process and number of stored profiles"""
+        kinds = [kind] if kind else PROFILE_KINDS
+        hits = sum(self.hits[counted_kind] for counted_kind in kinds)
+        misses = sum(self.misses[counted_kind] for counted_kind in kinds)
+        total_requests = hits + misses
+        hit_rate = (hits / total_requests * 100) if total_requests > 0 else 0
+        
+        cache_size = len(self._memory)
+        session_factory = database.async_session_factory
+        if session_factory is not None:
+            query = select(func.count()).select_from(SeriesProfileModel)
+            if kind is not None:
+                query = query.where(getattr(SeriesProfileModel, kind).is_not(None))
+            try:
+                async with session_factory() as db:
+                    cache_size = await db.scalar(query) or 0
+            except Exception as e:
+                self.logger.warning(f"⚠️ [SERIES PROFILE] Could not count profiles: {e}")
+        
+        return {
+            "hit_rate_percent": round(hit_rate, 2),
+            "total_hits": hits,
+            "total_misses": misses,
+            "cache_size": cache_size,
+            "ttl_hours": self.settings.series_profile_cache_ttl // 3600,
+            "last_cleanup": self.last_cleared.isoformat()
+        }
+    
+    def _get_from_memory(self, series_id: str, fingerprint: str, kind: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(series_id)
+        if entry is None:
+            return None
+        expires_at, cached_fingerprint, parts = entry
+        if expires_at <= time.monotonic() or cached_fingerprint != fingerprint:
+            return None
+        self._memory.move_to_end(series_id)
+        return parts.get(kind)
+    
+    async def _get_from_database(self, series_id: str, fingerprint: str, kind: str,
+                                 db_session: Optional[AsyncSession] = None) -> Optional[Dict[str, Any]]:
+        session_factory = self._session_factory(db_session)
+        if session_factory is None:
+            return None
+        
+        try:
+            async with session_factory() as db:
+                row = await db.get(SeriesProfileModel, series_id)
+        except Exception as e:
+            self.logger.warning(f"⚠️ [SERIES PROFILE] Lookup failed for series {series_id}: {e}")
+            return None
+        
+        if row is None or row.fingerprint != fingerprint:
+            return None
+        
+        age = datetime.now(timezone.utc) - row.updated_at
+        if age > timedelta(seconds=self.settings.series_profile_cache_ttl):
+            return None
+        
+        parts = {part: getattr(row, part) for part in PROFILE_KINDS if getattr(row, part) is not None}
+        self._remember(series_id, fingerprint, parts, self.settings.series_profile_cache_ttl - age.total_seconds())
+        return parts.get(kind)
+    
+    def _session_factory(self, db_session: Optional[AsyncSession] = None) -> Optional[async_sessionmaker]:
+        """Sessions on the caller's engine (batch workers), else on the global one"""
+        if db_session is not None and db_session.bind is not None:
+            return async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+        return database.async_session_factory
+    
+    def _remember(self, series_id: str, fingerprint: str, parts: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Keep a profile in the in-process LRU"""
+        ttl = self.settings.series_profile_cache_ttl if ttl is None else ttl
+        self._memory[series_id] = (time.monotonic() + ttl, fingerprint, parts)
+        self._memory.move_to_end(series_id)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+
+# Global cache instance
+_series_profile_cache: Optional[SeriesProfileCache] = None
+
+def get_series_profile_cache() -> SeriesProfileCache:
+    """Get global series profile cache instance"""
+    global _series_profile_cache
+    if _series_profile_cache is None:
+        _series_profile_cache = SeriesProfileCache()
+    return _series_profile_cache
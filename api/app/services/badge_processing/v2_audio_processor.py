@@ -5,15 +5,16 @@ Completely V2-native audio badge processing with enhanced detection capabilities
 Modularized for maintainability and enhanced with Dolby Atmos, DTS-X detection.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
+from PIL import Image
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from aphrodite_logging import get_logger
 from .base_processor import BaseBadgeProcessor
 from .types import PosterResult
 from .database_service import badge_settings_service
-from .renderers import UnifiedBadgeRenderer
+from .renderers import UnifiedBadgeRenderer, BadgeLayerResult
 from app.core.database import async_session_factory
 
 # Enhanced audio components
@@ -52,6 +53,37 @@ class V2AudioBadgeProcessor(BaseBadgeProcessor):
         """Process a single poster with audio badge using enhanced V2 system"""
         try:
             self.logger.info(f"🎧 [V2 AUDIO] PROCESSOR STARTED for: {poster_path}")
+            
+            with Image.open(poster_path) as poster:
+                poster_size = poster.size
+            
+            layer_result = await self.create_badge_layers(
+                poster_size, poster_path, use_demo_data, db_session, jellyfin_id
+            )
+            result = await self.apply_layer_result(poster_path, layer_result, output_path)
+            
+            if result.success and result.applied_badges:
+                self.logger.info(f"✅ [V2 AUDIO] PROCESSOR COMPLETED: {result.output_path}")
+            return result
+                
+        except Exception as e:
+            self.logger.error(f"🚨 [V2 AUDIO] PROCESSOR EXCEPTION: {e}", exc_info=True)
+            return PosterResult(
+                source_path=poster_path,
+                success=False,
+                error=f"V2 audio processor error: {str(e)}"
+            )
+    
+    async def create_badge_layers(
+        self,
+        poster_size: Tuple[int, int],
+        poster_path: str,
+        use_demo_data: bool = False,
+        db_session: Optional[AsyncSession] = None,
+        jellyfin_id: Optional[str] = None
+    ) -> BadgeLayerResult:
+        """Render the audio badge as a positioned layer for the compositing pipeline"""
+        try:
             self.logger.info(f"🎧 [V2 AUDIO] Jellyfin ID: {jellyfin_id}")
             self.logger.info(f"🎧 [V2 AUDIO] Use demo data: {use_demo_data}")
             
@@ -64,8 +96,7 @@ class V2AudioBadgeProcessor(BaseBadgeProcessor):
             settings = await self._load_v2_settings(db_session)
             if not settings:
                 self.logger.error("❌ [V2 AUDIO] Failed to load settings from PostgreSQL")
-                return PosterResult(
-                    source_path=poster_path,
+                return BadgeLayerResult(
                     success=False,
                     error="Failed to load V2 audio badge settings"
                 )
@@ -73,54 +104,41 @@ class V2AudioBadgeProcessor(BaseBadgeProcessor):
             self.logger.info("✅ [V2 AUDIO] Settings loaded from PostgreSQL")
             
             # Get audio data using enhanced or legacy methods
-            audio_data = await self._get_audio_data(jellyfin_id, use_demo_data, poster_path, settings)
+            audio_data = await self._get_audio_data(jellyfin_id, use_demo_data, poster_path, settings, db_session)
             
             if not audio_data:
                 self.logger.warning("⚠️ [V2 AUDIO] No audio data detected, skipping badge")
-                return PosterResult(
-                    source_path=poster_path,
-                    output_path=poster_path,
-                    applied_badges=[],
-                    success=True
-                )
+                return BadgeLayerResult()
             
             self.logger.info(f"📊 [V2 AUDIO] Audio detected: {audio_data}")
             
             # Create audio badge
-            result_path = await self.badge_creator.create_badge(
-                poster_path, audio_data, settings, output_path
-            )
-            
-            if result_path:
-                self.logger.info(f"✅ [V2 AUDIO] PROCESSOR COMPLETED: {result_path}")
-                return PosterResult(
-                    source_path=poster_path,
-                    output_path=result_path,
-                    applied_badges=["audio"],
-                    success=True
-                )
-            else:
+            badge = self.badge_creator.build_badge(audio_data, settings)
+            if not badge:
                 self.logger.error(f"❌ [V2 AUDIO] Badge creation failed")
-                return PosterResult(
-                    source_path=poster_path,
+                return BadgeLayerResult(
                     success=False,
                     error="V2 audio badge creation failed"
                 )
+            
+            return BadgeLayerResult(
+                layers=[self.renderer.position_badge(poster_size, badge, settings)],
+                applied_badges=["audio"]
+            )
                 
         except Exception as e:
-            self.logger.error(f"🚨 [V2 AUDIO] PROCESSOR EXCEPTION: {e}", exc_info=True)
-            return PosterResult(
-                source_path=poster_path,
+            self.logger.error(f"🚨 [V2 AUDIO] LAYER EXCEPTION: {e}", exc_info=True)
+            return BadgeLayerResult(
                 success=False,
                 error=f"V2 audio processor error: {str(e)}"
             )
     
-    async def _get_audio_data(self, jellyfin_id, use_demo_data, poster_path, settings):
+    async def _get_audio_data(self, jellyfin_id, use_demo_data, poster_path, settings, db_session=None):
         """Get audio data using enhanced or legacy methods"""
         # Try enhanced detection first
         if self.enhanced_components.enabled:
             audio_data = await self.enhanced_data_handler.get_audio_info(
-                jellyfin_id, use_demo_data, poster_path, settings
+                jellyfin_id, use_demo_data, poster_path, settings, db_session
             )
             if audio_data:
                 return audio_data
@@ -130,6 +148,17 @@ class V2AudioBadgeProcessor(BaseBadgeProcessor):
             jellyfin_id, use_demo_data, poster_path
         )
     
+    async def get_fingerprint_inputs(
+        self,
+        jellyfin_id: str,
+        db_session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Audio settings and detected audio format for the render fingerprint"""
+        settings = await self._load_v2_settings(db_session)
+        if not settings:
+            return None
+        return {"settings": settings, "audio": await self._get_audio_data(jellyfin_id, False, "", settings, db_session)}
+    
     async def process_bulk(
         self,
         poster_paths: List[str],
@@ -171,7 +200,7 @@ class V2AudioBadgeProcessor(BaseBadgeProcessor):
             
             # Load from v2 database
             if db_session:
-                settings = await badge_settings_service.get_audio_settings(db_session, force_reload=True)
+                settings = await badge_settings_service.get_audio_settings(db_session)
                 if settings and await badge_settings_service.validate_settings(settings, "audio"):
                     self.logger.info("✅ [V2 AUDIO] Settings loaded from PostgreSQL (provided session)")
                     return settings
@@ -180,7 +209,7 @@ class V2AudioBadgeProcessor(BaseBadgeProcessor):
             if not db_session:
                 try:
                     async with async_session_factory() as db:
-                        settings = await badge_settings_service.get_audio_settings(db, force_reload=True)
+                        settings = await badge_settings_service.get_audio_settings(db)
                         if settings and await badge_settings_service.validate_settings(settings, "audio"):
                             self.logger.info("✅ [V2 AUDIO] Settings loaded from PostgreSQL (new session)")
                             return settings
@@ -272,10 +301,10 @@ class V2AudioBadgeProcessor(BaseBadgeProcessor):
         return base_settings
     
     # Enhanced component access methods for diagnostics
-    def get_enhanced_components_status(self) -> Dict[str, Any]:
+    async def get_enhanced_components_status(self) -> Dict[str, Any]:
         """Get status of enhanced components for diagnostics"""
-        return self.enhanced_components.get_status()
+        return await self.enhanced_components.get_status()
     
-    def clear_audio_cache(self) -> bool:
+    async def clear_audio_cache(self) -> bool:
         """Clear audio cache (for diagnostics)"""
-        return self.enhanced_components.clear_cache()
+        return await self.enhanced_components.clear_cache()
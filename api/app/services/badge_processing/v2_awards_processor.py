@@ -5,8 +5,9 @@ Completely V2-native awards badge processing with no V1 dependencies.
 Clear logging for system differentiation.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
+from PIL import Image
 from sqlalchemy.ext.asyncio import AsyncSession
 import os
 
@@ -15,7 +16,7 @@ from .base_processor import BaseBadgeProcessor
 from .types import PosterResult
 from .database_service import badge_settings_service
 from .renderers.awards_data_fetcher import V2AwardsDataFetcher
-from .renderers import UnifiedBadgeRenderer
+from .renderers import UnifiedBadgeRenderer, BadgeLayerResult
 from app.core.database import async_session_factory
 
 
@@ -39,6 +40,37 @@ class V2AwardsBadgeProcessor(BaseBadgeProcessor):
         """Process a single poster with awards badge using pure V2 system"""
         try:
             self.logger.info(f"🏆 [V2 AWARDS] PROCESSOR STARTED for: {poster_path}")
+            
+            with Image.open(poster_path) as poster:
+                poster_size = poster.size
+            
+            layer_result = await self.create_badge_layers(
+                poster_size, poster_path, use_demo_data, db_session, jellyfin_id
+            )
+            result = await self.apply_layer_result(poster_path, layer_result, output_path)
+            
+            if result.success and result.applied_badges:
+                self.logger.info(f"✅ [V2 AWARDS] PROCESSOR COMPLETED: {result.output_path}")
+            return result
+                
+        except Exception as e:
+            self.logger.error(f"🚨 [V2 AWARDS] PROCESSOR EXCEPTION: {e}", exc_info=True)
+            return PosterResult(
+                source_path=poster_path,
+                success=False,
+                error=f"V2 awards processor error: {str(e)}"
+            )
+    
+    async def create_badge_layers(
+        self,
+        poster_size: Tuple[int, int],
+        poster_path: str,
+        use_demo_data: bool = False,
+        db_session: Optional[AsyncSession] = None,
+        jellyfin_id: Optional[str] = None
+    ) -> BadgeLayerResult:
+        """Render the awards badge as a positioned layer for the compositing pipeline"""
+        try:
             self.logger.info(f"🏆 [V2 AWARDS] Jellyfin ID: {jellyfin_id}")
             self.logger.info(f"🏆 [V2 AWARDS] Use demo data: {use_demo_data}")
             
@@ -46,8 +78,7 @@ class V2AwardsBadgeProcessor(BaseBadgeProcessor):
             settings = await self._load_v2_settings(db_session)
             if not settings:
                 self.logger.error("❌ [V2 AWARDS] Failed to load settings from PostgreSQL")
-                return PosterResult(
-                    source_path=poster_path,
+                return BadgeLayerResult(
                     success=False,
                     error="Failed to load V2 awards badge settings"
                 )
@@ -58,44 +89,42 @@ class V2AwardsBadgeProcessor(BaseBadgeProcessor):
             awards_data = await self._get_v2_awards_data(jellyfin_id, use_demo_data, poster_path)
             if not awards_data:
                 self.logger.warning("⚠️ [V2 AWARDS] No awards found, skipping awards badge")
-                return PosterResult(
-                    source_path=poster_path,
-                    output_path=poster_path,
-                    applied_badges=[],
-                    success=True
-                )
+                return BadgeLayerResult()
             
             self.logger.info(f"🏆 [V2 AWARDS] Awards detected: {awards_data}")
             
             # Create awards badge using V2 renderer
-            result_path = await self._create_v2_awards_badge(
-                poster_path, awards_data, settings, output_path
-            )
-            
-            if result_path:
-                self.logger.info(f"✅ [V2 AWARDS] PROCESSOR COMPLETED: {result_path}")
-                return PosterResult(
-                    source_path=poster_path,
-                    output_path=result_path,
-                    applied_badges=["awards"],
-                    success=True
-                )
-            else:
+            badge = self._build_v2_awards_badge(awards_data, settings)
+            if not badge:
                 self.logger.error(f"❌ [V2 AWARDS] Badge creation failed")
-                return PosterResult(
-                    source_path=poster_path,
+                return BadgeLayerResult(
                     success=False,
                     error="V2 awards badge creation failed"
                 )
-                
+            
+            return BadgeLayerResult(
+                layers=[self.renderer.position_badge(poster_size, badge, settings)],
+                applied_badges=["awards"]
+            )
+            
         except Exception as e:
-            self.logger.error(f"🚨 [V2 AWARDS] PROCESSOR EXCEPTION: {e}", exc_info=True)
-            return PosterResult(
-                source_path=poster_path,
+            self.logger.error(f"🚨 [V2 AWARDS] LAYER EXCEPTION: {e}", exc_info=True)
+            return BadgeLayerResult(
                 success=False,
                 error=f"V2 awards processor error: {str(e)}"
             )
     
+    async def get_fingerprint_inputs(
+        self,
+        jellyfin_id: str,
+        db_session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Awards settings and detected award for the render fingerprint"""
+        settings = await self._load_v2_settings(db_session)
+        if not settings:
+            return None
+        return {"settings": settings, "awards": await self._get_v2_awards_data(jellyfin_id, False, "")}
+    
     async def process_bulk(
         self,
         poster_paths: List[str],
@@ -137,7 +166,7 @@ class V2AwardsBadgeProcessor(BaseBadgeProcessor):
             
             # Load from v2 database
             if db_session:
-                settings = await badge_settings_service.get_awards_settings(db_session, force_reload=True)
+                settings = await badge_settings_service.get_awards_settings(db_session)
                 if settings and await badge_settings_service.validate_settings(settings, "awards"):
                     self.logger.info("✅ [V2 AWARDS] Settings loaded from PostgreSQL (provided session)")
                     return settings
@@ -146,7 +175,7 @@ class V2AwardsBadgeProcessor(BaseBadgeProcessor):
             if not db_session:
                 try:
                     async with async_session_factory() as db:
-                        settings = await badge_settings_service.get_awards_settings(db, force_reload=True)
+                        settings = await badge_settings_service.get_awards_settings(db)
                         if settings and await badge_settings_service.validate_settings(settings, "awards"):
                             self.logger.info("✅ [V2 AWARDS] Settings loaded from PostgreSQL (new session)")
                             return settings
@@ -227,25 +256,15 @@ class V2AwardsBadgeProcessor(BaseBadgeProcessor):
             self.logger.error(f"❌ [V2 AWARDS] Error getting awards data: {e}", exc_info=True)
             return None
     
-    async def _create_v2_awards_badge(
+    def _build_v2_awards_badge(
         self,
-        poster_path: str,
         awards_data: str,
-        settings: Dict[str, Any],
-        output_path: Optional[str] = None
-    ) -> Optional[str]:
-        """Create awards badge using pure V2 renderer"""
+        settings: Dict[str, Any]
+    ) -> Optional[Image.Image]:
+        """Create awards badge image using pure V2 renderer"""
         try:
             self.logger.debug(f"🎨 [V2 AWARDS] Creating badge for awards: {awards_data}")
             
-            # Determine output path
-            if output_path:
-                final_output_path = output_path
-            else:
-                # Generate V2 preview path
-                poster_name = Path(poster_path).name
-                final_output_path = f"/app/api/static/preview/{poster_name}"
-            
             # Check if image badges are enabled
             image_badges_enabled = settings.get('ImageBadges', {}).get('enable_image_badges', True)
             
@@ -273,21 +292,7 @@ class V2AwardsBadgeProcessor(BaseBadgeProcessor):
                 self.logger.debug(f"📝 [V2 AWARDS] Creating text badge")
                 badge = self.renderer.create_text_badge(awards_data.upper(), settings, "awards")
             
-            if not badge:
-                self.logger.error(f"❌ [V2 AWARDS] Badge creation failed")
-                return None
-            
-            # Apply badge to poster
-            success = self.renderer.apply_badge_to_poster(
-                poster_path, badge, settings, final_output_path
-            )
-            
-            if success:
-                self.logger.debug(f"✅ [V2 AWARDS] Badge applied successfully: {final_output_path}")
-                return final_output_path
-            else:
-                self.logger.error(f"❌ [V2 AWARDS] Badge application failed")
-                return None
+            return badge
                 
         except Exception as e:
             self.logger.error(f"❌ [V2 AWARDS] Badge creation error: {e}", exc_info=True)
@@ -27,6 +27,8 @@ from .v2_audio_processor import V2AudioBadgeProcessor
 from .v2_resolution_processor import V2ResolutionBadgeProcessor
 from .v2_review_processor import V2ReviewBadgeProcessor
 from .v2_awards_processor import V2AwardsBadgeProcessor
+from .renderers.compositor import BadgeLayer, BadgeLayerResult
+from .image_executor import PosterRenderJob, get_image_executor
 
 
 class V2UniversalBadgeProcessor:
@@ -167,12 +169,13 @@ class V2UniversalBadgeProcessor:
         self.logger.info(f"🎯 [V2 PIPELINE] JELLYFIN_ID: {request.jellyfin_id}")
         
         try:
-            # Step 1: Resize poster to standard 1,000px width
+            # Step 1: Work out the standard 1,000px-wide canvas size from the poster header;
+            # the decode and resize happen in the image executor with the final encode
             resize_start = time.perf_counter()
-            self.logger.info(f"📏 [V2 PIPELINE] Resizing poster: {request.poster_path}")
-            resized_poster_path = poster_resizer.resize_poster(request.poster_path)
+            self.logger.info(f"📏 [V2 PIPELINE] Reading poster size: {request.poster_path}")
+            canvas_size = poster_resizer.get_standardized_size(request.poster_path)
             
-            if not resized_poster_path:
+            if canvas_size is None:
                 self.logger.error(f"❌ [V2 PIPELINE] Failed to resize poster: {request.poster_path}")
                 detailed_metrics['badges_failed'].append({
                     'type': 'resize',
@@ -192,9 +195,8 @@ class V2UniversalBadgeProcessor:
             
             resize_time = int((time.perf_counter() - resize_start) * 1000)
             detailed_metrics['poster_processing_time_ms'] = resize_time
-            detailed_metrics['intermediate_files'].append(resized_poster_path)
             
-            self.logger.info(f"✅ [V2 PIPELINE] Poster resized: {resized_poster_path} ({resize_time}ms)")
+            self.logger.info(f"✅ [V2 PIPELINE] Poster canvas size: {canvas_size[0]}x{canvas_size[1]} ({resize_time}ms)")
             
             # Step 2: Initialize V2 badge processors
             processors = {
@@ -204,13 +206,12 @@ class V2UniversalBadgeProcessor:
                 "awards": V2AwardsBadgeProcessor()
             }
             
-            # Start with the resized poster
-            current_poster_path = resized_poster_path
             applied_badges = []
+            layers: List[BadgeLayer] = []
             
             self.logger.info(f"🔄 [V2 PIPELINE] Processing badges: {request.badge_types}")
             
-            # Apply badges sequentially
+            # Collect badge layers from each processor in order
             for i, badge_type in enumerate(request.badge_types):
                 processor = processors.get(badge_type)
                 if not processor:
@@ -218,24 +219,19 @@ class V2UniversalBadgeProcessor:
                     continue
                 
                 self.logger.info(f"🔄 [V2 PIPELINE] STARTING {badge_type.upper()} PROCESSOR ({i+1}/{len(request.badge_types)})")
-                self.logger.info(f"🔄 [V2 PIPELINE] Current poster: {current_poster_path}")
                 
-                # For the last badge, use the final output path if specified
-                is_last_badge = (i == len(request.badge_types) - 1)
-                output_path = request.output_path if is_last_badge and request.output_path else None
-                
-                self.logger.info(f"🔄 [V2 PIPELINE] Output path for {badge_type}: {output_path}")
-                
-                # Process with the specific badge processor
+                # Render the badge type as layers against the standardized canvas size
                 badge_start_time = time.perf_counter()
                 try:
-                    result = await processor.process_single(
-                        current_poster_path,
-                        output_path,
+                    result = await processor.create_badge_layers(
+                        canvas_size,
+                        request.poster_path,
                         request.use_demo_data,
                         db_session,
                         request.jellyfin_id
                     )
+                    if result.success and result.layers:
+                        layers.extend(result.layers)
                     badge_time = int((time.perf_counter() - badge_start_time) * 1000)
                     
                     self.logger.info(f"✅ [V2 PIPELINE] {badge_type.upper()} PROCESSOR COMPLETED ({badge_time}ms)")
@@ -246,7 +242,7 @@ class V2UniversalBadgeProcessor:
                             'type': badge_type,
                             'processing_time_ms': badge_time,
                             'badges': result.applied_badges,
-                            'output_path': result.output_path
+                            'layers': len(result.layers)
                         })
                     else:
                         detailed_metrics['badges_failed'].append({
@@ -268,11 +264,7 @@ class V2UniversalBadgeProcessor:
                     
                     # Continue processing other badges even if one fails
                     self.logger.warning(f"⚠️ [V2 PIPELINE] Continuing with remaining badges despite {badge_type} failure")
-                    # Create a failed result to continue processing
-                    result = PosterResult(
-                        source_path=current_poster_path,
-                        output_path=current_poster_path,
-                        applied_badges=[],
+                    result = BadgeLayerResult(
                         success=False,
                         error=f"{badge_type} processor exception: {str(processor_error)}"
                     )
@@ -280,113 +272,58 @@ class V2UniversalBadgeProcessor:
                 self.logger.info(f"📊 [V2 PIPELINE] {badge_type} result - Success: {result.success}, Applied: {result.applied_badges}")
                 
                 if result.success:
-                    self.logger.info(f"✅ [V2 PIPELINE] {badge_type} SUCCESS: {current_poster_path} -> {result.output_path}")
-                    current_poster_path = result.output_path
                     applied_badges.extend(result.applied_badges)
                 else:
                     self.logger.error(f"❌ [V2 PIPELINE] {badge_type} FAILED: {result.error}")
                     # Continue with other badges even if one fails
                     self.logger.info(f"🔄 [V2 PIPELINE] Continuing to next processor despite {badge_type} failure")
             
-            # Handle final output path
+            # Step 3: Decode, resize, composite and encode once in the image executor
             storage_manager = StorageManager()
+            
+            if request.output_path and Path(request.output_path).name.startswith("preview_"):
+                final_output_path = request.output_path
+            else:
+                final_output_path = storage_manager.create_preview_output_path(request.poster_path)
+            
+            encode_start = time.perf_counter()
+            await get_image_executor().render_poster(PosterRenderJob(
+                poster_path=request.poster_path,
+                output_path=final_output_path,
+                layers=layers,
+                target_size=canvas_size
+            ))
+            self.logger.info(f"💾 [V2 PIPELINE] Rendered {len(layers)} layers to {final_output_path} ({int((time.perf_counter() - encode_start) * 1000)}ms)")
+            
             processing_end_time = time.perf_counter()
             total_processing_time = int((processing_end_time - detailed_metrics['processing_start_time']) * 1000)
             
-            if applied_badges:
-                # Badges were applied - ensure final path has preview_ prefix
-                final_filename = Path(current_poster_path).name
-                
-                if not final_filename.startswith("preview_"):
-                    # File needs to be renamed to have preview_ prefix
-                    proper_preview_path = storage_manager.create_preview_output_path(request.poster_path)
-                    try:
-                        # Copy/move the final result to proper preview location
-                        import shutil
-                        Path(proper_preview_path).parent.mkdir(parents=True, exist_ok=True)
-                        shutil.move(current_poster_path, proper_preview_path)
-                        final_output_path = proper_preview_path
-                        self.logger.info(f"🔧 [V2 PIPELINE] Renamed to proper preview path: {final_output_path}")
-                    except Exception as e:
-                        self.logger.warning(f"⚠️ [V2 PIPELINE] Failed to rename to preview path: {e}")
-                        final_output_path = current_poster_path
-                else:
-                    final_output_path = current_poster_path
+            # Calculate final file metrics
+            detailed_metrics['final_poster_dimensions'] = f"{canvas_size[0]}x{canvas_size[1]}"
+            try:
+                final_file_size = Path(final_output_path).stat().st_size
+                detailed_metrics['final_file_size'] = final_file_size
                 
-                # Calculate final file metrics
-                try:
-                    final_file_size = Path(final_output_path).stat().st_size
-                    detailed_metrics['final_file_size'] = final_file_size
-                    
-                    # Calculate compression ratio if original size is available
-                    if Path(detailed_metrics['original_poster_path']).exists():
-                        original_size = Path(detailed_metrics['original_poster_path']).stat().st_size
-                        if original_size > 0:
-                            detailed_metrics['compression_ratio'] = final_file_size / original_size
-                    
-                    # Get final poster dimensions
-                    from PIL import Image
-                    with Image.open(final_output_path) as img:
-                        detailed_metrics['final_poster_dimensions'] = f"{img.width}x{img.height}"
+                # Calculate compression ratio if original size is available
+                if applied_badges and Path(detailed_metrics['original_poster_path']).exists():
+                    original_size = Path(detailed_metrics['original_poster_path']).stat().st_size
+                    if original_size > 0:
+                        detailed_metrics['compression_ratio'] = final_file_size / original_size
                         
-                except Exception as metrics_error:
-                    self.logger.warning(f"⚠️ [V2 PIPELINE] Failed to calculate file metrics: {metrics_error}")
-                
-                final_result = PosterResult(
-                    source_path=request.poster_path,
-                    output_path=final_output_path,
-                    applied_badges=applied_badges,
-                    success=True
-                )
+            except Exception as metrics_error:
+                self.logger.warning(f"⚠️ [V2 PIPELINE] Failed to calculate file metrics: {metrics_error}")
+            
+            final_result = PosterResult(
+                source_path=request.poster_path,
+                output_path=final_output_path,
+                applied_badges=applied_badges,
+                success=True
+            )
+            
+            if applied_badges:
                 self.logger.info(f"✅ [V2 PIPELINE] SUCCESSFULLY PROCESSED with {len(applied_badges)} badges: {final_output_path}")
             else:
-                # No badges were applied - create proper preview path
-                proper_preview_path = storage_manager.create_preview_output_path(request.poster_path)
-                
-                try:
-                    # Copy resized poster to proper preview location
-                    import shutil
-                    Path(proper_preview_path).parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(resized_poster_path, proper_preview_path)
-                    
-                    # Clean up temp resized poster
-                    if resized_poster_path != request.poster_path:
-                        Path(resized_poster_path).unlink(missing_ok=True)
-                    
-                    final_output_path = proper_preview_path
-                    
-                    # Calculate final file metrics for no-badge case
-                    try:
-                        final_file_size = Path(final_output_path).stat().st_size
-                        detailed_metrics['final_file_size'] = final_file_size
-                        
-                        from PIL import Image
-                        with Image.open(final_output_path) as img:
-                            detailed_metrics['final_poster_dimensions'] = f"{img.width}x{img.height}"
-                    except Exception:
-                        pass
-                    
-                    self.logger.info(f"🔧 [V2 PIPELINE] No badges applied, created proper preview path: {final_output_path}")
-                    
-                except Exception as e:
-                    self.logger.error(f"❌ [V2 PIPELINE] Error creating proper preview path: {e}")
-                    final_output_path = resized_poster_path
-                
-                final_result = PosterResult(
-                    source_path=request.poster_path,
-                    output_path=final_output_path,
-                    applied_badges=[],
-                    success=True
-                )
-            
-            # Clean up any remaining temporary resized poster
-            try:
-                if resized_poster_path != request.poster_path and resized_poster_path != final_result.output_path:
-                    if Path(resized_poster_path).exists():
-                        Path(resized_poster_path).unlink()
-                        self.logger.debug(f"🧹 [V2 PIPELINE] Cleaned up temporary resized poster: {resized_poster_path}")
-            except Exception as e:
-                self.logger.warning(f"⚠️ [V2 PIPELINE] Failed to clean up temporary poster: {e}")
+                self.logger.info(f"🔧 [V2 PIPELINE] No badges applied, created proper preview path: {final_output_path}")
             
             # Complete activity tracking on success
             if activity_id:
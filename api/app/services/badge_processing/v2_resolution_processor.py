@@ -5,16 +5,17 @@ Completely V2-native resolution badge processing with no V1 dependencies.
 Clear logging for system differentiation.
 """
 
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, Tuple
 from pathlib import Path
 import re
+from PIL import Image
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from aphrodite_logging import get_logger
 from .base_processor import BaseBadgeProcessor
 from .types import PosterResult
 from .database_service import badge_settings_service
-from .renderers import UnifiedBadgeRenderer
+from .renderers import UnifiedBadgeRenderer, BadgeLayerResult
 from app.core.database import async_session_factory
 
 # Enhanced resolution detection components
@@ -22,7 +23,7 @@ try:
     from .resolution_detector import EnhancedResolutionDetector
     from .image_manager import ResolutionImageManager
     from .parallel_processor import ParallelResolutionProcessor
-    from .resolution_cache import ResolutionCache
+    from .series_profile_cache import get_series_profile_cache, series_fingerprint
     ENHANCED_DETECTION_AVAILABLE = True
 except ImportError:
     ENHANCED_DETECTION_AVAILABLE = False
@@ -45,7 +46,7 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
             try:
                 self.image_manager = ResolutionImageManager()
                 self.parallel_processor = ParallelResolutionProcessor()
-                self.cache = ResolutionCache()
+                self.cache = get_series_profile_cache()
                 self.logger.info("✅ [V2 RESOLUTION] Advanced components loaded successfully")
             except ImportError:
                 self.logger.info("⚠️ [V2 RESOLUTION] Advanced components not available, using basic enhanced detection")
@@ -70,6 +71,37 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
         """Process a single poster with resolution badge using pure V2 system"""
         try:
             self.logger.info(f"📐 [V2 RESOLUTION] PROCESSOR STARTED for: {poster_path}")
+            
+            with Image.open(poster_path) as poster:
+                poster_size = poster.size
+            
+            layer_result = await self.create_badge_layers(
+                poster_size, poster_path, use_demo_data, db_session, jellyfin_id
+            )
+            result = await self.apply_layer_result(poster_path, layer_result, output_path)
+            
+            if result.success and result.applied_badges:
+                self.logger.info(f"✅ [V2 RESOLUTION] PROCESSOR COMPLETED: {result.output_path}")
+            return result
+                
+        except Exception as e:
+            self.logger.error(f"🚨 [V2 RESOLUTION] PROCESSOR EXCEPTION: {e}", exc_info=True)
+            return PosterResult(
+                source_path=poster_path,
+                success=False,
+                error=f"V2 resolution processor error: {str(e)}"
+            )
+    
+    async def create_badge_layers(
+        self,
+        poster_size: Tuple[int, int],
+        poster_path: str,
+        use_demo_data: bool = False,
+        db_session: Optional[AsyncSession] = None,
+        jellyfin_id: Optional[str] = None
+    ) -> BadgeLayerResult:
+        """Render the resolution badge as a positioned layer for the compositing pipeline"""
+        try:
             self.logger.info(f"📐 [V2 RESOLUTION] Jellyfin ID: {jellyfin_id}")
             self.logger.info(f"📐 [V2 RESOLUTION] Use demo data: {use_demo_data}")
             
@@ -77,8 +109,7 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
             settings = await self._load_v2_settings(db_session)
             if not settings:
                 self.logger.error("❌ [V2 RESOLUTION] Failed to load settings from PostgreSQL")
-                return PosterResult(
-                    source_path=poster_path,
+                return BadgeLayerResult(
                     success=False,
                     error="Failed to load V2 resolution badge settings"
                 )
@@ -86,47 +117,45 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
             self.logger.info("✅ [V2 RESOLUTION] Settings loaded from PostgreSQL")
             
             # Get resolution data using pure V2 methods
-            resolution_data = await self._get_v2_resolution(jellyfin_id, use_demo_data, poster_path)
+            resolution_data = await self._get_v2_resolution(jellyfin_id, use_demo_data, poster_path, db_session)
             if not resolution_data:
                 self.logger.warning("⚠️ [V2 RESOLUTION] No resolution detected, skipping badge")
-                return PosterResult(
-                    source_path=poster_path,
-                    output_path=poster_path,
-                    applied_badges=[],
-                    success=True
-                )
+                return BadgeLayerResult()
             
             self.logger.info(f"📊 [V2 RESOLUTION] Resolution detected: {resolution_data}")
             
             # Create resolution badge using V2 renderer
-            result_path = await self._create_v2_resolution_badge(
-                poster_path, resolution_data, settings, output_path
-            )
-            
-            if result_path:
-                self.logger.info(f"✅ [V2 RESOLUTION] PROCESSOR COMPLETED: {result_path}")
-                return PosterResult(
-                    source_path=poster_path,
-                    output_path=result_path,
-                    applied_badges=["resolution"],
-                    success=True
-                )
-            else:
+            badge = self._build_v2_resolution_badge(resolution_data, settings)
+            if not badge:
                 self.logger.error(f"❌ [V2 RESOLUTION] Badge creation failed")
-                return PosterResult(
-                    source_path=poster_path,
+                return BadgeLayerResult(
                     success=False,
                     error="V2 resolution badge creation failed"
                 )
-                
+            
+            return BadgeLayerResult(
+                layers=[self.renderer.position_badge(poster_size, badge, settings)],
+                applied_badges=["resolution"]
+            )
+            
         except Exception as e:
-            self.logger.error(f"🚨 [V2 RESOLUTION] PROCESSOR EXCEPTION: {e}", exc_info=True)
-            return PosterResult(
-                source_path=poster_path,
+            self.logger.error(f"🚨 [V2 RESOLUTION] LAYER EXCEPTION: {e}", exc_info=True)
+            return BadgeLayerResult(
                 success=False,
                 error=f"V2 resolution processor error: {str(e)}"
             )
     
+    async def get_fingerprint_inputs(
+        self,
+        jellyfin_id: str,
+        db_session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Resolution settings and detected resolution for the render fingerprint"""
+        settings = await self._load_v2_settings(db_session)
+        if not settings:
+            return None
+        return {"settings": settings, "resolution": await self._get_v2_resolution(jellyfin_id, False, "", db_session)}
+    
     async def process_bulk(
         self,
         poster_paths: List[str],
@@ -168,7 +197,7 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
             
             # Load from v2 database
             if db_session:
-                settings = await badge_settings_service.get_resolution_settings(db_session, force_reload=True)
+                settings = await badge_settings_service.get_resolution_settings(db_session)
                 if settings and await badge_settings_service.validate_settings(settings, "resolution"):
                     self.logger.info("✅ [V2 RESOLUTION] Settings loaded from PostgreSQL (provided session)")
                     return settings
@@ -177,7 +206,7 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
             if not db_session:
                 try:
                     async with async_session_factory() as db:
-                        settings = await badge_settings_service.get_resolution_settings(db, force_reload=True)
+                        settings = await badge_settings_service.get_resolution_settings(db)
                         if settings and await badge_settings_service.validate_settings(settings, "resolution"):
                             self.logger.info("✅ [V2 RESOLUTION] Settings loaded from PostgreSQL (new session)")
                             return settings
@@ -235,14 +264,15 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
         self, 
         jellyfin_id: Optional[str], 
         use_demo_data: bool, 
-        poster_path: str
+        poster_path: str,
+        db_session: Optional[AsyncSession] = None
     ) -> Optional[str]:
         """Get resolution using pure V2 methods only"""
         try:
             # Use real Jellyfin data when available
             if jellyfin_id:
                 self.logger.debug(f"🔍 [V2 RESOLUTION] Getting real resolution for ID: {jellyfin_id}")
-                resolution = await self._get_v2_jellyfin_resolution(jellyfin_id)
+                resolution = await self._get_v2_jellyfin_resolution(jellyfin_id, db_session)
                 if resolution and resolution != "UNKNOWN":
                     self.logger.debug(f"✅ [V2 RESOLUTION] Real resolution found: {resolution}")
                     return resolution
@@ -259,7 +289,7 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
             self.logger.error(f"❌ [V2 RESOLUTION] Error getting resolution: {e}", exc_info=True)
             return None
     
-    async def _get_v2_jellyfin_resolution(self, jellyfin_id: str) -> Optional[str]:
+    async def _get_v2_jellyfin_resolution(self, jellyfin_id: str, db_session: Optional[AsyncSession] = None) -> Optional[str]:
         """Get real resolution using ONLY enhanced detection (no legacy fallback)"""
         try:
             self.logger.debug(f"🌐 [V2 RESOLUTION] Querying Jellyfin for ID: {jellyfin_id}")
@@ -283,7 +313,7 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
             
             elif media_type in ['Series', 'Season']:
                 # For TV: use enhanced parallel processing with enhanced detector
-                return await self._get_enhanced_series_resolution(jellyfin_id, jellyfin_service)
+                return await self._get_enhanced_series_resolution(jellyfin_id, jellyfin_service, db_session)
             
             elif media_type == 'Episode':
                 # For episodes: use enhanced detection (same logic as movies)
@@ -314,12 +344,20 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
             self.logger.error(f"❌ [V2 RESOLUTION] Enhanced movie detection error: {e}")
             return "1080p"  # Fallback default
     
-    async def _get_enhanced_series_resolution(self, jellyfin_id: str, jellyfin_service) -> Optional[str]:
+    async def _get_enhanced_series_resolution(
+        self,
+        jellyfin_id: str,
+        jellyfin_service,
+        db_session: Optional[AsyncSession] = None
+    ) -> Optional[str]:
         """Get series resolution using enhanced detection with episode sampling"""
         try:
-            # Check cache first if available
+            # Check cache first if available; a new episode changes the fingerprint
+            fingerprint = None
             if hasattr(self, 'cache') and self.cache:
-                cached_resolution = self.cache.get_cached_resolution(jellyfin_id)
+                series_item = await jellyfin_service.get_item_details(jellyfin_id)
+                fingerprint = series_fingerprint(series_item)
+                cached_resolution = await self.cache.get_resolution(jellyfin_id, fingerprint, db_session)
                 if cached_resolution:
                     result = str(cached_resolution)
                     self.logger.debug(f"📦 [V2 RESOLUTION] Cached series resolution: {result}")
@@ -340,8 +378,8 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
             
             if resolution_info:
                 # Cache the result if caching is available
-                if hasattr(self, 'cache') and self.cache:
-                    self.cache.cache_series_resolution(jellyfin_id, resolution_info)
+                if fingerprint is not None and hasattr(resolution_info, 'to_dict'):
+                    await self.cache.put_resolution(jellyfin_id, fingerprint, resolution_info, db_session)
                 result = str(resolution_info)
                 self.logger.debug(f"🎆 [V2 RESOLUTION] Enhanced series resolution: {result}")
                 return result
@@ -426,25 +464,15 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
         self.logger.debug(f"🎭 [V2 RESOLUTION] Demo resolution for {poster_name}: {selected_resolution}")
         return selected_resolution
     
-    async def _create_v2_resolution_badge(
+    def _build_v2_resolution_badge(
         self,
-        poster_path: str,
         resolution_data: str,
-        settings: Dict[str, Any],
-        output_path: Optional[str] = None
-    ) -> Optional[str]:
-        """Create resolution badge using pure V2 renderer"""
+        settings: Dict[str, Any]
+    ) -> Optional[Image.Image]:
+        """Create resolution badge image using pure V2 renderer"""
         try:
             self.logger.debug(f"🎨 [V2 RESOLUTION] Creating badge for resolution: {resolution_data}")
             
-            # Determine output path
-            if output_path:
-                final_output_path = output_path
-            else:
-                # Generate V2 preview path
-                poster_name = Path(poster_path).name
-                final_output_path = f"/app/api/static/preview/{poster_name}"
-            
             # Create badge using V2 renderer
             image_badges_enabled = settings.get('ImageBadges', {}).get('enable_image_badges', True)
             
@@ -466,21 +494,7 @@ class V2ResolutionBadgeProcessor(BaseBadgeProcessor):
                 self.logger.debug(f"📝 [V2 RESOLUTION] Creating text badge")
                 badge = self.renderer.create_text_badge(resolution_data, settings, "resolution")
             
-            if not badge:
-                self.logger.error(f"❌ [V2 RESOLUTION] Badge creation failed")
-                return None
-            
-            # Apply badge to poster
-            success = self.renderer.apply_badge_to_poster(
-                poster_path, badge, settings, final_output_path
-            )
-            
-            if success:
-                self.logger.debug(f"✅ [V2 RESOLUTION] Badge applied successfully: {final_output_path}")
-                return final_output_path
-            else:
-                self.logger.error(f"❌ [V2 RESOLUTION] Badge application failed")
-                return None
+            return badge
                 
         except Exception as e:
             self.logger.error(f"❌ [V2 RESOLUTION] Badge creation error: {e}", exc_info=True)
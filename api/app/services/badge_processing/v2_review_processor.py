@@ -5,8 +5,9 @@ Completely V2-native review badge processing with no V1 dependencies.
 Clear logging for system differentiation.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
+from PIL import Image
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from aphrodite_logging import get_logger
@@ -15,6 +16,7 @@ from .types import PosterResult
 from .database_service import badge_settings_service
 from .renderers.review_data_fetcher import V2ReviewDataFetcher
 from .renderers.multi_badge_renderer import V2MultiBadgeRenderer
+from .renderers.compositor import BadgeLayerResult
 from app.core.database import async_session_factory
 
 
@@ -38,6 +40,37 @@ class V2ReviewBadgeProcessor(BaseBadgeProcessor):
         """Process a single poster with review badge using pure V2 system"""
         try:
             self.logger.info(f"🎬 [V2 REVIEW] PROCESSOR STARTED for: {poster_path}")
+            
+            with Image.open(poster_path) as poster:
+                poster_size = poster.size
+            
+            layer_result = await self.create_badge_layers(
+                poster_size, poster_path, use_demo_data, db_session, jellyfin_id
+            )
+            result = await self.apply_layer_result(poster_path, layer_result, output_path)
+            
+            if result.success and result.applied_badges:
+                self.logger.info(f"✅ [V2 REVIEW] PROCESSOR COMPLETED: {result.output_path}")
+            return result
+                
+        except Exception as e:
+            self.logger.error(f"🚨 [V2 REVIEW] PROCESSOR EXCEPTION: {e}", exc_info=True)
+            return PosterResult(
+                source_path=poster_path,
+                success=False,
+                error=f"V2 review processor error: {str(e)}"
+            )
+    
+    async def create_badge_layers(
+        self,
+        poster_size: Tuple[int, int],
+        poster_path: str,
+        use_demo_data: bool = False,
+        db_session: Optional[AsyncSession] = None,
+        jellyfin_id: Optional[str] = None
+    ) -> BadgeLayerResult:
+        """Render review badges as positioned layers for the compositing pipeline"""
+        try:
             self.logger.info(f"🎬 [V2 REVIEW] Jellyfin ID: {jellyfin_id}")
             self.logger.info(f"🎬 [V2 REVIEW] Use demo data: {use_demo_data}")
             
@@ -45,8 +78,7 @@ class V2ReviewBadgeProcessor(BaseBadgeProcessor):
             settings = await self._load_v2_settings(db_session)
             if not settings:
                 self.logger.error("❌ [V2 REVIEW] Failed to load settings from PostgreSQL")
-                return PosterResult(
-                    source_path=poster_path,
+                return BadgeLayerResult(
                     success=False,
                     error="Failed to load V2 review badge settings"
                 )
@@ -54,15 +86,10 @@ class V2ReviewBadgeProcessor(BaseBadgeProcessor):
             self.logger.info("✅ [V2 REVIEW] Settings loaded from PostgreSQL")
             
             # Get review data using pure V2 methods
-            reviews = await self._get_v2_review_data(jellyfin_id, use_demo_data, poster_path, settings)
+            reviews = await self._get_v2_review_data(jellyfin_id, use_demo_data, poster_path, settings, db_session)
             if not reviews:
                 self.logger.warning("⚠️ [V2 REVIEW] No reviews found, skipping review badge")
-                return PosterResult(
-                    source_path=poster_path,
-                    output_path=poster_path,
-                    applied_badges=[],
-                    success=True
-                )
+                return BadgeLayerResult()
             
             self.logger.info(f"📊 [V2 REVIEW] Found {len(reviews)} reviews")
             for i, review in enumerate(reviews):
@@ -70,35 +97,35 @@ class V2ReviewBadgeProcessor(BaseBadgeProcessor):
                 score = review.get('text', 'N/A')
                 self.logger.info(f"📈 [V2 REVIEW] Review {i+1}: {source} = {score}")
             
-            # Create review badges using V2 renderer
-            result_path = await self._create_v2_review_badges(
-                poster_path, reviews, settings, output_path
-            )
-            
-            if result_path:
-                self.logger.info(f"✅ [V2 REVIEW] PROCESSOR COMPLETED: {result_path}")
-                return PosterResult(
-                    source_path=poster_path,
-                    output_path=result_path,
-                    applied_badges=["review"],
-                    success=True
-                )
-            else:
+            # Create review badges using V2 multi-renderer
+            layers = self.multi_renderer.create_review_badge_layers(poster_size, reviews, settings)
+            if not layers:
                 self.logger.error(f"❌ [V2 REVIEW] Badge creation failed")
-                return PosterResult(
-                    source_path=poster_path,
+                return BadgeLayerResult(
                     success=False,
                     error="V2 review badge creation failed"
                 )
-                
+            
+            return BadgeLayerResult(layers=layers, applied_badges=["review"])
+            
         except Exception as e:
-            self.logger.error(f"🚨 [V2 REVIEW] PROCESSOR EXCEPTION: {e}", exc_info=True)
-            return PosterResult(
-                source_path=poster_path,
+            self.logger.error(f"🚨 [V2 REVIEW] LAYER EXCEPTION: {e}", exc_info=True)
+            return BadgeLayerResult(
                 success=False,
                 error=f"V2 review processor error: {str(e)}"
             )
     
+    async def get_fingerprint_inputs(
+        self,
+        jellyfin_id: str,
+        db_session: Optional[AsyncSession] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Review settings and fetched scores for the render fingerprint"""
+        settings = await self._load_v2_settings(db_session)
+        if not settings:
+            return None
+        return {"settings": settings, "reviews": await self._get_v2_review_data(jellyfin_id, False, "", settings, db_session)}
+    
     async def process_bulk(
         self,
         poster_paths: List[str],
@@ -140,7 +167,7 @@ class V2ReviewBadgeProcessor(BaseBadgeProcessor):
             
             # Load from v2 database
             if db_session:
-                settings = await badge_settings_service.get_review_settings(db_session, force_reload=True)
+                settings = await badge_settings_service.get_review_settings(db_session)
                 if settings and await badge_settings_service.validate_settings(settings, "review"):
                     self.logger.info("✅ [V2 REVIEW] Settings loaded from PostgreSQL (provided session)")
                     return settings
@@ -149,7 +176,7 @@ class V2ReviewBadgeProcessor(BaseBadgeProcessor):
             if not db_session:
                 try:
                     async with async_session_factory() as db:
-                        settings = await badge_settings_service.get_review_settings(db, force_reload=True)
+                        settings = await badge_settings_service.get_review_settings(db)
                         if settings and await badge_settings_service.validate_settings(settings, "review"):
                             self.logger.info("✅ [V2 REVIEW] Settings loaded from PostgreSQL (new session)")
                             return settings
@@ -213,14 +240,15 @@ class V2ReviewBadgeProcessor(BaseBadgeProcessor):
         jellyfin_id: Optional[str], 
         use_demo_data: bool, 
         poster_path: str,
-        settings: Dict[str, Any]
+        settings: Dict[str, Any],
+        db_session: Optional[AsyncSession] = None
     ) -> Optional[List[Dict[str, Any]]]:
         """Get review data using pure V2 methods only"""
         try:
             # Use real Jellyfin data when available
             if jellyfin_id:
                 self.logger.debug(f"🔍 [V2 REVIEW] Getting real reviews for ID: {jellyfin_id}")
-                reviews = await self.review_fetcher.get_reviews_for_media(jellyfin_id, settings)
+                reviews = await self.review_fetcher.get_reviews_for_media(jellyfin_id, settings, db_session)
                 if reviews:
                     self.logger.debug(f"✅ [V2 REVIEW] Real reviews found: {len(reviews)}")
                     return reviews
@@ -238,38 +266,3 @@ class V2ReviewBadgeProcessor(BaseBadgeProcessor):
         except Exception as e:
             self.logger.error(f"❌ [V2 REVIEW] Error getting review data: {e}", exc_info=True)
             return None
-    
-    async def _create_v2_review_badges(
-        self,
-        poster_path: str,
-        reviews: List[Dict[str, Any]],
-        settings: Dict[str, Any],
-        output_path: Optional[str] = None
-    ) -> Optional[str]:
-        """Create review badges using pure V2 renderer"""
-        try:
-            self.logger.debug(f"🎨 [V2 REVIEW] Creating badges for {len(reviews)} reviews")
-            
-            # Determine output path
-            if output_path:
-                final_output_path = output_path
-            else:
-                # Generate V2 preview path
-                poster_name = Path(poster_path).name
-                final_output_path = f"/app/api/static/preview/{poster_name}"
-            
-            # Apply review badges using V2 multi-renderer
-            success = self.multi_renderer.apply_review_badges_to_poster(
-                poster_path, reviews, settings, final_output_path
-            )
-            
-            if success:
-                self.logger.debug(f"✅ [V2 REVIEW] Review badges applied successfully: {final_output_path}")
-                return final_output_path
-            else:
-                self.logger.error(f"❌ [V2 REVIEW] Review badge application failed")
-                return None
-                
-        except Exception as e:
-            self.logger.error(f"❌ [V2 REVIEW] Badge creation error: {e}", exc_info=True)
-            return None
@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.jellyfin_service import get_jellyfin_service
 from app.services.tag_management_service import get_tag_management_service
+from app.services.badge_processing.render_fingerprint import get_render_fingerprint_service
 from app.services.poster_management import StorageManager
 from app.services.poster_sources import get_poster_source_manager
 from app.models.poster_sources import (
@@ -62,6 +63,11 @@ class BulkPosterReplacementService:
         # Process all items concurrently
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
+        # Confirm the uploaded posters with one batched query
+        unverified = await get_jellyfin_service().verify_pending_uploads(request.jellyfin_ids)
+        if unverified:
+            logger.warning(f"Could not verify replaced posters in Jellyfin: {unverified}")
+        
         # Process results
         processing_results = []
         successful_count = 0
@@ -324,14 +330,6 @@ class BulkPosterReplacementService:
                     error_details="Download failed"
                 )
                 
-            # Cache current poster as original
-            try:
-                current_poster_data = await jellyfin_service.download_poster(jellyfin_id)
-                if current_poster_data:
-                    self.storage_manager.cache_original_poster(current_poster_data, jellyfin_id)
-            except Exception as cache_error:
-                logger.warning(f"Failed to cache current poster for {item_id}: {cache_error}")
-                
             # Upload new poster to Jellyfin
             import tempfile
             import os
@@ -354,6 +352,19 @@ class BulkPosterReplacementService:
                         message="Failed to upload new poster to Jellyfin",
                         error_details="Upload failed"
                     )
+                
+                # The replacement is the item's new original, so restore returns to it
+                try:
+                    # Items run concurrently, so the store uses its own sessions rather than the shared one
+                    await self.storage_manager.cache_original_poster(poster_data, jellyfin_id, replace=True)
+                except Exception as cache_error:
+                    logger.warning(f"Failed to cache replacement poster for {item_id}: {cache_error}")
+                
+                # The next batch run must render this item again instead of skipping it as unchanged
+                try:
+                    await get_render_fingerprint_service().forget(jellyfin_id)
+                except Exception as fingerprint_error:
+                    logger.warning(f"Failed to clear render fingerprint for {item_id}: {fingerprint_error}")
                     
                 # Remove aphrodite-overlay tag
                 tag_removal_success = False
@@ -0,0 +1,357 @@
+"""
+Change Feed Service
+
+Finds new and changed Jellyfin items without listing whole libraries. Each
+library covered by an enabled schedule is polled with MinDateLastSaved from a
+stored high-water mark, and items still missing the aphrodite-overlay tag are
+queued for badging with that library's schedule badge types.
+
+Jellyfin webhook events wake the feed early instead of waiting for the next
+poll. Queued items are debounced: they go to a batch job once no further
+changes arrived for change_feed_debounce seconds, or after
+change_feed_max_delay at the latest, so a bulk import becomes a few batch
+jobs instead of one job per item.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import get_db_session
+from app.models.change_feed import ChangeFeedStateModel
+from app.models.schedules import ScheduleModel
+from app.services.jellyfin_service import get_jellyfin_service
+from app.services.poster_management.library_index import (
+    BADGE_TAG, INDEXED_ITEM_TYPES, SYNC_PAGE_SIZE, get_library_index_service, parse_jellyfin_date
+)
+from app.services.workflow import JobManager, JobCreator, PriorityManager, ResourceManager, JobRepository
+from aphrodite_logging import get_logger
+
+
+CHANGE_FEED_FIELDS = "Tags,DateLastSaved"
+
+# Webhook events arriving together (bulk imports) are coalesced into one poll
+WEBHOOK_COALESCE_SECONDS = 2.0
+
+MAX_POSTERS_PER_JOB = 1000
+
+
+class ChangeFeedService:
+    """Polls Jellyfin for changed items and queues them for badging"""
+    
+    def __init__(self):
+        self.settings = get_settings()
+        self.logger = get_logger("aphrodite.service.change_feed", service="scheduler")
+        self.running = False
+        self.feed_task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        
+        # Items waiting for a batch job: jellyfin_id -> library_id
+        self._pending: Dict[str, str] = {}
+        # Highest DateLastSaved queued per library, stored once the job exists
+        self._pending_watermarks: Dict[str, datetime] = {}
+        self._first_pending_at: Optional[float] = None
+        self._last_change_at: Optional[float] = None
+        self._last_poll_at: Optional[float] = None
+    
+    async def start(self):
+        """Start the change feed loop"""
+        if self.running:
+            return
+        if not self.settings.change_feed_enabled:
+            self.logger.info("Change feed disabled")
+            return
+        
+        self.logger.info("Starting change feed")
+        self.running = True
+        self._wake = asyncio.Event()
+        self.feed_task = asyncio.create_task(self._feed_loop())
+    
+    async def stop(self):
+        """Stop the change feed loop; queued items are picked up again after a restart"""
+        if not self.running:
+            return
+        
+        self.logger.info("Stopping change feed")
+        self.running = False
+        
+        if self.feed_task and not self.feed_task.done():
+            self.feed_task.cancel()
+            try:
+                await self.feed_task
+            except asyncio.CancelledError:
+                pass
+        
+        self.feed_task = None
+    
+    def notify(self) -> bool:
+        """
+        Poll soon because Jellyfin reported a change (webhook).
+        
+        Returns:
+            False if the change feed is not running
+        """
+        if not self.running or self._wake is None:
+            return False
+        self._wake.set()
+        return True
+    
+    def get_status(self) -> Dict[str, object]:
+        """Queued items and timings for diagnostics"""
+        now = time.monotonic()
+        return {
+            "enabled": self.settings.change_feed_enabled,
+            "running": self.running,
+            "pending_items": len(self._pending),
+            "pending_libraries": sorted(set(self._pending.values())),
+            "seconds_since_last_change": round(now - self._last_change_at, 1) if self._last_change_at else None
+        }
+    
+    async def _feed_loop(self):
+        """Poll on a timer or when woken, then hand settled changes to batch jobs"""
+        self.logger.info("Change feed loop started")
+        
+        while self.running:
+            try:
+                woken = await self._wait(self._next_timeout())
+                if woken:
+                    await asyncio.sleep(WEBHOOK_COALESCE_SECONDS)
+                    self._wake.clear()
+                
+                db_gen = get_db_session()
+                db = await db_gen.__anext__()
+                try:
+                    if woken or self._poll_due():
+                        await self.poll(db)
+                    if self._settled():
+                        await self.flush(db)
+                finally:
+                    await db.close()
+            
+            except asyncio.CancelledError:
+                self.logger.info("Change feed loop cancelled")
+                break
+            except Exception as e:
+                self.logger.error(f"Error in change feed loop: {e}", exc_info=True)
+                await asyncio.sleep(self.settings.change_feed_poll_interval)
+        
+        self.logger.info("Change feed loop stopped")
+    
+    async def _wait(self, timeout: float) -> bool:
+        """Sleep until the timeout or a webhook; returns True when woken by a webhook"""
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=max(timeout, 0.1))
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    def _next_timeout(self) -> float:
+        """Seconds until the next poll or until queued items settle, whichever is first"""
+        now = time.monotonic()
+        if self._last_poll_at is None:
+            return 0
+        timeout = self._last_poll_at + self.settings.change_feed_poll_interval - now
+        if self._pending:
+            timeout = min(
+                timeout,
+                self._last_change_at + self.settings.change_feed_debounce - now,
+                self._first_pending_at + self.settings.change_feed_max_delay - now
+            )
+        return timeout
+    
+    def _poll_due(self) -> bool:
+        return (
+            self._last_poll_at is None
+            or time.monotonic() - self._last_poll_at >= self.settings.change_feed_poll_interval
+        )
+    
+    def _settled(self) -> bool:
+        """Queued items go out once changes stop arriving, or after the maximum delay"""
+        if not self._pending:
+            return False
+        now = time.monotonic()
+        return (
+            now - self._last_change_at >= self.settings.change_feed_debounce
+            or now - self._first_pending_at >= self.settings.change_feed_max_delay
+        )
+    
+    async def poll(self, db: AsyncSession) -> int:
+        """
+        Ask Jellyfin for items saved since each library's watermark.
+        
+        Returns:
+            Number of newly queued items
+        """
+        self._last_poll_at = time.monotonic()
+        targets = await self._load_targets(db)
+        queued = 0
+        now = datetime.now(timezone.utc)
+        
+        for library_id in targets:
+            try:
+                state = await db.get(ChangeFeedStateModel, library_id)
+                if state is None:
+                    # Existing items are the scheduler's job; only follow changes from now on
+                    db.add(ChangeFeedStateModel(library_id=library_id, last_saved_watermark=now, last_polled_at=now))
+                    await db.commit()
+                    self.logger.info(f"Change feed now following library {library_id}")
+                    continue
+                
+                since = self._pending_watermarks.get(library_id) or state.last_saved_watermark
+                found, watermark = await self._fetch_changes(library_id, since)
+                
+                for jellyfin_id in found:
+                    if jellyfin_id not in self._pending:
+                        queued += 1
+                    self._pending[jellyfin_id] = library_id
+                if watermark is not None and (since is None or watermark > since):
+                    self._pending_watermarks[library_id] = watermark
+                
+                state.last_polled_at = now
+                await db.commit()
+                
+                if found:
+                    await get_library_index_service().mark_stale(library_id)
+                    self.logger.info(f"Change feed found {len(found)} changed items in library {library_id}")
+            
+            except Exception as e:
+                await db.rollback()
+                self.logger.error(f"Change feed poll failed for library {library_id}: {e}")
+        
+        if queued:
+            monotonic_now = time.monotonic()
+            self._last_change_at = monotonic_now
+            if self._first_pending_at is None:
+                self._first_pending_at = monotonic_now
+        
+        return queued
+    
+    async def _fetch_changes(self, library_id: str, since: Optional[datetime]) -> Tuple[List[str], Optional[datetime]]:
+        """
+        Unbadged movies and series saved after since.
+        
+        Returns:
+            Tuple of (jellyfin IDs, highest DateLastSaved seen)
+        """
+        jellyfin_service = get_jellyfin_service()
+        found = []
+        watermark = None
+        start_index = 0
+        
+        while True:
+            items, total = await jellyfin_service.fetch_library_page(
+                library_id,
+                item_types=INDEXED_ITEM_TYPES,
+                exclude_tags=[BADGE_TAG],
+                start_index=start_index,
+                limit=SYNC_PAGE_SIZE,
+                fields=CHANGE_FEED_FIELDS,
+                min_date_last_saved=since
+            )
+            
+            for item in items:
+                saved = parse_jellyfin_date(item.get("DateLastSaved"))
+                # MinDateLastSaved is inclusive; the item at the watermark was already queued
+                if not item.get("Id") or saved is None or (since is not None and saved <= since):
+                    continue
+                found.append(item["Id"])
+                if watermark is None or saved > watermark:
+                    watermark = saved
+            
+            # A page of badged items filtered out client-side is not the end of the library
+            start_index += SYNC_PAGE_SIZE
+            if start_index >= total:
+                break
+        
+        return found, watermark
+    
+    async def flush(self, db: AsyncSession) -> int:
+        """
+        Create batch jobs for the queued items and advance the stored watermarks.
+        
+        Returns:
+            Number of items sent to batch jobs
+        """
+        if not self._pending:
+            return 0
+        
+        targets = await self._load_targets(db)
+        enqueued_per_library: Dict[str, int] = {}
+        for library_id in self._pending.values():
+            enqueued_per_library[library_id] = enqueued_per_library.get(library_id, 0) + 1
+        
+        # Libraries sharing the same badge types share jobs
+        groups: Dict[Tuple[str, ...], List[str]] = {}
+        for jellyfin_id, library_id in self._pending.items():
+            badge_types = targets.get(library_id)
+            if badge_types:
+                groups.setdefault(tuple(badge_types), []).append(jellyfin_id)
+        
+        job_repository = JobRepository(db)
+        job_creator = JobCreator(job_repository)
+        priority_manager = PriorityManager(job_repository)
+        resource_manager = ResourceManager()
+        job_manager = JobManager(job_repository, job_creator, priority_manager, resource_manager)
+        
+        sent = 0
+        for badge_types, jellyfin_ids in groups.items():
+            poster_ids = [UUID(jellyfin_id) for jellyfin_id in jellyfin_ids]
+            for start in range(0, len(poster_ids), MAX_POSTERS_PER_JOB):
+                batch_poster_ids = poster_ids[start:start + MAX_POSTERS_PER_JOB]
+                job = await job_manager.create_job(
+                    user_id="change_feed",
+                    name=f"New media: {len(batch_poster_ids)} items",
+                    poster_ids=batch_poster_ids,
+                    badge_types=list(badge_types)
+                )
+                # A failure further on must not create this job twice
+                for jellyfin_id in jellyfin_ids[start:start + MAX_POSTERS_PER_JOB]:
+                    self._pending.pop(jellyfin_id, None)
+                sent += len(batch_poster_ids)
+                self.logger.info(f"✅ [CHANGE FEED] Created job {job.id} for {len(batch_poster_ids)} changed items")
+        
+        # Only now is it safe to move past these items
+        now = datetime.now(timezone.utc)
+        for library_id, watermark in self._pending_watermarks.items():
+            state = await db.get(ChangeFeedStateModel, library_id)
+            if state is None:
+                continue
+            state.last_saved_watermark = watermark
+            state.last_enqueued_at = now
+            state.items_enqueued = (state.items_enqueued or 0) + enqueued_per_library.get(library_id, 0)
+        await db.commit()
+        
+        self._pending.clear()
+        self._pending_watermarks.clear()
+        self._first_pending_at = None
+        self._last_change_at = None
+        return sent
+    
+    async def _load_targets(self, db: AsyncSession) -> Dict[str, List[str]]:
+        """Badge types per library, merged over all enabled schedules"""
+        result = await db.execute(select(ScheduleModel).where(ScheduleModel.enabled == True))
+        targets: Dict[str, List[str]] = {}
+        for schedule in result.scalars().all():
+            for library_id in schedule.target_libraries or []:
+                badge_types = targets.setdefault(library_id, [])
+                for badge_type in schedule.badge_types or []:
+                    if badge_type not in badge_types:
+                        badge_types.append(badge_type)
+        return {library_id: badge_types for library_id, badge_types in targets.items() if badge_types}
+
+
+# Global service instance
+_change_feed_service: Optional[ChangeFeedService] = None
+
+def get_change_feed_service() -> ChangeFeedService:
+    """Get global change feed service instance"""
+    global _change_feed_service
+    if _change_feed_service is None:
+        _change_feed_service = ChangeFeedService()
+    return _change_feed_service
@@ -224,30 +224,27 @@ class BatchJobDiagnostics:
             url = urljoin(self.jellyfin_service.base_url, "/System/Info")
             session = await self.jellyfin_service._get_session()
             
-            try:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "status": "authenticated",
-                            "server_name": data.get("ServerName", "Unknown"),
-                            "version": data.get("Version", "Unknown"),
-                            "message": "Authentication successful"
-                        }
-                    elif response.status == 401:
-                        return {
-                            "status": "unauthorized",
-                            "message": "Invalid API key or expired token"
-                        }
-                    else:
-                        response_text = await response.text()
-                        return {
-                            "status": "failed",
-                            "http_status": response.status,
-                            "message": response_text[:200]
-                        }
-            finally:
-                await session.close()
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return {
+                        "status": "authenticated",
+                        "server_name": data.get("ServerName", "Unknown"),
+                        "version": data.get("Version", "Unknown"),
+                        "message": "Authentication successful"
+                    }
+                elif response.status == 401:
+                    return {
+                        "status": "unauthorized",
+                        "message": "Invalid API key or expired token"
+                    }
+                else:
+                    response_text = await response.text()
+                    return {
+                        "status": "failed",
+                        "http_status": response.status,
+                        "message": response_text[:200]
+                    }
                 
         except Exception as e:
             return {
@@ -0,0 +1,338 @@
+"""
+Image Proxy Cache
+
+Bounded two-level cache for the image proxy: an in-memory LRU of encoded
+images and an on-disk LRU that survives restarts. Entries are keyed by the
+source URL plus the requested size, format and quality, so every thumbnail
+size is stored separately and served without touching Jellyfin or the
+external source again until it expires.
+
+Thumbnails are resized and encoded (WebP or JPEG) in the shared image
+executor so the event loop only awaits the result. Each entry carries a
+strong ETag (hash of the served bytes) for If-None-Match handling.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import aiohttp
+from PIL import Image
+from aphrodite_logging import get_logger
+
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/webp": "webp",
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif"
+}
+EXTENSION_CONTENT_TYPES = {ext: content_type for content_type, ext in CONTENT_TYPE_EXTENSIONS.items()}
+
+THUMBNAIL_FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+
+# Disk eviction trims to this share of the limit so it does not run on every write
+DISK_EVICTION_TARGET = 0.9
+
+
+@dataclass
+class CachedImage:
+    """Encoded image as served by the proxy"""
+    data: bytes
+    content_type: str
+    etag: str
+    stored_at: float  # time.time() when fetched from the source
+    
+    def is_fresh(self, max_age: float) -> bool:
+        return time.time() - self.stored_at < max_age
+
+
+def make_etag(data: bytes) -> str:
+    """Strong ETag for the exact bytes served"""
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+def make_thumbnail(
+    data: bytes,
+    width: Optional[int],
+    height: Optional[int],
+    image_format: str,
+    quality: int
+) -> Tuple[bytes, str]:
+    """
+    Downscale an image to fit width x height and encode it (runs inside a pool process).
+    
+    Returns:
+        Tuple of (encoded bytes, content type)
+    """
+    pil_format, content_type = THUMBNAIL_FORMATS[image_format]
+    
+    with Image.open(io.BytesIO(data)) as source:
+        source.draft("RGB", (width or source.width, height or source.height))  # Cheap JPEG downscale on decode
+        image = source.convert("RGBA" if pil_format == "WEBP" and source.mode in ("RGBA", "LA", "P") else "RGB")
+    
+    box = (width or image.width, height or image.height)
+    if image.width > box[0] or image.height > box[1]:
+        image.thumbnail(box, Image.LANCZOS)
+    
+    output = io.BytesIO()
+    if pil_format == "WEBP":
+        image.save(output, pil_format, quality=quality, method=4)
+    else:
+        image.save(output, pil_format, quality=quality, optimize=True, progressive=True)
+    return output.getvalue(), content_type
+
+
+class ImageProxyCache:
+    """Memory and disk LRU of proxied images"""
+    
+    def __init__(self, memory_bytes: int, disk_bytes: int, cache_dir: Optional[str] = None):
+        self.logger = get_logger("aphrodite.api.image_proxy_cache", service="api")
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir and disk_bytes > 0 else None
+        
+        self._images: "OrderedDict[str, CachedImage]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self._disk_used: Optional[int] = None  # Measured on first write
+        self._disk_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def make_key(self, url: str, width: Optional[int] = None, height: Optional[int] = None,
+                 image_format: Optional[str] = None, quality: Optional[int] = None) -> str:
+        """Hash the source URL and rendition into a cache key"""
+        raw = f"{url}|w={width}|h={height}|f={image_format}|q={quality}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    async def get_or_fetch(
+        self,
+        key: str,
+        max_age: float,
+        fetch: Callable[[], Awaitable[Tuple[bytes, str]]],
+        refresh: bool = False
+    ) -> CachedImage:
+        """
+        Return a fresh cached image or produce it with fetch().
+        
+        Concurrent misses for the same key share one fetch. If the source
+        fails, a stale copy is served rather than an error.
+        """
+        cached = None if refresh else await self._lookup(key)
+        if cached is not None and cached.is_fresh(max_age):
+            self.hits += 1
+            return cached
+        self.misses += 1
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            try:
+                data, content_type = await fetch()
+            except Exception:
+                if cached is not None:
+                    self.logger.warning(f"⚠️ [IMAGE CACHE] Source failed, serving stale copy of {key[:12]}")
+                    future.set_result(cached)
+                    return cached
+                raise
+            
+            image = CachedImage(data=data, content_type=content_type, etag=make_etag(data), stored_at=time.time())
+            self._put(key, image)
+            await asyncio.to_thread(self._save_to_disk, key, image)
+            future.set_result(image)
+            return image
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                future.exception()  # Waiters get it; do not warn when there are none
+            raise
+        finally:
+            self._inflight.pop(key, None)
+    
+    async def thumbnail(self, data: bytes, width: Optional[int], height: Optional[int],
+                        image_format: str, quality: int) -> Tuple[bytes, str]:
+        """Resize and encode an image in the image executor"""
+        from app.services.badge_processing.image_executor import get_image_executor
+        return await get_image_executor().run(make_thumbnail, data, width, height, image_format, quality)
+    
+    async def fetch_url(self, url: str, **kwargs: Any) -> Tuple[bytes, str]:
+        """
+        GET an external image over a pooled session.
+        
+        Raises:
+            aiohttp.ClientError on network errors
+            LookupError if the source does not return the image
+        """
+        session = await self._get_session()
+        async with session.get(url, **kwargs) as response:
+            if response.status != 200:
+                raise LookupError(f"HTTP {response.status}")
+            return await response.read(), response.headers.get("content-type", "image/jpeg")
+    
+    async def close(self) -> None:
+        """Close the pooled external session for the running event loop"""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        return {
+            "memory_items": len(self._images),
+            "memory_bytes": self._memory_used,
+            "memory_limit_bytes": self.memory_bytes,
+            "disk_bytes": self._disk_used,
+            "disk_limit_bytes": self.disk_bytes if self.cache_dir else 0,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+            self._sessions[loop] = session
+        return session
+    
+    async def _lookup(self, key: str) -> Optional[CachedImage]:
+        cached = self._get(key)
+        if cached is None and self.cache_dir:
+            cached = await asyncio.to_thread(self._load_from_disk, key)
+            if cached is not None:
+                self._put(key, cached)
+        return cached
+    
+    def _get(self, key: str) -> Optional[CachedImage]:
+        with self._lock:
+            cached = self._images.get(key)
+            if cached is not None:
+                self._images.move_to_end(key)
+            return cached
+    
+    def _put(self, key: str, image: CachedImage) -> None:
+        size = len(image.data)
+        if size > self.memory_bytes // 4:
+            return  # A few huge originals must not flush every thumbnail
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self._memory_used -= len(previous.data)
+            self._images[key] = image
+            self._memory_used += size
+            while self._memory_used > self.memory_bytes and self._images:
+                _, evicted = self._images.popitem(last=False)
+                self._memory_used -= len(evicted.data)
+    
+    def _disk_path(self, key: str, extension: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.{extension}"
+    
+    def _load_from_disk(self, key: str) -> Optional[CachedImage]:
+        for extension, content_type in EXTENSION_CONTENT_TYPES.items():
+            path = self._disk_path(key, extension)
+            try:
+                stat = path.stat()
+                data = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                self.logger.warning(f"⚠️ [IMAGE CACHE] Ignoring unreadable cached image {path.name}: {e}")
+                return None
+            # mtime is the fetch time; atime records use for LRU eviction
+            try:
+                os.utime(path, (time.time(), stat.st_mtime))
+            except OSError:
+                pass
+            return CachedImage(data=data, content_type=content_type, etag=make_etag(data), stored_at=stat.st_mtime)
+        return None
+    
+    def _save_to_disk(self, key: str, image: CachedImage) -> None:
+        extension = CONTENT_TYPE_EXTENSIONS.get(image.content_type.split(";")[0].strip())
+        if not self.cache_dir or extension is None:
+            return
+        try:
+            path = self._disk_path(key, extension)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            replaced = path.stat().st_size if path.exists() else 0
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(image.data)
+            os.utime(tmp_path, (time.time(), image.stored_at))
+            os.replace(tmp_path, path)
+            
+            with self._disk_lock:
+                if self._disk_used is None:
+                    self._disk_used = self._measure_disk()
+                else:
+                    self._disk_used += len(image.data) - replaced
+                if self._disk_used > self.disk_bytes:
+                    self._evict_disk()
+        except Exception as e:
+            self.logger.warning(f"⚠️ [IMAGE CACHE] Could not persist image: {e}")
+    
+    def _measure_disk(self) -> int:
+        return sum(path.stat().st_size for path in self.cache_dir.glob("*/*") if path.is_file())
+    
+    def _evict_disk(self) -> None:
+        """Delete least recently used files until the cache is back under its target"""
+        files = []
+        for path in self.cache_dir.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_atime, stat.st_size, path))
+        files.sort()
+        
+        used = sum(size for _, size, _ in files)
+        target = int(self.disk_bytes * DISK_EVICTION_TARGET)
+        removed = 0
+        for _, size, path in files:
+            if used <= target:
+                break
+            try:
+                path.unlink()
+                used -= size
+                removed += 1
+            except OSError:
+                continue
+        
+        self._disk_used = used
+        self.logger.debug(f"🧹 [IMAGE CACHE] Evicted {removed} cached images, {used} bytes on disk")
+
+
+# Global cache instance
+_image_proxy_cache: Optional[ImageProxyCache] = None
+
+def get_image_proxy_cache() -> ImageProxyCache:
+    """Get global image proxy cache instance"""
+    global _image_proxy_cache
+    if _image_proxy_cache is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+        _image_proxy_cache = ImageProxyCache(
+            memory_bytes=settings.image_proxy_memory_cache_mb * 1024 * 1024,
+            disk_bytes=settings.image_proxy_disk_cache_mb * 1024 * 1024,
+            cache_dir=settings.image_proxy_cache_dir or None
+        )
+    return _image_proxy_cache
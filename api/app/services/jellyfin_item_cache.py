@@ -0,0 +1,105 @@
+"""
+Jellyfin Item Metadata Cache
+
+Short-lived, size-bounded cache of Jellyfin item details with in-flight
+request coalescing, so every badge processor working on the same poster
+shares one metadata round trip.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aphrodite_logging import get_logger
+
+
+class JellyfinItemCache:
+    """TTL and LRU bounded item metadata cache with request coalescing"""
+    
+    def __init__(self, ttl_seconds: float = 300.0, max_items: int = 512):
+        self.logger = get_logger("aphrodite.service.jellyfin.cache", service="jellyfin")
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        
+        # item_id -> (expires_at, metadata)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        
+        # Pending fetches are futures, which belong to one event loop
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = weakref.WeakKeyDictionary()
+    
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Return cached metadata for an item if it has not expired"""
+        entry = self._entries.get(item_id)
+        if entry is None:
+            return None
+        
+        expires_at, metadata = entry
+        if expires_at <= time.monotonic():
+            del self._entries[item_id]
+            return None
+        
+        self._entries.move_to_end(item_id)
+        return metadata
+    
+    def put(self, item_id: str, metadata: Dict[str, Any]) -> None:
+        """Store metadata for an item, evicting the least recently used entries"""
+        if self.ttl_seconds <= 0 or self.max_items <= 0:
+            return
+        
+        self._entries[item_id] = (time.monotonic() + self.ttl_seconds, metadata)
+        self._entries.move_to_end(item_id)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, item_id: str) -> None:
+        """Drop an item after it was changed on the Jellyfin side"""
+        self._entries.pop(item_id, None)
+    
+    def clear(self) -> None:
+        """Drop all cached items"""
+        self._entries.clear()
+    
+    async def get_or_fetch(
+        self,
+        item_id: str,
+        fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return cached metadata or fetch it, sharing one fetch between
+        concurrent callers asking for the same item.
+        
+        Failed lookups (None) are returned to every waiter but not cached.
+        """
+        cached = self.get(item_id)
+        if cached is not None:
+            self.logger.debug(f"Item metadata cache hit: {item_id}")
+            return cached
+        
+        loop = asyncio.get_running_loop()
+        pending = self._in_flight.setdefault(loop, {})
+        
+        future = pending.get(item_id)
+        if future is not None:
+            self.logger.debug(f"Joining in-flight metadata request: {item_id}")
+            return await asyncio.shield(future)
+        
+        future = loop.create_future()
+        pending[item_id] = future
+        try:
+            metadata = await fetch()
+            if metadata is not None:
+                self.put(item_id, metadata)
+            future.set_result(metadata)
+            return metadata
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            pending.pop(item_id, None)
@@ -5,13 +5,18 @@ Handles communication with Jellyfin media server API.
 """
 
 import aiohttp
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Iterable, Callable
 from urllib.parse import urljoin
 import asyncio
+import base64
+import os
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 from app.core.config import get_settings
+from app.core.config_listener import get_system_config_listener
 from aphrodite_logging import get_logger
+from app.services.jellyfin_item_cache import JellyfinItemCache
 
 # Define MediaType enum locally to avoid shared module dependency
 from enum import Enum
@@ -28,6 +33,22 @@ def generate_id() -> str:
     return str(uuid.uuid4())
 
 
+# Item fields needed by all badge processors, requested once per item
+ITEM_DETAIL_FIELDS = "MediaSources,MediaStreams,ProviderIds,Tags,Genres,Overview,ProductionYear,CommunityRating,OfficialRating"
+
+# Episode fields needed for resolution and audio detection (Path feeds filename hints)
+EPISODE_MEDIA_FIELDS = "MediaSources,MediaStreams,Path"
+
+# Item fields needed for library listings (badge status comes from Tags)
+LIBRARY_LIST_FIELDS = "Tags,Genres,Overview,ProductionYear,CommunityRating,OfficialRating"
+
+# Poster uploads are Base64-encoded per chunk; a multiple of 3 keeps chunks free of padding
+UPLOAD_CHUNK_SIZE = 3 * 64 * 1024
+
+# Uploads awaiting deferred verification, oldest dropped beyond this
+MAX_PENDING_VERIFICATIONS = 1000
+
+
 class JellyfinService:
     """Service for interacting with Jellyfin API"""
     
@@ -40,21 +61,39 @@ class JellyfinService:
         self.api_key = None
         self.user_id = None
         
-        # Load settings asynchronously when needed
+        # Load settings asynchronously when needed, again after settings.yaml changes
+        # (notifications arrive in processes that run the config listener, e.g. the API)
         self._settings_loaded = False
+        get_system_config_listener().subscribe(self._on_config_changed)
         
         # Environment variable fallbacks
         self.env_base_url = self.settings.jellyfin_url
         self.env_api_key = self.settings.jellyfin_api_key
         self.env_user_id = getattr(self.settings, 'jellyfin_user_id', None)
         
-        self.session: Optional[aiohttp.ClientSession] = None
+        # Pooled HTTP sessions keyed by id(event loop): (loop, session, API key it was built for).
+        # A session references its loop, so entries for closed loops are pruned explicitly.
+        self._sessions: Dict[int, Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession, Optional[str]]] = {}
+        
+        # Item metadata shared by every badge processor working on the same item
+        self._item_cache = JellyfinItemCache(
+            ttl_seconds=self.settings.jellyfin_item_cache_ttl,
+            max_items=self.settings.jellyfin_item_cache_size
+        )
+        
+        # Uploaded item ID -> primary image tag before the upload, awaiting verification
+        self._pending_verifications: "OrderedDict[str, Optional[str]]" = OrderedDict()
         
         # Rate limiting for batch processing
         self._last_request_time = None
         self._min_request_interval = 0.1  # Minimum 100ms between requests
         self._request_lock = asyncio.Lock()
     
+    def _on_config_changed(self, config_key: str):
+        """Reload connection settings on next use after any process saves settings.yaml"""
+        if config_key in ("settings.yaml", "*"):
+            self._settings_loaded = False
+    
     async def _load_jellyfin_settings(self):
         """Load Jellyfin settings from database or environment variables"""
         if self._settings_loaded:
@@ -169,17 +208,38 @@ class JellyfinService:
         self._settings_loaded = True
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session with proper Jellyfin headers"""
-        # Always create a new session instead of reusing
-        # This prevents "Event loop is closed" errors in worker environment
-        # and avoids session conflicts during batch processing
+        """Get the pooled keep-alive HTTP session for the running event loop"""
+        # aiohttp sessions are bound to the loop that created them, so keep one
+        # per loop. Worker tasks that run on a short-lived loop get their own
+        # session instead of reusing one whose loop is already closed, which is
+        # what used to cause "Event loop is closed" errors.
+        loop = asyncio.get_running_loop()
+        self._prune_sessions()
+        pooled = self._sessions.get(id(loop))
+        if pooled is not None:
+            _, session, api_key = pooled
+            if not session.closed and api_key == self.api_key:
+                return session
+            # Credentials changed since the session was created
+            if not session.closed:
+                await session.close()
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.settings.jellyfin_pool_limit,
+            limit_per_host=self.settings.jellyfin_pool_limit_per_host,
+            ttl_dns_cache=300,
+            keepalive_timeout=self.settings.jellyfin_keepalive_timeout
+        )
         timeout = aiohttp.ClientTimeout(total=30)
         # Use X-Emby-Token header like v1, not URL parameters
         headers = {
             "X-Emby-Token": self.api_key,
             "Content-Type": "application/json"
         }
-        return aiohttp.ClientSession(timeout=timeout, headers=headers)
+        session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+        self._sessions[id(loop)] = (loop, session, self.api_key)
+        self.logger.debug(f"Created pooled Jellyfin session for event loop {id(loop)}")
+        return session
     
     async def _throttle_request(self):
         """Throttle API requests to prevent overwhelming Jellyfin during batch processing"""
@@ -196,10 +256,17 @@ class JellyfinService:
             self._last_request_time = datetime.now()
     
     async def close(self):
-        """Close HTTP session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Close the pooled HTTP session for the running event loop"""
+        pooled = self._sessions.pop(id(asyncio.get_running_loop()), None)
+        if pooled is not None and not pooled[1].closed:
+            await pooled[1].close()
+    
+    def _prune_sessions(self):
+        """Forget sessions of event loops that were closed without closing them (e.g. Celery task loops)"""
+        for loop_id, (loop, session, _) in list(self._sessions.items()):
+            if loop.is_closed():
+                del self._sessions[loop_id]
+                self.logger.debug(f"Dropped Jellyfin session of closed event loop {loop_id}")
     
     async def test_connection(self) -> Tuple[bool, str]:
         """Test connection to Jellyfin server"""
@@ -215,19 +282,16 @@ class JellyfinService:
             url = urljoin(self.base_url, "/System/Info")
             session = await self._get_session()
             
-            try:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        server_name = data.get("ServerName", "Unknown")
-                        version = data.get("Version", "Unknown")
-                        self.logger.info(f"Connected to Jellyfin: {server_name} v{version}")
-                        return True, f"Connected to {server_name} v{version}"
-                    else:
-                        self.logger.error(f"Jellyfin connection failed: HTTP {response.status}")
-                        return False, f"HTTP {response.status}: {await response.text()}"
-            finally:
-                await session.close()
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    server_name = data.get("ServerName", "Unknown")
+                    version = data.get("Version", "Unknown")
+                    self.logger.info(f"Connected to Jellyfin: {server_name} v{version}")
+                    return True, f"Connected to {server_name} v{version}"
+                else:
+                    self.logger.error(f"Jellyfin connection failed: HTTP {response.status}")
+                    return False, f"HTTP {response.status}: {await response.text()}"
                     
         except Exception as e:
             self.logger.error(f"Jellyfin connection error: {e}")
@@ -246,24 +310,26 @@ class JellyfinService:
             url = urljoin(self.base_url, "/Library/VirtualFolders")
             session = await self._get_session()
             
-            try:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        libraries = await response.json()
-                        self.logger.info(f"Found {len(libraries)} libraries")
-                        return libraries
-                    else:
-                        self.logger.error(f"Failed to get libraries: HTTP {response.status}")
-                        return []
-            finally:
-                await session.close()
+            async with session.get(url) as response:
+                if response.status == 200:
+                    libraries = await response.json()
+                    self.logger.info(f"Found {len(libraries)} libraries")
+                    return libraries
+                else:
+                    self.logger.error(f"Failed to get libraries: HTTP {response.status}")
+                    return []
                     
         except Exception as e:
             self.logger.error(f"Error getting libraries: {e}")
             return []
     
     async def get_library_items(self, library_id: str) -> List[Dict[str, Any]]:
-        """Get all items from a specific library using user-specific API for reliability"""
+        """
+        Get all items from a specific library using user-specific API for reliability.
+        
+        Loads the whole library in one response; prefer iter_library_items or
+        query_library_items when only some item types or one page are needed.
+        """
         try:
             # Load settings first
             await self._load_jellyfin_settings()
@@ -283,22 +349,19 @@ class JellyfinService:
                 params = {
                     "ParentId": library_id,
                     "Recursive": "true",
-                    "Fields": "Tags,Genres,Overview,ProductionYear,CommunityRating,OfficialRating"
+                    "Fields": LIBRARY_LIST_FIELDS
                 }
                 
                 session = await self._get_session()
                 
-                try:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            items = data.get("Items", [])
-                            self.logger.info(f"Found {len(items)} items in library {library_id} via user API")
-                            return items
-                        else:
-                            self.logger.warning(f"User API failed for library items: HTTP {response.status}, falling back to general API")
-                finally:
-                    await session.close()
+                async with session.get(url, params=params) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        items = data.get("Items", [])
+                        self.logger.info(f"Found {len(items)} items in library {library_id} via user API")
+                        return items
+                    else:
+                        self.logger.warning(f"User API failed for library items: HTTP {response.status}, falling back to general API")
             
             # Fallback to general API
             url = urljoin(
@@ -310,30 +373,232 @@ class JellyfinService:
             params = {
                 "ParentId": library_id,
                 "Recursive": "true",
-                "Fields": "Tags,Genres,Overview,ProductionYear,CommunityRating,OfficialRating"
+                "Fields": LIBRARY_LIST_FIELDS
             }
             
             session = await self._get_session()
             
-            try:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        items = data.get("Items", [])
-                        self.logger.info(f"Found {len(items)} items in library {library_id} via general API")
-                        return items
-                    else:
-                        self.logger.error(f"Failed to get library items: HTTP {response.status}")
-                        return []
-            finally:
-                await session.close()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    items = data.get("Items", [])
+                    self.logger.info(f"Found {len(items)} items in library {library_id} via general API")
+                    return items
+                else:
+                    self.logger.error(f"Failed to get library items: HTTP {response.status}")
+                    return []
                     
         except Exception as e:
             self.logger.error(f"Error getting library items: {e}")
             return []
     
-    async def get_item_details(self, item_id: str) -> Optional[Dict[str, Any]]:
-        """Get detailed information for a specific item (uses user-specific API first as it's more reliable)"""
+    async def fetch_library_page(
+        self,
+        library_id: Optional[str],
+        item_types: Optional[Iterable[str]] = None,
+        search_term: Optional[str] = None,
+        genres: Optional[Iterable[str]] = None,
+        years: Optional[Iterable[int]] = None,
+        tags: Optional[Iterable[str]] = None,
+        exclude_tags: Optional[Iterable[str]] = None,
+        sort_by: str = "SortName",
+        sort_order: str = "Ascending",
+        start_index: int = 0,
+        limit: Optional[int] = None,
+        fields: str = LIBRARY_LIST_FIELDS,
+        min_date_last_saved: Optional[datetime] = None,
+        image_types: Optional[Iterable[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get one page of library items with filtering, sorting and paging done by Jellyfin.
+        
+        Args:
+            library_id: Jellyfin library (parent) ID, or None for all of the user's libraries
+            item_types: Jellyfin item types to include, e.g. ["Movie", "Series"]
+            search_term: Name search term
+            genres / years / tags: Only include items matching any of these
+            exclude_tags: Skip items carrying any of these tags
+            sort_by / sort_order: Jellyfin sort fields and direction
+            start_index / limit: Page window (limit=0 returns only the total count)
+            fields: Extra item fields to return
+            min_date_last_saved: Only include items saved in Jellyfin at or after this time
+            image_types: Only include items that have all of these images, e.g. ["Primary"]
+            
+        Returns:
+            Tuple of (items, total record count matching the filters). Servers
+            that ignore ExcludeTags count excluded items in the total and the
+            page may come back short or empty, so callers page on
+            start_index < total rather than stopping at an empty page.
+            
+        Raises:
+            RuntimeError: If Jellyfin is not configured or the request fails
+        """
+        await self._load_jellyfin_settings()
+        
+        if not self.base_url or not self.api_key:
+            raise RuntimeError("Jellyfin not configured")
+        
+        params = {
+            "Recursive": "true",
+            "Fields": fields,
+            "SortBy": sort_by,
+            "SortOrder": sort_order,
+            "StartIndex": str(start_index),
+            "EnableTotalRecordCount": "true"
+        }
+        if library_id:
+            params["ParentId"] = library_id
+        if limit is not None:
+            params["Limit"] = str(limit)
+        if item_types:
+            params["IncludeItemTypes"] = ",".join(item_types)
+        if search_term:
+            params["SearchTerm"] = search_term
+        if genres:
+            params["Genres"] = "|".join(genres)
+        if years:
+            params["Years"] = ",".join(str(year) for year in years)
+        if tags:
+            params["Tags"] = "|".join(tags)
+        if min_date_last_saved:
+            params["MinDateLastSaved"] = min_date_last_saved.isoformat()
+        if image_types:
+            params["ImageTypes"] = ",".join(image_types)
+        exclude_tags = list(exclude_tags or [])
+        if exclude_tags:
+            params["ExcludeTags"] = "|".join(exclude_tags)
+        
+        # Use user-specific API if available (more reliable than general /Items endpoint)
+        if self.user_id:
+            url = urljoin(self.base_url, f"/Users/{self.user_id}/Items")
+        else:
+            url = urljoin(self.base_url, "/Items")
+        
+        session = await self._get_session()
+        
+        async with session.get(url, params=params) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Failed to query library items: HTTP {response.status}")
+            
+            data = await response.json()
+        
+        items = data.get("Items", [])
+        total = data.get("TotalRecordCount", len(items))
+        
+        # Servers that ignore ExcludeTags must still not leak excluded items
+        if exclude_tags:
+            items = [
+                item for item in items
+                if not any(tag in (item.get("Tags") or []) for tag in exclude_tags)
+            ]
+        
+        self.logger.debug(f"Library {library_id} page at {start_index}: {len(items)} of {total} items")
+        return items, total
+    
+    async def query_library_items(self, library_id: str, **filters) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get one page of library items (see fetch_library_page for the filters).
+        
+        Returns:
+            Tuple of (items, total record count), or ([], 0) if the request failed
+        """
+        try:
+            return await self.fetch_library_page(library_id, **filters)
+        except Exception as e:
+            self.logger.error(f"Error querying library items: {e}")
+            return [], 0
+    
+    async def iter_library_items(
+        self,
+        library_id: str,
+        page_size: int = 500,
+        **filters
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over library items page by page instead of loading the whole library.
+        
+        Accepts the same filters as fetch_library_page (except start_index/limit).
+        
+        Raises:
+            RuntimeError: If Jellyfin is not configured or a page request fails,
+                so a failed library is not mistaken for an empty one
+        """
+        start_index = 0
+        while True:
+            items, total = await self.fetch_library_page(
+                library_id,
+                start_index=start_index,
+                limit=page_size,
+                **filters
+            )
+            for item in items:
+                yield item
+            
+            # A page emptied by the exclude_tags filter is not the end of the library
+            start_index += page_size
+            if start_index >= total:
+                break
+    
+    async def count_library_items(self, library_id: str, **filters) -> int:
+        """Count library items matching the filters without downloading them"""
+        _, total = await self.query_library_items(library_id, limit=0, **filters)
+        return total
+    
+    async def get_library_filters(self, library_id: str) -> Dict[str, List[Any]]:
+        """
+        Get the genres and years present in a library from Jellyfin's filter index.
+        
+        Returns:
+            Dict with "genres" and "years" lists (empty if unavailable)
+        """
+        try:
+            await self._load_jellyfin_settings()
+            
+            if not self.base_url or not self.api_key:
+                self.logger.error("Jellyfin not configured")
+                return {"genres": [], "years": []}
+            
+            url = urljoin(self.base_url, "/Items/Filters")
+            params = {"ParentId": library_id}
+            if self.user_id:
+                params["UserId"] = self.user_id
+            
+            session = await self._get_session()
+            
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    self.logger.warning(f"Failed to get library filters: HTTP {response.status}")
+                    return {"genres": [], "years": []}
+                
+                data = await response.json()
+            
+            return {
+                "genres": data.get("Genres") or [],
+                "years": data.get("Years") or []
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error getting library filters: {e}")
+            return {"genres": [], "years": []}
+    
+    async def get_item_details(self, item_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Get detailed information for a specific item (uses user-specific API first as it's more reliable).
+        
+        Results are cached briefly and concurrent lookups for the same item share
+        one request, so the audio, resolution, review and awards processors fetch
+        a poster's metadata once. The returned dict is shared; treat it as read-only.
+        """
+        if not use_cache:
+            return await self._fetch_item_details(item_id)
+        return await self._item_cache.get_or_fetch(item_id, lambda: self._fetch_item_details(item_id))
+    
+    def invalidate_item(self, item_id: str) -> None:
+        """Drop cached metadata for an item that was changed in Jellyfin"""
+        self._item_cache.invalidate(item_id)
+    
+    async def _fetch_item_details(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch item details from Jellyfin, bypassing the metadata cache"""
         # Try the user-specific API first as it's more reliable
         result = await self.get_media_item_by_id(item_id)
         if result:
@@ -358,33 +623,30 @@ class JellyfinService:
             
             # Add MediaSources and MediaStreams fields for badge compatibility
             params = {
-                "Fields": "MediaSources,MediaStreams,ProviderIds,Tags,Genres,Overview,ProductionYear,CommunityRating,OfficialRating"
+                "Fields": ITEM_DETAIL_FIELDS
             }
             
             session = await self._get_session()
             
-            try:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        metadata = await response.json()
-                        self.logger.debug(f"Retrieved metadata for item {item_id}")
-                        return metadata
-                    elif response.status == 400:
-                        self.logger.error(f"Jellyfin item not found or invalid: {item_id} (HTTP 400)")
-                        self.logger.error(f"This usually means the item ID is invalid or the item was deleted from Jellyfin")
-                        return None
-                    elif response.status == 401:
-                        self.logger.error(f"Jellyfin authentication failed (HTTP 401) - check API key configuration")
-                        return None
-                    elif response.status == 404:
-                        self.logger.error(f"Jellyfin item not found: {item_id} (HTTP 404)")
-                        return None
-                    else:
-                        response_text = await response.text()
-                        self.logger.error(f"Failed to get item metadata: HTTP {response.status} - {response_text}")
-                        return None
-            finally:
-                await session.close()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    metadata = await response.json()
+                    self.logger.debug(f"Retrieved metadata for item {item_id}")
+                    return metadata
+                elif response.status == 400:
+                    self.logger.error(f"Jellyfin item not found or invalid: {item_id} (HTTP 400)")
+                    self.logger.error(f"This usually means the item ID is invalid or the item was deleted from Jellyfin")
+                    return None
+                elif response.status == 401:
+                    self.logger.error(f"Jellyfin authentication failed (HTTP 401) - check API key configuration")
+                    return None
+                elif response.status == 404:
+                    self.logger.error(f"Jellyfin item not found: {item_id} (HTTP 404)")
+                    return None
+                else:
+                    response_text = await response.text()
+                    self.logger.error(f"Failed to get item metadata: HTTP {response.status} - {response_text}")
+                    return None
                     
         except Exception as e:
             self.logger.error(f"Error getting item metadata for {item_id}: {e}")
@@ -408,30 +670,27 @@ class JellyfinService:
             
             # Verify the image exists
             session = await self._get_session()
-            try:
-                async with session.head(poster_url) as response:
-                    if response.status == 200:
-                        self.logger.debug(f"Found poster for item {item_id}")
-                        return poster_url
-                    elif response.status == 400:
-                        # HTTP 400 is common for this endpoint, but poster might still exist
-                        # Try a GET request to see if the image is actually available
-                        self.logger.debug(f"HEAD request returned 400 for {item_id}, trying GET")
-                        async with session.get(poster_url) as get_response:
-                            if get_response.status == 200:
-                                self.logger.debug(f"Found poster for item {item_id} via GET (HEAD failed)")
-                                return poster_url
-                            else:
-                                self.logger.warning(f"No poster found for item {item_id} (GET: HTTP {get_response.status})")
-                                return None
-                    else:
-                        self.logger.warning(f"No poster found for item {item_id} (HTTP {response.status})")
-                        # Log more details for debugging
-                        response_text = await response.text() if response.status != 404 else "Not Found"
-                        self.logger.debug(f"Poster check failed for {item_id}: {response_text}")
-                        return None
-            finally:
-                await session.close()
+            async with session.head(poster_url) as response:
+                if response.status == 200:
+                    self.logger.debug(f"Found poster for item {item_id}")
+                    return poster_url
+                elif response.status == 400:
+                    # HTTP 400 is common for this endpoint, but poster might still exist
+                    # Try a GET request to see if the image is actually available
+                    self.logger.debug(f"HEAD request returned 400 for {item_id}, trying GET")
+                    async with session.get(poster_url) as get_response:
+                        if get_response.status == 200:
+                            self.logger.debug(f"Found poster for item {item_id} via GET (HEAD failed)")
+                            return poster_url
+                        else:
+                            self.logger.warning(f"No poster found for item {item_id} (GET: HTTP {get_response.status})")
+                            return None
+                else:
+                    self.logger.warning(f"No poster found for item {item_id} (HTTP {response.status})")
+                    # Log more details for debugging
+                    response_text = await response.text() if response.status != 404 else "Not Found"
+                    self.logger.debug(f"Poster check failed for {item_id}: {response_text}")
+                    return None
                     
         except Exception as e:
             self.logger.error(f"Error getting poster URL for {item_id}: {e}")
@@ -454,34 +713,31 @@ class JellyfinService:
             
             self.logger.debug(f"Downloading poster from URL: {poster_url}")
             session = await self._get_session()
-            try:
-                # Debug logging: Log session creation
+            # Debug logging: Log session creation
+            if debug_logger:
+                await debug_logger.log_session_creation("download_poster", {
+                    "poster_url": poster_url,
+                    "session_id": id(session),
+                    "item_id": item_id
+                })
+            async with session.get(poster_url) as response:
+                # Debug logging: Log response details
                 if debug_logger:
-                    await debug_logger.log_session_creation("download_poster", {
-                        "poster_url": poster_url,
-                        "session_id": id(session),
-                        "item_id": item_id
-                    })
-                async with session.get(poster_url) as response:
-                    # Debug logging: Log response details
+                    await debug_logger.log_response_analysis(item_id, response)
+                    
+                if response.status == 200:
+                    poster_data = await response.read()
+                    # Debug logging: Log successful download
+                    if debug_logger:
+                        await debug_logger.log_response_analysis(item_id, response, poster_data)
+                    self.logger.debug(f"Downloaded poster for item {item_id}: {len(poster_data)} bytes")
+                    return poster_data
+                else:
+                    # Debug logging: Log failed download
                     if debug_logger:
                         await debug_logger.log_response_analysis(item_id, response)
-                        
-                    if response.status == 200:
-                        poster_data = await response.read()
-                        # Debug logging: Log successful download
-                        if debug_logger:
-                            await debug_logger.log_response_analysis(item_id, response, poster_data)
-                        self.logger.debug(f"Downloaded poster for item {item_id}: {len(poster_data)} bytes")
-                        return poster_data
-                    else:
-                        # Debug logging: Log failed download
-                        if debug_logger:
-                            await debug_logger.log_response_analysis(item_id, response)
-                        self.logger.error(f"Failed to download poster for {item_id}: HTTP {response.status}")
-                        return None
-            finally:
-                await session.close()
+                    self.logger.error(f"Failed to download poster for {item_id}: HTTP {response.status}")
+                    return None
                     
         except Exception as e:
             self.logger.error(f"Error downloading poster for {item_id}: {e}")
@@ -541,67 +797,72 @@ class JellyfinService:
             if self.user_id:
                 url = urljoin(self.base_url, f"/Users/{self.user_id}/Items/{jellyfin_id}")
                 params = {
-                    "Fields": "MediaSources,MediaStreams"
+                    "Fields": ITEM_DETAIL_FIELDS
                 }
                 
                 session = await self._get_session()
                 
-                try:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            media_item = await response.json()
-                            self.logger.debug(f"Retrieved media item via user API {jellyfin_id}: {media_item.get('Name', 'Unknown')}")
-                            return media_item
-                        elif response.status == 400:
-                            self.logger.warning(f"User API returned 400 for {jellyfin_id}, trying general API")
-                        elif response.status == 401:
-                            self.logger.error(f"Jellyfin authentication failed (HTTP 401) - check API key and user ID")
-                            return None
-                        elif response.status == 404:
-                            self.logger.warning(f"Item not found via user API: {jellyfin_id}, trying general API")
-                        else:
-                            response_text = await response.text()
-                            self.logger.warning(f"User API failed for {jellyfin_id}: HTTP {response.status} - {response_text}")
-                finally:
-                    await session.close()
-            
-            # Fallback to general API endpoint
-            url = urljoin(self.base_url, f"/Items/{jellyfin_id}")
-            params = {
-                "Fields": "MediaSources,MediaStreams,ProviderIds,Tags,Genres,Overview,ProductionYear,CommunityRating,OfficialRating"
-            }
-            
-            session = await self._get_session()
-            
-            try:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         media_item = await response.json()
-                        self.logger.debug(f"Retrieved media item via general API {jellyfin_id}: {media_item.get('Name', 'Unknown')}")
+                        self.logger.debug(f"Retrieved media item via user API {jellyfin_id}: {media_item.get('Name', 'Unknown')}")
                         return media_item
                     elif response.status == 400:
-                        self.logger.error(f"Invalid Jellyfin item ID: {jellyfin_id} (HTTP 400)")
-                        self.logger.error(f"This item may have been deleted from Jellyfin or the ID is corrupted")
-                        return None
+                        self.logger.warning(f"User API returned 400 for {jellyfin_id}, trying general API")
                     elif response.status == 401:
-                        self.logger.error(f"Jellyfin authentication failed (HTTP 401) - check API key configuration")
+                        self.logger.error(f"Jellyfin authentication failed (HTTP 401) - check API key and user ID")
                         return None
                     elif response.status == 404:
-                        self.logger.error(f"Jellyfin item not found: {jellyfin_id} (HTTP 404)")
-                        return None
+                        self.logger.warning(f"Item not found via user API: {jellyfin_id}, trying general API")
                     else:
                         response_text = await response.text()
-                        self.logger.error(f"Failed to get media item {jellyfin_id}: HTTP {response.status} - {response_text}")
-                        return None
-            finally:
-                await session.close()
+                        self.logger.warning(f"User API failed for {jellyfin_id}: HTTP {response.status} - {response_text}")
+            
+            # Fallback to general API endpoint
+            url = urljoin(self.base_url, f"/Items/{jellyfin_id}")
+            params = {
+                "Fields": ITEM_DETAIL_FIELDS
+            }
+            
+            session = await self._get_session()
+            
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    media_item = await response.json()
+                    self.logger.debug(f"Retrieved media item via general API {jellyfin_id}: {media_item.get('Name', 'Unknown')}")
+                    return media_item
+                elif response.status == 400:
+                    self.logger.error(f"Invalid Jellyfin item ID: {jellyfin_id} (HTTP 400)")
+                    self.logger.error(f"This item may have been deleted from Jellyfin or the ID is corrupted")
+                    return None
+                elif response.status == 401:
+                    self.logger.error(f"Jellyfin authentication failed (HTTP 401) - check API key configuration")
+                    return None
+                elif response.status == 404:
+                    self.logger.error(f"Jellyfin item not found: {jellyfin_id} (HTTP 404)")
+                    return None
+                else:
+                    response_text = await response.text()
+                    self.logger.error(f"Failed to get media item {jellyfin_id}: HTTP {response.status} - {response_text}")
+                    return None
                     
         except Exception as e:
             self.logger.error(f"Error getting media item {jellyfin_id}: {e}")
             return None
     
-    async def upload_poster_image(self, item_id: str, image_path: str) -> bool:
-        """Upload processed poster back to Jellyfin to replace original (v1 method)"""
+    async def upload_poster_image(self, item_id: str, image_path: Optional[str] = None, image_data: Optional[bytes] = None) -> bool:
+        """
+        Upload processed poster back to Jellyfin to replace original.
+        
+        The image is streamed from disk (or from ``image_data``) over the pooled
+        session. Jellyfin's image endpoint only accepts a Base64 body, so the
+        image is encoded chunk by chunk while it is sent instead of being held
+        in memory as one encoded copy.
+        
+        Verification follows ``jellyfin_upload_verification``: "deferred" queues
+        the item for verify_pending_uploads(), "immediate" checks the item's new
+        primary image tag right away and "off" trusts the HTTP status.
+        """
         try:
             # Ensure settings are loaded first
             await self._load_jellyfin_settings()
@@ -610,60 +871,95 @@ class JellyfinService:
                 self.logger.error(f"Jellyfin settings not configured when uploading poster for {item_id}")
                 return False
             
-            # Read the image file
-            with open(image_path, 'rb') as image_file:
-                image_data = image_file.read()
-            
-            # Base64 encode the image data (v1 method)
-            import base64
-            b64_data = base64.b64encode(image_data)
-            
-            # Determine content type from file extension
-            from pathlib import Path
-            ext = Path(image_path).suffix.lower()
-            if ext in (".jpg", ".jpeg"):
-                content_type = "image/jpeg"
-            elif ext == ".png":
-                content_type = "image/png"
+            if image_data is not None:
+                size = len(image_data)
+                is_png = bytes(image_data[:8]) == b"\x89PNG\r\n\x1a\n"
             else:
-                content_type = "image/jpeg"  # Default
+                size = os.path.getsize(image_path)
+                is_png = os.path.splitext(image_path)[1].lower() == ".png"
             
+            content_type = "image/png" if is_png else "image/jpeg"
             content_type += "; charset=utf-8"  # v1 format
             
             # Jellyfin API endpoint for setting primary image
             url = urljoin(self.base_url, f"/Items/{item_id}/Images/Primary")
             
-            # Headers for Base64 upload (v1 method)
+            # Headers for Base64 upload (v1 method); the encoded length is known up front
             headers = {
                 "X-Emby-Token": self.api_key,
-                "Content-Type": content_type
+                "Content-Type": content_type,
+                "Content-Length": str(4 * ((size + 2) // 3))
             }
             
-            # Upload using Base64 body (not multipart form data)
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60)) as session:
-                async with session.post(url, headers=headers, data=b64_data) as response:
-                    if response.status in [200, 204]:
-                        self.logger.info(f"Successfully uploaded poster for item {item_id}")
-                        
-                        # Verify upload like v1 does
-                        await asyncio.sleep(1)  # Brief delay
-                        verification_success = await self._verify_upload(item_id)
-                        
-                        if verification_success:
-                            self.logger.info(f"Upload verification successful for {item_id}")
-                            return True
-                        else:
-                            self.logger.warning(f"Upload verification failed for {item_id}")
-                            return False
-                    else:
-                        response_text = await response.text()
-                        self.logger.error(f"Failed to upload poster for item {item_id}: HTTP {response.status} - {response_text}")
-                        return False
-                    
+            # The image tag before the upload tells whether the new image landed
+            verification = self.settings.jellyfin_upload_verification
+            cached_item = self._item_cache.get(item_id)
+            if cached_item:
+                previous_tag = (cached_item.get("ImageTags") or {}).get("Primary")
+            elif verification != "off":
+                previous_tag = (await self._get_primary_image_tags([item_id])).get(item_id)
+            else:
+                previous_tag = None
+            
+            session = await self._get_session()
+            body = self._base64_chunks(image_path, image_data)
+            async with session.post(url, headers=headers, data=body, timeout=aiohttp.ClientTimeout(total=60)) as response:
+                if response.status not in [200, 204]:
+                    response_text = await response.text()
+                    self.logger.error(f"Failed to upload poster for item {item_id}: HTTP {response.status} - {response_text}")
+                    return False
+            
+            self.logger.info(f"Successfully uploaded poster for item {item_id}")
+            self.invalidate_item(item_id)
+            
+            if verification == "immediate":
+                if await self._verify_uploads({item_id: previous_tag}):
+                    self.logger.warning(f"Upload verification failed for {item_id}")
+                    return False
+                self.logger.debug(f"Upload verification successful for {item_id}")
+            elif verification == "deferred":
+                self._pending_verifications[item_id] = previous_tag
+                self._pending_verifications.move_to_end(item_id)
+                while len(self._pending_verifications) > MAX_PENDING_VERIFICATIONS:
+                    self._pending_verifications.popitem(last=False)
+            
+            return True
+                
         except Exception as e:
             self.logger.error(f"Error uploading poster for item {item_id}: {e}")
             return False
     
+    async def verify_pending_uploads(self, item_ids: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Verify deferred uploads in batches of one request per 100 items.
+        
+        Args:
+            item_ids: Only verify these items (default: every pending upload)
+            
+        Returns:
+            IDs of items Jellyfin reports without a new poster (items whose
+            verification query failed are logged, not reported)
+        """
+        if item_ids is None:
+            pending = dict(self._pending_verifications)
+            self._pending_verifications.clear()
+        else:
+            pending = {
+                item_id: self._pending_verifications.pop(item_id)
+                for item_id in item_ids
+                if item_id in self._pending_verifications
+            }
+        
+        if not pending:
+            return []
+        
+        unverified = await self._verify_uploads(pending)
+        if unverified:
+            self.logger.warning(f"Could not verify {len(unverified)}/{len(pending)} poster uploads: {unverified[:10]}")
+        else:
+            self.logger.info(f"Verified {len(pending)} poster uploads")
+        return unverified
+    
     async def get_enhanced_audio_info(self, media_item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Get enhanced audio information including badge mapping (for V2 badge system)"""
         try:
@@ -785,62 +1081,171 @@ class JellyfinService:
     
     async def get_series_episodes(self, series_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get episodes for a TV series, limited to specified count"""
+        episodes, _ = await self.get_series_episode_page(series_id, start_index=0, limit=limit)
+        return episodes
+    
+    async def get_series_episode_page(
+        self,
+        series_id: str,
+        start_index: int = 0,
+        limit: int = 10
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get one window of a series' episodes, with media streams, in series order.
+        
+        Returns:
+            Tuple of (episodes, total episode count of the series); ([], 0) on failure
+        """
         try:
             # Use the same pattern as other methods - user-specific API
             url = urljoin(self.base_url, f"/Shows/{series_id}/Episodes")
             
             params = {
-                "Fields": "MediaSources,MediaStreams",
+                "Fields": EPISODE_MEDIA_FIELDS,
+                "StartIndex": start_index,
                 "Limit": limit,
-                "UserId": self.user_id
+                "UserId": self.user_id,
+                "EnableTotalRecordCount": "true"
             }
             
             session = await self._get_session()
             
-            try:
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        episodes = data.get("Items", [])
-                        self.logger.debug(f"Retrieved {len(episodes)} episodes for series {series_id}")
-                        return episodes
-                    else:
-                        self.logger.error(f"Failed to get series episodes {series_id}: HTTP {response.status}")
-                        return []
-            finally:
-                await session.close()
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    episodes = data.get("Items", [])
+                    total = data.get("TotalRecordCount", start_index + len(episodes))
+                    self.logger.debug(f"Retrieved {len(episodes)} of {total} episodes for series {series_id} at {start_index}")
+                    return episodes, total
+                else:
+                    self.logger.error(f"Failed to get series episodes {series_id}: HTTP {response.status}")
+                    return [], 0
                     
         except Exception as e:
             self.logger.error(f"Error getting series episodes {series_id}: {e}")
+            return [], 0
+    
+    async def get_series_episode_sample(
+        self,
+        series_id: str,
+        pick_indices: Callable[[int], List[int]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a sample of episodes spread across a whole series.
+        
+        The first request returns the first episode and the series' episode
+        count; the remaining picks are then fetched concurrently by StartIndex.
+        
+        Args:
+            series_id: Jellyfin series ID
+            pick_indices: Maps the episode count to the episode positions to sample
+            
+        Returns:
+            Sampled episodes (with media streams) in series order
+        """
+        first, total = await self.get_series_episode_page(series_id, start_index=0, limit=1)
+        if not first:
             return []
+        
+        indices = sorted(set(index for index in pick_indices(total) if 0 <= index < total))
+        by_index = {0: first[0]}
+        
+        # Consecutive positions are fetched as one window
+        windows: List[List[int]] = []
+        for index in indices:
+            if index == 0:
+                continue
+            if windows and index == windows[-1][-1] + 1:
+                windows[-1].append(index)
+            else:
+                windows.append([index])
+        
+        pages = await asyncio.gather(*(
+            self.get_series_episode_page(series_id, start_index=window[0], limit=len(window))
+            for window in windows
+        ))
+        for window, (episodes, _) in zip(windows, pages):
+            by_index.update(zip(window, episodes))
+        
+        return [by_index[index] for index in indices if index in by_index]
     
-    async def _verify_upload(self, item_id: str) -> bool:
-        """Verify that the uploaded image is retrievable (v1 method)"""
-        try:
-            url = urljoin(self.base_url, f"/Items/{item_id}/Images/Primary")
-            headers = {"X-Emby-Token": self.api_key}
+    async def _base64_chunks(self, image_path: Optional[str], image_data: Optional[bytes]) -> AsyncIterator[bytes]:
+        """Base64-encode an image in 3-byte aligned chunks so the pieces join into one valid body"""
+        if image_data is not None:
+            view = memoryview(image_data)
+            for offset in range(0, len(view), UPLOAD_CHUNK_SIZE):
+                yield base64.b64encode(view[offset:offset + UPLOAD_CHUNK_SIZE])
+            return
+        
+        with open(image_path, 'rb') as image_file:
+            while True:
+                chunk = image_file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield base64.b64encode(chunk)
+    
+    async def _verify_uploads(self, previous_tags: Dict[str, Optional[str]]) -> List[str]:
+        """
+        Check that uploaded items now carry a new primary image tag.
+        
+        Args:
+            previous_tags: Item ID -> primary image tag before the upload (None if unknown)
             
-            session = await self._get_session()
+        Returns:
+            IDs of items without a (new) primary image. Items whose query
+            failed are unknown rather than failed and are not returned.
+        """
+        current_tags = await self._get_primary_image_tags(list(previous_tags))
+        
+        unknown = len(previous_tags) - len(current_tags)
+        if unknown:
+            self.logger.warning(f"Could not check the poster of {unknown} uploaded items")
+        
+        return [
+            item_id for item_id, previous_tag in previous_tags.items()
+            if item_id in current_tags
+            and (not current_tags[item_id] or current_tags[item_id] == previous_tag)
+        ]
+    
+    async def _get_primary_image_tags(self, item_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Current primary image tags, one request per 100 items.
+        
+        Returns:
+            Item ID -> primary image tag (None if the item has none). Items
+            whose request failed are left out.
+        """
+        if self.user_id:
+            url = urljoin(self.base_url, f"/Users/{self.user_id}/Items")
+        else:
+            url = urljoin(self.base_url, "/Items")
+        
+        session = await self._get_session()
+        current_tags: Dict[str, Optional[str]] = {}
+        
+        for start in range(0, len(item_ids), 100):
+            batch = item_ids[start:start + 100]
+            params = {
+                "Ids": ",".join(batch),
+                "EnableImageTypes": "Primary",
+                "EnableUserData": "false"
+            }
             try:
-                async with session.get(url, headers=headers) as response:
+                async with session.get(url, params=params) as response:
                     if response.status != 200:
-                        return False
-                    
-                    # Check first 256 bytes for valid image signature
-                    chunk = await response.content.read(256)
-                    
-                    # Check for valid image signatures
-                    return (
-                        chunk.startswith(b"\xff\xd8\xff") or  # JPEG
-                        chunk.startswith(b"\x89PNG\r\n\x1a\n") or  # PNG
-                        chunk.startswith(b"GIF")  # GIF
-                    )
-            finally:
-                await session.close()
-                
-        except Exception as e:
-            self.logger.error(f"Error verifying upload for {item_id}: {e}")
-            return False
+                        self.logger.warning(f"Primary image tag query failed: HTTP {response.status}")
+                        continue
+                    data = await response.json()
+            except Exception as e:
+                self.logger.error(f"Error querying primary image tags: {e}")
+                continue
+            
+            current_tags.update(dict.fromkeys(batch))
+            for item in data.get("Items", []):
+                if item.get("Id") in current_tags:
+                    current_tags[item["Id"]] = (item.get("ImageTags") or {}).get("Primary")
+        
+        return current_tags
 
 
 # Global service instance  
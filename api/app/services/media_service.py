@@ -8,7 +8,8 @@ import os
 import aiofiles
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, delete, literal_column
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql import func as sql_func
 from pathlib import Path
 import hashlib
@@ -22,6 +23,12 @@ from aphrodite_logging import get_logger
 from shared.types import MediaItem, MediaType, generate_id
 
 
+# Items fetched and upserted per round trip during a library scan
+SCAN_PAGE_SIZE = 500
+
+# Item fields parse_jellyfin_item reads
+SCAN_FIELDS = "ProviderIds,Genres,Overview,ProductionYear,CommunityRating,OfficialRating,PremiereDate"
+
 class MediaService:
     """Service for managing media items"""
     
@@ -37,6 +44,11 @@ class MediaService:
     async def scan_jellyfin_library(self, db: AsyncSession) -> Tuple[int, int, List[str]]:
         """
         Scan Jellyfin library and update database
+        
+        Items are fetched a page at a time and written with one multi-row upsert
+        per page, so memory stays bounded by the page size. Items no longer in
+        Jellyfin are removed with a single DELETE once every library was read.
+        
         Returns: (total_found, new_items, errors)
         """
         self.logger.info("Starting Jellyfin library scan")
@@ -61,6 +73,10 @@ class MediaService:
                 errors.append(error_msg)
                 return 0, 0, errors
             
+            # Every row written by this scan gets this updated_at; older rows were not seen
+            scan_started = datetime.utcnow()
+            complete = True
+            
             # Process each library
             for library in libraries:
                 library_name = library.get("Name", "Unknown")
@@ -71,37 +87,29 @@ class MediaService:
                 
                 self.logger.info(f"Scanning library: {library_name}")
                 
-                # Get items from this library
-                items = await self.jellyfin.get_library_items(library_id)
-                total_found += len(items)
-                
-                # Process each item
-                for item in items:
-                    try:
-                        jellyfin_id = item.get("Id")
-                        if not jellyfin_id:
-                            continue
-                        
-                        # Check if item already exists
-                        existing = await self._get_media_by_jellyfin_id(db, jellyfin_id)
-                        if existing:
-                            continue
-                        
-                        # Parse and create new media item
-                        parsed_item = self.jellyfin.parse_jellyfin_item(item)
-                        media_item = await self._create_media_item(db, parsed_item)
-                        
-                        if media_item:
-                            new_items += 1
-                            self.logger.debug(f"Created media item: {media_item.title}")
-                        
-                    except Exception as e:
-                        error_msg = f"Error processing item {item.get('Name', 'Unknown')}: {e}"
-                        self.logger.error(error_msg)
-                        errors.append(error_msg)
-                        continue
+                try:
+                    found, inserted = await self._scan_library(db, library_id, scan_started)
+                    total_found += found
+                    new_items += inserted
+                except Exception as e:
+                    await db.rollback()
+                    complete = False
+                    error_msg = f"Error scanning library {library_name}: {e}"
+                    self.logger.error(error_msg)
+                    errors.append(error_msg)
+            
+            # A library that failed part way must not look like deleted items
+            if complete:
+                result = await db.execute(
+                    delete(MediaItemModel).where(
+                        MediaItemModel.jellyfin_id.is_not(None),
+                        MediaItemModel.updated_at < scan_started
+                    )
+                )
+                await db.commit()
+                if result.rowcount:
+                    self.logger.info(f"Removed {result.rowcount} media items no longer in Jellyfin")
             
-            await db.commit()
             self.logger.info(f"Library scan complete: {total_found} found, {new_items} new")
             
         except Exception as e:
@@ -112,47 +120,89 @@ class MediaService:
         
         return total_found, new_items, errors
     
-    async def _get_media_by_jellyfin_id(self, db: AsyncSession, jellyfin_id: str) -> Optional[MediaItemModel]:
-        """Get media item by Jellyfin ID"""
-        result = await db.execute(
-            select(MediaItemModel).where(MediaItemModel.jellyfin_id == jellyfin_id)
-        )
-        return result.scalar_one_or_none()
-    
-    async def _create_media_item(self, db: AsyncSession, data: Dict[str, Any]) -> Optional[MediaItemModel]:
-        """Create new media item in database"""
-        try:
-            # Ensure community_rating is a string
-            community_rating = data.get("community_rating")
-            if isinstance(community_rating, (int, float)):
-                community_rating = str(community_rating)  # Convert any numeric type to string
-
-            media_item = MediaItemModel(
-                id=data["id"],
-                title=data["title"],
-                media_type=data["media_type"],
-                year=data.get("year"),
-                jellyfin_id=data["jellyfin_id"],
-                tmdb_id=data.get("tmdb_id"),
-                imdb_id=data.get("imdb_id"),
-                overview=data.get("overview"),
-                genres=data.get("genres", []),
-                runtime=data.get("runtime"),
-                community_rating=community_rating,
-                official_rating=data.get("official_rating"),
-                premiere_date=data.get("premiere_date"),
-                series_name=data.get("series_name"),
-                season_number=data.get("season_number"),
-                episode_number=data.get("episode_number")
+    async def _scan_library(self, db: AsyncSession, library_id: str, scan_started: datetime) -> Tuple[int, int]:
+        """
+        Upsert every item of one library, a page per transaction.
+        
+        Returns: (items found, items inserted)
+        """
+        found = 0
+        inserted = 0
+        start_index = 0
+        
+        while True:
+            # Errors propagate so a failed listing never looks like an empty library
+            items, total = await self.jellyfin.fetch_library_page(
+                library_id,
+                start_index=start_index,
+                limit=SCAN_PAGE_SIZE,
+                fields=SCAN_FIELDS
             )
+            found += len(items)
             
-            db.add(media_item)
-            await db.flush()  # Get the ID without committing
-            return media_item
+            # Postgres rejects an upsert that touches the same row twice
+            rows = {}
+            for item in items:
+                if item.get("Id"):
+                    rows[item["Id"]] = self._build_row(item, scan_started)
             
-        except Exception as e:
-            self.logger.error(f"Error creating media item: {e}")
-            return None
+            if rows:
+                inserted += await self._upsert_rows(db, list(rows.values()))
+                await db.commit()
+            
+            start_index += SCAN_PAGE_SIZE
+            if not items or start_index >= total:
+                break
+        
+        return found, inserted
+    
+    def _build_row(self, item: Dict[str, Any], scan_started: datetime) -> Dict[str, Any]:
+        """media_items row for a Jellyfin item"""
+        data = self.jellyfin.parse_jellyfin_item(item)
+        
+        # Ensure community_rating is a string
+        community_rating = data.get("community_rating")
+        if isinstance(community_rating, (int, float)):
+            community_rating = str(community_rating)  # Convert any numeric type to string
+        
+        tmdb_id = data.get("tmdb_id")
+        media_type = data["media_type"]
+        
+        return {
+            "id": data["id"],
+            "title": data["title"],
+            "media_type": getattr(media_type, "value", media_type),
+            "year": data.get("year"),
+            "jellyfin_id": data["jellyfin_id"],
+            "tmdb_id": int(tmdb_id) if tmdb_id and str(tmdb_id).isdigit() else None,
+            "imdb_id": data.get("imdb_id"),
+            "overview": data.get("overview"),
+            "genres": data.get("genres", []),
+            "runtime": data.get("runtime"),
+            "community_rating": community_rating,
+            "official_rating": data.get("official_rating"),
+            "premiere_date": data.get("premiere_date"),
+            "series_name": data.get("series_name"),
+            "season_number": data.get("season_number"),
+            "episode_number": data.get("episode_number"),
+            "created_at": scan_started,
+            "updated_at": scan_started
+        }
+    
+    async def _upsert_rows(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        """Insert or update media rows keyed by jellyfin_id; returns how many were new"""
+        stmt = insert(MediaItemModel).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["jellyfin_id"],
+            set_={
+                column: stmt.excluded[column]
+                for column in rows[0]
+                if column not in ("id", "jellyfin_id", "created_at")
+            }
+        )
+        # xmax is 0 only for rows this statement inserted
+        result = await db.execute(stmt.returning(literal_column("xmax = 0")))
+        return sum(1 for (was_inserted,) in result if was_inserted)
     
     async def get_media_items(
         self,
@@ -6,8 +6,11 @@ Handles poster discovery, selection, and file operations.
 
 from .poster_selector import PosterSelector
 from .storage import StorageManager
+from .library_index import LibraryIndexService, get_library_index_service
 
 __all__ = [
     "PosterSelector",
     "StorageManager",
+    "LibraryIndexService",
+    "get_library_index_service",
 ]
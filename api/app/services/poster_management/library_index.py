@@ -0,0 +1,351 @@
+"""
+Library Index Service
+
+Keeps a local Postgres snapshot of Jellyfin movie and series libraries so the
+poster manager can search, filter, paginate and compute stats with indexed
+queries instead of downloading the whole library on every request.
+
+The snapshot is refreshed incrementally with Jellyfin's MinDateLastSaved and
+fully resynced periodically (or when item counts drift) to pick up deletions.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, delete, distinct, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core import database
+from app.core.config import get_settings
+from app.models.library_index import LibraryIndexItemModel, LibraryIndexStateModel
+from app.services.jellyfin_service import get_jellyfin_service
+from aphrodite_logging import get_logger
+
+
+BADGE_TAG = "aphrodite-overlay"
+INDEXED_ITEM_TYPES = ["Movie", "Series"]
+INDEX_FIELDS = "Tags,Genres,Overview,ProductionYear,CommunityRating,OfficialRating,DateLastSaved"
+SYNC_PAGE_SIZE = 500
+
+
+def parse_jellyfin_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse Jellyfin timestamps, which carry 7 fractional digits"""
+    if not value:
+        return None
+    try:
+        value = value.replace("Z", "+00:00")
+        if "." in value:
+            main, rest = value.split(".", 1)
+            digits = "".join(ch for ch in rest if ch.isdigit())
+            suffix = rest[len(digits):]
+            value = f"{main}.{digits[:6]}{suffix}"
+        parsed = datetime.fromisoformat(value)
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+class LibraryIndexService:
+    """Maintains and queries the poster manager library index"""
+    
+    def __init__(self):
+        self.settings = get_settings()
+        self.logger = get_logger("aphrodite.poster_manager.library_index", service="api")
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # library_id (or "*" for all) -> when it was last marked stale in this process
+        self._stale_at: Dict[str, datetime] = {}
+    
+    async def mark_stale(self, library_id: Optional[str] = None, db_session: Optional[AsyncSession] = None) -> None:
+        """
+        Force an incremental refresh of one library, or all, on the next request (e.g. after tag changes).
+        
+        Clearing last_synced_at in library_index_state lets the API process see
+        changes made by workers. The in-process timestamp also covers a sync that
+        was already running when the change happened.
+        """
+        self._stale_at[library_id or "*"] = datetime.now(timezone.utc)
+        
+        if db_session is not None and db_session.bind is not None:
+            session_factory = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+        else:
+            session_factory = database.async_session_factory
+        if session_factory is None:
+            return
+        
+        stmt = update(LibraryIndexStateModel).values(last_synced_at=None)
+        if library_id:
+            stmt = stmt.where(LibraryIndexStateModel.library_id == library_id)
+        try:
+            async with session_factory() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            self.logger.warning(f"⚠️ [LIBRARY INDEX] Could not mark library {library_id or 'index'} stale: {e}")
+    
+    def _marked_stale_since(self, library_id: str, synced_at: Optional[datetime]) -> bool:
+        """Whether this process marked the library stale after its last sync started"""
+        marks = [self._stale_at.get(library_id), self._stale_at.get("*")]
+        return any(mark is not None and (synced_at is None or mark > synced_at) for mark in marks)
+    
+    async def ensure_fresh(self, db: AsyncSession, library_id: str) -> bool:
+        """
+        Refresh the index for a library if it is stale.
+        
+        Returns:
+            True if the library has usable index data
+        """
+        lock = self._locks.setdefault(library_id, asyncio.Lock())
+        async with lock:
+            state = await db.get(LibraryIndexStateModel, library_id)
+            now = datetime.now(timezone.utc)
+            
+            forced = state is not None and self._marked_stale_since(library_id, state.last_synced_at)
+            needs_full = (
+                state is None
+                or state.last_full_sync_at is None
+                or now - state.last_full_sync_at > timedelta(seconds=self.settings.library_index_full_sync_interval)
+            )
+            needs_incremental = (
+                forced
+                or state is None
+                or state.last_synced_at is None
+                or now - state.last_synced_at > timedelta(seconds=self.settings.library_index_refresh_interval)
+            )
+            
+            if not needs_full and not needs_incremental:
+                return True
+            
+            try:
+                await self.refresh_library(db, library_id, full=needs_full, state=state)
+                return True
+            except Exception as e:
+                await db.rollback()
+                self.logger.error(f"❌ [LIBRARY INDEX] Refresh failed for library {library_id}: {e}", exc_info=True)
+                # Serve the previous snapshot if there is one
+                return state is not None and state.last_full_sync_at is not None
+    
+    async def refresh_library(
+        self,
+        db: AsyncSession,
+        library_id: str,
+        full: bool = False,
+        state: Optional[LibraryIndexStateModel] = None
+    ) -> int:
+        """
+        Sync the index for a library from Jellyfin.
+        
+        An incremental sync only fetches items saved since the last watermark.
+        A full sync fetches everything and removes items no longer in Jellyfin.
+        
+        Returns:
+            Number of items written
+        """
+        jellyfin_service = get_jellyfin_service()
+        if state is None:
+            state = await db.get(LibraryIndexStateModel, library_id)
+        if state is None:
+            state = LibraryIndexStateModel(library_id=library_id, item_count=0)
+            db.add(state)
+        
+        sync_started = datetime.now(timezone.utc)
+        min_date_last_saved = None
+        if not full and state.last_saved_watermark is not None:
+            min_date_last_saved = state.last_saved_watermark
+        
+        written = 0
+        watermark = state.last_saved_watermark
+        start_index = 0
+        
+        while True:
+            # Errors propagate so a failed listing never looks like an empty library
+            items, total = await jellyfin_service.fetch_library_page(
+                library_id,
+                item_types=INDEXED_ITEM_TYPES,
+                start_index=start_index,
+                limit=SYNC_PAGE_SIZE,
+                fields=INDEX_FIELDS,
+                min_date_last_saved=min_date_last_saved
+            )
+            
+            rows = [self._build_row(library_id, item) for item in items if item.get("Id")]
+            if rows:
+                await self._upsert_rows(db, rows)
+                written += len(rows)
+                for row in rows:
+                    if row["date_last_saved"] and (watermark is None or row["date_last_saved"] > watermark):
+                        watermark = row["date_last_saved"]
+            
+            start_index += SYNC_PAGE_SIZE
+            if not items or start_index >= total:
+                break
+        
+        if full:
+            # Every row written in this transaction has indexed_at = now(), so
+            # anything older was not returned by the full listing and is gone
+            await db.execute(
+                delete(LibraryIndexItemModel).where(
+                    LibraryIndexItemModel.library_id == library_id,
+                    LibraryIndexItemModel.indexed_at < func.now()
+                )
+            )
+            state.last_full_sync_at = sync_started
+        
+        state.last_saved_watermark = watermark
+        state.last_synced_at = sync_started
+        state.item_count = await self._count_items(db, library_id)
+        await db.commit()
+        
+        self.logger.info(
+            f"✅ [LIBRARY INDEX] {'Full' if full else 'Incremental'} sync of library {library_id}: "
+            f"{written} items written, {state.item_count} indexed"
+        )
+        
+        # Deletions are invisible to incremental syncs; reconcile when counts drift
+        if not full:
+            _, remote_count = await jellyfin_service.fetch_library_page(
+                library_id,
+                item_types=INDEXED_ITEM_TYPES,
+                limit=0
+            )
+            if remote_count != state.item_count:
+                self.logger.info(
+                    f"🔄 [LIBRARY INDEX] Count drift for library {library_id} "
+                    f"(jellyfin={remote_count}, index={state.item_count}), running full sync"
+                )
+                written += await self.refresh_library(db, library_id, full=True, state=state)
+        
+        return written
+    
+    async def query_items(
+        self,
+        db: AsyncSession,
+        library_id: str,
+        query: Optional[str] = None,
+        media_type: Optional[str] = None,
+        genre: Optional[str] = None,
+        year: Optional[int] = None,
+        badge_filter: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> Tuple[List[LibraryIndexItemModel], int]:
+        """
+        Search, filter and paginate indexed items ordered by title.
+        
+        Returns:
+            Tuple of (items for the page, total matching items)
+        """
+        conditions = [LibraryIndexItemModel.library_id == library_id]
+        if query:
+            conditions.append(LibraryIndexItemModel.title.icontains(query, autoescape=True))
+        if media_type:
+            conditions.append(LibraryIndexItemModel.item_type == media_type.lower())
+        if genre:
+            conditions.append(LibraryIndexItemModel.genre_keys.contains([genre.lower()]))
+        if year:
+            conditions.append(LibraryIndexItemModel.year == year)
+        if badge_filter == "badged":
+            conditions.append(LibraryIndexItemModel.badged.is_(True))
+        elif badge_filter == "original":
+            conditions.append(LibraryIndexItemModel.badged.is_(False))
+        
+        total = await db.scalar(select(func.count()).select_from(LibraryIndexItemModel).where(*conditions))
+        
+        stmt = (
+            select(LibraryIndexItemModel)
+            .where(*conditions)
+            .order_by(LibraryIndexItemModel.sort_title, LibraryIndexItemModel.jellyfin_id)
+            .offset(offset)
+        )
+        if limit:
+            stmt = stmt.limit(limit)
+        
+        result = await db.execute(stmt)
+        return list(result.scalars().all()), total or 0
+    
+    async def get_stats(self, db: AsyncSession, library_id: str) -> Dict[str, Any]:
+        """Compute type counts, years and genres for an indexed library"""
+        type_counts = dict(
+            (await db.execute(
+                select(LibraryIndexItemModel.item_type, func.count())
+                .where(LibraryIndexItemModel.library_id == library_id)
+                .group_by(LibraryIndexItemModel.item_type)
+            )).all()
+        )
+        
+        years = (await db.execute(
+            select(distinct(LibraryIndexItemModel.year))
+            .where(LibraryIndexItemModel.library_id == library_id, LibraryIndexItemModel.year.isnot(None))
+            .order_by(LibraryIndexItemModel.year.desc())
+        )).scalars().all()
+        
+        genres = (await db.execute(
+            select(func.jsonb_array_elements_text(LibraryIndexItemModel.genres))
+            .where(LibraryIndexItemModel.library_id == library_id)
+            .distinct()
+        )).scalars().all()
+        
+        movies = type_counts.get("movie", 0)
+        tv_shows = type_counts.get("series", 0)
+        return {
+            "total_items": movies + tv_shows,
+            "movies": movies,
+            "tv_shows": tv_shows,
+            "other": 0,
+            "years": list(years),
+            "genres": sorted(genres)
+        }
+    
+    async def _upsert_rows(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        """Insert or update a page of index rows"""
+        stmt = insert(LibraryIndexItemModel).values(rows)
+        update_columns = {
+            column: stmt.excluded[column]
+            for column in rows[0].keys()
+            if column != "jellyfin_id"
+        }
+        update_columns["indexed_at"] = func.now()
+        await db.execute(stmt.on_conflict_do_update(index_elements=["jellyfin_id"], set_=update_columns))
+    
+    async def _count_items(self, db: AsyncSession, library_id: str) -> int:
+        """Count indexed items for a library"""
+        return await db.scalar(
+            select(func.count()).select_from(LibraryIndexItemModel)
+            .where(LibraryIndexItemModel.library_id == library_id)
+        ) or 0
+    
+    def _build_row(self, library_id: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a Jellyfin item into an index row"""
+        title = item.get("Name") or "Unknown"
+        genres = item.get("Genres") or []
+        tags = item.get("Tags") or []
+        community_rating = item.get("CommunityRating")
+        
+        return {
+            "jellyfin_id": item["Id"],
+            "library_id": library_id,
+            "title": title[:500],
+            "sort_title": title.lower()[:500],
+            "item_type": (item.get("Type") or "").lower(),
+            "year": item.get("ProductionYear"),
+            "overview": item.get("Overview") or "",
+            "community_rating": float(community_rating) if community_rating is not None else None,
+            "official_rating": item.get("OfficialRating"),
+            "genres": genres,
+            "genre_keys": [g.lower() for g in genres],
+            "tags": tags,
+            "badged": BADGE_TAG in tags,
+            "date_last_saved": parse_jellyfin_date(item.get("DateLastSaved"))
+        }
+
+
+# Global service instance
+_library_index_service: Optional[LibraryIndexService] = None
+
+def get_library_index_service() -> LibraryIndexService:
+    """Get global library index service instance"""
+    global _library_index_service
+    if _library_index_service is None:
+        _library_index_service = LibraryIndexService()
+    return _library_index_service
@@ -12,10 +12,15 @@ from pathlib import Path
 from typing import List, Optional
 import tempfile
 import uuid
+import json
+import time
 
 from aphrodite_logging import get_logger
 from app.services.jellyfin_service import get_jellyfin_service
 
+# Random picks tried before giving up when a poster cannot be downloaded
+RANDOM_POSTER_ATTEMPTS = 3
+
 
 class PosterSelector:
     """Service for selecting posters from Jellyfin movies library or originals directory."""
@@ -154,7 +159,7 @@ class PosterSelector:
                     new_loop = asyncio.new_event_loop()
                     asyncio.set_event_loop(new_loop)
                     try:
-                        return new_loop.run_until_complete(self._async_get_random_jellyfin_poster())
+                        return new_loop.run_until_complete(self._async_get_random_jellyfin_poster_on_own_loop())
                     finally:
                         new_loop.close()
                 
@@ -164,142 +169,94 @@ class PosterSelector:
                     
             except RuntimeError:
                 # No event loop running, safe to use asyncio.run()
-                return asyncio.run(self._async_get_random_jellyfin_poster())
+                return asyncio.run(self._async_get_random_jellyfin_poster_on_own_loop())
                 
         except Exception as e:
             self.logger.warning(f"Failed to get Jellyfin poster: {e}")
             return None
     
+    async def _async_get_random_jellyfin_poster_on_own_loop(self) -> Optional[str]:
+        """
+        Run the Jellyfin lookup on a short-lived event loop and release that
+        loop's pooled Jellyfin session before the loop is closed.
+        """
+        try:
+            return await self._async_get_random_jellyfin_poster()
+        finally:
+            try:
+                await self.jellyfin_service.close()
+            except Exception as cleanup_error:
+                self.logger.warning(f"Error during Jellyfin cleanup: {cleanup_error}")
+    
     async def _async_get_random_jellyfin_poster(self) -> Optional[str]:
         """
         Async method to get random poster from Jellyfin.
         
+        Jellyfin picks the movie (SortBy=Random, Limit=1, only items with a
+        primary image), so the cost does not depend on library size.
+        
         Returns:
             str: Path to cached poster file, or None if failed
         """
         try:
-            # CRITICAL FIX: Force fresh random selection each time
-            import random
-            import time
-            
             # Clear old cached posters to prevent reusing same ones
             self._clear_old_cache()
             
-            # Use microsecond-level randomization for better entropy
-            random.seed(time.time_ns() + random.randint(1, 1000000))
-            self.logger.info("Initializing random poster selection from Jellyfin")
-            # Test Jellyfin connection
-            connected, message = await self.jellyfin_service.test_connection()
-            if not connected:
-                self.logger.warning(f"Jellyfin not connected: {message}")
-                return None
-            
-            # Get all libraries
-            libraries = await self.jellyfin_service.get_libraries()
-            if not libraries:
-                self.logger.warning("No Jellyfin libraries found")
-                return None
-            
-            # Find movie libraries (looking for libraries with movie metadata)
-            movie_libraries = []
-            for lib in libraries:
-                # Check if this library has movie metadata by examining its item types
-                lib_name = lib.get('Name', '').lower()
-                lib_locations = lib.get('Locations', [])
+            self.logger.info("Requesting a random movie from Jellyfin")
+            for attempt in range(RANDOM_POSTER_ATTEMPTS):
+                movies, _ = await self.jellyfin_service.query_library_items(
+                    None,
+                    item_types=["Movie"],
+                    image_types=["Primary"],
+                    sort_by="Random",
+                    limit=1,
+                    fields="ParentId"
+                )
+                if not movies:
+                    self.logger.warning("No movies with posters found in Jellyfin")
+                    return None
                 
-                # Simple heuristic: if library name contains 'movie' or has movie-like content
-                if 'movie' in lib_name or 'film' in lib_name:
-                    movie_libraries.append(lib)
-                    self.logger.debug(f"Found movie library: {lib.get('Name')}")
-            
-            if not movie_libraries:
-                # If no explicit movie libraries found, try all libraries
-                self.logger.info("No explicit movie libraries found, trying all libraries")
-                movie_libraries = libraries
-            
-            # Try each movie library until we find movies
-            for library in movie_libraries:
-                library_id = library.get('ItemId') or library.get('Id')
-                if not library_id:
+                selected_movie = movies[0]
+                movie_id = selected_movie.get('Id')
+                movie_name = selected_movie.get('Name', 'Unknown')
+                
+                self.logger.info(f"Selected random movie: {movie_name} (ID: {movie_id})")
+                
+                # Download poster
+                poster_data = await self.jellyfin_service.download_poster(movie_id)
+                if not poster_data:
+                    self.logger.warning(f"Failed to download poster for movie: {movie_name}")
                     continue
                 
-                self.logger.info(f"Checking library: {library.get('Name')} (ID: {library_id})")
+                # Save to cache with metadata - use timestamp for uniqueness
+                timestamp = int(time.time_ns() // 1000000)  # Millisecond timestamp
+                cache_filename = f"jellyfin_{movie_id}_{timestamp}_{uuid.uuid4().hex[:8]}.jpg"
+                cache_path = self.cache_dir / cache_filename
                 
-                # Get items from this library
-                items = await self.jellyfin_service.get_library_items(library_id)
+                with open(cache_path, 'wb') as f:
+                    f.write(poster_data)
                 
-                # Filter for movie items
-                movie_items = [item for item in items if item.get('Type') == 'Movie']
+                # Also save metadata file for audio codec detection
+                metadata_path = cache_path.with_suffix('.meta')
+                metadata = {
+                    'jellyfin_id': movie_id,
+                    'movie_name': movie_name,
+                    'cached_at': str(cache_path.stat().st_mtime)
+                }
                 
-                if movie_items:
-                    self.logger.info(f"Found {len(movie_items)} movies in library {library.get('Name')}")
-                    
-                    # CRITICAL FIX: Enhanced randomization to prevent same movie selection
-                    import time
-                    
-                    # Use multiple entropy sources for better randomization
-                    current_ns = time.time_ns()
-                    library_hash = hash(library.get('Name', ''))
-                    items_hash = hash(str([item.get('Id') for item in movie_items[:5]]))
-                    
-                    # Combine multiple sources of entropy
-                    seed_value = current_ns + library_hash + items_hash + len(movie_items)
-                    random.seed(seed_value)
-                    
-                    # Shuffle the list and select to further randomize
-                    random.shuffle(movie_items)
-                    selected_movie = random.choice(movie_items)
-                    movie_id = selected_movie.get('Id')
-                    movie_name = selected_movie.get('Name', 'Unknown')
-                    
-                    self.logger.info(f"Selected random movie: {movie_name} (ID: {movie_id})")
-                    
-                    # Download poster
-                    poster_data = await self.jellyfin_service.download_poster(movie_id)
-                    if poster_data:
-                        # Save to cache with metadata - use timestamp for uniqueness
-                        timestamp = int(time.time_ns() // 1000000)  # Millisecond timestamp
-                        cache_filename = f"jellyfin_{movie_id}_{timestamp}_{uuid.uuid4().hex[:8]}.jpg"
-                        cache_path = self.cache_dir / cache_filename
-                        
-                        with open(cache_path, 'wb') as f:
-                            f.write(poster_data)
-                        
-                        # Also save metadata file for audio codec detection
-                        metadata_path = cache_path.with_suffix('.meta')
-                        metadata = {
-                            'jellyfin_id': movie_id,
-                            'movie_name': movie_name,
-                            'library_name': library.get('Name'),
-                            'cached_at': str(cache_path.stat().st_mtime)
-                        }
-                        
-                        import json
-                        with open(metadata_path, 'w') as f:
-                            json.dump(metadata, f)
-                        
-                        self.logger.info(f"Downloaded and cached poster: {cache_path}")
-                        self.logger.debug(f"Saved metadata: {metadata_path}")
-                        return str(cache_path)
-                    else:
-                        self.logger.warning(f"Failed to download poster for movie: {movie_name}")
+                with open(metadata_path, 'w') as f:
+                    json.dump(metadata, f)
+                
+                self.logger.info(f"Downloaded and cached poster: {cache_path}")
+                self.logger.debug(f"Saved metadata: {metadata_path}")
+                return str(cache_path)
             
-            self.logger.warning("No movies with posters found in any library")
+            self.logger.warning(f"No poster could be downloaded after {RANDOM_POSTER_ATTEMPTS} random picks")
             return None
             
         except Exception as e:
             self.logger.error(f"Error getting Jellyfin poster: {e}", exc_info=True)
             return None
-        finally:
-            # CRITICAL FIX: Always clean up Jellyfin session to force fresh connections
-            try:
-                await self.jellyfin_service.close()
-                # Reset the service to force fresh connection next time
-                self.jellyfin_service._settings_loaded = False
-                self.jellyfin_service.session = None
-                self.logger.debug("Cleaned up Jellyfin session and reset connection state")
-            except Exception as cleanup_error:
-                self.logger.warning(f"Error during Jellyfin cleanup: {cleanup_error}")
     
     def get_all_posters(self) -> List[str]:
         """
@@ -5,16 +5,29 @@ Handles file operations for processed posters and preview outputs.
 """
 
 import os
+import io
 import shutil
+import hashlib
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 import uuid
-import json
-from datetime import datetime
+from datetime import datetime, timezone
 
+from PIL import Image
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database
+from app.models.original_posters import OriginalPosterModel
 from aphrodite_logging import get_logger
 
 
+# Cache directory -> whether it may still hold jellyfin_{id}_{uuid}.jpg files from before the store
+_legacy_cache_dirs: Dict[str, bool] = {}
+
+
 class StorageManager:
     """Service for managing poster file storage and operations."""
     
@@ -39,6 +52,7 @@ class StorageManager:
         self.processed_path = Path(processed_path)
         self.preview_path = Path(preview_path)
         self.cache_path = Path(cache_path)
+        self.originals_path = self.cache_path / "originals"
         
         # Ensure directories exist
         self._ensure_directories()
@@ -49,7 +63,7 @@ class StorageManager:
         
         Args:
             source_poster: Path to source poster file
-            
+        
         Returns:
             str: Path for preview output file
         """
@@ -64,7 +78,7 @@ class StorageManager:
             
             self.logger.info(f"Created preview output path: {output_path}")
             return str(output_path)
-            
+        
         except Exception as e:
             self.logger.error(f"Error creating preview output path: {e}", exc_info=True)
             # Fallback to temp file
@@ -77,7 +91,7 @@ class StorageManager:
         Args:
             current_path: Current poster path in the processing chain
             badge_type: Type of badge being applied (for debugging)
-            
+        
         Returns:
             str: New path for the next step in the chain
         """
@@ -111,7 +125,7 @@ class StorageManager:
             
             self.logger.debug(f"Created chained preview path for {badge_type}: {current_path} -> {output_path}")
             return str(output_path)
-            
+        
         except Exception as e:
             self.logger.error(f"Error creating chained preview path: {e}", exc_info=True)
             # Fallback
@@ -124,7 +138,7 @@ class StorageManager:
         Args:
             source_poster: Path to source poster file
             job_id: Optional job ID for organizing outputs
-            
+        
         Returns:
             str: Path for processed output file
         """
@@ -142,7 +156,7 @@ class StorageManager:
             
             self.logger.info(f"Created processed output path: {output_path}")
             return str(output_path)
-            
+        
         except Exception as e:
             self.logger.error(f"Error creating processed output path: {e}", exc_info=True)
             # Fallback to temp file
@@ -155,7 +169,7 @@ class StorageManager:
         Args:
             source_poster: Path to source poster
             destination: Path to destination
-            
+        
         Returns:
             bool: True if copy successful, False otherwise
         """
@@ -171,7 +185,7 @@ class StorageManager:
             
             self.logger.info(f"Copied poster from {source_path} to {dest_path}")
             return True
-            
+        
         except Exception as e:
             self.logger.error(f"Error copying poster: {e}", exc_info=True)
             return False
@@ -182,7 +196,7 @@ class StorageManager:
         
         Args:
             max_age_hours: Maximum age of files to keep (hours)
-            
+        
         Returns:
             int: Number of files cleaned up
         """
@@ -209,7 +223,7 @@ class StorageManager:
                 self.logger.info(f"Cleaned up {cleaned_count} old preview files")
             
             return cleaned_count
-            
+        
         except Exception as e:
             self.logger.error(f"Error cleaning up preview files: {e}", exc_info=True)
             return 0
@@ -221,7 +235,7 @@ class StorageManager:
         Args:
             file_path: Local file path
             base_url: Base URL for static files
-            
+        
         Returns:
             str: Accessible URL for file
         """
@@ -256,131 +270,260 @@ class StorageManager:
             
             self.logger.debug(f"Generated URL for {file_path}: {url}")
             return url
-            
+        
         except Exception as e:
             self.logger.error(f"Error generating file URL: {e}", exc_info=True)
             # Fallback URL
             return f"{base_url}/preview/{Path(file_path).name}"
     
-    def cache_original_poster(self, poster_data: bytes, jellyfin_id: str) -> str:
+    async def cache_original_poster(self, poster_data: bytes, jellyfin_id: str,
+                                    db: Optional[AsyncSession] = None, replace: bool = False) -> str:
         """
         Cache original poster before processing.
         
+        Originals are stored once per distinct image under their SHA-256 and an
+        item keeps the first poster seen for it, so re-processing a badged
+        item neither overwrites its original nor adds another copy.
+        
         Args:
             poster_data: Raw poster image bytes
             jellyfin_id: Jellyfin item ID
-            
+            db: Optional session to record the index entry with
+            replace: Make these bytes the item's original even if one is cached
+                (the user replaced the poster, so restore should return to it)
+        
         Returns:
-            str: Path to cached poster file
+            str: Path to the item's original poster file
         """
         try:
-            # Generate unique filename for cached original
-            unique_id = str(uuid.uuid4())[:8]
-            cache_filename = f"jellyfin_{jellyfin_id}_{unique_id}.jpg"
-            cache_file_path = self.cache_path / cache_filename
-            
-            # Save the original poster data
-            with open(cache_file_path, 'wb') as f:
-                f.write(poster_data)
-            
-            # Create metadata file
-            meta_filename = f"jellyfin_{jellyfin_id}_{unique_id}.meta"
-            meta_file_path = self.cache_path / meta_filename
-            
-            metadata = {
-                "jellyfin_id": jellyfin_id,
-                "cached_at": datetime.now().isoformat(),
-                "original_size": len(poster_data),
-                "cache_filename": cache_filename
-            }
-            
-            with open(meta_file_path, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            
-            self.logger.info(f"Cached original poster for {jellyfin_id}: {cache_filename}")
-            return str(cache_file_path)
-            
+            async with self._index_session(db) as session:
+                if session is not None and not replace:
+                    existing = await session.get(OriginalPosterModel, jellyfin_id)
+                    if existing is None:
+                        existing = await self._import_legacy_original(session, jellyfin_id)
+                    if existing is not None and self._original_blob_path(existing.content_hash).exists():
+                        self.logger.debug(f"Original poster for {jellyfin_id} already cached: {existing.content_hash[:12]}")
+                        return str(self._original_blob_path(existing.content_hash))
+                
+                content_hash = hashlib.sha256(poster_data).hexdigest()
+                blob_path = self._store_original_blob(content_hash, poster_data)
+                
+                if session is None:
+                    self.logger.warning(f"Database unavailable, original poster for {jellyfin_id} stored but not indexed")
+                    return str(blob_path)
+                
+                width, height = self._image_dimensions(poster_data)
+                stmt = insert(OriginalPosterModel).values(
+                    jellyfin_id=jellyfin_id,
+                    content_hash=content_hash,
+                    width=width,
+                    height=height,
+                    size_bytes=len(poster_data)
+                )
+                # An existing entry only gets here when replacing or when its blob went missing
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["jellyfin_id"],
+                    set_={
+                        "content_hash": stmt.excluded.content_hash,
+                        "width": stmt.excluded.width,
+                        "height": stmt.excluded.height,
+                        "size_bytes": stmt.excluded.size_bytes,
+                        "first_seen_at": func.now()
+                    }
+                )
+                await session.execute(stmt)
+                await session.commit()
+            
+            self.logger.info(f"Cached original poster for {jellyfin_id}: {content_hash[:12]}")
+            return str(blob_path)
+        
         except Exception as e:
             self.logger.error(f"Error caching original poster: {e}", exc_info=True)
             raise
     
-    def get_cached_original(self, jellyfin_id: str) -> Optional[str]:
+    async def get_cached_original(self, jellyfin_id: str, db: Optional[AsyncSession] = None) -> Optional[str]:
         """
         Get cached original poster path for a Jellyfin item.
         
         Args:
             jellyfin_id: Jellyfin item ID
-            
+            db: Optional session to read the index with
+        
         Returns:
             Optional[str]: Path to cached poster if found, None otherwise
         """
         try:
-            if not self.cache_path.exists():
-                self.logger.debug(f"Cache directory does not exist: {self.cache_path}")
-                return None
-            
-            # Look for cached poster files that match exactly
-            # Pattern: jellyfin_{jellyfin_id}_{8-char-uuid}.jpg
-            matching_files = []
-            
-            for cache_file in self.cache_path.glob("*.jpg"):
-                filename = cache_file.name
-                
-                # Check if filename matches our expected pattern
-                if filename.startswith(f"jellyfin_{jellyfin_id}_") and filename.endswith(".jpg"):
-                    # Extract the unique_id part to validate format
-                    prefix = f"jellyfin_{jellyfin_id}_"
-                    suffix = ".jpg"
-                    
-                    # Get the unique_id part
-                    if len(filename) > len(prefix) + len(suffix):
-                        unique_part = filename[len(prefix):-len(suffix)]
-                        
-                        # Validate it's exactly 8 characters (our UUID format)
-                        if len(unique_part) == 8 and unique_part.isalnum():
-                            # Verify the file exists and is readable
-                            if cache_file.exists() and cache_file.is_file():
-                                matching_files.append(cache_file)
-                                self.logger.debug(f"Found valid cache file: {filename}")
-            
-            if matching_files:
-                # Sort by modification time (newest first) to get the most recent cache
-                matching_files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
+            async with self._index_session(db) as session:
+                if session is None:
+                    self.logger.warning(f"Database unavailable, cannot look up original poster for {jellyfin_id}")
+                    return None
                 
-                # Try each matching file until we find one with valid metadata
-                for cached_poster in matching_files:
-                    self.logger.debug(f"Checking cached original for {jellyfin_id}: {cached_poster.name}")
-                    
-                    # Additional validation: check if metadata file exists and validates
-                    meta_file = cached_poster.with_suffix('.meta')
-                    if meta_file.exists():
-                        try:
-                            with open(meta_file, 'r') as f:
-                                metadata = json.load(f)
-                            
-                            # Validate metadata matches the jellyfin_id
-                            if metadata.get('jellyfin_id') == jellyfin_id:
-                                self.logger.debug(f"Metadata validation passed for {jellyfin_id}")
-                                return str(cached_poster)
-                            else:
-                                self.logger.warning(f"Metadata validation failed for {cached_poster.name}: expected {jellyfin_id}, got {metadata.get('jellyfin_id')}")
-                                # Continue to check other files
-                                continue
-                        except Exception as meta_error:
-                            self.logger.warning(f"Could not read metadata for {cached_poster.name}: {meta_error}")
-                            # Metadata issues don't disqualify the file, just log the warning
-                            # Fall through to return this file
-                    
-                    # If we get here, either metadata is valid or doesn't exist (older cache)
-                    return str(cached_poster)
+                entry = await session.get(OriginalPosterModel, jellyfin_id)
+                if entry is None:
+                    entry = await self._import_legacy_original(session, jellyfin_id)
+                if entry is not None:
+                    blob_path = self._original_blob_path(entry.content_hash)
+                    if blob_path.exists():
+                        return str(blob_path)
+                    self.logger.warning(f"Original poster {entry.content_hash[:12]} for {jellyfin_id} is missing from the store")
+                    return None
             
             self.logger.debug(f"No cached original found for {jellyfin_id}")
             return None
-            
+        
         except Exception as e:
             self.logger.error(f"Error getting cached original: {e}", exc_info=True)
             return None
     
+    async def get_original_hash(self, jellyfin_id: str, db: Optional[AsyncSession] = None) -> Optional[str]:
+        """Content hash of an item's cached original poster, if it has one"""
+        cached_path = await self.get_cached_original(jellyfin_id, db)
+        return Path(cached_path).stem if cached_path else None
+    
+    async def cleanup_original_cache(self, db: Optional[AsyncSession] = None) -> Dict[str, int]:
+        """
+        Move legacy cached originals into the store and delete stored posters
+        that no item references any more.
+        
+        Returns:
+            Dict[str, int]: Counts of imported legacy posters and removed files
+        """
+        async with self._index_session(db) as session:
+            if session is None:
+                raise RuntimeError("Database unavailable, cannot clean up original posters")
+            
+            legacy: Dict[str, List[Path]] = {}
+            for cache_file in self.cache_path.glob("jellyfin_*_*.jpg"):
+                jellyfin_id = self._legacy_jellyfin_id(cache_file.name)
+                if jellyfin_id:
+                    legacy.setdefault(jellyfin_id, []).append(cache_file)
+            imported = await self._import_legacy_originals(session, legacy) if legacy else 0
+            _legacy_cache_dirs[str(self.cache_path)] = False
+            
+            referenced = set((await session.execute(
+                select(OriginalPosterModel.content_hash).distinct()
+            )).scalars())
+        
+        removed = 0
+        if self.originals_path.exists():
+            for shard in self.originals_path.iterdir():
+                if not shard.is_dir():
+                    continue
+                for blob_path in shard.iterdir():
+                    if blob_path.stem not in referenced:
+                        blob_path.unlink(missing_ok=True)
+                        removed += 1
+        
+        self.logger.info(f"Original poster cleanup: {imported} legacy posters imported, {removed} unreferenced files removed")
+        return {"legacy_imported": imported, "removed": removed}
+    
+    def _original_blob_path(self, content_hash: str) -> Path:
+        """Location of a poster in the content-addressed store"""
+        return self.originals_path / content_hash[:2] / f"{content_hash}.jpg"
+    
+    def _store_original_blob(self, content_hash: str, poster_data: bytes) -> Path:
+        """Write a poster to the store unless identical bytes are already there"""
+        blob_path = self._original_blob_path(content_hash)
+        if blob_path.exists():
+            return blob_path
+        
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = blob_path.with_name(f".{content_hash}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(poster_data)
+        os.replace(temp_path, blob_path)
+        return blob_path
+    
+    def _image_dimensions(self, poster_data: bytes) -> Tuple[Optional[int], Optional[int]]:
+        """Width and height from the image header"""
+        try:
+            with Image.open(io.BytesIO(poster_data)) as image:
+                return image.size
+        except Exception as e:
+            self.logger.debug(f"Could not read poster dimensions: {e}")
+            return None, None
+    
+    def _legacy_jellyfin_id(self, filename: str) -> Optional[str]:
+        """Item ID of a legacy jellyfin_{id}_{8-char-uuid}.jpg cache file"""
+        stem = filename[:-len(".jpg")]
+        prefix, _, unique_part = stem.rpartition("_")
+        if not prefix.startswith("jellyfin_") or len(unique_part) != 8 or not unique_part.isalnum():
+            return None
+        return prefix[len("jellyfin_"):] or None
+    
+    async def _import_legacy_original(self, session: AsyncSession, jellyfin_id: str) -> Optional[OriginalPosterModel]:
+        """Index entry created from an item's pre-store cache files, if it has any"""
+        key = str(self.cache_path)
+        if key not in _legacy_cache_dirs:
+            # Scanned once per process; the store never writes legacy names
+            _legacy_cache_dirs[key] = any(
+                self._legacy_jellyfin_id(cache_file.name) for cache_file in self.cache_path.glob("jellyfin_*_*.jpg")
+            )
+        if not _legacy_cache_dirs[key]:
+            return None
+        
+        legacy_files = [
+            cache_file for cache_file in self.cache_path.glob(f"jellyfin_{jellyfin_id}_*.jpg")
+            if self._legacy_jellyfin_id(cache_file.name) == jellyfin_id
+        ]
+        if not legacy_files:
+            return None
+        await self._import_legacy_originals(session, {jellyfin_id: legacy_files})
+        return await session.get(OriginalPosterModel, jellyfin_id)
+    
+    async def _import_legacy_originals(self, session: AsyncSession, legacy: Dict[str, List[Path]]) -> int:
+        """
+        Index the oldest legacy file of each item as its original, then delete
+        the legacy files and their .meta sidecars. Items already indexed keep
+        their entry.
+        """
+        imported = 0
+        for jellyfin_id, files in legacy.items():
+            try:
+                files.sort(key=lambda f: f.stat().st_mtime)
+                first_cached_at = datetime.fromtimestamp(files[0].stat().st_mtime, tz=timezone.utc)
+                poster_data = files[0].read_bytes()
+            except OSError as e:
+                # Another process imported this item first
+                self.logger.debug(f"Skipping legacy originals of {jellyfin_id}: {e}")
+                continue
+            content_hash = hashlib.sha256(poster_data).hexdigest()
+            self._store_original_blob(content_hash, poster_data)
+            
+            width, height = self._image_dimensions(poster_data)
+            stmt = insert(OriginalPosterModel).values(
+                jellyfin_id=jellyfin_id,
+                content_hash=content_hash,
+                width=width,
+                height=height,
+                size_bytes=len(poster_data),
+                first_seen_at=first_cached_at
+            ).on_conflict_do_nothing(index_elements=["jellyfin_id"])
+            await session.execute(stmt)
+            await session.commit()
+            imported += 1
+            
+            for cache_file in files:
+                cache_file.unlink(missing_ok=True)
+                cache_file.with_suffix('.meta').unlink(missing_ok=True)
+        
+        return imported
+    
+    @asynccontextmanager
+    async def _index_session(self, db: Optional[AsyncSession]):
+        """The caller's session, or a short-lived one from the shared factory (None if no database)"""
+        if db is not None:
+            yield db
+            return
+        
+        session_factory = database.async_session_factory
+        if session_factory is None:
+            yield None
+            return
+        
+        async with session_factory() as session:
+            yield session
+    
     def _ensure_directories(self):
         """Ensure required directories exist."""
         try:
@@ -389,6 +532,6 @@ class StorageManager:
             self.cache_path.mkdir(parents=True, exist_ok=True)
             
             self.logger.debug(f"Ensured directories exist: {self.processed_path}, {self.preview_path}, {self.cache_path}")
-            
+        
         except Exception as e:
             self.logger.error(f"Error creating directories: {e}", exc_info=True)
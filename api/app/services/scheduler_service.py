@@ -252,27 +252,25 @@ class SchedulerService:
                 try:
                     self.logger.info(f"Processing library {library_id} for schedule {schedule.name}")
                     
-                    # Get library items from Jellyfin
-                    items = await jellyfin_service.get_library_items(library_id)
-                    library_total = len(items)
-                    total_items += library_total
-                    
-                    self.logger.info(f"Found {library_total} items in library {library_id}")
-                    
-                    # Filter items that need processing
+                    # Page through movies and series only; Jellyfin does the type filtering.
+                    # Unless everything is reprocessed it also drops badged items, so a
+                    # mostly badged library costs a handful of small pages
                     items_to_process = []
-                    for item in items:
+                    library_total = 0
+                    candidate_count = 0
+                    async for item in jellyfin_service.iter_library_items(
+                        library_id,
+                        item_types=["Movie", "Series"],
+                        fields="Tags",
+                        exclude_tags=None if schedule.reprocess_all else ["aphrodite-overlay"]
+                    ):
+                        candidate_count += 1
                         jellyfin_id = item.get('Id')
                         item_name = item.get('Name', 'Unknown')
-                        item_type = item.get('Type', '').lower()
                         
                         if not jellyfin_id:
                             continue
                             
-                        # Only process movies and series
-                        if item_type not in ['movie', 'series']:
-                            continue
-                            
                         # Check if item should be processed
                         should_process = schedule.reprocess_all
                         
@@ -288,6 +286,20 @@ class SchedulerService:
                         else:
                             self.logger.debug(f"Skipping {item_name} (already has aphrodite-overlay tag)")
                     
+                    # Badged items were never listed; count them without downloading them
+                    if schedule.reprocess_all:
+                        library_total = candidate_count
+                    else:
+                        library_total = await jellyfin_service.count_library_items(
+                            library_id,
+                            item_types=["Movie", "Series"]
+                        )
+                    total_items += library_total
+                    self.logger.info(
+                        f"Found {library_total} items in library {library_id}, "
+                        f"{len(items_to_process)} to process"
+                    )
+                    
                     # Create batch job(s) for this library if we have items to process
                     if items_to_process:
                         try:
@@ -353,7 +365,7 @@ class SchedulerService:
                         
                 except Exception as e:
                     self.logger.error(f"Error processing library {library_id}: {e}", exc_info=True)
-                    failed_items += library_total
+                    failed_items += candidate_count
                     
             # Update execution with results
             execution.status = "completed" if failed_items == 0 else "completed_with_errors"
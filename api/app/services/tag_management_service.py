@@ -4,10 +4,12 @@ Tag Management Service
 Handles adding/removing tags from Jellyfin media items.
 """
 
+import asyncio
 import aiohttp
 from typing import List, Dict, Any, Optional
 from urllib.parse import urljoin
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.services.jellyfin_service import get_jellyfin_service
@@ -147,8 +149,44 @@ class TagManagementService:
                     pass  # Ignore cleanup errors
             return None
     
-    async def add_tag_to_items(self, item_ids: List[str], tag_name: str = "aphrodite-overlay") -> BulkTagResponse:
-        """Add a tag to multiple Jellyfin items"""
+    async def add_tag_to_items(
+        self,
+        item_ids: List[str],
+        tag_name: str = "aphrodite-overlay",
+        item_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        db_session: Optional[AsyncSession] = None
+    ) -> BulkTagResponse:
+        """
+        Add a tag to multiple Jellyfin items.
+        
+        ``item_data`` maps item IDs to full item details the caller already
+        fetched; those items are written without fetching them again.
+        ``db_session`` is used to mark the library index stale where the
+        global session factory is not initialised (batch workers).
+        """
+        return await self._apply_tag(item_ids, tag_name, add=True, item_data=item_data, db_session=db_session)
+    
+    async def remove_tag_from_items(
+        self,
+        item_ids: List[str],
+        tag_name: str = "aphrodite-overlay",
+        item_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        db_session: Optional[AsyncSession] = None
+    ) -> BulkTagResponse:
+        """Remove a tag from multiple Jellyfin items (see add_tag_to_items)"""
+        return await self._apply_tag(item_ids, tag_name, add=False, item_data=item_data, db_session=db_session)
+    
+    async def _apply_tag(
+        self,
+        item_ids: List[str],
+        tag_name: str,
+        add: bool,
+        item_data: Optional[Dict[str, Dict[str, Any]]] = None,
+        db_session: Optional[AsyncSession] = None
+    ) -> BulkTagResponse:
+        """Add or remove a tag on many items concurrently within a bounded window"""
+        action = "add" if add else "remove"
+        
         # Ensure Jellyfin config is loaded
         if not await self._get_jellyfin_config():
             return BulkTagResponse(
@@ -158,163 +196,110 @@ class TagManagementService:
                 errors=["Failed to load Jellyfin configuration from database"]
             )
         
-        processed_count = 0
-        failed_items = []
-        errors = []
+        # Each item is written at most once per request
+        unique_ids = list(dict.fromkeys(item_ids))
+        item_data = item_data or {}
         
-        self.logger.info(f"Adding tag '{tag_name}' to {len(item_ids)} items")
-        
-        for item_id in item_ids:
-            try:
-                success = await self._add_tag_to_item(item_id, tag_name)
-                if success:
-                    processed_count += 1
-                    self.logger.debug(f"Successfully added tag to item {item_id}")
-                else:
-                    failed_items.append(item_id)
-                    errors.append(f"Failed to add tag to item {item_id}")
-                    self.logger.warning(f"Failed to add tag to item {item_id}")
-            except Exception as e:
-                failed_items.append(item_id)
-                error_msg = f"Error adding tag to item {item_id}: {str(e)}"
-                errors.append(error_msg)
-                self.logger.error(error_msg)
+        self.logger.info(f"{'Adding' if add else 'Removing'} tag '{tag_name}' {'to' if add else 'from'} {len(unique_ids)} items")
         
-        success = len(failed_items) == 0
-        self.logger.info(f"Tag addition complete: {processed_count}/{len(item_ids)} successful")
+        semaphore = asyncio.Semaphore(max(1, get_settings().tag_write_concurrency))
         
-        return BulkTagResponse(
-            success=success,
-            processed_count=processed_count,
-            failed_items=failed_items,
-            errors=errors
-        )
-    
-    async def remove_tag_from_items(self, item_ids: List[str], tag_name: str = "aphrodite-overlay") -> BulkTagResponse:
-        """Remove a tag from multiple Jellyfin items"""
-        # Ensure Jellyfin config is loaded
-        if not await self._get_jellyfin_config():
-            return BulkTagResponse(
-                success=False,
-                processed_count=0,
-                failed_items=item_ids,
-                errors=["Failed to load Jellyfin configuration from database"]
-            )
+        async def apply(item_id: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    if await self._set_item_tag(item_id, tag_name, add, item_data.get(item_id)):
+                        self.logger.debug(f"Successfully {'added' if add else 'removed'} tag on item {item_id}")
+                        return None
+                    self.logger.warning(f"Failed to {action} tag on item {item_id}")
+                    return f"Failed to {action} tag on item {item_id}"
+                except Exception as e:
+                    error_msg = f"Error {'adding' if add else 'removing'} tag on item {item_id}: {str(e)}"
+                    self.logger.error(error_msg)
+                    return error_msg
         
-        processed_count = 0
-        failed_items = []
-        errors = []
+        outcomes = await asyncio.gather(*(apply(item_id) for item_id in unique_ids))
         
-        self.logger.info(f"Removing tag '{tag_name}' from {len(item_ids)} items")
+        failed_items = [item_id for item_id, error in zip(unique_ids, outcomes) if error]
+        errors = [error for error in outcomes if error]
+        processed_count = len(unique_ids) - len(failed_items)
         
-        for item_id in item_ids:
-            try:
-                success = await self._remove_tag_from_item(item_id, tag_name)
-                if success:
-                    processed_count += 1
-                    self.logger.debug(f"Successfully removed tag from item {item_id}")
-                else:
-                    failed_items.append(item_id)
-                    errors.append(f"Failed to remove tag from item {item_id}")
-                    self.logger.warning(f"Failed to remove tag from item {item_id}")
-            except Exception as e:
-                failed_items.append(item_id)
-                error_msg = f"Error removing tag from item {item_id}: {str(e)}"
-                errors.append(error_msg)
-                self.logger.error(error_msg)
+        if processed_count:
+            await self._mark_library_index_stale(db_session)
         
-        success = len(failed_items) == 0
-        self.logger.info(f"Tag removal complete: {processed_count}/{len(item_ids)} successful")
+        self.logger.info(f"Tag {'addition' if add else 'removal'} complete: {processed_count}/{len(unique_ids)} successful")
         
         return BulkTagResponse(
-            success=success,
+            success=len(failed_items) == 0,
             processed_count=processed_count,
             failed_items=failed_items,
             errors=errors
         )
     
-    async def _add_tag_to_item(self, item_id: str, tag_name: str) -> bool:
-        """Add a tag to a single Jellyfin item"""
+    async def _set_item_tag(
+        self,
+        item_id: str,
+        tag_name: str,
+        add: bool,
+        item_data: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Add or remove a tag on one item: one GET (skipped when item_data is given) and one POST if needed"""
         try:
-            # First get current item data
-            current_tags = await self._get_item_tags(item_id)
-            if current_tags is None:
-                return False
+            if item_data is None:
+                item_data = await self._get_item_data(item_id)
+                if item_data is None:
+                    return False
+            
+            current_tags = item_data.get("Tags", []) or []  # Handle None case
             
-            # Check if tag already exists
-            if tag_name in current_tags:
+            if add and tag_name in current_tags:
                 self.logger.debug(f"Tag '{tag_name}' already exists on item {item_id}")
                 return True
-            
-            # Add the new tag
-            updated_tags = current_tags + [tag_name]
-            
-            # Update the item
-            return await self._update_item_tags(item_id, updated_tags)
-            
-        except Exception as e:
-            self.logger.error(f"Error adding tag to item {item_id}: {e}")
-            return False
-    
-    async def _remove_tag_from_item(self, item_id: str, tag_name: str) -> bool:
-        """Remove a tag from a single Jellyfin item"""
-        try:
-            # First get current item data
-            current_tags = await self._get_item_tags(item_id)
-            if current_tags is None:
-                return False
-            
-            # Check if tag exists
-            if tag_name not in current_tags:
+            if not add and tag_name not in current_tags:
                 self.logger.debug(f"Tag '{tag_name}' does not exist on item {item_id}")
                 return True
             
-            # Remove the tag
-            updated_tags = [tag for tag in current_tags if tag != tag_name]
-            
-            # Update the item
-            return await self._update_item_tags(item_id, updated_tags)
+            if add:
+                updated_tags = current_tags + [tag_name]
+            else:
+                updated_tags = [tag for tag in current_tags if tag != tag_name]
             
+            return await self._update_item_tags(item_id, updated_tags, item_data)
+        
         except Exception as e:
-            self.logger.error(f"Error removing tag from item {item_id}: {e}")
+            self.logger.error(f"Error updating tag on item {item_id}: {e}")
             return False
     
+    async def _get_item_data(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Get the full item as the update endpoint expects it (following v1 pattern)"""
+        url = urljoin(self.base_url, f"/Users/{self.user_id}/Items/{item_id}")
+        session = await self.jellyfin_service._get_session()
+        
+        async with session.get(url) as response:
+            if response.status == 200:
+                return await response.json()
+            response_text = await response.text()
+            self.logger.error(f"Failed to get item {item_id}: HTTP {response.status} - {response_text}")
+            return None
+    
     async def _get_item_tags(self, item_id: str) -> Optional[List[str]]:
         """Get current tags for an item (following v1 pattern)"""
         try:
-            # Use the user-specific endpoint like v1 does
-            url = urljoin(self.base_url, f"/Users/{self.user_id}/Items/{item_id}")
-            session = await self.jellyfin_service._get_session()
-            
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    tags = data.get("Tags", []) or []  # Handle None case
-                    self.logger.debug(f"Retrieved {len(tags)} tags for item {item_id}: {tags}")
-                    return tags
-                else:
-                    response_text = await response.text()
-                    self.logger.error(f"Failed to get item {item_id}: HTTP {response.status} - {response_text}")
-                    return None
-                    
+            data = await self._get_item_data(item_id)
+            if data is None:
+                return None
+            tags = data.get("Tags", []) or []  # Handle None case
+            self.logger.debug(f"Retrieved {len(tags)} tags for item {item_id}: {tags}")
+            return tags
+        
         except Exception as e:
             self.logger.error(f"Error getting tags for item {item_id}: {e}")
             return None
     
-    async def _update_item_tags(self, item_id: str, tags: List[str]) -> bool:
+    async def _update_item_tags(self, item_id: str, tags: List[str], item_data: Dict[str, Any]) -> bool:
         """Update tags for an item using Jellyfin API (following v1 pattern)"""
         try:
-            # First get the full item data using user-specific endpoint
-            get_url = urljoin(self.base_url, f"/Users/{self.user_id}/Items/{item_id}")
             session = await self.jellyfin_service._get_session()
             
-            async with session.get(get_url) as response:
-                if response.status != 200:
-                    self.logger.error(f"Failed to get item data for {item_id}: HTTP {response.status}")
-                    return False
-                
-                item_data = await response.json()
-            
             # Create a comprehensive update payload following v1 pattern
             update_payload = {
                 "Id": item_id,
@@ -345,6 +330,7 @@ class TagManagementService:
             async with session.post(update_url, json=update_payload) as response:
                 if response.status in [200, 204]:
                     self.logger.debug(f"Successfully updated tags for item {item_id} to: {tags}")
+                    self.jellyfin_service.invalidate_item(item_id)
                     return True
                 else:
                     response_text = await response.text()
@@ -375,6 +361,7 @@ class TagManagementService:
             async with session.post(update_url, json=update_payload) as response:
                 if response.status in [200, 204]:
                     self.logger.debug(f"Successfully updated tags using alternative method for item {item_id}")
+                    self.jellyfin_service.invalidate_item(item_id)
                     return True
                 else:
                     response_text = await response.text()
@@ -385,6 +372,11 @@ class TagManagementService:
             self.logger.error(f"Error in alternative update for item {item_id}: {e}")
             return False
     
+    async def _mark_library_index_stale(self, db_session: Optional[AsyncSession] = None) -> None:
+        """Make the poster manager pick up badge status changes on its next request"""
+        from app.services.poster_management.library_index import get_library_index_service
+        await get_library_index_service().mark_stale(db_session=db_session)
+    
     async def get_item_tags(self, item_id: str) -> Optional[List[str]]:
         """Public method to get tags for an item"""
         # Ensure Jellyfin config is loaded
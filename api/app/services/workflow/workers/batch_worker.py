@@ -3,6 +3,8 @@ Batch Worker (FIXED)
 
 Main Celery task for processing batch jobs.
 Fixed to properly handle unique posters per job.
+Posters run in a bounded concurrency window (batch_poster_concurrency),
+each with its own database session.
 """
 
 import asyncio
@@ -17,6 +19,7 @@ from app.services.diagnostics.batch_debug_logger import BatchDebugLogger
 from .poster_processor import PosterProcessor
 from .error_handler import ErrorHandler
 from .progress_updater import ProgressUpdater
+from app.services.workflow.progress_tracker import ProgressTracker
 
 logger = get_logger("aphrodite.worker.batch")
 
@@ -44,6 +47,9 @@ def process_batch_job(job_id: str) -> Dict[str, Any]:
     try:
         return loop.run_until_complete(_process_batch_job_async(job_id))
     finally:
+        # Release this loop's pooled Jellyfin connections before the loop goes away
+        from app.services.jellyfin_service import get_jellyfin_service
+        loop.run_until_complete(get_jellyfin_service().close())
         loop.close()
 
 
@@ -56,6 +62,7 @@ async def _process_batch_job_async(job_id: str) -> Dict[str, Any]:
     import asyncio
     
     settings = get_settings()
+    concurrency = max(1, settings.batch_poster_concurrency)
     
     # Get database URL with proper error handling
     try:
@@ -74,7 +81,7 @@ async def _process_batch_job_async(job_id: str) -> Dict[str, Any]:
             worker_engine = create_async_engine(
                 database_url,
                 echo=False,
-                pool_size=1,
+                pool_size=concurrency + 2,  # One session per in-flight poster, the control session and activity writes
                 max_overflow=0,
                 pool_pre_ping=True,
                 pool_recycle=3600,
@@ -150,109 +157,52 @@ async def _process_batch_job_async(job_id: str) -> Dict[str, Any]:
             
             completed = 0
             failed = 0
+            in_flight = set()
+            
+            logger.info(f"📋 Processing with up to {concurrency} posters in flight")
             
             try:
-                # Process each poster with robust error handling
+                # Keep a bounded window of posters in flight; each poster task owns its DB session
                 for i, poster_id in enumerate(job.selected_poster_ids):
-                    try:
-                        logger.info(f"Processing poster {poster_id} ({i + 1}/{job.total_posters})")
-                        
-                        # Debug logging: Start poster processing
-                        await debug_logger.log_poster_processing_start(poster_id, job.badge_types)
-                        
-                        # Check if job was cancelled or paused
-                        current_job = await job_repo.get_job_by_id(job_id)
-                        if current_job.status in [JobStatus.CANCELLED.value, JobStatus.PAUSED.value]:
-                            logger.info(f"Job {job_id} was {current_job.status}, stopping processing")
-                            break
-                        
-                        # Update poster status to processing
-                        await job_repo.update_poster_status(job_id, poster_id, PosterStatus.PROCESSING)
-                        
-                        try:
-                            # Process single poster with progress tracking and debug logging
-                            result = await poster_processor.process_poster(
-                                poster_id=poster_id,
-                                badge_types=job.badge_types,
-                                job_id=job_id,
-                                db_session=db_session,
-                                progress_tracker=progress_updater.progress_tracker,
-                                debug_logger=debug_logger
-                            )
-                            
-                            if result["success"]:
-                                await job_repo.update_poster_status(
-                                    job_id, poster_id, PosterStatus.COMPLETED,
-                                    output_path=result.get("output_path")
-                                )
-                                completed += 1
-                                
-                                # Add aphrodite-overlay tag if successfully uploaded to Jellyfin
-                                if result.get("uploaded_to_jellyfin", False):
-                                    try:
-                                        logger.info(f"Attempting to add aphrodite-overlay tag to {poster_id}")
-                                        from app.services.tag_management_service import get_tag_management_service
-                                        tag_service = get_tag_management_service()
-                                        await tag_service.add_tag_to_items([poster_id], "aphrodite-overlay")
-                                        logger.info(f"✅ Successfully added aphrodite-overlay tag to {poster_id}")
-                                    except Exception as tag_error:
-                                        logger.error(f"❌ Failed to add tag to {poster_id}: {tag_error}", exc_info=True)
-                                else:
-                                    logger.warning(f"Skipping tag addition for {poster_id} - not uploaded to Jellyfin")
-                                
-                                logger.info(f"✅ Completed poster {poster_id} successfully")
-                                # Debug logging: Success
-                                await debug_logger.log_poster_processing_end(poster_id, True)
-                            else:
-                                error_msg = result["error"]
-                                logger.error(f"❌ Failed to process poster {poster_id}: {error_msg}")
-                                # Debug logging: Failure
-                                await debug_logger.log_poster_processing_end(poster_id, False, error_msg)
-                                await error_handler.handle_poster_error(
-                                    job_repo, job_id, poster_id, error_msg
-                                )
-                                failed += 1
-                                
-                        except Exception as poster_exception:
-                            error_msg = str(poster_exception)
-                            logger.error(f"❌ Exception processing poster {poster_id}: {error_msg}", exc_info=True)
-                            # Debug logging: Exception
-                            await debug_logger.log_poster_processing_end(poster_id, False, error_msg)
-                            await error_handler.handle_poster_error(
-                                job_repo, job_id, poster_id, error_msg
-                            )
-                            failed += 1
-                        
-                        # Update job progress after each poster
-                        try:
-                            await progress_updater.update_job_progress(job_id, completed, failed)
-                            logger.info(f"📊 Progress updated: {completed + failed}/{job.total_posters} posters processed")
-                        except Exception as progress_error:
-                            logger.warning(f"Failed to update progress: {progress_error}")
-                        
-                        # Add a small delay between posters to prevent overwhelming the system
-                        if i < len(job.selected_poster_ids) - 1:  # Don't delay after the last poster
-                            await asyncio.sleep(0.1)
-                        
-                    except Exception as loop_exception:
-                        logger.error(f"🚨 CRITICAL: Exception in main processing loop for poster {poster_id}: {loop_exception}", exc_info=True)
-                        # Try to update status and continue with next poster
-                        try:
-                            await job_repo.update_poster_status(job_id, poster_id, PosterStatus.FAILED, error_message=str(loop_exception))
-                            failed += 1
-                            await debug_logger.log_poster_processing_end(poster_id, False, str(loop_exception))
-                        except Exception as status_error:
-                            logger.error(f"Failed to update status for failed poster {poster_id}: {status_error}")
-                        
-                        # Continue processing the next poster
-                        logger.info(f"🔄 Continuing to next poster despite error with {poster_id}")
-                        continue
+                    # Check if job was cancelled or paused before admitting the next poster
+                    current_job = await job_repo.get_job_by_id(job_id)
+                    if current_job.status in [JobStatus.CANCELLED.value, JobStatus.PAUSED.value]:
+                        logger.info(f"Job {job_id} was {current_job.status}, stopping processing")
+                        break
+                    
+                    logger.info(f"Processing poster {poster_id} ({i + 1}/{job.total_posters})")
+                    in_flight.add(asyncio.create_task(
+                        _process_poster_in_window(
+                            session_factory, poster_processor, error_handler,
+                            debug_logger, job_id, poster_id, job.badge_types
+                        )
+                    ))
+                    
+                    if len(in_flight) >= concurrency:
+                        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        completed, failed = await _record_finished_posters(
+                            done, progress_updater, job_id, job.total_posters, completed, failed
+                        )
+                
+                # Drain the window - posters already started always run to completion
+                if in_flight:
+                    done, _ = await asyncio.wait(in_flight)
+                    completed, failed = await _record_finished_posters(
+                        done, progress_updater, job_id, job.total_posters, completed, failed
+                    )
+                
+                # Confirm this job's uploads with one batched query instead of one per poster
+                unverified = await poster_processor.jellyfin_service.verify_pending_uploads(job.selected_poster_ids)
+                if unverified:
+                    logger.warning(f"⚠️ {len(unverified)} uploaded posters could not be verified in Jellyfin: {unverified[:10]}")
                 
                 logger.info(f"📋 Batch processing completed: {completed} successful, {failed} failed out of {job.total_posters} total")
-                logger.info(f"📋 Processing loop finished normally - all {len(job.selected_poster_ids)} posters were attempted")
+                logger.info(f"📋 Processing loop finished normally - {completed + failed}/{len(job.selected_poster_ids)} posters were attempted")
             
             except Exception as critical_error:
                 logger.error(f"🚨 CRITICAL ERROR in job {job_id}: {critical_error}", exc_info=True)
+                for task in in_flight:
+                    task.cancel()
                 try:
                     await job_repo.update_job_status(job_id, JobStatus.FAILED)
                     await job_repo.update_job_error(job_id, str(critical_error))
@@ -273,6 +223,7 @@ async def _process_batch_job_async(job_id: str) -> Dict[str, Any]:
                 "completed": completed,
                 "failed": failed,
                 "total": job.total_posters,
+                "unverified_uploads": len(unverified),
                 "debug_summary": debug_summary if debug_summary.get("debug_enabled") else None
             }
             
@@ -280,5 +231,111 @@ async def _process_batch_job_async(job_id: str) -> Dict[str, Any]:
             return result
             
     finally:
-        # Clean up the worker engine
+        # Write this job's queued activity records, then clean up the worker engine
+        # and the config listener connection opened on this task's event loop
+        from app.services.activity_tracking import get_activity_writer
+        from app.core.config_listener import get_system_config_listener
+        await get_activity_writer().close()
+        await get_system_config_listener().close()
         await worker_engine.dispose()
+
+
+async def _record_finished_posters(done, progress_updater: ProgressUpdater, job_id: str,
+                                   total_posters: int, completed: int, failed: int):
+    """Fold finished poster tasks into the counters and publish progress once per batch of completions"""
+    for task in done:
+        if task.result():
+            completed += 1
+        else:
+            failed += 1
+    
+    # Progress is written through the control session only, never from poster tasks
+    try:
+        await progress_updater.update_job_progress(job_id, completed, failed)
+        logger.info(f"📊 Progress updated: {completed + failed}/{total_posters} posters processed")
+    except Exception as progress_error:
+        logger.warning(f"Failed to update progress: {progress_error}")
+    
+    return completed, failed
+
+
+async def _process_poster_in_window(session_factory,
+                                    poster_processor: PosterProcessor,
+                                    error_handler: ErrorHandler,
+                                    debug_logger: BatchDebugLogger,
+                                    job_id: str,
+                                    poster_id: str,
+                                    badge_types: List[str]) -> bool:
+    """
+    Process one poster inside the concurrency window using its own database session.
+    
+    Returns:
+        True if the poster completed successfully, False otherwise
+    """
+    async with session_factory() as poster_session:
+        poster_repo = JobRepository(poster_session)
+        progress_tracker = ProgressTracker(poster_repo)
+        
+        try:
+            # Debug logging: Start poster processing
+            await debug_logger.log_poster_processing_start(poster_id, badge_types)
+            
+            # Update poster status to processing
+            await poster_repo.update_poster_status(job_id, poster_id, PosterStatus.PROCESSING)
+            
+            try:
+                # Process single poster with progress tracking and debug logging
+                result = await poster_processor.process_poster(
+                    poster_id=poster_id,
+                    badge_types=badge_types,
+                    job_id=job_id,
+                    db_session=poster_session,
+                    progress_tracker=progress_tracker,
+                    debug_logger=debug_logger
+                )
+                
+                if result["success"]:
+                    await poster_repo.update_poster_status(
+                        job_id, poster_id, PosterStatus.COMPLETED,
+                        output_path=result.get("output_path")
+                    )
+                    
+                    # PosterProcessor tags the item right after a successful upload
+                    if result.get("skipped_unchanged"):
+                        logger.info(f"⏭️ Poster {poster_id} unchanged since its last render, skipped")
+                    elif not result.get("uploaded_to_jellyfin", False):
+                        logger.warning(f"Poster {poster_id} was not uploaded to Jellyfin, so it was not tagged")
+                    
+                    logger.info(f"✅ Completed poster {poster_id} successfully")
+                    # Debug logging: Success
+                    await debug_logger.log_poster_processing_end(poster_id, True)
+                    return True
+                
+                error_msg = result["error"]
+                logger.error(f"❌ Failed to process poster {poster_id}: {error_msg}")
+                # Debug logging: Failure
+                await debug_logger.log_poster_processing_end(poster_id, False, error_msg)
+                await error_handler.handle_poster_error(
+                    poster_repo, job_id, poster_id, error_msg
+                )
+                return False
+                
+            except Exception as poster_exception:
+                error_msg = str(poster_exception)
+                logger.error(f"❌ Exception processing poster {poster_id}: {error_msg}", exc_info=True)
+                # Debug logging: Exception
+                await debug_logger.log_poster_processing_end(poster_id, False, error_msg)
+                await error_handler.handle_poster_error(
+                    poster_repo, job_id, poster_id, error_msg
+                )
+                return False
+        
+        except Exception as loop_exception:
+            logger.error(f"🚨 CRITICAL: Exception in processing window for poster {poster_id}: {loop_exception}", exc_info=True)
+            # Try to record the failure; the window carries on with other posters
+            try:
+                await poster_repo.update_poster_status(job_id, poster_id, PosterStatus.FAILED, error_message=str(loop_exception))
+                await debug_logger.log_poster_processing_end(poster_id, False, str(loop_exception))
+            except Exception as status_error:
+                logger.error(f"Failed to update status for failed poster {poster_id}: {status_error}")
+            return False
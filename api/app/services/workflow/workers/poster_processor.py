@@ -4,7 +4,7 @@ Poster Processor (FIXED)
 Individual poster processing wrapper for workers - Fixed to properly handle unique posters.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 import uuid
 import asyncio
@@ -18,6 +18,8 @@ from app.services.jellyfin_service import get_jellyfin_service
 from app.services.workflow.types import PosterStatus
 from app.services.poster_management import StorageManager
 from app.services.tag_management_service import get_tag_management_service
+from app.services.badge_processing.render_fingerprint import get_render_fingerprint_service
+from app.core.config import get_settings
 
 logger = get_logger("aphrodite.worker.poster")
 
@@ -29,6 +31,8 @@ class PosterProcessor:
         self.badge_processor = UniversalBadgeProcessor()
         self.jellyfin_service = get_jellyfin_service()
         self.storage_manager = StorageManager()
+        self.fingerprints = get_render_fingerprint_service()
+        self.skip_unchanged = get_settings().render_fingerprint_skip
     
     async def process_poster(self, 
                            poster_id: str, 
@@ -62,6 +66,26 @@ class PosterProcessor:
         temp_poster_path = None
         
         try:
+            # Badged items whose inputs have not changed since their last upload are skipped
+            inputs_digest = None
+            if self.skip_unchanged and db_session is not None:
+                inputs_digest = await self.fingerprints.get_inputs_digest(poster_id, badge_types, db_session)
+                if inputs_digest and await self._is_render_unchanged(poster_id, inputs_digest, db_session):
+                    logger.debug(f"Skipping poster {poster_id}: original, badge inputs and settings unchanged")
+                    if progress_tracker:
+                        await progress_tracker.update_poster_status(
+                            job_id=job_id,
+                            poster_id=poster_id,
+                            status=PosterStatus.COMPLETED.value
+                        )
+                    return {
+                        "success": True,
+                        "output_path": None,
+                        "applied_badges": [],
+                        "uploaded_to_jellyfin": False,
+                        "skipped_unchanged": True
+                    }
+            
             # Download the specific poster from Jellyfin with retry logic
             logger.debug(f"Downloading poster from Jellyfin for {poster_id}")
             
@@ -121,8 +145,10 @@ class PosterProcessor:
                 }
             
             # Cache the original poster before processing for restore functionality
+            original_hash = None
             try:
-                cached_original_path = self.storage_manager.cache_original_poster(poster_data, poster_id)
+                cached_original_path = await self.storage_manager.cache_original_poster(poster_data, poster_id, db_session)
+                original_hash = Path(cached_original_path).stem
                 logger.debug(f"Successfully cached original poster for {poster_id}: {cached_original_path}")
             except Exception as cache_error:
                 logger.warning(f"Failed to cache original poster for {poster_id}: {cache_error}")
@@ -158,15 +184,22 @@ class PosterProcessor:
                 upload_success = False
                 if poster_result.output_path and os.path.exists(poster_result.output_path):
                     try:
+                        # Item details the badge processors already fetched (the
+                        # upload invalidates the cache) let the tag write skip a GET
+                        item_data = await self.jellyfin_service.get_item_details(poster_id)
+                        
                         upload_success = await self.jellyfin_service.upload_poster_image(
                             poster_id, 
                             poster_result.output_path
                         )
                         if upload_success:
                             # Add aphrodite-overlay tag to mark as processed
-                            await self._add_aphrodite_tag(poster_id)
+                            await self._add_aphrodite_tag(poster_id, item_data, db_session)
                             logger.debug(f"Successfully uploaded processed poster to Jellyfin for {poster_id}")
                             
+                            if inputs_digest and original_hash:
+                                await self._record_render(poster_id, original_hash, inputs_digest, badge_types, db_session)
+                            
                             # Emit progress update: completed successfully
                             if progress_tracker:
                                 await progress_tracker.update_poster_status(
@@ -239,11 +272,42 @@ class PosterProcessor:
         # Use StorageManager to get proper configured path
         return self.storage_manager.create_processed_output_path(f"{poster_id}.jpg", job_id)
     
-    async def _add_aphrodite_tag(self, poster_id: str) -> None:
+    async def _is_render_unchanged(self, poster_id: str, inputs_digest: str, db_session) -> bool:
+        """Whether the item still carries the poster rendered from this original and these inputs"""
+        # Restore and poster replacement remove the tag, so an untagged item always needs rendering.
+        # They run in the API process, so this worker's cached copy of the item may predate them.
+        self.jellyfin_service.invalidate_item(poster_id)
+        item_data = await self.jellyfin_service.get_item_details(poster_id)
+        if not item_data or "aphrodite-overlay" not in (item_data.get("Tags") or []):
+            return False
+        
+        original_hash = await self.storage_manager.get_original_hash(poster_id, db_session)
+        if not original_hash:
+            return False
+        
+        fingerprint = self.fingerprints.fingerprint(original_hash, inputs_digest)
+        return await self.fingerprints.matches(db_session, poster_id, fingerprint)
+    
+    async def _record_render(self, poster_id: str, original_hash: str, inputs_digest: str,
+                             badge_types: List[str], db_session) -> None:
+        """Store the fingerprint of the poster just uploaded"""
+        try:
+            fingerprint = self.fingerprints.fingerprint(original_hash, inputs_digest)
+            await self.fingerprints.record(db_session, poster_id, fingerprint, badge_types)
+        except Exception as e:
+            logger.warning(f"Failed to record render fingerprint for {poster_id}: {e}")
+    
+    async def _add_aphrodite_tag(self, poster_id: str, item_data: Optional[Dict[str, Any]] = None,
+                                 db_session=None) -> None:
         """Add aphrodite-overlay tag to processed item"""
         try:
             tag_service = get_tag_management_service()
-            result = await tag_service.add_tag_to_items([poster_id], "aphrodite-overlay")
+            result = await tag_service.add_tag_to_items(
+                [poster_id],
+                "aphrodite-overlay",
+                item_data={poster_id: item_data} if item_data else None,
+                db_session=db_session
+            )
             if result.processed_count > 0:
                 logger.debug(f"Successfully added 'aphrodite-overlay' tag to item {poster_id}")
             else:
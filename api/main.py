@@ -33,7 +33,7 @@ from app.middleware.logging import LoggingMiddleware
 from app.middleware.correlation import CorrelationMiddleware
 
 # Import routes
-from app.routes import health, media, jobs, config, system, maintenance, preview, poster_manager, poster_replacement, image_proxy, schedules, analytics, resolution_diagnostics, audio_diagnostics, jellyfin_diagnostics, infrastructure_diagnostics, batch_debug, activity_tracking, advanced_analytics, debug_routes
+from app.routes import health, media, jobs, config, system, maintenance, preview, poster_manager, poster_replacement, image_proxy, schedules, analytics, resolution_diagnostics, audio_diagnostics, jellyfin_diagnostics, infrastructure_diagnostics, batch_debug, activity_tracking, advanced_analytics, debug_routes, webhooks
 from app.routes.workflow import job_router, control_router, progress_router, websocket_endpoint
 
 # Import exception handlers
@@ -81,6 +81,13 @@ async def lifespan(app: FastAPI):
         else:
             logger.info(f"Session factory verified: {id(async_session_factory)}")
         
+        # Listen for system_config changes so cached settings in this process stay current
+        try:
+            from app.core.config_listener import get_system_config_listener
+            await get_system_config_listener().ensure_listening()
+        except Exception as e:
+            logger.warning(f"Failed to start config change listener: {e}")
+        
         # Auto-initialize badge settings if needed
         try:
             from api.database_defaults_init import auto_initialize_on_startup
@@ -88,6 +95,13 @@ async def lifespan(app: FastAPI):
         except Exception as init_error:
             logger.warning(f"Badge settings auto-initialization failed: {init_error}")
         
+        # Build the daily activity rollups from existing history on first start
+        try:
+            from app.services.analytics.activity_rollups import get_activity_rollup_service
+            await get_activity_rollup_service().backfill_if_empty()
+        except Exception as rollup_error:
+            logger.warning(f"Activity rollup backfill failed: {rollup_error}")
+        
         # NOTE: Automatic library scan disabled to prevent startup issues
         # The dashboard will fetch live counts directly from Jellyfin instead
         # Users can manually trigger scans from the Media page if needed
@@ -144,6 +158,13 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Failed to start scheduler service: {e}")
         
+        # Start change feed (new and changed Jellyfin items)
+        try:
+            from app.services.change_feed_service import get_change_feed_service
+            await get_change_feed_service().start()
+        except Exception as e:
+            logger.warning(f"Failed to start change feed: {e}")
+        
         yield
         
     except Exception as e:
@@ -162,6 +183,13 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Error stopping scheduler service: {e}")
         
+        # Stop change feed
+        try:
+            from app.services.change_feed_service import get_change_feed_service
+            await get_change_feed_service().stop()
+        except Exception as e:
+            logger.warning(f"Error stopping change feed: {e}")
+        
         # Stop WebSocket Redis listener
         try:
             # Import only when needed
@@ -171,6 +199,44 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"Error stopping WebSocket Redis listener: {e}")
         
+        # Close pooled Jellyfin connections
+        try:
+            from app.services.jellyfin_service import get_jellyfin_service
+            await get_jellyfin_service().close()
+            logger.info("Jellyfin connection pool closed")
+        except Exception as e:
+            logger.warning(f"Error closing Jellyfin connection pool: {e}")
+        
+        # Close the image proxy's external connection pool
+        try:
+            from app.services.image_proxy_cache import get_image_proxy_cache
+            await get_image_proxy_cache().close()
+        except Exception as e:
+            logger.warning(f"Error closing image proxy session: {e}")
+        
+        # Stop image processing pool
+        try:
+            from app.services.badge_processing.image_executor import get_image_executor
+            get_image_executor().shutdown(wait=False)
+            logger.info("Image processing pool stopped")
+        except Exception as e:
+            logger.warning(f"Error stopping image processing pool: {e}")
+        
+        # Write queued activity records before the engine goes away
+        try:
+            from app.services.activity_tracking import get_activity_writer
+            await get_activity_writer().close()
+            logger.info("Activity writer flushed")
+        except Exception as e:
+            logger.warning(f"Error flushing activity writer: {e}")
+        
+        # Stop listening for system_config changes
+        try:
+            from app.core.config_listener import get_system_config_listener
+            await get_system_config_listener().close()
+        except Exception as e:
+            logger.warning(f"Error closing config change listener: {e}")
+        
         await close_db()
         logger.info("Database connections closed")
 
@@ -240,6 +306,7 @@ def create_application() -> FastAPI:
     app.include_router(activity_tracking.router, prefix="/api/v1", tags=["Activity Tracking"])
     app.include_router(advanced_analytics.router, prefix="/api/v1", tags=["Advanced Analytics"])
     app.include_router(debug_routes.router, prefix="/api/v1", tags=["Debug"])
+    app.include_router(webhooks.router, prefix="/api/v1", tags=["Webhooks"])
     
     # Workflow routes
     app.include_router(job_router, prefix="/api/v1", tags=["Workflow"])
@@ -11,6 +11,57 @@ import os
 import logging
 from pathlib import Path
 
+async def upload_and_tag(jellyfin_id: str, poster_path: str) -> dict:
+    """
+    Upload a poster to Jellyfin and add the aphrodite-overlay tag.
+    
+    Expects the database to be initialized. Shared by this runner and the
+    persistent workers in v2_worker_pool.
+    """
+    # Import services after database initialization
+    from app.services.jellyfin_service import get_jellyfin_service
+    from app.services.tag_management_service import get_tag_management_service
+    
+    jellyfin_service = get_jellyfin_service()
+    
+    # Item details cached while the badges were rendered in this process; the
+    # upload invalidates them, and the tag write can reuse them instead of a GET
+    item_data = await jellyfin_service.get_item_details(jellyfin_id)
+    known_items = {jellyfin_id: item_data} if item_data else None
+    
+    # Upload enhanced poster to Jellyfin
+    upload_success = await jellyfin_service.upload_poster_image(
+        jellyfin_id, 
+        poster_path
+    )
+    
+    tag_success = False
+    tag_error = None
+    if upload_success:
+        # Add aphrodite-overlay tag
+        try:
+            tag_service = get_tag_management_service()
+            tag_result = await tag_service.add_tag_to_items([jellyfin_id], "aphrodite-overlay", item_data=known_items)
+            # Check if the tag was actually applied
+            tag_success = tag_result.processed_count > 0
+        except Exception as e:
+            tag_error = str(e)
+    else:
+        # Even if upload fails, we should still try to add the tag for testing
+        # This helps us isolate whether the tag issue is separate from upload issue
+        try:
+            tag_service = get_tag_management_service()
+            tag_result = await tag_service.add_tag_to_items([jellyfin_id], "aphrodite-overlay", item_data=known_items)
+            tag_success = tag_result.processed_count > 0
+        except Exception as e:
+            tag_error = str(e)
+    
+    return {
+        "upload_success": upload_success,
+        "tag_success": tag_success,
+        "tag_error": tag_error
+    }
+
 def run_jellyfin_upload():
     """Run Jellyfin upload in isolated subprocess"""
     
@@ -36,52 +87,14 @@ def run_jellyfin_upload():
         os.chdir(api_dir)
         sys.path.insert(0, str(api_dir))
         
-        async def upload_and_tag():
+        async def upload_with_database():
             # Initialize database first
             from app.core.database import init_db
             await init_db()
-            
-            # Import services after database initialization
-            from app.services.jellyfin_service import get_jellyfin_service
-            from app.services.tag_management_service import get_tag_management_service
-            
-            jellyfin_service = get_jellyfin_service()
-            
-            # Upload enhanced poster to Jellyfin
-            upload_success = await jellyfin_service.upload_poster_image(
-                jellyfin_id, 
-                poster_path
-            )
-            
-            tag_success = False
-            tag_error = None
-            if upload_success:
-                # Add aphrodite-overlay tag
-                try:
-                    tag_service = get_tag_management_service()
-                    tag_result = await tag_service.add_tag_to_items([jellyfin_id], "aphrodite-overlay")
-                    # Check if the tag was actually applied
-                    tag_success = tag_result.processed_count > 0
-                except Exception as e:
-                    tag_error = str(e)
-            else:
-                # Even if upload fails, we should still try to add the tag for testing
-                # This helps us isolate whether the tag issue is separate from upload issue
-                try:
-                    tag_service = get_tag_management_service()
-                    tag_result = await tag_service.add_tag_to_items([jellyfin_id], "aphrodite-overlay")
-                    tag_success = tag_result.processed_count > 0
-                except Exception as e:
-                    tag_error = str(e)
-            
-            return {
-                "upload_success": upload_success,
-                "tag_success": tag_success,
-                "tag_error": tag_error
-            }
+            return await upload_and_tag(jellyfin_id, poster_path)
         
         # Run async function
-        result = asyncio.run(upload_and_tag())
+        result = asyncio.run(upload_with_database())
         
         # Return clean JSON response
         print(json.dumps(result))
@@ -17,6 +17,7 @@ if api_path not in sys.path:
     sys.path.insert(0, api_path)
 
 from celery import Celery
+from celery.signals import worker_ready, worker_shutdown
 import time
 from typing import Dict, Any, Optional
 from pathlib import Path
@@ -59,6 +60,24 @@ def setup_database(sender, **kwargs):
     print("V2-only mode enabled - legacy v1 imports disabled")
 
 
+@worker_ready.connect
+def start_v2_worker_pool(sender, **kwargs):
+    """Pre-warm the persistent V2 processing workers"""
+    from v2_worker_pool import get_v2_worker_pool
+    try:
+        get_v2_worker_pool().start()
+    except Exception as e:
+        # Tasks will retry the start on first use
+        print(f"⚠️ Failed to pre-warm V2 worker pool: {e}")
+
+
+@worker_shutdown.connect
+def stop_v2_worker_pool(sender, **kwargs):
+    """Stop the persistent V2 processing workers"""
+    from v2_worker_pool import get_v2_worker_pool
+    get_v2_worker_pool().shutdown()
+
+
 @app.task
 def simple_task(message):
     """Simple test task"""
@@ -199,6 +218,15 @@ def process_batch_job(self, job_id: str) -> Dict[str, Any]:
             # Broadcast progress update via WebSocket
             broadcast_progress_update(job_id, completed, failed, total_posters)
         
+        # Confirm the uploads the V2 workers deferred, one batched query per worker
+        try:
+            from v2_worker_pool import get_v2_worker_pool
+            unverified = get_v2_worker_pool().verify_uploads()
+            if unverified:
+                print(f"⚠️ {len(unverified)} uploaded posters could not be verified in Jellyfin: {unverified[:10]}")
+        except Exception as e:
+            print(f"⚠️ Upload verification failed: {e}")
+        
         # Finalize job
         final_status = 'completed' if failed == 0 else 'failed'
         with conn.cursor() as cursor:
@@ -312,7 +340,7 @@ def process_single_poster(poster_id: str, badge_types: list, job_id: str) -> dic
                 
                 print(f"Uploading enhanced poster to ORIGINAL Jellyfin ID: {upload_jellyfin_id} (not {jellyfin_id})")
                 
-                # Run Jellyfin upload via subprocess to avoid async conflicts
+                # Run Jellyfin upload on the V2 worker to avoid async conflicts
                 upload_result = run_jellyfin_upload_subprocess(
                     upload_jellyfin_id,  # Use original poster ID, not fallback poster ID
                     result["output_path"]
@@ -523,58 +551,20 @@ def get_input_poster_path(poster_id: str) -> Optional[Path]:
 
 def run_jellyfin_upload_subprocess(jellyfin_id: str, poster_path: str) -> dict:
     """
-    Run Jellyfin upload via subprocess to avoid async context conflicts
+    Run Jellyfin upload on a persistent V2 worker to avoid async context conflicts
     """
-    import subprocess
-    import json
+    from v2_worker_pool import get_v2_worker_pool
     
     try:
         print(f"Uploading enhanced poster back to Jellyfin for {jellyfin_id}")
         
-        # Prepare request data for subprocess
-        request_data = {
-            "jellyfin_id": jellyfin_id,
-            "poster_path": poster_path
-        }
-        
-        request_json = json.dumps(request_data)
-        
-        # Get the subprocess runner path
-        script_dir = os.path.dirname(__file__)
-        runner_path = os.path.join(script_dir, "jellyfin_upload_runner.py")
-        
-        # Run the subprocess
-        result = subprocess.run(
-            [sys.executable, runner_path],
-            input=request_json,
-            text=True,
-            capture_output=True,
-            timeout=60,  # 1 minute timeout
-            encoding='utf-8',
-            errors='replace'
+        return get_v2_worker_pool().run_upload(
+            jellyfin_id,
+            os.path.abspath(poster_path),
+            timeout=60  # 1 minute timeout
         )
-        
-        if result.returncode != 0:
-            error_msg = f"Subprocess failed with code {result.returncode}: {result.stderr}"
-            print(f"[ERROR] {error_msg}")
-            return {
-                "upload_success": False,
-                "tag_success": False,
-                "error": error_msg
-            }
-        
-        # Parse the response
-        if result.stdout is None or not result.stdout.strip():
-            return {
-                "upload_success": False,
-                "tag_success": False,
-                "error": "No response from subprocess"
-            }
-        
-        response_data = json.loads(result.stdout.strip())
-        return response_data
-        
-    except subprocess.TimeoutExpired:
+    
+    except TimeoutError:
         error_msg = "Jellyfin upload timed out after 1 minute"
         print(f"[ERROR] {error_msg}")
         return {
@@ -583,7 +573,7 @@ def run_jellyfin_upload_subprocess(jellyfin_id: str, poster_path: str) -> dict:
             "error": error_msg
         }
     except Exception as e:
-        error_msg = f"Subprocess execution error: {str(e)}"
+        error_msg = f"V2 worker execution error: {str(e)}"
         print(f"[ERROR] {error_msg}")
         return {
             "upload_success": False,
@@ -625,82 +615,37 @@ def get_jellyfin_id_from_poster(poster_path: Path) -> Optional[str]:
 
 def run_v2_badge_processing(poster_path: str, badge_types: list, output_path: str, jellyfin_id: Optional[str] = None) -> dict:
     """
-    Run the v2 badge processing system via subprocess to avoid Celery import conflicts
+    Run the v2 badge processing system on a persistent V2 worker process.
+    
+    The worker keeps the V2 imports, database engine and caches warm between
+    posters and stays isolated from Celery's import state.
     """
-    print(f"[DEBUG] Running V2 processing via subprocess")
-    print(f"[DEBUG] Parameters: poster_path={poster_path}, badge_types={badge_types}, jellyfin_id={jellyfin_id}")
+    from v2_worker_pool import get_v2_worker_pool
     
-    # Ensure we're not importing any v1 legacy code
-    import subprocess
-    import json
+    print(f"[DEBUG] Running V2 processing on persistent worker")
+    print(f"[DEBUG] Parameters: poster_path={poster_path}, badge_types={badge_types}, jellyfin_id={jellyfin_id}")
     
     try:
-        # Prepare request data for subprocess
+        # Workers run from the API directory, so resolve paths here
         request_data = {
-            "poster_path": poster_path,
+            "poster_path": os.path.abspath(poster_path),
             "badge_types": badge_types,
-            "output_path": output_path,
+            "output_path": os.path.abspath(output_path),
             "use_demo_data": False,
             "jellyfin_id": jellyfin_id
         }
+        print(f"[DEBUG] Worker request: {request_data}")
         
-        request_json = json.dumps(request_data)
-        print(f"[DEBUG] Subprocess request: {request_json}")
-        
-        # Get the subprocess runner path
-        script_dir = os.path.dirname(__file__)
-        runner_path = os.path.join(script_dir, "v2_subprocess_runner.py")
-        
-        print(f"[DEBUG] Running subprocess: {runner_path}")
-        
-        # Set environment for UTF-8 encoding and disable v1 legacy imports
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        env['PYTHONLEGACYWINDOWSSTDIO'] = 'utf-8'
-        env['APHRODITE_V2_ONLY'] = '1'  # Flag to disable v1 imports
-        
-        # Run the subprocess
-        result = subprocess.run(
-            [sys.executable, runner_path],
-            input=request_json,
-            text=True,
-            capture_output=True,
-            timeout=300,  # 5 minute timeout
-            env=env,
-            encoding='utf-8',
-            errors='replace'  # Replace invalid characters instead of crashing
+        response_data = get_v2_worker_pool().run_badge_request(
+            request_data,
+            timeout=300  # 5 minute timeout
         )
         
-        print(f"[DEBUG] Subprocess return code: {result.returncode}")
-        print(f"[DEBUG] Subprocess stderr: {result.stderr}")
-        
-        if result.returncode != 0:
-            raise Exception(f"Subprocess failed with code {result.returncode}: {result.stderr}")
-        
-        # Parse the response
-        try:
-            # Handle potential None stdout or encoding issues
-            if result.stdout is None:
-                raise Exception("Subprocess returned no stdout")
-                
-            stdout_text = result.stdout.strip()
-            if not stdout_text:
-                raise Exception("Subprocess returned empty stdout")
-                
-            # Handle multiple lines in stdout - take the last line as JSON response
-            lines = stdout_text.split('\n')
-            json_line = lines[-1]  # Last line should be the JSON response
-            response_data = json.loads(json_line)
-        except (json.JSONDecodeError, IndexError, AttributeError) as e:
-            print(f"JSON parsing error: {e}")
-            print(f"Raw stdout: {result.stdout}")
-            raise Exception(f"Failed to parse subprocess response: {e}")
-        
-        print(f"[DEBUG] Subprocess response: {response_data}")
+        print(f"[DEBUG] Worker response: {response_data}")
         
         return response_data
-        
-    except subprocess.TimeoutExpired:
+    
+    except TimeoutError:
         error_msg = "V2 processing timed out after 5 minutes"
         print(f"[ERROR] {error_msg}")
         return {
@@ -711,7 +656,7 @@ def run_v2_badge_processing(poster_path: str, badge_types: list, output_path: st
             "processing_time": 0
         }
     except Exception as e:
-        error_msg = f"Subprocess execution error: {str(e)}"
+        error_msg = f"V2 worker execution error: {str(e)}"
         print(f"[ERROR] {error_msg}")
         import traceback
         traceback.print_exc()
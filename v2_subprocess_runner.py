@@ -14,6 +14,50 @@ from pathlib import Path
 # CRITICAL: Disable v1 legacy imports that cause database table errors
 V2_ONLY_MODE = os.environ.get('APHRODITE_V2_ONLY', '0') == '1'
 
+async def process_badge_request(request_data: dict) -> dict:
+    """
+    Run one V2 badge request and return the JSON-serializable response.
+    
+    Expects the database to be initialized and absolute poster/output paths.
+    Shared by this runner and the persistent workers in v2_worker_pool.
+    """
+    # Import V2 components after database initialization
+    try:
+        from app.services.badge_processing.pipeline import UniversalBadgeProcessor
+        from app.services.badge_processing.types import SingleBadgeRequest
+    except ImportError as import_error:
+        print(f"Import error: {import_error}", file=sys.stderr)
+        raise
+    
+    # Create and run request
+    request = SingleBadgeRequest(
+        poster_path=request_data["poster_path"],
+        badge_types=request_data["badge_types"],
+        output_path=request_data["output_path"],
+        use_demo_data=request_data.get("use_demo_data", False),
+        jellyfin_id=request_data.get("jellyfin_id")
+    )
+    
+    processor = UniversalBadgeProcessor()
+    result = await processor.process_single(request)
+    
+    # Extract results
+    applied_badges = []
+    final_output_path = None
+    
+    if result.results and len(result.results) > 0:
+        first_result = result.results[0]
+        applied_badges = first_result.applied_badges
+        final_output_path = first_result.output_path
+    
+    return {
+        "success": result.success,
+        "applied_badges": applied_badges,
+        "output_path": str(final_output_path) if final_output_path else None,
+        "processing_time": result.processing_time,
+        "error": result.error
+    }
+
 def run_v2_processing():
     """Run V2 badge processing in isolated subprocess"""
     
@@ -62,49 +106,19 @@ def run_v2_processing():
                 print(f"Database initialization failed: {db_error}", file=sys.stderr)
                 raise
             
-            # Import V2 components after database initialization
             try:
-                from app.services.badge_processing.pipeline import UniversalBadgeProcessor
-                from app.services.badge_processing.types import SingleBadgeRequest
-                print("Imported badge processing components successfully", file=sys.stderr)
-            except ImportError as import_error:
-                print(f"Import error: {import_error}", file=sys.stderr)
-                raise
-            
-            # Create and run request
-            request = SingleBadgeRequest(
-                poster_path=poster_path,
-                badge_types=request_data["badge_types"],
-                output_path=output_path,
-                use_demo_data=request_data.get("use_demo_data", False),
-                jellyfin_id=request_data.get("jellyfin_id")
-            )
-            
-            processor = UniversalBadgeProcessor()
-            result = await processor.process_single(request)
-            
-            return result
+                return await process_badge_request({
+                    **request_data,
+                    "poster_path": poster_path,
+                    "output_path": output_path
+                })
+            finally:
+                # asyncio.run cancels the writer's delayed flush; write queued activity rows now
+                from app.services.activity_tracking import get_activity_writer
+                await get_activity_writer().close()
         
         # Run processing with database initialization
-        result = asyncio.run(process_with_database())
-        
-        # Extract results
-        applied_badges = []
-        final_output_path = None
-        
-        if result.results and len(result.results) > 0:
-            first_result = result.results[0]
-            applied_badges = first_result.applied_badges
-            final_output_path = first_result.output_path
-        
-        # Return clean JSON response
-        response = {
-            "success": result.success,
-            "applied_badges": applied_badges,
-            "output_path": str(final_output_path) if final_output_path else None,
-            "processing_time": result.processing_time,
-            "error": result.error
-        }
+        response = asyncio.run(process_with_database())
         
         print(json.dumps(response))
         
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+V2 Worker Pool
+Persistent, pre-warmed processes for V2 badge processing and Jellyfin uploads.
+
+Each worker imports the API once, initializes the database once and keeps a
+single event loop alive, so fonts, settings, HTTP sessions and other caches
+survive between posters. Jobs and results travel over a pipe per worker.
+"""
+
+import sys
+import os
+import asyncio
+import atexit
+import multiprocessing
+import queue
+import threading
+import traceback
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+API_DIR = SCRIPT_DIR / "api"
+
+
+def _worker_main(conn) -> None:
+    """Worker process entry point: warm up once, then serve jobs until told to stop"""
+    os.environ['APHRODITE_V2_ONLY'] = '1'
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    os.chdir(API_DIR)
+    for path in (str(SCRIPT_DIR), str(API_DIR)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    
+    try:
+        from app.core.database import init_db
+        loop.run_until_complete(init_db())
+        
+        # Pay the import cost once per worker instead of once per poster
+        from v2_subprocess_runner import process_badge_request
+        from jellyfin_upload_runner import upload_and_tag
+        from app.services.activity_tracking import get_activity_writer
+        
+        print(f"[V2 POOL] Worker {os.getpid()} ready", file=sys.stderr)
+        conn.send({"ready": True})
+    except Exception as e:
+        traceback.print_exc()
+        conn.send({"ready": False, "error": f"Worker initialization failed: {e}"})
+        return
+    
+    try:
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                break
+            if job is None:
+                break
+            
+            try:
+                if job["kind"] == "badge":
+                    response = loop.run_until_complete(process_badge_request(job["request"]))
+                elif job["kind"] == "upload":
+                    response = loop.run_until_complete(upload_and_tag(job["jellyfin_id"], job["poster_path"]))
+                elif job["kind"] == "verify":
+                    from app.services.jellyfin_service import get_jellyfin_service
+                    unverified = loop.run_until_complete(get_jellyfin_service().verify_pending_uploads())
+                    response = {"success": True, "unverified": unverified}
+                else:
+                    response = {"success": False, "error": f"Unknown job kind: {job['kind']}"}
+            except Exception as e:
+                traceback.print_exc()
+                response = {"success": False, "error": str(e)}
+            
+            # The loop only runs during a job, so the writer's delayed flush would stall until the next one
+            try:
+                loop.run_until_complete(get_activity_writer().close())
+            except Exception:
+                traceback.print_exc()
+            
+            conn.send(response)
+    finally:
+        try:
+            from app.services.jellyfin_service import get_jellyfin_service
+            from app.core.config_listener import get_system_config_listener
+            loop.run_until_complete(get_activity_writer().close())
+            loop.run_until_complete(get_jellyfin_service().close())
+            loop.run_until_complete(get_system_config_listener().close())
+        except Exception:
+            pass
+        loop.close()
+
+
+class _Worker:
+    """Handle for one pool process and the parent end of its pipe"""
+    
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+    
+    def wait_ready(self, timeout: float) -> None:
+        if not self.conn.poll(timeout):
+            self.kill()
+            raise RuntimeError(f"V2 worker did not start within {timeout}s")
+        message = self.conn.recv()
+        if not message.get("ready"):
+            self.kill()
+            raise RuntimeError(message.get("error", "V2 worker failed to start"))
+    
+    def kill(self) -> None:
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
+    
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout=10)
+        self.kill()
+
+
+class V2WorkerPool:
+    """Fixed-size pool of persistent V2 processing workers"""
+    
+    def __init__(self, size: int = 1, startup_timeout: float = 120.0, acquire_timeout: float = 900.0):
+        self.size = max(1, size)
+        self.startup_timeout = startup_timeout
+        self.acquire_timeout = acquire_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers = []
+        self._spawning = 0
+        self._lock = threading.Lock()
+        self._started = False
+    
+    def start(self) -> None:
+        """Start and warm up all workers (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            print(f"[V2 POOL] Starting {self.size} persistent V2 workers")
+            try:
+                for _ in range(self.size):
+                    worker = self._spawn()
+                    self._workers.append(worker)
+                    self._idle.put(worker)
+            except Exception:
+                for worker in self._workers:
+                    worker.kill()
+                self._workers = []
+                self._idle = queue.Queue()
+                raise
+            self._started = True
+    
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context)
+        worker.wait_ready(self.startup_timeout)
+        return worker
+    
+    def _add_worker(self) -> Optional[_Worker]:
+        """Start and register one more worker if the running pool is below its size"""
+        with self._lock:
+            if not self._started or len(self._workers) + self._spawning >= self.size:
+                return None
+            self._spawning += 1
+        try:
+            worker = self._spawn()
+        except Exception as e:
+            with self._lock:
+                self._spawning -= 1
+            print(f"[V2 POOL] Failed to start worker: {e}")
+            return None
+        with self._lock:
+            self._spawning -= 1
+            if self._started:
+                self._workers.append(worker)
+                return worker
+        # The pool was shut down while this worker was starting
+        worker.stop()
+        return None
+    
+    def _replace(self, worker: _Worker) -> Optional[_Worker]:
+        """Kill a broken or hung worker and start a fresh one in its place"""
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        return self._add_worker()
+    
+    def _acquire(self) -> _Worker:
+        """
+        Take the next idle worker, first restarting one if failed restarts left the pool short.
+        
+        Raises:
+            TimeoutError: If no worker became idle within acquire_timeout
+        """
+        if self._idle.empty():
+            worker = self._add_worker()
+            if worker is not None:
+                return worker
+        try:
+            return self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No V2 worker became available within {self.acquire_timeout}s")
+    
+    def submit(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        Run a job on the next idle worker and wait for its response.
+        
+        Raises:
+            TimeoutError: If no worker became available, or the worker did not answer
+                in time (it is replaced)
+            RuntimeError: If the worker died while handling the job (it is replaced)
+        """
+        self.start()
+        worker = self._acquire()
+        try:
+            worker.conn.send(job)
+            if not worker.conn.poll(timeout):
+                worker = self._replace(worker)
+                raise TimeoutError(f"V2 worker timed out after {timeout}s")
+            return worker.conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError, OSError) as e:
+            worker = self._replace(worker)
+            raise RuntimeError(f"V2 worker process died: {e}")
+        finally:
+            if worker is None:
+                # Keep the pool at full size even if a restart failed once
+                worker = self._add_worker()
+            if worker is not None:
+                self._idle.put(worker)
+            elif self._started:
+                print("[V2 POOL] Pool is running short a worker; the next job will retry starting one")
+    
+    def run_badge_request(self, request_data: Dict[str, Any], timeout: float = 300) -> Dict[str, Any]:
+        """Process one poster with the V2 pipeline"""
+        return self.submit({"kind": "badge", "request": request_data}, timeout)
+    
+    def run_upload(self, jellyfin_id: str, poster_path: str, timeout: float = 60) -> Dict[str, Any]:
+        """Upload a poster to Jellyfin and tag it"""
+        return self.submit({"kind": "upload", "jellyfin_id": jellyfin_id, "poster_path": poster_path}, timeout)
+    
+    def verify_uploads(self, timeout: float = 60) -> list:
+        """
+        Have every worker verify the poster uploads it deferred.
+        
+        Waits for busy workers to finish their current job first.
+        
+        Returns:
+            Jellyfin IDs whose new poster could not be confirmed
+        """
+        if not self._started:
+            return []
+        
+        unverified = []
+        workers = []
+        for _ in range(len(self._workers)):
+            try:
+                workers.append(self._idle.get(timeout=self.acquire_timeout))
+            except queue.Empty:
+                print(f"[V2 POOL] Skipping upload verification on workers still busy after {self.acquire_timeout}s")
+                break
+        for worker in workers:
+            try:
+                worker.conn.send({"kind": "verify"})
+                if worker.conn.poll(timeout):
+                    unverified.extend(worker.conn.recv().get("unverified", []))
+                    self._idle.put(worker)
+                    continue
+                print(f"[V2 POOL] Upload verification timed out after {timeout}s")
+            except (EOFError, BrokenPipeError, ConnectionResetError, OSError) as e:
+                print(f"[V2 POOL] Upload verification interrupted: {e}")
+            
+            # A worker that did not answer cannot be trusted with the next job
+            replacement = self._replace(worker)
+            if replacement is not None:
+                self._idle.put(replacement)
+        return unverified
+    
+    def shutdown(self) -> None:
+        """Stop all workers"""
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._started = False
+        for worker in workers:
+            worker.stop()
+        self._idle = queue.Queue()
+
+
+# Global pool instance
+_pool: Optional[V2WorkerPool] = None
+
+def get_v2_worker_pool() -> V2WorkerPool:
+    """Get global V2 worker pool (sized by V2_WORKER_POOL_SIZE, default 1)"""
+    global _pool
+    if _pool is None:
+        _pool = V2WorkerPool(size=int(os.environ.get('V2_WORKER_POOL_SIZE', '1')))
+        atexit.register(_pool.shutdown)
+    return _pool